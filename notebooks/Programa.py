@@ -1,19 +1,66 @@
 import os
+import re
 import sys
+import json
+import time
+import argparse
+import shutil
+import pickle
+import hashlib
+import importlib
+import importlib.util
 import subprocess
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import shapiro, normaltest
-
-# Intentar importar display de IPython, pero usar print como fallback
-try:
-    from IPython.display import display
-except ImportError:
-    # Si estamos en un entorno que no tiene IPython, usar print
-    def display(obj):
+import threading
+import contextlib
+import copy
+import tracemalloc
+from collections import OrderedDict, deque
+
+
+class ModuloDiferido:
+    """
+    Sustituto de un módulo que lo importa la primera vez que se usa uno de
+    sus atributos. Así el menú aparece sin esperar a pandas, matplotlib o
+    seaborn, y cada opción paga la importación solo cuando la necesita.
+    """
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return getattr(self._modulo, atributo)
+
+
+pd = ModuloDiferido("pandas")
+np = ModuloDiferido("numpy")
+plt = ModuloDiferido("matplotlib.pyplot")
+sns = ModuloDiferido("seaborn")
+
+# pyarrow es opcional: sin él no hay caché columnar y se usa solo el CSV
+pa = ModuloDiferido("pyarrow")
+pq = ModuloDiferido("pyarrow.parquet")
+ds = ModuloDiferido("pyarrow.dataset")
+
+# duckdb es opcional: solo lo usa el backend SQL (AURELION_BACKEND=duckdb)
+duckdb = ModuloDiferido("duckdb")
+
+
+def pyarrow_disponible():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def display(obj):
+    """display de IPython si está instalado; si no, print"""
+    try:
+        from IPython.display import display as display_ipython
+    except ImportError:
         print(obj)
+        return
+    display_ipython(obj)
+
 
 def cargar_datos():
     try:
@@ -30,12 +77,11 @@ def cargar_datos():
 
 def crear_df_maestro(ventas, clientes, productos, detalle_ventas):
     try:
-        df_maestro = (
-            detalle_ventas
-            .merge(productos, on="id_producto", how="left")
-            .merge(ventas, on="id_venta", how="left")
-            .merge(clientes, on="id_cliente", how="left")
-        )
+        df_maestro = unir_dimensiones(detalle_ventas, [
+            (productos, "id_producto", None, ("_x", "_y")),
+            (ventas, "id_venta", None, ("_x", "_y")),
+            (clientes, "id_cliente", None, ("_x", "_y")),
+        ])
         print("✅ DataFrame maestro creado correctamente.")
         return df_maestro
     except Exception as e:
@@ -43,13 +89,20 @@ def crear_df_maestro(ventas, clientes, productos, detalle_ventas):
         return None
 
 
-def cargar_tabla_unificada_csv():
+def cargar_tabla_unificada_csv(columnas=None):
     try:
-        base_dir = os.path.dirname(__file__)
-        ruta = os.path.join(base_dir, "..", "database", "tabla_unificada.csv")
-        ruta = os.path.normpath(ruta)
+        database_dir = obtener_directorio_database()
+        df = abrir_columnas_numericas(database_dir, columnas)
+        if df is not None:
+            print(f"🗺️ Columnas {columnas} mapeadas desde el almacén numérico (.npy)")
+            return df
+        ruta = os.path.join(database_dir, "tabla_unificada.csv")
+        if verificar_registro_csv(ruta) is None:
+            print("❌ tabla_unificada.csv no coincide con su registro: ejecuta la opción 6 para reconstruirla.")
+            return None
         print(f"📥 Cargando tabla unificada desde: {ruta}")
-        df = pd.read_csv(ruta)
+        df = pd.read_csv(ruta, **argumentos_read_csv(ruta, columnas))
+        df = aplicar_esquema(df, estimar_memoria_sin_esquema(df))
         print("✅ Tabla unificada cargada correctamente.")
         return df
     except Exception as e:
@@ -57,297 +110,1864 @@ def cargar_tabla_unificada_csv():
         return None
 
 
-def ejecutar_documentacion_notebook():
+# =====================================================
+# INSTRUMENTACIÓN (SPANS POR ETAPA)
+# =====================================================
+# Con AURELION_TRAZA=<ruta> (o `--traza <ruta>`) cada etapa de la carga
+# registra tiempo de reloj y de CPU, filas de entrada y salida y memoria
+# (RSS y, con AURELION_TRAZA_MEMORIA=1, el pico de tracemalloc). Una ruta
+# .json se escribe en formato Chrome trace (chrome://tracing o Perfetto);
+# cualquier otra como JSON lines, agregando una línea por span y ejecución.
+
+# Traza de la ejecución actual (la crea cli(); None = instrumentación apagada)
+TRAZA = None
+
+
+def rss_actual_mb():
+    """Memoria residente actual del proceso (None si el sistema no la expone)"""
     try:
-        base_dir = os.path.dirname(__file__)
-        notebook_path = os.path.join(base_dir, "SPRINT2.ipynb")
-        notebook_path = os.path.normpath(notebook_path)
-        print(f"🧪 Ejecutando notebook y mostrando resultados: {notebook_path}\n")
-        # Intento 1: jupyter en PATH
-        cmd = [
-            "jupyter",
-            "nbconvert",
-            "--to",
-            "notebook",
-            "--execute",
-            "--stdout",
-            notebook_path,
-        ]
-        try:
-            res = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        except Exception:
-            # Intento 2: python -m jupyter
-            cmd = [
-                "python",
-                "-m",
-                "jupyter",
-                "nbconvert",
-                "--to",
-                "notebook",
-                "--execute",
-                "--stdout",
-                notebook_path,
-            ]
-            res = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        # Mostrar salida en terminal (puede ser extensa)
-        print(res.stdout)
-        if res.stderr:
-            print("\n[stderr]\n" + res.stderr)
-        print("\n✅ Ejecución de SPRINT2.ipynb finalizada.")
-    except subprocess.CalledProcessError as e:
-        print("❌ Error al ejecutar el notebook con nbconvert.")
-        print(e.stdout or "")
-        print(e.stderr or "")
-    except Exception as e:
-        print(f"❌ Error inesperado al ejecutar el notebook: {e}")
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
 
 
-def analisis_estadistico(df):
-    print("\n📊 ANÁLISIS ESTADÍSTICO GENERAL:")
-    print(df[["cantidad", "precio_unitario", "importe"]].describe().round(2))
+def rss_pico_mb():
+    """Pico de memoria residente del proceso desde que arrancó"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2**20 if sys.platform == "darwin" else pico / 2**10
 
 
-def medios_pago(df):
-    print("\n💳 ANÁLISIS DE MEDIOS DE PAGO:")
-    conteo = df["medio_pago"].value_counts().reset_index()
-    conteo.columns = ["Medio de Pago", "Cantidad de Ventas"]
-    print(conteo)
-    plt.figure(figsize=(7,5))
-    sns.barplot(data=conteo, x="Medio de Pago", y="Cantidad de Ventas", palette="crest")
-    plt.title("Frecuencia de Medios de Pago", fontsize=13, weight="bold")
-    plt.show()
+class Traza:
+    """
+    Spans anidados de una ejecución. Cada span es un dict que el bloque
+    instrumentado puede completar (por ejemplo con "filas_salida").
+    """
 
+    def __init__(self, ruta, memoria=False):
+        self.ruta = ruta
+        self.memoria = memoria
+        self.ejecucion = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.origen = time.perf_counter()
+        self.spans = []
+        self.abiertos = []
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
 
-def conclusiones(df):
-    top_pago = df["medio_pago"].value_counts().idxmax()
-    print(f"✅ Conclusión: El medio de pago más utilizado por los clientes es **{top_pago}**.")
+    def abrir(self, nombre, filas_entrada=None, atributos=None):
+        if self.memoria:
+            # El pico de tracemalloc es global: se reparte a los spans abiertos antes de reiniciarlo
+            pico = tracemalloc.get_traced_memory()[1]
+            for abierto in self.abiertos:
+                abierto["_pico"] = max(abierto["_pico"], pico)
+            tracemalloc.reset_peak()
+        span = {
+            "nombre": nombre,
+            "padre": self.abiertos[-1]["nombre"] if self.abiertos else None,
+            "nivel": len(self.abiertos),
+            "filas_entrada": filas_entrada,
+            "filas_salida": None,
+            **(atributos or {}),
+            "_inicio": time.perf_counter(),
+            "_cpu": time.process_time(),
+            "_pico": 0,
+            "_base": tracemalloc.get_traced_memory()[0] if self.memoria else 0,
+        }
+        self.abiertos.append(span)
+        return span
 
+    def cerrar(self, span):
+        span["segundos"] = round(time.perf_counter() - span.pop("_inicio"), 6)
+        span["cpu_segundos"] = round(time.process_time() - span.pop("_cpu"), 6)
+        span["inicio_s"] = round(time.perf_counter() - span["segundos"] - self.origen, 6)
+        pico, base = span.pop("_pico"), span.pop("_base")
+        if self.memoria:
+            pico = max(pico, tracemalloc.get_traced_memory()[1])
+            span["pico_tracemalloc_mb"] = round(pico / 2**20, 2)
+            # Cuánto creció la memoria de Python por encima de la que había al abrir el span
+            span["incremento_tracemalloc_mb"] = round((pico - base) / 2**20, 2)
+        rss, rss_pico = rss_actual_mb(), rss_pico_mb()
+        span["rss_mb"] = round(rss, 2) if rss is not None else None
+        if rss_pico is not None:
+            # ru_maxrss se actualiza con retraso respecto de statm
+            span["rss_pico_mb"] = round(max(rss_pico, rss or 0), 2)
+        else:
+            span["rss_pico_mb"] = None
+        self.abiertos = [abierto for abierto in self.abiertos if abierto is not span]
+        for abierto in self.abiertos:
+            abierto["_pico"] = max(abierto["_pico"], pico)
+        self.spans.append(span)
+        filas = ""
+        if span["filas_entrada"] is not None or span["filas_salida"] is not None:
+            filas = f" · filas {span['filas_entrada'] if span['filas_entrada'] is not None else '-'}" \
+                    f" → {span['filas_salida'] if span['filas_salida'] is not None else '-'}"
+        print(f"{'   ' * span['nivel']}⏱️ {span['nombre']}: {span['segundos']:.3f} s "
+              f"(CPU {span['cpu_segundos']:.3f} s){filas}")
 
-def info_general(df):
-    print("\nℹ️ INFORMACIÓN GENERAL DEL DATAFRAME:")
-    print(df.info())
-    print("\nDescripción estadística de variables numéricas:")
-    print(df.describe().T)
+    def exportar(self):
+        """Escribe los spans cerrados en self.ruta (Chrome trace si termina en .json)"""
+        if not self.spans:
+            return
+        carpeta = os.path.dirname(os.path.abspath(self.ruta))
+        os.makedirs(carpeta, exist_ok=True)
+        if self.ruta.endswith(".json"):
+            eventos = [{
+                "name": span["nombre"], "cat": "aurelion", "ph": "X", "pid": os.getpid(), "tid": 0,
+                "ts": span["inicio_s"] * 1e6, "dur": span["segundos"] * 1e6,
+                "args": {k: v for k, v in span.items() if k not in ("nombre", "inicio_s", "segundos")},
+            } for span in self.spans]
+            with open(self.ruta, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        else:
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                for span in self.spans:
+                    f.write(json.dumps({"ejecucion": self.ejecucion, **span}, ensure_ascii=False) + "\n")
+        print(f"💾 Traza de {len(self.spans)} etapas guardada en: {self.ruta}")
 
 
-def medios_pago_conteo_porcentaje(df):
-    print("\n📌 CONTEO Y PORCENTAJE POR MEDIO DE PAGO:")
-    print(df["medio_pago"].value_counts())
-    print("\nPorcentaje de participación por medio de pago:")
-    print((df["medio_pago"].value_counts(normalize=True) * 100).round(2))
+def crear_traza():
+    """Traza según AURELION_TRAZA y AURELION_TRAZA_MEMORIA (None si está apagada)"""
+    ruta = os.environ.get("AURELION_TRAZA")
+    if not ruta:
+        return None
+    return Traza(ruta, memoria=os.environ.get("AURELION_TRAZA_MEMORIA") == "1")
 
 
-def encoding_medios_pago(df):
-    print("\n🔤 ONE-HOT ENCODING DE MEDIOS DE PAGO:")
-    df_encoded = pd.get_dummies(df.copy(), columns=["medio_pago"], prefix="medio")
-    nuevas_cols = [c for c in df_encoded.columns if c.startswith("medio_")]
-    print("Columnas generadas:")
-    print(nuevas_cols)
+@contextlib.contextmanager
+def medir_etapa(nombre, filas_entrada=None, **atributos):
+    """
+    Span de una etapa: `with medir_etapa("leer_csv") as span: ...` y dentro
+    `span["filas_salida"] = len(df)`. Sin traza activa no mide nada.
+    """
+    if TRAZA is None:
+        yield {}
+        return
+    span = TRAZA.abrir(nombre, filas_entrada, atributos)
+    try:
+        yield span
+    finally:
+        TRAZA.cerrar(span)
 
+# =====================================================
+# CACHÉ COLUMNAR (PARQUET)
+# =====================================================
 
-def correlaciones_numericas(df):
-    print("\n🧩 MATRIZ DE CORRELACIÓN (variables numéricas):")
-    df_encoded = pd.get_dummies(df.copy(), columns=["medio_pago"], prefix="medio")
-    corr = df_encoded.corr(numeric_only=True)
-    print(corr.round(2))
+# Archivos de origen cuya modificación invalida la caché columnar
+ARCHIVOS_FUENTE = [
+    "clientes.xlsx",
+    "productos.xlsx",
+    "ventas.xlsx",
+    "detalle_ventas.xlsx",
+    "tabla_unificada.csv",
+]
 
+# Esquema compacto de tabla_unificada: textos con pocos valores distintos
+# como category, enteros al menor ancho que alcanza y fechas como datetime64
+ESQUEMA_TABLA_UNIFICADA = {
+    "id_venta": "int32",
+    "id_producto": "int32",
+    "nombre_producto": "category",
+    "cantidad": "int16",
+    "precio_unitario": "int32",
+    "importe": "float64",
+    "categoria_corregida": "category",
+    "precio_unitario_producto": "int32",
+    "fecha": "datetime64[ns]",
+    "id_cliente": "int32",
+    "medio_pago": "category",
+    "ciudad": "category",
+    "fecha_alta": "datetime64[ns]",
+    "nombre_cliente": "category",
+    "email": "category",
+}
 
-def deteccion_outliers(df):
-    print("\n🚩 DETECCIÓN DE OUTLIERS (IQR):")
-    columnas_numericas = [col for col in ["cantidad", "precio_unitario", "importe"] if col in df.columns]
-    for col in columnas_numericas:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        lim_inf = Q1 - 1.5 * IQR
-        lim_sup = Q3 + 1.5 * IQR
-        outliers = df[(df[col] < lim_inf) | (df[col] > lim_sup)]
-        print(f"\n📍 Variable: {col}")
-        print(f" - IQR: {IQR:.2f}")
-        print(f" - Límite inferior: {lim_inf:.2f}")
-        print(f" - Límite superior: {lim_sup:.2f}")
-        print(f" - Outliers detectados: {outliers.shape[0]} registros")
+# La caché columnar se particiona por año y mes de esta columna
+# (carpetas anio=AAAA/mes=MM; las filas sin fecha van a anio=0000/mes=00)
+COLUMNA_PARTICION = "fecha"
+PATRON_PARTICION = re.compile(r"anio=(\d{4})[\\/]mes=(\d{2})$")
 
+# Columnas que lee cada opción del menú (None = todas)
+COLUMNAS_POR_OPCION = {
+    7: None,
+    8: None,
+    9: ["medio_pago"],
+    10: ["cantidad", "precio_unitario", "importe"],
+    11: ["cantidad", "precio_unitario", "importe"],
+    12: ["medio_pago"],
+    13: ["importe"],
+    14: ["medio_pago", "importe"],
+}
 
-def analisis_clientes(df):
-    print("\n🧑‍🤝‍🧑 CLIENTES: gasto total, compras y ticket promedio")
-    if not all(c in df.columns for c in ["id_cliente", "importe"]):
-        print("No se encuentran las columnas necesarias para el análisis de clientes.")
-        return
-    agrupado = (
-        df.groupby(["id_cliente"], as_index=False)
-          .agg(
-              nombre_cliente=("nombre_cliente", "first") if "nombre_cliente" in df.columns else ("id_cliente", "first"),
-              ciudad=("ciudad", "first") if "ciudad" in df.columns else ("id_cliente", "first"),
-              compras=("id_venta", "nunique") if "id_venta" in df.columns else ("id_cliente", "size"),
-              total_gastado=("importe", "sum"),
-              ticket_promedio_cliente=("importe", "mean"),
-              fecha_ultima_compra=("fecha", "max") if "fecha" in df.columns else ("id_cliente", "first"),
-          )
-    )
-    print("Clientes con mayor gasto total (top 10):")
-    try:
-        print(agrupado.sort_values("total_gastado", ascending=False).head(10).round(2))
-    except Exception:
-        print(agrupado.sort_values("total_gastado", ascending=False).head(10))
-    print("\nEstadísticas generales de clientes:\n")
-    try:
-        print(agrupado[["compras", "total_gastado", "ticket_promedio_cliente"]].describe().round(2))
-    except Exception:
-        print(agrupado[["compras", "total_gastado", "ticket_promedio_cliente"]].describe())
 
+def obtener_directorio_database():
+    """
+    Devuelve la carpeta database/ del proyecto.
+    Se puede apuntar a otra carpeta con la variable de entorno AURELION_DATABASE_DIR.
+    """
+    database_dir = os.environ.get("AURELION_DATABASE_DIR")
+    if not database_dir:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        database_dir = os.path.join(script_dir, "..", "database")
+    return os.path.normpath(database_dir)
 
-def ver_tabla_unificada(df):
-    print("\n📄 TABLA UNIFICADA:")
-    try:
-        print("Forma:", df.shape)
-        print("\nColumnas:")
-        print(df.columns.tolist())
-        print("\nVista previa:")
-        try:
-            print(df.head(10))
-        except Exception:
-            print(df.head())
-        print("\nNulos por columna:")
-        print(df.isnull().sum())
-    except Exception as e:
-        print(f"Error al visualizar la tabla unificada: {e}")
 
+def calcular_huella_fuentes(database_dir):
+    """
+    Huella de los archivos de origen (mtime y tamaño). Con AURELION_CACHE_HASH=1
+    se agrega además el SHA-256 del contenido, útil si las fechas de
+    modificación no son confiables (copias, checkouts de git).
+    """
+    usar_hash = os.environ.get("AURELION_CACHE_HASH") == "1"
+    huella = {}
+    for nombre in ARCHIVOS_FUENTE:
+        ruta = os.path.join(database_dir, nombre)
+        if not os.path.exists(ruta):
+            continue
+        estado = os.stat(ruta)
+        huella[nombre] = {"mtime_ns": estado.st_mtime_ns, "tamano": estado.st_size}
+        if usar_hash:
+            sha = hashlib.sha256()
+            with open(ruta, "rb") as f:
+                for bloque in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(bloque)
+            huella[nombre]["sha256"] = sha.hexdigest()
+    return huella
 
-def heatmap_correlaciones(df):
-    print("\n🧩 MATRIZ DE CORRELACIÓN (heatmap):")
-    df_encoded = pd.get_dummies(df.copy(), columns=["medio_pago"], prefix="medio")
-    corr = df_encoded.corr(numeric_only=True)
-    try:
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(corr, cmap="crest", annot=False)
-        plt.title("Matriz de correlación (variables numéricas)")
-        plt.tight_layout()
-        plt.show()
-    except Exception as e:
-        print("No se pudo mostrar el heatmap, imprimiendo la matriz redondeada en su lugar:")
-        print(corr.round(2))
 
+def argumentos_read_csv(csv_path, columnas=None):
+    """
+    usecols, dtype y parse_dates para leer tabla_unificada.csv ya con el
+    esquema compacto (los textos se leen directo como category). Los
+    enteros se reducen después, en aplicar_esquema, porque read_csv no
+    admite un int angosto si la columna trae nulos.
+    """
+    encabezado = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    if columnas is not None:
+        columnas = [c for c in columnas if c in encabezado]
+    leidas = encabezado if columnas is None else columnas
+    return {
+        "usecols": columnas,
+        "dtype": {c: t for c, t in ESQUEMA_TABLA_UNIFICADA.items()
+                  if c in leidas and t in ("category", "float64")},
+        "parse_dates": [c for c, t in ESQUEMA_TABLA_UNIFICADA.items()
+                        if c in leidas and t.startswith("datetime")],
+    }
 
-def grafico_distribucion_importe(df):
-    print("\n📈 Distribución de 'importe' (histograma + KDE):")
-    if "importe" not in df.columns:
-        print("No se encuentra la columna 'importe'.")
-        return
-    plt.figure(figsize=(7,5))
-    try:
-        sns.histplot(df["importe"].dropna(), kde=True, bins=30, color="#4c78a8")
-    except Exception:
-        plt.hist(df["importe"].dropna(), bins=30, color="#4c78a8")
-    plt.xlabel("Importe")
-    plt.ylabel("Frecuencia")
-    plt.title("Distribución de Importe")
-    plt.tight_layout()
-    plt.show()
 
+def memoria_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
 
-def boxplot_importe_por_medio(df):
-    print("\n📦 Boxplot de 'importe' por 'medio_pago':")
-    if not all(c in df.columns for c in ["importe", "medio_pago"]):
-        print("No se encuentran las columnas necesarias ('importe', 'medio_pago').")
-        return
-    plt.figure(figsize=(8,5))
-    sns.boxplot(data=df, x="medio_pago", y="importe", palette="crest")
-    plt.title("Importe por Medio de Pago")
-    plt.xlabel("Medio de Pago")
-    plt.ylabel("Importe")
-    plt.tight_layout()
-    plt.show()
 
-def abrir_readme():
+def bytes_por_texto(textos):
     """
-    Abre el archivo README.md con la aplicación predeterminada del sistema operativo.
-    Utiliza os.startfile() en Windows, 'open' en macOS y 'xdg-open' en Linux.
+    Bytes que ocupa cada texto (None = nulo) por fila en el tipo de texto
+    que read_csv usa por defecto: object (puntero + objeto str) o, desde
+    pandas 3, texto Arrow (UTF-8 + un offset de 64 bits).
     """
-    ruta_readme = "../README.md"
-    
-    if not os.path.exists(ruta_readme):
-        print("❌ Error: No se encontró el archivo README.md en la ruta especificada.")
-        print(f"   Ruta buscada: {os.path.abspath(ruta_readme)}")
-        return
-    
-    try:
-        if sys.platform == "win32":
-            # Windows
-            os.startfile(os.path.abspath(ruta_readme))
-        elif sys.platform == "darwin":
-            # macOS
-            subprocess.Popen(["open", os.path.abspath(ruta_readme)])
+    tipo = pd.Series(["texto"]).dtype
+    if isinstance(tipo, pd.StringDtype) and tipo.storage == "pyarrow":
+        return np.array([8 + (len(t.encode("utf-8")) if t is not None else 0) for t in textos], dtype="int64")
+    return np.array([8 + sys.getsizeof(t if t is not None else np.nan) for t in textos], dtype="int64")
+
+
+def estimar_memoria_sin_esquema(df):
+    """
+    Memoria que ocuparía df leído con read_csv sin esquema (textos y fechas
+    como texto, números de 64 bits), calculada desde sus tipos en lugar de
+    releer el CSV: un texto ocupa lo mismo en cada fila donde aparece, así
+    que alcanza con el tamaño de cada categoría y sus repeticiones.
+    """
+    filas = len(df)
+    total = int(df.index.memory_usage())
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            categorias = serie.cat.categories
+            tamanos = bytes_por_texto([str(v) for v in categorias] + [None])
+            # El código -1 (nulo) cae en la última posición
+            repeticiones = np.bincount(serie.cat.codes.to_numpy() % (len(categorias) + 1), minlength=len(tamanos))
+            total += int(repeticiones @ tamanos)
+        elif pd.api.types.is_datetime64_any_dtype(serie.dtype):
+            validas = serie.dropna()
+            # to_csv escribe AAAA-MM-DD si ninguna fecha tiene hora
+            texto = "AAAA-MM-DD" if (validas.dt.normalize() == validas).all() else "AAAA-MM-DD HH:MM:SS"
+            tamanos = bytes_por_texto([texto, None])
+            total += int(len(validas) * tamanos[0] + (filas - len(validas)) * tamanos[1])
         else:
-            # Linux y otros
-            subprocess.Popen(["xdg-open", os.path.abspath(ruta_readme)])
-        
-        print("✅ README.md abierto correctamente.")
-    except Exception as e:
-        print(f"❌ Error al intentar abrir README.md: {e}")
+            total += 8 * filas
+    return total
 
-def cargar_documentacion_tema():
-    """Opción 2: Tema, problema y solución"""
-    print("\n" + "="*60)
-    print("📌 TEMA, PROBLEMA Y SOLUCIÓN")
-    print("="*60)
-    print("""
-TEMA:
-Este proyecto simula la gestión de una Tienda a partir de datos sintéticos.
 
-PROBLEMA:
-El objetivo es determinar cuál es el medio de pago más utilizado por los clientes 
-en la Tienda y comprender los patrones de comportamiento asociados.
+def aplicar_esquema(df, memoria_antes=None):
+    """
+    Convierte df_maestro al esquema compacto e informa la memoria antes y
+    después (memory_usage(deep=True)). Un entero solo se reduce si todos sus
+    valores entran en el tipo del esquema; con nulos (claves huérfanas tras
+    un merge left) se usa el entero con nulos de pandas (Int32, Int16...).
+    """
+    if memoria_antes is None:
+        memoria_antes = memoria_bytes(df)
+    df = df.copy(deep=False)
+    for col, tipo in ESQUEMA_TABLA_UNIFICADA.items():
+        if col not in df.columns or str(df[col].dtype) == tipo:
+            continue
+        serie = df[col]
+        if tipo == "category":
+            df[col] = serie.astype("category")
+        elif tipo.startswith("datetime"):
+            df[col] = pd.to_datetime(serie, errors="coerce").astype(tipo)
+        elif tipo.startswith("int"):
+            limites = np.iinfo(tipo)
+            if serie.notna().any() and (serie.min() < limites.min or serie.max() > limites.max):
+                print(f"⚠️ '{col}' no entra en {tipo}; se mantiene en 64 bits")
+                tipo = "int64"
+            try:
+                df[col] = serie.astype(tipo.capitalize() if serie.isnull().any() else tipo)
+            except (TypeError, ValueError) as e:
+                print(f"⚠️ '{col}' no se pudo convertir a {tipo}: {e}")
+        else:
+            df[col] = serie.astype(tipo)
+    
+    memoria_despues = memoria_bytes(df)
+    print(f"🧮 Memoria de df_maestro: {memoria_antes / 2**20:,.2f} MB → {memoria_despues / 2**20:,.2f} MB "
+          f"(x{memoria_antes / max(memoria_despues, 1):.1f} menos)")
+    return df
 
-SOLUCIÓN:
-Desarrollo de un sistema de análisis de datos que permite:
-- Procesar información de ventas y clientes
-- Identificar patrones de pagos
-- Generar reportes sobre métodos de pago más frecuentes
-    """)
 
-def cargar_dataset_referencia():
-    """Opción 3: Dataset de referencia"""
-    print("\n" + "="*60)
-    print("📊 DATASET DE REFERENCIA")
-    print("="*60)
-    print("""
-FUENTE: Datos sintéticos educativos, generados por Guayerd e IBM.
+def rutas_cache_columnar(database_dir):
+    cache_dir = os.path.join(database_dir, "cache")
+    return (
+        os.path.join(cache_dir, "tabla_unificada"),
+        os.path.join(cache_dir, "tabla_unificada.json"),
+    )
 
-TABLAS:
-1. Productos (productos.xlsx) - 100 filas
-   - id_producto, nombre_producto, categoria, precio_unitario
 
-2. Clientes (clientes.xlsx) - 100 filas
-   - id_cliente, nombre_cliente, ciudad, fecha_alta
+def tabla_arrow(df):
+    """
+    df como tabla Arrow con índices de diccionario int32 en las columnas
+    category, para que todas las partes de la caché (escritas en distintas
+    actualizaciones) compartan el mismo esquema.
+    """
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    campos = [
+        campo.with_type(pa.dictionary(pa.int32(), campo.type.value_type))
+        if pa.types.is_dictionary(campo.type) else campo
+        for campo in tabla.schema
+    ]
+    return tabla.cast(pa.schema(campos, metadata=tabla.schema.metadata))
 
-3. Ventas (ventas.xlsx) - 120 filas
-   - id_venta, fecha, id_cliente, medio_pago
 
-4. Detalle Ventas (detalle_ventas.xlsx) - 300+ filas
-   - id_venta, id_producto, cantidad, importe
+def escribir_particiones(df, datos_dir):
+    """
+    Agrega las filas de df a la caché columnar, una parte nueva
+    (parte-NNNN.parquet) por cada partición anio=AAAA/mes=MM que toca.
+    Devuelve (rutas escritas, filas de cada una, orden): las partes tienen
+    las filas df.iloc[orden], una parte detrás de otra.
+    """
+    fechas = df[COLUMNA_PARTICION]
+    claves = fechas.dt.year.fillna(0).to_numpy("int64") * 100 + fechas.dt.month.fillna(0).to_numpy("int64")
+    codigos, unicos = pd.factorize(claves, sort=True)
+    orden = np.argsort(codigos, kind="stable")
+    limites = np.searchsorted(codigos[orden], np.arange(len(unicos) + 1))
+    tabla = tabla_arrow(df)
+    escritas = []
+    for i, clave in enumerate(unicos):
+        carpeta = os.path.join(datos_dir, f"anio={clave // 100:04d}", f"mes={clave % 100:02d}")
+        os.makedirs(carpeta, exist_ok=True)
+        parte = len([a for a in os.listdir(carpeta) if a.endswith(".parquet")])
+        ruta = os.path.join(carpeta, f"parte-{parte:04d}.parquet")
+        pq.write_table(tabla.take(orden[limites[i]:limites[i + 1]]), ruta)
+        escritas.append(ruta)
+    return escritas, np.diff(limites).tolist(), orden
 
-PERÍODO: Enero - Junio 2024
-CIUDADES: Carlos Paz, Río Cuarto, Mendiolaza, Villa María, Alta Gracia, Córdoba
-    """)
 
-def cargar_pasos_pseudocodigo():
-    """Opción 4: Pasos, pseudocódigo y diagrama"""
-    print("\n" + "="*60)
-    print("🔧 PASOS, PSEUDOCÓDIGO Y DIAGRAMA")
-    print("="*60)
-    print("""
-PASOS DEL PROGRAMA:
-1. Mostrar un menú numérico con opciones disponibles
-2. Imprimir texto asociado a la opción escogida
-3. Mantener acceso al menú hasta seleccionar "Salir"
+def guardar_cache_columnar(df, database_dir):
+    """Guarda df_maestro como Parquet tipado, particionado por mes, junto con la huella de las fuentes"""
+    if not pyarrow_disponible():
+        return
+    datos_dir, metadatos_path = rutas_cache_columnar(database_dir)
+    try:
+        # Los metadatos se borran primero y se escriben al final:
+        # una caché a medio escribir nunca se considera válida
+        if os.path.exists(metadatos_path):
+            os.remove(metadatos_path)
+        if os.path.exists(datos_dir):
+            shutil.rmtree(datos_dir)
+        os.makedirs(datos_dir)
+        with medir_etapa("guardar_cache_columnar", len(df)) as span:
+            escritas, filas_partes, orden = escribir_particiones(df, datos_dir)
+            span["filas_salida"] = len(df)
+            span["partes"] = len(escritas)
+        numericas = None
+        try:
+            with medir_etapa("guardar_almacen_numerico", len(df)) as span:
+                numericas = guardar_almacen_numerico(df, orden, partes_almacen(datos_dir, escritas, filas_partes),
+                                                     database_dir)
+                span["columnas"] = len(numericas["columnas"])
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar el almacén numérico (.npy); se leerá el Parquet: {e}")
+        cubo = None
+        if all(col in df.columns for col in DIMENSIONES_CUBO + ["id_venta", "importe", "cantidad"]):
+            with medir_etapa("construir_cubo", len(df)) as span:
+                cubo = construir_cubo(df)
+                guardar_cubo(cubo, database_dir)
+                span["filas_salida"] = len(cubo)
+        metadatos = {
+            "huella": calcular_huella_fuentes(database_dir),
+            "esquema": ESQUEMA_TABLA_UNIFICADA,
+            "particion": COLUMNA_PARTICION,
+            "cubo": DIMENSIONES_CUBO if cubo is not None else None,
+            "numericas": numericas,
+            "filas": len(df),
+            "columnas": df.columns.tolist(),
+        }
+        with open(metadatos_path, "w", encoding="utf-8") as f:
+            json.dump(metadatos, f, indent=2)
+        print(f"💾 Caché columnar actualizada en: {datos_dir} ({len(escritas)} particiones por mes)")
+        if cubo is not None:
+            print(f"🧊 Cubo de ventas: {len(cubo):,} celdas (día × ciudad × medio de pago × categoría)")
+        if numericas is not None:
+            print(f"🗺️ Almacén numérico: {len(numericas['columnas'])} columnas .npy en {ruta_almacen_numerico(database_dir)}")
+    except Exception as e:
+        print(f"⚠️ No se pudo guardar la caché columnar: {e}")
 
-PSEUDOCÓDIGO OPTIMIZADO:
-INICIO
-    Mientras True:
-        Mostrar opciones (1-15)
-        Leer opción
-        Si opción == 15:
+
+# Las tablas en disco (streaming y DuckDB) leen la caché pero no la reconstruyen
+AVISO_CACHE_SOLO_LECTURA = ("se lee tabla_unificada.csv. Ejecuta la opción 6 sin AURELION_STREAMING ni "
+                            "AURELION_BACKEND=duckdb para regenerarla")
+
+
+def leer_metadatos_cache(database_dir, accion="se regenerará"):
+    """
+    Metadatos de la caché columnar si sigue vigente; None en otro caso. Si
+    está vencida se avisa el motivo y `accion` (lo que hará quien la lee).
+    """
+    if not pyarrow_disponible():
+        return None
+    _, metadatos_path = rutas_cache_columnar(database_dir)
+    if not os.path.exists(metadatos_path):
+        return None
+    try:
+        with open(metadatos_path, encoding="utf-8") as f:
+            metadatos = json.load(f)
+    except Exception as e:
+        print(f"⚠️ Metadatos de la caché columnar ilegibles, se ignoran: {e}")
+        return None
+    if metadatos.get("huella") != calcular_huella_fuentes(database_dir):
+        print(f"♻️ Las fuentes cambiaron desde la última caché columnar; {accion}.")
+        return None
+    if metadatos.get("esquema") != ESQUEMA_TABLA_UNIFICADA:
+        print(f"♻️ La caché columnar usa otro esquema de tipos; {accion}.")
+        return None
+    if metadatos.get("particion") != COLUMNA_PARTICION:
+        print(f"♻️ La caché columnar no está particionada por fecha; {accion}.")
+        return None
+    if "cubo" not in metadatos:
+        print(f"♻️ La caché columnar no incluye el cubo de ventas; {accion}.")
+        return None
+    if "numericas" not in metadatos:
+        print(f"♻️ La caché columnar no incluye el almacén numérico (.npy); {accion}.")
+        return None
+    if metadatos["numericas"] and "segmentos" not in metadatos["numericas"]:
+        print(f"♻️ El almacén numérico (.npy) no está guardado por segmentos; {accion}.")
+        return None
+    return metadatos
+
+
+def archivos_cache(datos_dir, filtro=None):
+    """
+    Partes Parquet de la caché columnar. Con `filtro` se descartan, sin
+    abrirlas, las particiones anio/mes que quedan fuera de su rango de fechas.
+    Devuelve (partes seleccionadas, todas las partes).
+    """
+    todas = []
+    for raiz, carpetas, archivos in os.walk(datos_dir):
+        carpetas.sort()
+        todas += [os.path.join(raiz, a) for a in sorted(archivos) if a.endswith(".parquet")]
+    if filtro is None:
+        return todas, todas
+    seleccionadas = []
+    for ruta in todas:
+        particion = PATRON_PARTICION.search(os.path.dirname(ruta))
+        if particion is None or filtro.incluye_particion(int(particion.group(1)), int(particion.group(2))):
+            seleccionadas.append(ruta)
+    return seleccionadas, todas
+
+
+def lineas_de_ventas(datos_dir, ids, columnas):
+    """Líneas de la caché columnar con id_venta en `ids` (el filtro se evalúa en Arrow)"""
+    archivos, _ = archivos_cache(datos_dir)
+    if not archivos:
+        return None
+    dataset = ds.dataset(archivos, schema=pq.read_schema(archivos[0]), format="parquet")
+    return dataset.to_table(columns=columnas, filter=ds.field("id_venta").isin(ids)).to_pandas()
+
+
+def dataset_cache(database_dir, filtro=None, metadatos=None):
+    """
+    (pyarrow.dataset sobre las partes de la caché que pueden tener filas de
+    `filtro`, metadatos), o None si la caché no está vigente. Con
+    `metadatos` ya validados no se vuelven a leer.
+    """
+    metadatos = metadatos or leer_metadatos_cache(database_dir)
+    if metadatos is None:
+        return None
+    datos_dir, _ = rutas_cache_columnar(database_dir)
+    seleccionadas, todas = archivos_cache(datos_dir, filtro)
+    if not todas:
+        return None
+    if filtro is not None:
+        particiones = len({os.path.dirname(r) for r in seleccionadas})
+        print(f"📂 Particiones leídas: {particiones} de {len({os.path.dirname(r) for r in todas})} "
+              f"({filtro.descripcion()})")
+    # Esquema explícito: también vale cuando el filtro no deja ninguna parte
+    esquema = pq.read_schema(todas[0])
+    return ds.dataset(seleccionadas, schema=esquema, format="parquet"), metadatos
+
+
+def cargar_cache_columnar(database_dir, columnas=None, filtro=None):
+    """
+    Lee la caché Parquet si sigue vigente. Solo se leen del disco las
+    columnas pedidas y, con `filtro`, las particiones de su rango de fechas;
+    las filas se filtran dentro de Arrow antes de pasar a pandas. Las
+    columnas numéricas se mapean desde el almacén .npy cuando existe.
+    Devuelve None si no hay caché o está desactualizada.
+    """
+    try:
+        abierto = dataset_cache(database_dir, filtro)
+        if abierto is None:
+            return None
+        dataset, metadatos = abierto
+        if columnas is not None:
+            columnas = [c for c in columnas if c in metadatos["columnas"]]
+        expresion = filtro.expresion_arrow() if filtro is not None else None
+        with medir_etapa("leer_cache_columnar", partes=len(dataset.files)) as span:
+            df = leer_con_almacen_numerico(database_dir, dataset, metadatos,
+                                           metadatos["columnas"] if columnas is None else columnas, filtro)
+            span["almacen_numerico"] = df is not None
+            if df is None:
+                df = dataset.to_table(columns=columnas, filter=expresion).to_pandas()
+            span["filas_salida"] = len(df)
+        if filtro is not None:
+            df.attrs["filtro"] = filtro.descripcion()
+            df.attrs["filtro_tabla"] = filtro
+        return df
+    except Exception as e:
+        print(f"⚠️ Caché columnar ilegible, se ignora: {e}")
+        return None
+
+# =====================================================
+# ALMACÉN NUMÉRICO (COLUMNAS .NPY MAPEADAS EN MEMORIA)
+# =====================================================
+# Las columnas numéricas de ancho fijo se guardan además como arreglos
+# .npy crudos en database/cache/columnas_numericas/ y se abren con
+# np.load(mmap_mode="r"): abrirlas no depende de la cantidad de filas, no
+# se copian a la memoria del proceso y varias sesiones sobre la misma
+# tabla comparten las páginas del caché del sistema operativo. Las filas
+# siguen el orden de las partes de la caché columnar (metadatos
+# ["numericas"]["partes"]), así cada parte es un rango contiguo. Se guardan
+# en segmentos (carpetas 0000/, 0001/, ...) de partes consecutivas: la
+# caché completa escribe uno solo y cada actualización incremental agrega
+# otro con sus filas nuevas, sin tocar los anteriores. Una columna que
+# abarca varios segmentos ya no es una vista del archivo sino una copia
+# (np.concatenate), así que cuando se acumulan más de
+# SEGMENTOS_NUMERICOS_MAXIMOS la actualización los reescribe como uno solo.
+
+# Columnas que se guardan en el almacén (salvo enteros con nulos, Int32)
+COLUMNAS_NUMERICAS = [
+    "id_venta",
+    "id_producto",
+    "cantidad",
+    "precio_unitario",
+    "importe",
+    "precio_unitario_producto",
+    "id_cliente",
+]
+
+
+# Segmentos que puede acumular el almacén antes de compactarse en uno
+SEGMENTOS_NUMERICOS_MAXIMOS = int(os.environ.get("AURELION_SEGMENTOS_NUMERICOS", "8"))
+
+
+def ruta_almacen_numerico(database_dir):
+    return os.path.join(database_dir, "cache", "columnas_numericas")
+
+
+def columnas_almacenables(df):
+    """{columna: tipo} de las columnas numéricas de df con tipo NumPy de ancho fijo"""
+    return {c: str(df[c].dtype) for c in COLUMNAS_NUMERICAS
+            if c in df.columns and isinstance(df[c].dtype, np.dtype) and df[c].dtype.kind in "iuf"}
+
+
+def partes_almacen(datos_dir, escritas, filas):
+    """[[ruta relativa de la parte, filas], ...] como se guardan en los metadatos"""
+    return [[os.path.relpath(r, datos_dir).replace(os.sep, "/"), n] for r, n in zip(escritas, filas)]
+
+
+def guardar_npy_atomico(ruta, arreglo):
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f:
+        np.save(f, arreglo)
+    os.replace(temporal, ruta)
+
+
+def guardar_segmento_numerico(df, orden, columnas, database_dir, nombre):
+    """Un .npy por columna con las filas df.iloc[orden], en la carpeta del segmento `nombre`"""
+    carpeta = os.path.join(ruta_almacen_numerico(database_dir), nombre)
+    os.makedirs(carpeta, exist_ok=True)
+    for col in columnas:
+        guardar_npy_atomico(os.path.join(carpeta, f"{col}.npy"), df[col].to_numpy()[orden])
+
+
+def guardar_almacen_numerico(df, orden, partes, database_dir):
+    """
+    Almacén con un solo segmento: las filas df.iloc[orden] (el orden de las
+    partes de la caché). Devuelve la sección "numericas" de los metadatos.
+    """
+    carpeta = ruta_almacen_numerico(database_dir)
+    if os.path.exists(carpeta):
+        shutil.rmtree(carpeta)
+    columnas = columnas_almacenables(df)
+    guardar_segmento_numerico(df, orden, columnas, database_dir, "0000")
+    return {"columnas": columnas, "partes": partes, "segmentos": [["0000", len(partes)]]}
+
+
+def extender_almacen_numerico(df_nuevo, orden, partes, database_dir, numericas):
+    """
+    Guarda las filas nuevas (en el orden de sus partes) como un segmento
+    más y agrega sus partes a `numericas`: el costo es el de las filas
+    nuevas, no el de todo el historial. Los segmentos anteriores no se
+    tocan, así una sesión que ya los tenía mapeados sigue leyéndolos.
+    """
+    columnas = columnas_almacenables(df_nuevo)
+    if columnas != numericas["columnas"]:
+        raise ValueError(f"las filas nuevas tienen otros tipos: {columnas}")
+    # Un segmento que quedó de una actualización cortada no figura en los metadatos y se sobrescribe
+    nombre = siguiente_segmento(numericas)
+    guardar_segmento_numerico(df_nuevo, orden, columnas, database_dir, nombre)
+    numericas["partes"] += partes
+    numericas["segmentos"].append([nombre, len(partes)])
+    if len(numericas["segmentos"]) > SEGMENTOS_NUMERICOS_MAXIMOS:
+        compactar_almacen_numerico(database_dir, numericas)
+    return numericas
+
+
+def siguiente_segmento(numericas):
+    return f"{int(numericas['segmentos'][-1][0]) + 1:04d}" if numericas["segmentos"] else "0000"
+
+
+def compactar_almacen_numerico(database_dir, numericas):
+    """
+    Reescribe todos los segmentos como uno nuevo, para que cada columna
+    vuelva a ser una vista del memmap, y borra los anteriores. Una sesión
+    que todavía los tenga mapeados los sigue leyendo hasta cerrarlos (en
+    Windows no se pueden borrar: quedan hasta la próxima caché completa).
+    """
+    partes = [parte for parte, _ in numericas["partes"]]
+    nombre = siguiente_segmento(numericas)
+    carpeta = os.path.join(ruta_almacen_numerico(database_dir), nombre)
+    os.makedirs(carpeta, exist_ok=True)
+    # Una columna por vez: la copia en memoria es la de una sola columna
+    for col in numericas["columnas"]:
+        arreglo = abrir_almacen_numerico(database_dir, numericas, partes, [col])[col]
+        guardar_npy_atomico(os.path.join(carpeta, f"{col}.npy"), arreglo)
+    anteriores = [segmento for segmento, _ in numericas["segmentos"]]
+    numericas["segmentos"] = [[nombre, len(partes)]]
+    for segmento in anteriores:
+        shutil.rmtree(os.path.join(ruta_almacen_numerico(database_dir), segmento), ignore_errors=True)
+    print(f"🗜️ Almacén numérico compactado: {len(anteriores)} segmentos → {nombre}/")
+    return numericas
+
+
+def abrir_almacen_numerico(database_dir, numericas, partes, columnas):
+    """
+    {columna: arreglo} con las filas de `partes` (rutas relativas, en el
+    orden del almacén). Solo se abren los segmentos que tienen alguna de
+    esas partes. Si las filas salen de un solo rango de un segmento el
+    arreglo es una vista del memmap, sin copia; si no, se copian esos
+    rangos (la compactación vuelve a dejar un solo segmento).
+    """
+    rangos, total = {}, 0
+    for parte, filas in numericas["partes"]:
+        rangos[parte] = (total, total + filas)
+        total += filas
+    # Rango de filas del almacén que ocupa cada segmento
+    segmentos, primera = [], 0
+    for nombre, cantidad in numericas["segmentos"]:
+        propias = numericas["partes"][primera:primera + cantidad]
+        inicio = rangos[propias[0][0]][0] if propias else (segmentos[-1][2] if segmentos else 0)
+        segmentos.append((nombre, inicio, inicio + sum(filas for _, filas in propias)))
+        primera += cantidad
+    tramos = []
+    for parte in partes:
+        inicio, fin = rangos[parte]
+        if tramos and tramos[-1][1] == inicio:
+            tramos[-1] = (tramos[-1][0], fin)
+        else:
+            tramos.append((inicio, fin))
+    arreglos = {}
+    for col in columnas:
+        pedazos = []
+        for nombre, desde, hasta in segmentos:
+            solapados = [(max(a, desde), min(b, hasta)) for a, b in tramos if a < hasta and b > desde]
+            if not solapados:
+                continue
+            mapa = np.load(os.path.join(ruta_almacen_numerico(database_dir), nombre, f"{col}.npy"), mmap_mode="r")
+            if len(mapa) != hasta - desde:
+                raise ValueError(f"{nombre}/{col}.npy tiene {len(mapa)} filas y su segmento {hasta - desde}")
+            pedazos += [mapa[a - desde:b - desde] for a, b in solapados]
+        if len(pedazos) == 1:
+            arreglos[col] = pedazos[0]
+        else:
+            arreglos[col] = np.concatenate(pedazos or [np.empty(0, dtype=numericas["columnas"][col])])
+    return arreglos
+
+
+def leer_con_almacen_numerico(database_dir, dataset, metadatos, columnas, filtro=None):
+    """
+    Las filas de `dataset` (partes de la caché columnar) con las columnas
+    numéricas mapeadas desde el almacén y el resto, más las que necesita
+    `filtro`, leídas del Parquet. None si el almacén no está vigente o no
+    tiene ninguna de las columnas pedidas.
+    """
+    numericas = metadatos.get("numericas")
+    if not numericas:
+        return None
+    mapeadas = [c for c in columnas if c in numericas["columnas"]]
+    if not mapeadas:
+        return None
+    datos_dir, _ = rutas_cache_columnar(database_dir)
+    posicion = {parte: i for i, (parte, _) in enumerate(numericas["partes"])}
+    partes = [os.path.relpath(r, datos_dir).replace(os.sep, "/") for r in dataset.files]
+    if any(p not in posicion for p in partes):
+        return None
+    partes.sort(key=posicion.get)
+    arreglos = abrir_almacen_numerico(database_dir, numericas, partes, mapeadas)
+    resto = [c for c in columnas if c not in mapeadas]
+    resto += [c for c in (filtro.columnas() if filtro is not None else []) if c not in resto and c not in mapeadas]
+    if resto:
+        rutas = [os.path.join(datos_dir, p) for p in partes]
+        df = ds.dataset(rutas, schema=dataset.schema, format="parquet").to_table(columns=resto).to_pandas()
+        for col, arreglo in arreglos.items():
+            df[col] = pd.Series(arreglo, index=df.index, copy=False)
+    else:
+        df = pd.DataFrame(arreglos, copy=False)
+    if filtro is not None:
+        df = df[filtro.mascara(df)].reset_index(drop=True)
+    return df[columnas]
+
+
+def abrir_columnas_numericas(database_dir, columnas):
+    """
+    DataFrame con `columnas` mapeadas desde el almacén (todas las filas, en
+    el orden de la caché columnar), o None si el almacén no está vigente o
+    le falta alguna.
+    """
+    metadatos = leer_metadatos_cache(database_dir)
+    numericas = metadatos.get("numericas") if metadatos else None
+    if not columnas or not numericas or any(c not in numericas["columnas"] for c in columnas):
+        return None
+    partes = [parte for parte, _ in numericas["partes"]]
+    return pd.DataFrame(abrir_almacen_numerico(database_dir, numericas, partes, columnas), copy=False)
+
+# =====================================================
+# CUBO DE VENTAS (agregados precalculados)
+# =====================================================
+# Junto con la caché columnar se guarda un cubo con una celda por día,
+# ciudad, medio de pago y categoría: líneas, suma de importe, suma de
+# cantidad y ventas distintas. Una venta tiene un solo día, ciudad y medio
+# de pago pero puede tener líneas de varias categorías, así que además se
+# guardan celdas con categoria_corregida = TOTAL_CATEGORIAS (todas las
+# categorías de la venta juntas): los totales que no abren por categoría
+# salen de esas celdas y las ventas distintas se pueden sumar sin contar
+# dos veces la misma venta. El value_counts de las opciones 9 y 12 (con o
+# sin filtro) se responde sumando celdas, sin recorrer las líneas.
+
+# Columnas que definen una celda (fecha se guarda truncada al día)
+DIMENSIONES_CUBO = ["fecha", "ciudad", "medio_pago", "categoria_corregida"]
+
+# Categoría de las celdas que suman todas las categorías
+TOTAL_CATEGORIAS = "(todas)"
+
+# Cubo leído en esta sesión: {"firma": (mtime_ns, tamaño), "tabla": DataFrame}
+CUBO_EN_MEMORIA = {}
+
+
+def ruta_cubo(database_dir):
+    return os.path.join(database_dir, "cache", "cubo_ventas.parquet")
+
+
+def construir_cubo(df):
+    """Celdas del cubo para las líneas de df (con esquema compacto)"""
+    claves = {
+        "fecha": df["fecha"].dt.normalize(),
+        "ciudad": df["ciudad"],
+        "medio_pago": df["medio_pago"],
+        "categoria_corregida": df["categoria_corregida"].astype("object"),
+    }
+    lineas = pd.DataFrame({**claves, "id_venta": df["id_venta"], "importe": df["importe"], "cantidad": df["cantidad"]})
+    agregados = {
+        "lineas": ("id_venta", "size"),
+        "importe": ("importe", "sum"),
+        "cantidad": ("cantidad", "sum"),
+        "ventas": ("id_venta", "nunique"),
+    }
+    por_categoria = lineas.groupby(DIMENSIONES_CUBO, observed=True, dropna=False).agg(**agregados)
+    totales = lineas.groupby(DIMENSIONES_CUBO[:-1], observed=True, dropna=False).agg(**agregados)
+    totales["categoria_corregida"] = TOTAL_CATEGORIAS
+    cubo = pd.concat([por_categoria.reset_index(), totales.reset_index()], ignore_index=True)
+    return tipos_cubo(cubo)
+
+
+def tipos_cubo(cubo):
+    for col in ("ciudad", "medio_pago", "categoria_corregida"):
+        cubo[col] = cubo[col].astype("category")
+    return cubo.astype({"lineas": "int64", "importe": "float64", "cantidad": "int64", "ventas": "int64"})
+
+
+def guardar_cubo(cubo, database_dir):
+    """Escribe el cubo de forma atómica (un cubo a medio escribir nunca se lee)"""
+    ruta = ruta_cubo(database_dir)
+    temporal = ruta + ".tmp"
+    pq.write_table(tabla_arrow(cubo), temporal)
+    os.replace(temporal, ruta)
+    CUBO_EN_MEMORIA.clear()
+
+
+def extender_cubo(df_nuevo, database_dir, previas=None):
+    """
+    Suma al cubo las celdas de líneas nuevas. `previas` son las líneas ya
+    unificadas de las ventas que reciben líneas nuevas: esas ventas ya se
+    contaron en sus celdas, así que sus ventas distintas se recalculan con
+    todas sus líneas en lugar de sumarse.
+    """
+    partes = [pd.read_parquet(ruta_cubo(database_dir)), construir_cubo(df_nuevo)]
+    if previas is not None and len(previas):
+        agregadas = df_nuevo[df_nuevo["id_venta"].isin(previas["id_venta"].unique())]
+        # ventas(todas las líneas) - ventas(previas) - ventas(agregadas), celda por celda
+        for lineas, signo in ((pd.concat([previas, agregadas], ignore_index=True), 1), (previas, -1), (agregadas, -1)):
+            correccion = construir_cubo(lineas)
+            correccion[["lineas", "importe", "cantidad"]] = 0
+            correccion["ventas"] *= signo
+            partes.append(correccion)
+    cubo = pd.concat(partes, ignore_index=True)
+    for col in ("ciudad", "medio_pago", "categoria_corregida"):
+        cubo[col] = cubo[col].astype("object")
+    cubo = cubo.groupby(DIMENSIONES_CUBO, dropna=False).sum().reset_index()
+    guardar_cubo(tipos_cubo(cubo), database_dir)
+    return len(cubo)
+
+
+def cubo_para(df_maestro):
+    """
+    (cubo, filtro) si el cubo guardado describe los mismos datos que
+    df_maestro (misma huella de fuentes) y se conoce el filtro con que se
+    cargó; None si hay que recorrer la tabla.
+    """
+    if isinstance(df_maestro, TablaPorBloques):
+        database_dir = df_maestro.database_dir
+        huella = calcular_huella_fuentes(database_dir)
+        filtro = df_maestro.filtro
+    elif isinstance(df_maestro, pd.DataFrame) and "huella_fuentes" in df_maestro.attrs:
+        database_dir = obtener_directorio_database()
+        huella = df_maestro.attrs["huella_fuentes"]
+        filtro = df_maestro.attrs.get("filtro_tabla")
+        if filtro is None and df_maestro.attrs.get("filtro"):
+            return None
+    else:
+        return None
+    ruta = ruta_cubo(database_dir)
+    if not pyarrow_disponible() or not os.path.exists(ruta):
+        return None
+    _, metadatos_path = rutas_cache_columnar(database_dir)
+    try:
+        with open(metadatos_path, encoding="utf-8") as f:
+            metadatos = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if metadatos.get("cubo") != DIMENSIONES_CUBO or metadatos.get("huella") != huella:
+        return None
+    estado = os.stat(ruta)
+    firma = (estado.st_mtime_ns, estado.st_size)
+    if CUBO_EN_MEMORIA.get("firma") != firma:
+        CUBO_EN_MEMORIA.update(firma=firma, tabla=pd.read_parquet(ruta))
+    return CUBO_EN_MEMORIA["tabla"], filtro
+
+
+def celdas_cubo(cubo, filtro=None, por_categoria=False):
+    """Celdas por categoría o totales (TOTAL_CATEGORIAS), restringidas a `filtro`"""
+    totales = (cubo["categoria_corregida"] == TOTAL_CATEGORIAS).to_numpy()
+    celdas = cubo[~totales if por_categoria else totales]
+    if filtro is not None:
+        celdas = celdas[filtro.mascara(celdas)]
+    return celdas
+
+
+def conteo_desde_cubo(cubo, filtro, columna, tipo=None):
+    """
+    value_counts de `columna` (una dimensión del cubo) sumando líneas por
+    celda. Con `tipo` categórico se devuelven todas sus categorías, como
+    value_counts sobre la tabla.
+    """
+    celdas = celdas_cubo(cubo, filtro, por_categoria=columna == "categoria_corregida")
+    conteo = celdas.groupby(columna, observed=True)["lineas"].sum()
+    conteo.index = conteo.index.astype("object")
+    if isinstance(tipo, pd.CategoricalDtype):
+        conteo = pd.Series(conteo.reindex(tipo.categories, fill_value=0).to_numpy(dtype="int64"),
+                           index=pd.CategoricalIndex(tipo.categories, dtype=tipo))
+    conteo.name = "count"
+    conteo.index.name = columna
+    return conteo.sort_values(ascending=False, kind="stable")
+
+
+def resumen_cubo(cubo, filtro=None, agrupar=("medio_pago",)):
+    """
+    Líneas, importe, cantidad y ventas distintas por las columnas de
+    `agrupar` (dimensiones del cubo o "mes"), para tableros y el servidor.
+    """
+    agrupar = list(agrupar)
+    celdas = celdas_cubo(cubo, filtro, por_categoria="categoria_corregida" in agrupar)
+    claves = [clave_mes(celdas["fecha"]) if col == "mes" else celdas[col] for col in agrupar]
+    resumen = celdas.groupby(claves, observed=True)[["lineas", "importe", "cantidad", "ventas"]].sum()
+    return completar_resumen(resumen)
+
+
+def resumen_lineas(df, agrupar):
+    """Lo mismo que resumen_cubo recorriendo las líneas (para verificar el cubo)"""
+    claves = [clave_mes(df["fecha"]) if col == "mes" else df["fecha"].dt.normalize() if col == "fecha" else df[col]
+              for col in agrupar]
+    resumen = df.groupby(claves, observed=True).agg(lineas=("id_venta", "size"), importe=("importe", "sum"),
+                                                    cantidad=("cantidad", "sum"), ventas=("id_venta", "nunique"))
+    return completar_resumen(resumen)
+
+
+def clave_mes(fechas):
+    # AAAAMM numérico: agrupar por número es mucho más rápido que por texto
+    return (fechas.dt.year * 100 + fechas.dt.month).rename("mes")
+
+
+def completar_resumen(resumen):
+    """Ticket promedio y el mes como texto AAAA-MM (se formatea por grupo, no por fila)"""
+    if "mes" in resumen.index.names:
+        resumen = resumen.rename(index=lambda v: f"{int(v) // 100:04d}-{int(v) % 100:02d}", level="mes")
+    resumen["ticket_promedio"] = (resumen["importe"] / resumen["ventas"]).round(2)
+    return resumen
+
+
+# =====================================================
+# FILTRO POR FECHA Y CIUDAD
+# =====================================================
+# El filtro viaja hasta los archivos: sobre la caché columnar se descartan
+# las particiones de meses fuera del rango y el resto de la condición se
+# evalúa en Arrow al leer; sobre un DataFrame ya cargado es una máscara.
+
+class FiltroTabla:
+    """
+    Rango de fechas de venta (por día, ambos extremos incluidos) y lista de
+    ciudades. Cualquiera de las partes puede faltar.
+    """
+
+    def __init__(self, desde=None, hasta=None, ciudades=None):
+        self.desde = pd.Timestamp(desde).normalize() if desde else None
+        self.hasta = pd.Timestamp(hasta).normalize() if hasta else None
+        self.ciudades = sorted(set(ciudades)) if ciudades else None
+        if self.desde is not None and self.hasta is not None and self.desde > self.hasta:
+            raise ValueError(f"Rango de fechas vacío: {self.desde.date()} es posterior a {self.hasta.date()}")
+
+    @classmethod
+    def desde_entorno(cls):
+        """Filtro de AURELION_DESDE, AURELION_HASTA y AURELION_CIUDADES (None si no hay ninguno)"""
+        desde = os.environ.get("AURELION_DESDE")
+        hasta = os.environ.get("AURELION_HASTA")
+        ciudades = [c.strip() for c in os.environ.get("AURELION_CIUDADES", "").split(",") if c.strip()]
+        if not (desde or hasta or ciudades):
+            return None
+        return cls(desde, hasta, ciudades)
+
+    def fin_exclusivo(self):
+        return self.hasta + pd.Timedelta(days=1)
+
+    def columnas(self):
+        """Columnas que necesita el filtro para evaluarse"""
+        columnas = []
+        if self.desde is not None or self.hasta is not None:
+            columnas.append("fecha")
+        if self.ciudades is not None:
+            columnas.append("ciudad")
+        return columnas
+
+    def descripcion(self):
+        partes = []
+        if self.desde is not None or self.hasta is not None:
+            desde = self.desde.date() if self.desde is not None else "inicio"
+            hasta = self.hasta.date() if self.hasta is not None else "fin"
+            partes.append(f"fecha {desde} → {hasta}")
+        if self.ciudades is not None:
+            partes.append(f"ciudad: {', '.join(self.ciudades)}")
+        return " | ".join(partes)
+
+    def incluye_particion(self, anio, mes):
+        """False si ninguna fila de la partición anio/mes puede cumplir el rango de fechas"""
+        if self.desde is None and self.hasta is None:
+            return True
+        if anio == 0:
+            return False
+        inicio = pd.Timestamp(year=anio, month=mes, day=1)
+        fin = inicio + pd.offsets.MonthBegin(1)
+        return ((self.desde is None or fin > self.desde)
+                and (self.hasta is None or inicio < self.fin_exclusivo()))
+
+    def expresion_arrow(self):
+        condiciones = []
+        if self.desde is not None:
+            condiciones.append(ds.field("fecha") >= self.desde)
+        if self.hasta is not None:
+            condiciones.append(ds.field("fecha") < self.fin_exclusivo())
+        if self.ciudades is not None:
+            condiciones.append(ds.field("ciudad").isin(self.ciudades))
+        expresion = condiciones[0]
+        for condicion in condiciones[1:]:
+            expresion = expresion & condicion
+        return expresion
+
+    def condicion_sql(self):
+        """Condición WHERE equivalente, con parámetros `?`, para el backend SQL"""
+        condiciones, parametros = [], []
+        if self.desde is not None:
+            condiciones.append("fecha >= ?")
+            parametros.append(self.desde.to_pydatetime())
+        if self.hasta is not None:
+            condiciones.append("fecha < ?")
+            parametros.append(self.fin_exclusivo().to_pydatetime())
+        if self.ciudades is not None:
+            condiciones.append(f"ciudad IN ({', '.join('?' * len(self.ciudades))})")
+            parametros += self.ciudades
+        return " AND ".join(condiciones), parametros
+
+    def mascara(self, df):
+        faltantes = [c for c in self.columnas() if c not in df.columns]
+        if faltantes:
+            raise ValueError(f"El filtro necesita las columnas {faltantes}")
+        mascara = np.ones(len(df), dtype=bool)
+        if self.desde is not None:
+            mascara &= (df["fecha"] >= self.desde).to_numpy()
+        if self.hasta is not None:
+            mascara &= (df["fecha"] < self.fin_exclusivo()).to_numpy()
+        if self.ciudades is not None:
+            mascara &= df["ciudad"].isin(self.ciudades).to_numpy()
+        return mascara
+
+    def intersectar(self, otro):
+        """Filtro equivalente a aplicar self y otro (ValueError si ninguna fila puede cumplir ambos)"""
+        desde = max((f.desde for f in (self, otro) if f.desde is not None), default=None)
+        hasta = min((f.hasta for f in (self, otro) if f.hasta is not None), default=None)
+        ciudades = self.ciudades if otro.ciudades is None else otro.ciudades
+        if self.ciudades is not None and otro.ciudades is not None:
+            ciudades = sorted(set(self.ciudades) & set(otro.ciudades))
+            if not ciudades:
+                raise ValueError("Los filtros no tienen ciudades en común")
+        return FiltroTabla(desde, hasta, ciudades)
+
+    def aplicar(self, df):
+        """Filas de un DataFrame ya cargado que cumplen el filtro"""
+        filtrado = df[self.mascara(df)]
+        filtrado.attrs = dict(df.attrs)
+        previo = df.attrs.get("filtro")
+        filtrado.attrs["filtro"] = f"{previo} ∧ {self.descripcion()}" if previo else self.descripcion()
+        # El filtro combinado permite responder desde el cubo de ventas
+        filtrado.attrs["filtro_tabla"] = None
+        if not previo:
+            filtrado.attrs["filtro_tabla"] = self
+        elif df.attrs.get("filtro_tabla") is not None:
+            try:
+                filtrado.attrs["filtro_tabla"] = df.attrs["filtro_tabla"].intersectar(self)
+            except ValueError:
+                pass
+        return filtrado
+
+
+def filtrar_tabla(df_maestro, filtro):
+    """
+    df_maestro restringido a `filtro`. Una TablaPorBloques aplica el filtro
+    al recorrer la caché (solo lee las particiones del rango); un DataFrame
+    ya cargado se filtra en memoria, salvo que ya se haya cargado con ese filtro.
+    """
+    if filtro is None or df_maestro is None:
+        return df_maestro
+    if isinstance(df_maestro, (TablaPorBloques, TablaSQL)):
+        # La copia conserva la validación de la caché (y la conexión de DuckDB)
+        filtrada = copy.copy(df_maestro)
+        filtrada.filtro = filtro
+        return filtrada
+    if df_maestro.attrs.get("filtro") == filtro.descripcion():
+        return df_maestro
+    return filtro.aplicar(df_maestro)
+
+def sin_filas(df_maestro):
+    """
+    Avisa y devuelve True si no hay filas que analizar: sin datos cargados
+    o, si la tabla viene filtrada, sin ventas que cumplan el filtro.
+    """
+    if df_maestro is None:
+        print("❌ Error: No hay datos cargados. Ejecuta la opción 6 primero.")
+        return True
+    if not df_maestro.empty:
+        return False
+    if isinstance(df_maestro, (TablaPorBloques, TablaSQL)):
+        filtrada = df_maestro.filtro is not None
+    else:
+        filtrada = "filtro" in df_maestro.attrs
+    if filtrada:
+        print("⚠️ Ninguna venta cumple el filtro.")
+    else:
+        print("❌ Error: No hay datos cargados. Ejecuta la opción 6 primero.")
+    return True
+
+# =====================================================
+# CACHÉ DE RESULTADOS (memoización de análisis)
+# =====================================================
+
+# Cantidad máxima de resultados guardados; se descarta el usado hace más tiempo
+CAPACIDAD_CACHE_RESULTADOS = int(os.environ.get("AURELION_CACHE_RESULTADOS", "64"))
+
+# Caché de la sesión actual (la crean main() y ejecutar_reporte; None = sin caché)
+CACHE_RESULTADOS = None
+
+
+class CacheResultados:
+    """
+    Caché LRU de resultados de análisis (describe, value_counts, corr,
+    cuantiles, datos de gráficos). Cada clave incluye la huella de
+    df_maestro, así un resultado solo se reutiliza mientras los datos de
+    origen no cambien. Con `ruta` las entradas se persisten en disco (pickle)
+    y la próxima sesión sobre la misma tabla las encuentra ya calculadas.
+    """
+
+    def __init__(self, capacidad=None, ruta=None):
+        self.capacidad = capacidad or CAPACIDAD_CACHE_RESULTADOS
+        self.ruta = ruta
+        self.entradas = OrderedDict()
+        self.aciertos = 0
+        self.calculos = 0
+        self.modificada = False
+        self.cargada = ruta is None
+
+    def cargar(self):
+        # Se lee recién en el primer uso para no demorar la aparición del menú
+        self.cargada = True
+        if not os.path.exists(self.ruta):
+            return
+        try:
+            with open(self.ruta, "rb") as f:
+                self.entradas.update(pickle.load(f))
+            self.recortar()
+        except Exception as e:
+            print(f"⚠️ Caché de resultados ilegible, se ignora: {e}")
+            self.entradas.clear()
+
+    def recortar(self):
+        while len(self.entradas) > self.capacidad:
+            self.entradas.popitem(last=False)
+
+    def __contains__(self, clave):
+        if not self.cargada:
+            self.cargar()
+        return clave in self.entradas
+
+    def obtener(self, clave, calcular):
+        """Devuelve el resultado guardado para `clave` o lo calcula y lo guarda"""
+        if clave in self:
+            self.entradas.move_to_end(clave)
+            self.aciertos += 1
+            return self.entradas[clave]
+        resultado = calcular()
+        self.calculos += 1
+        self.entradas[clave] = resultado
+        self.modificada = True
+        self.recortar()
+        return resultado
+
+    def guardar(self):
+        """Persiste las entradas en disco (si hay ruta y algo cambió)"""
+        if self.ruta is None or not self.modificada:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            temporal = self.ruta + ".tmp"
+            with open(temporal, "wb") as f:
+                pickle.dump(self.entradas, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, self.ruta)
+            self.modificada = False
+            print(f"💾 Caché de resultados guardada en: {self.ruta}")
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la caché de resultados: {e}")
+
+
+def crear_cache_resultados():
+    """Caché de la sesión; con AURELION_CACHE_RESULTADOS_DISCO=1 se persiste en database/cache/"""
+    ruta = None
+    if os.environ.get("AURELION_CACHE_RESULTADOS_DISCO") == "1":
+        ruta = os.path.join(obtener_directorio_database(), "cache", "resultados.pkl")
+    return CacheResultados(ruta=ruta)
+
+
+def huella_tabla(df_maestro):
+    """
+    Huella barata de los datos cargados: huella de las fuentes (guardada en
+    df.attrs por la opción 6) más dimensiones y tipos. Sin huella de fuentes
+    se usa un hash del contenido, calculado una sola vez.
+    """
+    if isinstance(df_maestro, TablaSQL):
+        base = ["sql", calcular_huella_fuentes(df_maestro.database_dir),
+                df_maestro.filtro.descripcion() if df_maestro.filtro is not None else None]
+    elif isinstance(df_maestro, TablaPorBloques):
+        base = ["bloques", calcular_huella_fuentes(df_maestro.database_dir), df_maestro.tamano_bloque,
+                df_maestro.filtro.descripcion() if df_maestro.filtro is not None else None]
+    else:
+        if "huella_fuentes" not in df_maestro.attrs:
+            contenido = pd.util.hash_pandas_object(df_maestro, index=True).to_numpy()
+            df_maestro.attrs["huella_fuentes"] = {"contenido": hashlib.sha256(contenido.tobytes()).hexdigest()}
+        base = [
+            df_maestro.attrs["huella_fuentes"],
+            df_maestro.attrs.get("filtro"),
+            list(df_maestro.shape),
+            [[col, str(tipo)] for col, tipo in df_maestro.dtypes.items()],
+        ]
+    return hashlib.sha256(json.dumps(base, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def memoizar(df_maestro, nombre, calcular, *parametros):
+    """Resultado de `calcular()` para df_maestro, reutilizado mientras la huella no cambie"""
+    if CACHE_RESULTADOS is None:
+        return calcular()
+    clave = (huella_tabla(df_maestro), nombre) + parametros
+    if TRAZA is not None and clave in CACHE_RESULTADOS:
+        # Solo con traza activa: sin ella cada opción repetida llenaría la salida de avisos
+        print(f"⚡ Resultado reutilizado de la caché: {nombre}")
+    return CACHE_RESULTADOS.obtener(clave, calcular)
+
+
+def conteo_valores(df_maestro, columna):
+    """value_counts compartido por las opciones 9 y 12 (desde el cubo de ventas si está vigente)"""
+    if isinstance(df_maestro, TablaSQL):
+        return memoizar(df_maestro, "conteo_valores", lambda: conteo_valores_sql(df_maestro, columna), columna)
+    if columna in DIMENSIONES_CUBO[1:]:
+        cubo = cubo_para(df_maestro)
+        if cubo is not None:
+            tipo = df_maestro[columna].dtype if isinstance(df_maestro, pd.DataFrame) and columna in df_maestro.columns else None
+            return memoizar(df_maestro, "conteo_valores", lambda: conteo_desde_cubo(*cubo, columna, tipo), columna)
+    if isinstance(df_maestro, TablaPorBloques):
+        return memoizar(df_maestro, "conteo_valores", lambda: contar_valores_por_bloques(df_maestro, columna), columna)
+    return memoizar(df_maestro, "conteo_valores", lambda: df_maestro[columna].value_counts(), columna)
+
+
+def matriz_correlacion(df_maestro, columnas):
+    """Correlación de Pearson compartida por la tabla y el heatmap de la opción 10"""
+    if isinstance(df_maestro, TablaSQL):
+        return memoizar(df_maestro, "correlacion", lambda: correlacion_sql(df_maestro, columnas), tuple(columnas))
+    return kernel_estadistico(df_maestro)["corr"].loc[columnas, columnas]
+
+# =====================================================
+# KERNEL ESTADÍSTICO (una pasada compartida)
+# =====================================================
+# describe, correlaciones, outliers e histograma salen de un único resumen
+# por tabla: las VARIABLES_NUMERICAS se copian una vez a una matriz float64
+# contigua y los momentos se acumulan por bloques de filas con productos
+# matriciales. Los cuantiles exactos y los extremos salen de una selección
+# (np.partition, tiempo lineal) y no de ordenar cada columna; histogramas y
+# conteos fuera de rango son recorridos lineales. Las demás columnas
+# numéricas (ids) solo se describen cuando se pide el describe completo.
+
+VARIABLES_NUMERICAS = ["cantidad", "precio_unitario", "importe"]
+
+# Bins del histograma de la opción 13 y del histograma fino de la KDE
+BINS_HISTOGRAMA = 30
+BINS_KDE = 2048
+
+# Filas por bloque al acumular los momentos (acota la memoria temporal)
+FILAS_BLOQUE_KERNEL = 1 << 20
+
+
+def extremos_y_cuantiles(valores, qs):
+    """
+    (mínimo, [cuantiles qs], máximo) de `valores` sin NaN, con interpolación
+    lineal como pandas. Usa una selección en lugar de ordenar: solo quedan
+    en su lugar las posiciones que se leen. Reordena `valores` en el lugar.
+    """
+    n = len(valores)
+    if not n:
+        return np.nan, [np.nan] * len(qs), np.nan
+    posiciones = [q * (n - 1) for q in qs]
+    inferiores = [int(np.floor(p)) for p in posiciones]
+    superiores = [min(i + 1, n - 1) for i in inferiores]
+    valores.partition(sorted({0, n - 1, *inferiores, *superiores}))
+    cuantiles = [valores[i] + (valores[j] - valores[i]) * (p - i)
+                 for p, i, j in zip(posiciones, inferiores, superiores)]
+    return valores[0], cuantiles, valores[n - 1]
+
+
+def momentos_por_bloques(matriz):
+    """
+    Conteos, medias y covarianzas por pares completos (como DataFrame.cov y
+    DataFrame.corr) en una pasada por bloques de filas. Los valores se
+    desplazan por la media del primer bloque para evitar cancelaciones.
+    """
+    columnas = matriz.shape[1]
+    pares = np.zeros((columnas, columnas))
+    sumas = np.zeros((columnas, columnas))
+    cuadrados = np.zeros((columnas, columnas))
+    productos = np.zeros((columnas, columnas))
+    desplazamiento = None
+    for inicio in range(0, len(matriz), FILAS_BLOQUE_KERNEL):
+        bloque = matriz[inicio:inicio + FILAS_BLOQUE_KERNEL]
+        validos = ~np.isnan(bloque)
+        if desplazamiento is None:
+            desplazamiento = np.where(validos, bloque, 0).sum(axis=0) / np.maximum(validos.sum(axis=0), 1)
+        centrada = np.where(validos, bloque - desplazamiento, 0.0)
+        mascara = validos.astype("float64")
+        # [i, j]: cantidad de filas con i y j válidos / suma de i y de i² en esas filas / suma de i·j
+        pares += mascara.T @ mascara
+        sumas += centrada.T @ mascara
+        cuadrados += (centrada ** 2).T @ mascara
+        productos += centrada.T @ centrada
+    if desplazamiento is None:
+        desplazamiento = np.zeros(columnas)
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        comomento = productos - sumas * sumas.T / pares
+        dispersion = cuadrados - sumas ** 2 / pares
+        cov = np.where(pares > 1, comomento / (pares - 1), np.nan)
+        corr = np.clip(comomento / np.sqrt(dispersion * dispersion.T), -1, 1)
+        n = np.diag(pares)
+        media = np.where(n > 0, desplazamiento + np.diag(sumas) / n, np.nan)
+    np.fill_diagonal(corr, np.where(np.diag(dispersion) > 0, 1.0, np.nan))
+    return n, media, cov, corr
+
+
+def calcular_kernel_estadistico(matriz, columnas, bins=BINS_HISTOGRAMA, bins_kde=BINS_KDE):
+    """
+    Resumen de las columnas de `matriz` (float64 en orden F, NaN = nulo):
+    tabla tipo describe, covarianza y correlación de Pearson, límites y
+    conteos de outliers IQR, histograma y histograma fino para la KDE.
+    """
+    n, media, cov, corr = momentos_por_bloques(matriz)
+    std = np.sqrt(np.diag(cov))
+    
+    resumen, outliers, histogramas, kde = {}, {}, {}, {}
+    for j, col in enumerate(columnas):
+        valores = matriz[:, j]
+        valores = valores[~np.isnan(valores)]
+        
+        minimo, (Q1, mediana, Q3), maximo = extremos_y_cuantiles(valores, (0.25, 0.5, 0.75))
+        resumen[col] = [n[j], media[j], std[j], minimo, Q1, mediana, Q3, maximo]
+        
+        r = resumen_iqr(Q1, Q3)
+        r["outliers"] = int(np.count_nonzero((valores < r["limite_inferior"]) | (valores > r["limite_superior"])))
+        outliers[col] = r
+        
+        # Bins uniformes con rango explícito: np.histogram los cuenta sin ordenar
+        histogramas[col] = np.histogram(valores, bins=bins, range=(minimo, maximo) if len(valores) else (0.0, 1.0))
+        
+        # Histograma fino para la KDE (ancho de banda de Scott, como seaborn)
+        h = std[j] * n[j] ** (-1 / 5) if n[j] > 1 else 0.0
+        if h > 0:
+            conteos, bordes_kde = np.histogram(valores, bins=bins_kde, range=(minimo - 4 * h, maximo + 4 * h))
+            kde[col] = {"conteos": conteos, "bordes": bordes_kde, "n": int(n[j]), "h": h}
+        else:
+            kde[col] = None
+    
+    return {
+        "filas": len(matriz),
+        "resumen": pd.DataFrame(resumen, index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"]),
+        "cov": pd.DataFrame(cov, index=columnas, columns=columnas),
+        "corr": pd.DataFrame(corr, index=columnas, columns=columnas),
+        "outliers": outliers,
+        "histogramas": histogramas,
+        "kde": kde,
+    }
+
+
+def kernel_estadistico(df_maestro):
+    """Kernel de las VARIABLES_NUMERICAS de df_maestro, calculado una vez por tabla"""
+    def calcular():
+        columnas = [col for col in VARIABLES_NUMERICAS if col in df_maestro.columns]
+        matriz = np.empty((len(df_maestro), len(columnas)), dtype="float64", order="F")
+        for j, col in enumerate(columnas):
+            matriz[:, j] = df_maestro[col].to_numpy(dtype="float64", na_value=np.nan)
+        return calcular_kernel_estadistico(matriz, columnas)
+    return memoizar(df_maestro, "kernel_estadistico", calcular)
+
+
+def describir_con_kernel(df_maestro, columnas=None):
+    """
+    Equivalente a df_maestro.describe() (o a df_maestro[columnas].describe(),
+    con columnas de VARIABLES_NUMERICAS) armado desde el kernel; las demás
+    columnas numéricas y las fechas se describen aparte con pandas.
+    """
+    descripcion = kernel_estadistico(df_maestro)["resumen"]
+    if columnas is not None:
+        return descripcion[columnas]
+    otras = [col for col in df_maestro.select_dtypes("number").columns if col not in descripcion.columns]
+    if otras:
+        descripcion = pd.concat([descripcion, memoizar(df_maestro, "describir_otras",
+                                                       lambda: df_maestro[otras].describe(), tuple(otras))], axis=1)
+    fechas = df_maestro.select_dtypes("datetime").columns
+    if len(fechas):
+        return combinar_descripcion_fechas(descripcion, df_maestro[fechas].describe(), df_maestro.columns)
+    return descripcion[[col for col in df_maestro.columns if col in descripcion.columns]]
+
+
+def combinar_descripcion_fechas(descripcion, descripcion_fechas, orden_columnas):
+    """Une el describe numérico con el de las fechas en el orden de filas y columnas de pandas"""
+    filas = list(descripcion_fechas.index) + [f for f in descripcion.index if f not in descripcion_fechas.index]
+    descripcion = pd.concat([descripcion, descripcion_fechas], axis=1).reindex(filas)
+    return descripcion[[c for c in orden_columnas if c in descripcion.columns]]
+
+
+# =====================================================
+# EJECUCIÓN DEL NOTEBOOK (segundo plano y caché)
+# =====================================================
+# SPRINT2.ipynb se ejecuta en un hilo para que el menú siga disponible, y
+# las salidas de cada celda se muestran apenas termina. El notebook
+# ejecutado se guarda en database/cache/notebooks/ con una clave que combina
+# el código de sus celdas y el contenido de tabla_unificada.csv: mientras
+# ninguno de los dos cambie se muestran las salidas guardadas sin ejecutarlo.
+
+# Hilo de la ejecución en segundo plano (None = nunca se lanzó)
+EJECUCION_NOTEBOOK = None
+
+# Segundos máximos que puede tardar una celda
+TIEMPO_MAXIMO_CELDA_S = 600
+
+
+def clave_notebook(notebook_path, database_dir):
+    """SHA-256 del código de las celdas (no de sus salidas) y del contenido de los Excel que lee"""
+    with open(notebook_path, encoding="utf-8") as f:
+        notebook = json.load(f)
+    sha = hashlib.sha256()
+    sha.update(json.dumps(notebook.get("metadata", {}).get("kernelspec"), sort_keys=True).encode("utf-8"))
+    for celda in notebook.get("cells", []):
+        if celda.get("cell_type") == "code":
+            fuente = celda.get("source", "")
+            sha.update(("".join(fuente) if isinstance(fuente, list) else fuente).encode("utf-8") + b"\0")
+    # tabla_unificada.csv no: el notebook la escribe (y la opción 6 también)
+    for nombre in [n for n in ARCHIVOS_FUENTE if n.endswith(".xlsx")]:
+        ruta = os.path.join(database_dir, nombre)
+        sha.update(nombre.encode("utf-8") + b"\0")
+        if os.path.exists(ruta):
+            with open(ruta, "rb") as f:
+                for bloque in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(bloque)
+    return sha.hexdigest()
+
+
+def copia_privada_notebook(notebook_path, database_dir, carpeta):
+    """
+    Copia el notebook a `carpeta`/notebooks y los Excel a `carpeta`/database,
+    donde lo resuelve su ruta relativa "../database/". Así la celda que
+    guarda tabla_unificada.csv escribe en la copia y no en la que usan la
+    opción 6 y la actualización incremental mientras el notebook corre.
+    Devuelve la ruta del notebook copiado.
+    """
+    os.makedirs(os.path.join(carpeta, "notebooks"))
+    os.makedirs(os.path.join(carpeta, "database"))
+    for nombre in ARCHIVOS_FUENTE:
+        ruta = os.path.join(database_dir, nombre)
+        if os.path.exists(ruta):
+            shutil.copy2(ruta, os.path.join(carpeta, "database", nombre))
+    copia = os.path.join(carpeta, "notebooks", os.path.basename(notebook_path))
+    shutil.copy2(notebook_path, copia)
+    return copia
+
+
+def texto_salida(salida):
+    """Texto legible de una salida de celda (stream, resultado, imagen o error)"""
+    def unir(texto):
+        return "".join(texto) if isinstance(texto, list) else texto
+    tipo = salida.get("output_type")
+    if tipo == "stream":
+        return unir(salida.get("text", ""))
+    if tipo in ("execute_result", "display_data"):
+        datos = salida.get("data", {})
+        if any(formato.startswith("image/") for formato in datos):
+            return "[imagen]"
+        return unir(datos.get("text/plain", ""))
+    if tipo == "error":
+        return f"{salida.get('ename')}: {salida.get('evalue')}"
+    return ""
+
+
+def mostrar_salidas_celda(indice, celda):
+    textos = [texto.rstrip("\n") for texto in map(texto_salida, celda.get("outputs", [])) if texto.strip()]
+    if textos:
+        print(f"\n📓 [celda {indice + 1}]")
+        print("\n".join(textos))
+
+
+def ejecutar_con_nbclient(notebook_path, destino):
+    """Ejecuta celda por celda con nbclient, mostrando las salidas de cada una al terminar"""
+    import nbclient
+    import nbformat
+    
+    notebook = nbformat.read(notebook_path, as_version=4)
+    cliente = nbclient.NotebookClient(
+        notebook,
+        timeout=TIEMPO_MAXIMO_CELDA_S,
+        kernel_name=notebook.metadata.get("kernelspec", {}).get("name", "python3"),
+        resources={"metadata": {"path": os.path.dirname(notebook_path)}},
+        on_cell_executed=lambda cell, cell_index, **_: mostrar_salidas_celda(cell_index, cell),
+    )
+    cliente.execute()
+    nbformat.write(notebook, destino)
+
+
+def ejecutar_con_nbconvert(notebook_path, destino):
+    """Sin nbclient: nbconvert en un subproceso; su progreso se muestra en vivo y las salidas al final"""
+    jupyter = [shutil.which("jupyter")] if shutil.which("jupyter") else [sys.executable, "-m", "jupyter"]
+    cmd = jupyter + [
+        "nbconvert", "--to", "notebook", "--execute",
+        f"--ExecutePreprocessor.timeout={TIEMPO_MAXIMO_CELDA_S}",
+        "--output-dir", os.path.dirname(destino), "--output", os.path.basename(destino),
+        notebook_path,
+    ]
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as proceso:
+        for linea in proceso.stdout:
+            print(f"   {linea.rstrip()}")
+    if proceso.returncode != 0:
+        raise RuntimeError(f"nbconvert terminó con código {proceso.returncode}")
+    with open(destino, encoding="utf-8") as f:
+        for indice, celda in enumerate(json.load(f)["cells"]):
+            mostrar_salidas_celda(indice, celda)
+
+
+def ejecutar_notebook_con_cache(forzar=False):
+    """
+    Ejecuta SPRINT2.ipynb sobre una copia privada de los Excel (o muestra
+    las salidas guardadas si su código y los Excel no cambiaron). Devuelve
+    True si terminó bien.
+    """
+    import tempfile
+    
+    try:
+        notebook_path = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "SPRINT2.ipynb"))
+        database_dir = obtener_directorio_database()
+        cache_dir = os.path.join(database_dir, "cache", "notebooks")
+        nombre = os.path.splitext(os.path.basename(notebook_path))[0]
+        
+        ruta_cache = os.path.join(cache_dir, f"{nombre}-{clave_notebook(notebook_path, database_dir)[:16]}.ipynb")
+        if os.path.exists(ruta_cache) and not forzar:
+            print(f"♻️ {nombre}.ipynb sin cambios (ni en su código ni en los Excel): salidas guardadas")
+            with open(ruta_cache, encoding="utf-8") as f:
+                for indice, celda in enumerate(json.load(f)["cells"]):
+                    mostrar_salidas_celda(indice, celda)
+            print(f"\n✅ Salidas de {nombre}.ipynb mostradas desde: {ruta_cache}")
+            return True
+        
+        print(f"🧪 Ejecutando notebook y mostrando resultados: {notebook_path}")
+        os.makedirs(cache_dir, exist_ok=True)
+        temporal = os.path.join(cache_dir, f"{nombre}.ejecutando.ipynb")
+        inicio = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="aurelion-notebook-") as carpeta:
+            copia = copia_privada_notebook(notebook_path, database_dir, carpeta)
+            # La clave se toma de la copia antes de ejecutarla: son los Excel que el notebook lee de verdad
+            ruta_cache = os.path.join(cache_dir, f"{nombre}-{clave_notebook(copia, os.path.join(carpeta, 'database'))[:16]}.ipynb")
+            if importlib.util.find_spec("nbclient") is not None and importlib.util.find_spec("nbformat") is not None:
+                ejecutar_con_nbclient(copia, temporal)
+            else:
+                ejecutar_con_nbconvert(copia, temporal)
+            # Lo demás que deja el notebook (el resumen en Markdown) va junto al original, como antes
+            for archivo in os.listdir(os.path.dirname(copia)):
+                generado = os.path.join(os.path.dirname(copia), archivo)
+                if generado != copia and os.path.isfile(generado):
+                    shutil.copy2(generado, os.path.join(os.path.dirname(notebook_path), archivo))
+        
+        for archivo in os.listdir(cache_dir):
+            if re.fullmatch(re.escape(nombre) + r"-[0-9a-f]{16}\.ipynb", archivo):
+                os.remove(os.path.join(cache_dir, archivo))
+        os.replace(temporal, ruta_cache)
+        print(f"\n✅ Ejecución de {nombre}.ipynb finalizada en {time.perf_counter() - inicio:.1f} s "
+              f"(guardada en {ruta_cache})")
+        return True
+    except Exception as e:
+        # CellExecutionError de nbclient trae el nombre y el mensaje del error de la celda
+        detalle = f"{e.ename}: {e.evalue}" if hasattr(e, "ename") else str(e)
+        print(f"❌ Error al ejecutar el notebook: {detalle}")
+        return False
+
+
+def ejecutar_documentacion_notebook(en_segundo_plano=True, forzar=False):
+    """
+    Ejecuta SPRINT2.ipynb. En segundo plano devuelve enseguida el hilo que
+    lo ejecuta (el menú sigue disponible y las salidas aparecen a medida que
+    terminan las celdas); si no, espera y devuelve True si terminó bien.
+    """
+    global EJECUCION_NOTEBOOK
+    if EJECUCION_NOTEBOOK is not None and EJECUCION_NOTEBOOK.is_alive():
+        print("⏳ SPRINT2.ipynb ya se está ejecutando en segundo plano.")
+        return EJECUCION_NOTEBOOK
+    if not en_segundo_plano:
+        return ejecutar_notebook_con_cache(forzar)
+    EJECUCION_NOTEBOOK = threading.Thread(target=ejecutar_notebook_con_cache, args=(forzar,),
+                                          name="notebook", daemon=True)
+    EJECUCION_NOTEBOOK.start()
+    print("🧪 SPRINT2.ipynb se ejecuta en segundo plano; sus salidas irán apareciendo.")
+    return EJECUCION_NOTEBOOK
+
+# =====================================================
+# ANÁLISIS Y DOCUMENTACIÓN DEL MENÚ
+# =====================================================
+
+def analisis_estadistico(df):
+    print("\n📊 ANÁLISIS ESTADÍSTICO GENERAL:")
+    print(describir_con_kernel(df, VARIABLES_NUMERICAS).round(2))
+
+
+def medios_pago(df):
+    print("\n💳 ANÁLISIS DE MEDIOS DE PAGO:")
+    conteo = conteo_valores(df, "medio_pago").reset_index()
+    conteo.columns = ["Medio de Pago", "Cantidad de Ventas"]
+    print(conteo)
+    plt.figure(figsize=(7,5))
+    sns.barplot(data=conteo, x="Medio de Pago", y="Cantidad de Ventas", palette="crest")
+    plt.title("Frecuencia de Medios de Pago", fontsize=13, weight="bold")
+    plt.show()
+
+
+def conclusiones(df):
+    top_pago = conteo_valores(df, "medio_pago").idxmax()
+    print(f"✅ Conclusión: El medio de pago más utilizado por los clientes es **{top_pago}**.")
+
+
+def info_general(df):
+    print("\nℹ️ INFORMACIÓN GENERAL DEL DATAFRAME:")
+    print(df.info())
+    print("\nDescripción estadística de variables numéricas:")
+    print(df.describe().T)
+
+
+def medios_pago_conteo_porcentaje(df):
+    print("\n📌 CONTEO Y PORCENTAJE POR MEDIO DE PAGO:")
+    print(df["medio_pago"].value_counts())
+    print("\nPorcentaje de participación por medio de pago:")
+    print((df["medio_pago"].value_counts(normalize=True) * 100).round(2))
+
+
+def encoding_medios_pago(df):
+    print("\n🔤 ONE-HOT ENCODING DE MEDIOS DE PAGO:")
+    df_encoded = pd.get_dummies(df.copy(), columns=["medio_pago"], prefix="medio")
+    nuevas_cols = [c for c in df_encoded.columns if c.startswith("medio_")]
+    print("Columnas generadas:")
+    print(nuevas_cols)
+
+
+def correlaciones_numericas(df):
+    print("\n🧩 MATRIZ DE CORRELACIÓN (variables numéricas):")
+    df_encoded = pd.get_dummies(df.copy(), columns=["medio_pago"], prefix="medio")
+    corr = df_encoded.corr(numeric_only=True)
+    print(corr.round(2))
+
+
+def deteccion_outliers(df):
+    print("\n🚩 DETECCIÓN DE OUTLIERS (IQR):")
+    columnas_numericas = [col for col in ["cantidad", "precio_unitario", "importe"] if col in df.columns]
+    for col in columnas_numericas:
+        Q1 = df[col].quantile(0.25)
+        Q3 = df[col].quantile(0.75)
+        IQR = Q3 - Q1
+        lim_inf = Q1 - 1.5 * IQR
+        lim_sup = Q3 + 1.5 * IQR
+        outliers = df[(df[col] < lim_inf) | (df[col] > lim_sup)]
+        print(f"\n📍 Variable: {col}")
+        print(f" - IQR: {IQR:.2f}")
+        print(f" - Límite inferior: {lim_inf:.2f}")
+        print(f" - Límite superior: {lim_sup:.2f}")
+        print(f" - Outliers detectados: {outliers.shape[0]} registros")
+
+
+def metricas_clientes_tabla(df):
+    """Métricas por cliente con el motor que corresponde a la tabla (None si faltan columnas)"""
+    if isinstance(df, TablaSQL):
+        return metricas_clientes_sql(df)
+    if isinstance(df, TablaPorBloques):
+        return metricas_clientes_por_bloques(df)
+    if not all(c in df.columns for c in ["id_cliente", "importe"]):
+        return None
+    return metricas_clientes(df)
+
+
+def analisis_clientes(df, filtro=None):
+    print("\n🧑‍🤝‍🧑 CLIENTES: gasto total, compras y ticket promedio")
+    df = filtrar_tabla(df, filtro)
+    agrupado = metricas_clientes_tabla(df)
+    if agrupado is None:
+        print("No se encuentran las columnas necesarias para el análisis de clientes.")
+        return
+    print("Clientes con mayor gasto total (top 10):")
+    top = top_clientes(agrupado, 10)
+    # Solo las columnas numéricas: fecha_ultima_compra es datetime y round no aplica
+    print(top.round({col: 2 for col in top.select_dtypes("number").columns}))
+    print("\nEstadísticas generales de clientes:\n")
+    print(agrupado[["compras", "total_gastado", "ticket_promedio_cliente"]].describe().round(2))
+    return agrupado
+
+
+def ver_tabla_unificada(df):
+    print("\n📄 TABLA UNIFICADA:")
+    try:
+        print("Forma:", df.shape)
+        print("\nColumnas:")
+        print(df.columns.tolist())
+        print("\nVista previa:")
+        try:
+            print(df.head(10))
+        except Exception:
+            print(df.head())
+        print("\nNulos por columna:")
+        print(df.isnull().sum())
+        mostrar_cardinalidades(cardinalidades(df))
+    except Exception as e:
+        print(f"Error al visualizar la tabla unificada: {e}")
+
+
+def heatmap_correlaciones(df):
+    print("\n🧩 MATRIZ DE CORRELACIÓN (heatmap):")
+    df_encoded = pd.get_dummies(df.copy(), columns=["medio_pago"], prefix="medio")
+    corr = df_encoded.corr(numeric_only=True)
+    try:
+        plt.figure(figsize=(10, 8))
+        sns.heatmap(corr, cmap="crest", annot=False)
+        plt.title("Matriz de correlación (variables numéricas)")
+        plt.tight_layout()
+        plt.show()
+    except Exception as e:
+        print("No se pudo mostrar el heatmap, imprimiendo la matriz redondeada en su lugar:")
+        print(corr.round(2))
+
+
+def grafico_distribucion_importe(df):
+    print("\n📈 Distribución de 'importe' (histograma + KDE):")
+    if "importe" not in df.columns:
+        print("No se encuentra la columna 'importe'.")
+        return
+    plt.figure(figsize=(7,5))
+    try:
+        sns.histplot(df["importe"].dropna(), kde=True, bins=30, color="#4c78a8")
+    except Exception:
+        plt.hist(df["importe"].dropna(), bins=30, color="#4c78a8")
+    plt.xlabel("Importe")
+    plt.ylabel("Frecuencia")
+    plt.title("Distribución de Importe")
+    plt.tight_layout()
+    plt.show()
+
+
+def boxplot_importe_por_medio(df):
+    print("\n📦 Boxplot de 'importe' por 'medio_pago':")
+    if not all(c in df.columns for c in ["importe", "medio_pago"]):
+        print("No se encuentran las columnas necesarias ('importe', 'medio_pago').")
+        return
+    plt.figure(figsize=(8,5))
+    sns.boxplot(data=df, x="medio_pago", y="importe", palette="crest")
+    plt.title("Importe por Medio de Pago")
+    plt.xlabel("Medio de Pago")
+    plt.ylabel("Importe")
+    plt.tight_layout()
+    plt.show()
+
+def abrir_readme():
+    """
+    Abre el archivo README.md con la aplicación predeterminada del sistema operativo.
+    Utiliza os.startfile() en Windows, 'open' en macOS y 'xdg-open' en Linux.
+    """
+    ruta_readme = "../README.md"
+    
+    if not os.path.exists(ruta_readme):
+        print("❌ Error: No se encontró el archivo README.md en la ruta especificada.")
+        print(f"   Ruta buscada: {os.path.abspath(ruta_readme)}")
+        return
+    
+    try:
+        if sys.platform == "win32":
+            # Windows
+            os.startfile(os.path.abspath(ruta_readme))
+        elif sys.platform == "darwin":
+            # macOS
+            subprocess.Popen(["open", os.path.abspath(ruta_readme)])
+        else:
+            # Linux y otros
+            subprocess.Popen(["xdg-open", os.path.abspath(ruta_readme)])
+        
+        print("✅ README.md abierto correctamente.")
+    except Exception as e:
+        print(f"❌ Error al intentar abrir README.md: {e}")
+
+def cargar_documentacion_tema():
+    """Opción 2: Tema, problema y solución"""
+    print("\n" + "="*60)
+    print("📌 TEMA, PROBLEMA Y SOLUCIÓN")
+    print("="*60)
+    print("""
+TEMA:
+Este proyecto simula la gestión de una Tienda a partir de datos sintéticos.
+
+PROBLEMA:
+El objetivo es determinar cuál es el medio de pago más utilizado por los clientes 
+en la Tienda y comprender los patrones de comportamiento asociados.
+
+SOLUCIÓN:
+Desarrollo de un sistema de análisis de datos que permite:
+- Procesar información de ventas y clientes
+- Identificar patrones de pagos
+- Generar reportes sobre métodos de pago más frecuentes
+    """)
+
+def cargar_dataset_referencia():
+    """Opción 3: Dataset de referencia"""
+    print("\n" + "="*60)
+    print("📊 DATASET DE REFERENCIA")
+    print("="*60)
+    print("""
+FUENTE: Datos sintéticos educativos, generados por Guayerd e IBM.
+
+TABLAS:
+1. Productos (productos.xlsx) - 100 filas
+   - id_producto, nombre_producto, categoria, precio_unitario
+
+2. Clientes (clientes.xlsx) - 100 filas
+   - id_cliente, nombre_cliente, ciudad, fecha_alta
+
+3. Ventas (ventas.xlsx) - 120 filas
+   - id_venta, fecha, id_cliente, medio_pago
+
+4. Detalle Ventas (detalle_ventas.xlsx) - 300+ filas
+   - id_venta, id_producto, cantidad, importe
+
+PERÍODO: Enero - Junio 2024
+CIUDADES: Carlos Paz, Río Cuarto, Mendiolaza, Villa María, Alta Gracia, Córdoba
+    """)
+
+def cargar_pasos_pseudocodigo():
+    """Opción 4: Pasos, pseudocódigo y diagrama"""
+    print("\n" + "="*60)
+    print("🔧 PASOS, PSEUDOCÓDIGO Y DIAGRAMA")
+    print("="*60)
+    print("""
+PASOS DEL PROGRAMA:
+1. Mostrar un menú numérico con opciones disponibles
+2. Imprimir texto asociado a la opción escogida
+3. Mantener acceso al menú hasta seleccionar "Salir"
+
+PSEUDOCÓDIGO OPTIMIZADO:
+INICIO
+    Mientras True:
+        Mostrar opciones (1-15)
+        Leer opción
+        Si opción == 15:
             Romper bucle (Salir)
         Sino si opción >= 1 y opción <= 14:
             Ejecutar función asociada
@@ -355,347 +1975,2730 @@ INICIO
             Imprimir 'Opción inválida'
 FIN
 
-DIAGRAMA: Consultar archivo Diagrama_Flujo.png en la carpeta del proyecto
-    """)
+DIAGRAMA: Consultar archivo Diagrama_Flujo.png en la carpeta del proyecto
+    """)
+
+def cargar_mejoras_copilot():
+    """Opción 5: Sugerencias y mejoras con Copilot"""
+    print("\n" + "="*60)
+    print("💡 SUGERENCIAS Y MEJORAS APLICADAS CON COPILOT")
+    print("="*60)
+    print("""
+MEJORAS IMPLEMENTADAS:
+
+1. Optimización del pseudocódigo
+   - Mejorada la lógica de control de opciones
+   - Se evitaron condiciones redundantes
+   
+2. Validación de entrada
+   - Manejo de opciones inválidas
+   - Control de errores en conversión de tipos
+   
+3. Claridad en la estructura
+   - Simplificación del flujo de control
+   - Mejor comprensión del programa
+   
+4. Eficiencia
+   - Reducción de líneas de código
+   - Reutilización de funciones
+   
+5. Eliminación de funcionalidad redundante
+   - Removido One-Hot Encoding (opción 9 anterior)
+   - Información ya disponible en análisis de correlaciones
+    """)
+
+def cargar_ejecutar_documentacion(df_maestro, columnas=None, filtro=None):
+    """
+    Opción 6: Cargar tabla_unificada.csv y ejecutar documentación
+
+    Primero intenta la caché columnar (Parquet); si no está vigente lee el CSV
+    o reconstruye desde los Excel y regenera la caché. Con `columnas` solo se
+    devuelven (y, desde la caché, solo se leen) esas columnas. Con `filtro`
+    (FiltroTabla) desde la caché solo se leen las particiones de su rango de
+    fechas; la caché siempre se regenera con la tabla completa.
+    """
+    print("\n" + "="*60)
+    print("📁 CARGAR TABLA UNIFICADA Y EJECUTAR DOCUMENTACIÓN")
+    print("="*60)
+    
+    try:
+        # Construir la ruta a la carpeta database
+        database_dir = obtener_directorio_database()
+        
+        csv_path = os.path.join(database_dir, "tabla_unificada.csv")
+        csv_path = os.path.normpath(csv_path)
+        
+        # Con AURELION_INCREMENTAL=1 primero se agregan las ventas nuevas
+        if os.environ.get("AURELION_INCREMENTAL") == "1" and os.path.exists(csv_path):
+            with medir_etapa("actualizacion_incremental") as span:
+                span["filas_salida"] = actualizar_tabla_incremental(database_dir)
+        
+        # Intentar primero la caché columnar
+        df_cache = cargar_cache_columnar(database_dir, columnas, filtro)
+        if df_cache is not None:
+            df_cache.attrs["huella_fuentes"] = calcular_huella_fuentes(database_dir)
+            print("✅ Tabla unificada cargada desde la caché columnar (Parquet)")
+            if filtro is not None:
+                print(f"   🔎 Filtro: {filtro.descripcion()}")
+            print(f"   Dimensiones: {df_cache.shape}")
+            print(f"   Columnas: {df_cache.columns.tolist()}")
+            validar_al_cargar(df_cache)
+            return df_cache
+        
+        print(f"🔍 Buscando tabla unificada en: {csv_path}")
+        
+        # Intentar cargar la tabla unificada (si coincide con su registro)
+        df_maestro = None
+        registro = verificar_registro_csv(csv_path) if os.path.exists(csv_path) else None
+        if registro is not None:
+            with medir_etapa("leer_csv") as span:
+                df_maestro = pd.read_csv(csv_path, **argumentos_read_csv(csv_path))
+                span["filas_salida"] = len(df_maestro)
+            if registro.get("filas") not in (None, len(df_maestro)):
+                print(f"⚠️ Se leyeron {len(df_maestro):,} filas de tabla_unificada.csv y su registro dice "
+                      f"{registro['filas']:,}.")
+                df_maestro = None
+        if df_maestro is not None:
+            memoria_antes = estimar_memoria_sin_esquema(df_maestro)
+            print("✅ Tabla unificada cargada exitosamente desde tabla_unificada.csv")
+            print(f"   Dimensiones: {df_maestro.shape}")
+            print(f"   Columnas: {df_maestro.columns.tolist()}")
+        else:
+            if os.path.exists(csv_path):
+                print("   tabla_unificada.csv no es confiable: se reconstruye desde las fuentes individuales (Excel)...\n")
+            else:
+                print(f"⚠️ Archivo tabla_unificada.csv no encontrado en: {csv_path}")
+                print("   Intentando cargar desde fuentes individuales (Excel)...\n")
+            
+            # Rutas a los archivos Excel
+            clientes_path = os.path.join(database_dir, "clientes.xlsx")
+            productos_path = os.path.join(database_dir, "productos.xlsx")
+            ventas_path = os.path.join(database_dir, "ventas.xlsx")
+            detalle_path = os.path.join(database_dir, "detalle_ventas.xlsx")
+            
+            # Verificar que todos los archivos existan
+            archivos_requeridos = {
+                "clientes.xlsx": clientes_path,
+                "productos.xlsx": productos_path,
+                "ventas.xlsx": ventas_path,
+                "detalle_ventas.xlsx": detalle_path
+            }
+            
+            archivos_faltantes = [nombre for nombre, ruta in archivos_requeridos.items() if not os.path.exists(ruta)]
+            
+            if archivos_faltantes:
+                print(f"❌ Error: Faltan los siguientes archivos en {database_dir}:")
+                for archivo in archivos_faltantes:
+                    print(f"   - {archivo}")
+                if os.path.exists(csv_path):
+                    print(f"   Sin ellos no se puede reconstruir tabla_unificada.csv. Si el CSV es correcto, "
+                          f"borra {ruta_registro_csv(csv_path)} para aceptarlo como está.")
+                return None
+            
+            print("📥 Cargando archivos Excel...")
+            tablas = leer_excels_en_paralelo(database_dir, {nombre: {} for nombre in archivos_requeridos})
+            clientes = tablas["clientes.xlsx"]
+            productos = tablas["productos.xlsx"]
+            ventas = tablas["ventas.xlsx"]
+            detalle = tablas["detalle_ventas.xlsx"]
+            
+            print("✅ Archivos Excel cargados correctamente")
+            
+            df_maestro = unificar_tablas(clientes, productos, ventas, detalle)
+            memoria_antes = None
+            
+            # Guardar tabla unificada
+            print(f"💾 Guardando tabla unificada en: {csv_path}")
+            with medir_etapa("escribir_csv", len(df_maestro)) as span:
+                registro = escribir_csv(df_maestro, csv_path)
+                span["filas_salida"] = len(df_maestro)
+                span["bytes"] = registro["bytes"]
+            estado = {"ventas_unificadas": len(ventas) if guardar_ventas_unificadas(database_dir, ventas, True) else None}
+            guardar_estado_incremental(database_dir, estado, df_maestro["id_venta"].max(), len(ventas), len(detalle))
+            print("✅ Tabla unificada creada y guardada en tabla_unificada.csv")
+            print(f"   Dimensiones: {df_maestro.shape}")
+        
+        # Esquema compacto y caché columnar para la próxima carga
+        with medir_etapa("aplicar_esquema", len(df_maestro)) as span:
+            df_maestro = aplicar_esquema(df_maestro, memoria_antes)
+            span["filas_salida"] = len(df_maestro)
+            span["memoria_mb"] = round(memoria_bytes(df_maestro) / 2**20, 2)
+        guardar_cache_columnar(df_maestro, database_dir)
+        
+        if filtro is not None:
+            with medir_etapa("filtrar", len(df_maestro)) as span:
+                df_maestro = filtro.aplicar(df_maestro)
+                span["filas_salida"] = len(df_maestro)
+            print(f"🔎 Filtro: {filtro.descripcion()} → {len(df_maestro)} filas")
+        if columnas is not None:
+            df_maestro = df_maestro[[c for c in columnas if c in df_maestro.columns]]
+        # Identifica los datos para la caché de resultados
+        df_maestro.attrs["huella_fuentes"] = calcular_huella_fuentes(database_dir)
+        validar_al_cargar(df_maestro)
+        return df_maestro
+    
+    except FileNotFoundError as e:
+        print(f"❌ Error: Archivo no encontrado: {e}")
+        return None
+    except Exception as e:
+        print(f"❌ Error inesperado al cargar datos: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+# =====================================================
+# ESCRITURA DE TABLA_UNIFICADA.CSV (BLOQUES EN PARALELO)
+# =====================================================
+# El CSV se escribe en bloques de filas que se formatean en paralelo (con el
+# escritor CSV de pyarrow, que suelta el GIL; sin pyarrow, con pandas) y se
+# vuelcan en orden a <archivo>.tmp, que al terminar reemplaza al destino.
+# Al lado queda un registro <archivo>.json con filas, bytes y SHA-256 de
+# cada tramo escrito: quien lee el CSV lo verifica antes de confiar en él.
+# Un CSV sin registro (de una versión anterior o escrito a mano) se acepta.
+
+# Filas por bloque: cada hilo formatea un bloque por vez
+FILAS_BLOQUE_CSV = 100_000
+
+# Compresiones admitidas y la extensión que les corresponde
+COMPRESIONES_CSV = {"ninguna": "", "gzip": ".gz", "zstd": ".zst"}
+
+# Resultados de verificar_registro_csv en este proceso, por (ruta, mtime_ns, tamaño)
+VERIFICACIONES_CSV = {}
+
+
+def ruta_registro_csv(ruta):
+    return ruta + ".json"
+
+
+def tabla_para_csv(df):
+    """
+    df como tabla Arrow que pyarrow escribe igual que pandas.to_csv: fechas
+    sin hora si todas caen a medianoche, floats enteros con ".0" y las
+    columnas category como sus valores.
+    """
+    import pyarrow.compute as pc
+    
+    # Sin attrs: pyarrow intenta guardarlos como JSON y el filtro no lo es
+    sin_attrs = df.copy(deep=False)
+    sin_attrs.attrs = {}
+    tabla = pa.Table.from_pandas(sin_attrs, preserve_index=False)
+    for i, campo in enumerate(tabla.schema):
+        columna = tabla.column(i)
+        if pa.types.is_dictionary(campo.type):
+            columna = columna.cast(campo.type.value_type)
+        elif pa.types.is_timestamp(campo.type):
+            valores = df[campo.name].dropna()
+            if (valores == valores.dt.normalize()).all():
+                columna = columna.cast(pa.date32())
+            elif (valores == valores.dt.floor("s")).all():
+                columna = columna.cast(pa.timestamp("s", campo.type.tz))
+        elif pa.types.is_floating(campo.type):
+            texto = pc.cast(columna, pa.string())
+            columna = pc.if_else(pc.match_substring_regex(texto, r"^-?\d+$"),
+                                 pc.binary_join_element_wise(texto, ".0", ""), texto)
+        else:
+            continue
+        tabla = tabla.set_column(i, campo.name, columna)
+    return tabla
+
+
+def comprimir_bloque(datos, compresion):
+    """Bloque como un miembro gzip o una trama zstd: concatenados siguen siendo un archivo válido"""
+    if compresion == "ninguna":
+        return datos
+    if not pyarrow_disponible():
+        import gzip
+        return gzip.compress(datos, compresslevel=6)
+    salida = pa.BufferOutputStream()
+    with pa.CompressedOutputStream(salida, compresion) as f:
+        f.write(datos)
+    return salida.getvalue().to_pybytes()
+
+
+def formatear_bloque_csv(bloque, compresion="ninguna", encabezado=False):
+    """
+    Tarea de un hilo: el bloque (tabla Arrow o DataFrame) como bytes CSV.
+    Sin comillas, como pandas; si algún texto trae comas, comillas o saltos
+    de línea, ese bloque se entrecomilla.
+    """
+    if isinstance(bloque, pd.DataFrame):
+        datos = bloque.to_csv(index=False, header=encabezado, lineterminator="\n").encode("utf-8")
+        return comprimir_bloque(datos, compresion)
+    import pyarrow.csv as pacsv
+    
+    try:
+        salida = pa.BufferOutputStream()
+        pacsv.write_csv(bloque, salida, pacsv.WriteOptions(include_header=encabezado, quoting_style="none",
+                                                            quoting_header="none"))
+    except pa.ArrowInvalid:
+        salida = pa.BufferOutputStream()
+        pacsv.write_csv(bloque, salida, pacsv.WriteOptions(include_header=encabezado))
+    return comprimir_bloque(salida.getvalue().to_pybytes(), compresion)
+
+
+def leer_registro_csv(ruta):
+    """Registro de `ruta` ({} si no tiene); ValueError si está ilegible"""
+    registro_path = ruta_registro_csv(ruta)
+    if not os.path.exists(registro_path):
+        return {}
+    try:
+        with open(registro_path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        raise ValueError(f"registro {registro_path} ilegible: {e}") from e
+
+
+def sha256_tramos(ruta, tramos):
+    """SHA-256 de cada tramo consecutivo de `ruta` ([bytes, ...]) leyendo el archivo una sola vez"""
+    digestos = []
+    with open(ruta, "rb") as f:
+        for tamano in tramos:
+            sha = hashlib.sha256()
+            while tamano > 0:
+                bloque = f.read(min(tamano, 1 << 20))
+                if not bloque:
+                    break
+                sha.update(bloque)
+                tamano -= len(bloque)
+            digestos.append(sha.hexdigest())
+    return digestos
+
+
+def verificar_registro_csv(ruta):
+    """
+    Registro de `ruta` si el archivo coincide con él (tamaño y SHA-256 de
+    cada tramo), {} si no tiene registro y None si no coincide o el registro
+    está ilegible: en ese caso el CSV no es confiable.
+    """
+    estado = os.stat(ruta)
+    clave = (os.path.abspath(ruta), estado.st_mtime_ns, estado.st_size)
+    if clave in VERIFICACIONES_CSV:
+        return VERIFICACIONES_CSV[clave]
+    nombre = os.path.basename(ruta)
+    try:
+        registro = leer_registro_csv(ruta)
+    except ValueError as e:
+        print(f"⚠️ {nombre}: {e}")
+        registro = None
+    if registro:
+        tramos = registro.get("tramos", [])
+        if registro.get("bytes") != estado.st_size or sum(t["bytes"] for t in tramos) != estado.st_size:
+            print(f"⚠️ {nombre} tiene {estado.st_size:,} bytes y su registro dice {registro.get('bytes', 0):,}: "
+                  f"quedó a medio escribir o lo modificó otro programa.")
+            registro = None
+        elif sha256_tramos(ruta, [t["bytes"] for t in tramos]) != [t["sha256"] for t in tramos]:
+            print(f"⚠️ El SHA-256 de {nombre} no coincide con su registro: el contenido cambió.")
+            registro = None
+    VERIFICACIONES_CSV[clave] = registro
+    return registro
+
+
+def escribir_csv(df, ruta, compresion="ninguna", agregar=False, hilos=None, filas_bloque=FILAS_BLOQUE_CSV):
+    """
+    Escribe df en `ruta` en bloques formateados en paralelo y deja al lado
+    su registro. Se escribe en `ruta`.tmp, que al final reemplaza a `ruta`:
+    nadie lee nunca un CSV a medias. Con `agregar` las filas van al final
+    de `ruta` (sin encabezado) y el registro suma un tramo; si se corta a
+    mitad, el tamaño deja de coincidir con el registro y se detecta.
+    Devuelve el registro.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    if compresion not in COMPRESIONES_CSV:
+        raise ValueError(f"compresión '{compresion}' no válida (usa {', '.join(COMPRESIONES_CSV)})")
+    if compresion == "zstd" and not pyarrow_disponible():
+        raise ValueError("la compresión zstd necesita pyarrow (pip install pyarrow)")
+    agregar = agregar and os.path.exists(ruta)
+    registro = {"filas": 0, "bytes": 0, "compresion": compresion, "columnas": df.columns.tolist(), "tramos": []}
+    if agregar:
+        previo = verificar_registro_csv(ruta)
+        if previo is None:
+            raise ValueError(f"{os.path.basename(ruta)} no coincide con su registro; no se le agregan filas")
+        if previo.get("columnas", registro["columnas"]) != registro["columnas"]:
+            raise ValueError(f"las columnas no coinciden con las de {os.path.basename(ruta)}")
+        if previo.get("compresion", "ninguna") != compresion:
+            raise ValueError(f"{os.path.basename(ruta)} usa compresión '{previo.get('compresion', 'ninguna')}'")
+        if not previo:
+            # CSV sin registro: todo lo que ya tiene pasa a ser el primer tramo
+            tamano = os.path.getsize(ruta)
+            previo = {"filas": None, "bytes": tamano,
+                      "tramos": [{"bytes": tamano, "sha256": sha256_tramos(ruta, [tamano])[0]}]}
+        registro.update(filas=previo["filas"], bytes=previo["bytes"], tramos=list(previo["tramos"]))
+    
+    tabla = tabla_para_csv(df) if pyarrow_disponible() else df
+    filas = len(df)
+    hilos = hilos or os.cpu_count() or 1
+    sha = hashlib.sha256()
+    escritos = 0
+    destino = ruta if agregar else ruta + ".tmp"
+    with open(destino, "ab" if agregar else "wb") as f, ThreadPoolExecutor(max_workers=hilos) as pool:
+        pendientes = deque()
+        if not agregar:
+            pendientes.append(pool.submit(formatear_bloque_csv, tabla[:0], compresion, True))
+        for inicio in range(0, filas, filas_bloque):
+            pendientes.append(pool.submit(formatear_bloque_csv, tabla[inicio:inicio + filas_bloque], compresion))
+            # A lo sumo dos bloques por hilo en memoria; se escriben en orden
+            while len(pendientes) > 2 * hilos:
+                datos = pendientes.popleft().result()
+                f.write(datos)
+                sha.update(datos)
+                escritos += len(datos)
+        while pendientes:
+            datos = pendientes.popleft().result()
+            f.write(datos)
+            sha.update(datos)
+            escritos += len(datos)
+    if not agregar:
+        os.replace(destino, ruta)
+    if registro["filas"] is not None:
+        registro["filas"] += filas
+    registro["bytes"] += escritos
+    registro["tramos"].append({"bytes": escritos, "sha256": sha.hexdigest()})
+    escribir_json_atomico(ruta_registro_csv(ruta), registro)
+    return registro
+
+
+def exportar_tabla_csv(salida=None, compresion="ninguna", filtro=None):
+    """
+    Exporta la tabla unificada (con `filtro`, solo esas filas) a un CSV,
+    comprimido con gzip o zstd si se pide, con su registro al lado.
+    Devuelve 0 si terminó bien y 1 si no.
+    """
+    salida = salida or f"tabla_unificada.csv{COMPRESIONES_CSV.get(compresion, '')}"
+    df_maestro = cargar_ejecutar_documentacion(None, filtro=filtro)
+    if df_maestro is None:
+        print("❌ No se pudieron cargar los datos.")
+        return 1
+    try:
+        inicio = time.perf_counter()
+        with medir_etapa("exportar_csv", len(df_maestro), compresion=compresion) as span:
+            registro = escribir_csv(df_maestro, salida, compresion)
+            span["bytes"] = registro["bytes"]
+        print(f"💾 {len(df_maestro):,} filas exportadas a {salida} ({registro['bytes'] / 2**20:,.1f} MB, "
+              f"compresión: {compresion}) en {time.perf_counter() - inicio:.2f} s")
+        print(f"   Registro (filas, bytes, SHA-256): {ruta_registro_csv(salida)}")
+        return 0
+    except Exception as e:
+        print(f"❌ Error al exportar: {e}")
+        return 1
+
+
+# =====================================================
+# LECTURA DE EXCEL EN PARALELO
+# =====================================================
+
+# Columnas de cada Excel que usa la unificación (el resto no se lee)
+COLUMNAS_EXCEL = {
+    "clientes.xlsx": ["id_cliente", "nombre_cliente", "email", "ciudad", "fecha_alta"],
+    "productos.xlsx": ["id_producto", "nombre_producto", "precio_unitario"],
+    "ventas.xlsx": ["id_venta", "fecha", "id_cliente", "medio_pago"],
+    "detalle_ventas.xlsx": ["id_venta", "id_producto", "nombre_producto", "cantidad", "precio_unitario", "importe"],
+}
+
+
+# Por debajo de este tamaño total se lee en serie: arrancar el pool cuesta más que leer
+UMBRAL_EXCEL_PARALELO_BYTES = 1 << 20
+
+
+def motor_excel():
+    """
+    Motor de lectura de Excel: AURELION_MOTOR_EXCEL si está definida; si no,
+    calamine (python-calamine, mucho más rápido) cuando está instalado y
+    openpyxl en otro caso.
+    """
+    motor = os.environ.get("AURELION_MOTOR_EXCEL")
+    if motor:
+        return motor
+    return "calamine" if importlib.util.find_spec("python_calamine") is not None else "openpyxl"
+
+
+def leer_excel_cronometrado(ruta, argumentos):
+    """Tarea de un proceso del pool: lee un Excel y devuelve (tabla, segundos)"""
+    inicio = time.perf_counter()
+    tabla = pd.read_excel(ruta, **argumentos)
+    return tabla, time.perf_counter() - inicio
+
+
+def leer_excels_en_paralelo(database_dir, lecturas):
+    """
+    Lee a la vez los Excel de `lecturas` ({archivo: argumentos extra de
+    read_excel}) en un pool de procesos, solo con las columnas de
+    COLUMNAS_EXCEL, e informa el tiempo de cada uno. Así la carga en frío
+    tarda lo que el archivo más grande y no la suma de los cuatro.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    motor = motor_excel()
+    tareas = {
+        nombre: (os.path.join(database_dir, nombre),
+                 {"engine": motor, "usecols": COLUMNAS_EXCEL.get(nombre), **argumentos})
+        for nombre, argumentos in lecturas.items()
+    }
+    inicio = time.perf_counter()
+    resultados = None
+    tamano_total = sum(os.path.getsize(ruta) for ruta, _ in tareas.values())
+    with medir_etapa("leer_excel", motor=motor, bytes=tamano_total) as span:
+        if len(tareas) > 1 and tamano_total >= UMBRAL_EXCEL_PARALELO_BYTES and (os.cpu_count() or 1) > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=min(len(tareas), os.cpu_count() or 1)) as pool:
+                    futuros = {nombre: pool.submit(leer_excel_cronometrado, *tarea) for nombre, tarea in tareas.items()}
+                    resultados = {nombre: futuro.result() for nombre, futuro in futuros.items()}
+            except (OSError, RuntimeError) as e:
+                print(f"⚠️ Pool de procesos no disponible ({e}); se leen en serie.")
+        if resultados is None:
+            resultados = {nombre: leer_excel_cronometrado(*tarea) for nombre, tarea in tareas.items()}
+        span["filas_salida"] = sum(len(tabla) for tabla, _ in resultados.values())
+        span["archivos"] = {nombre: {"segundos": round(segundos, 4), "filas": len(tabla)}
+                            for nombre, (tabla, segundos) in resultados.items()}
+    
+    for nombre, (tabla, segundos) in resultados.items():
+        print(f"   ⏱️ {nombre:<22} {segundos:7.2f} s  ({len(tabla):,} filas)")
+    print(f"   Motor: {motor} | total: {time.perf_counter() - inicio:.2f} s "
+          f"(en serie serían {sum(s for _, s in resultados.values()):.2f} s)")
+    return {nombre: tabla for nombre, (tabla, _) in resultados.items()}
+
+# =====================================================
+# UNIFICACIÓN VECTORIZADA (reconstrucción desde Excel)
+# =====================================================
+
+# Palabras clave que identifican productos de la categoría "Alimentos"
+KEYWORDS_ALIMENTOS = [
+    "gallet", "harina", "fideo", "aceite", "azúcar", "yerba",
+    "arroz", "leche", "pan", "helado", "coca", "pepsi", "sprite",
+    "fanta", "agua", "medialuna", "aceituna", "café", "vino",
+    "fernet", "cerveza", "hamburguesa", "queso", "jamón"
+]
+
+# Una sola alternancia compilada en lugar de un bucle por palabra clave
+PATRON_ALIMENTOS = re.compile("|".join(re.escape(p) for p in KEYWORDS_ALIMENTOS))
+
+
+def corregir_categorias(nombres):
+    """
+    Clasifica cada nombre de producto como "Alimentos" o "Limpieza".
+    La regex se evalúa una vez por nombre distinto y el resultado se
+    expande a todas las filas por posición.
+    """
+    codigos, unicos = pd.factorize(nombres)
+    es_alimento = (
+        pd.Series(unicos, dtype=object).str.lower()
+          .str.contains(PATRON_ALIMENTOS, na=False)
+          .to_numpy(dtype=bool)
+    )
+    # El código -1 (nombre nulo) cae en el False agregado al final
+    es_alimento = np.append(es_alimento, False)[codigos]
+    return pd.Series(np.where(es_alimento, "Alimentos", "Limpieza"), index=nombres.index)
+
+
+def imputar_importes(detalle):
+    """Completa los importes nulos con cantidad * precio_unitario (en el lugar)"""
+    faltantes = detalle["importe"].isna()
+    detalle.loc[faltantes, "importe"] = (
+        detalle.loc[faltantes, "cantidad"] * detalle.loc[faltantes, "precio_unitario"]
+    )
+    return detalle
+
+
+def posiciones_por_clave(claves_dimension, claves):
+    """
+    Fila de la dimensión que corresponde a cada clave (-1 si no existe).
+    Con ids enteros densos se usa un arreglo indexado por id; si no, un
+    índice hash de pandas.
+    """
+    dimension = claves_dimension.to_numpy()
+    buscadas = claves.to_numpy() if hasattr(claves, "to_numpy") else np.asarray(claves)
+    if (dimension.dtype.kind in "iu" and buscadas.dtype.kind in "iu" and len(dimension)
+            and dimension.min() >= 0 and dimension.max() <= 4 * len(dimension) + 1024):
+        tabla = np.full(int(dimension.max()) + 1, -1, dtype=np.int64)
+        tabla[dimension] = np.arange(len(dimension))
+        posiciones = np.full(len(buscadas), -1, dtype=np.int64)
+        en_rango = (buscadas >= 0) & (buscadas < len(tabla))
+        posiciones[en_rango] = tabla[buscadas[en_rango]]
+        return posiciones
+    return pd.Index(dimension).get_indexer(buscadas)
+
+
+def unir_dimensiones(hechos, uniones):
+    """
+    Equivalente a encadenar `hechos.merge(dimension, on=clave, how="left")`
+    para dimensiones con clave única, sin DataFrames intermedios: por cada
+    dimensión se calcula una vez la posición de cada clave y las columnas
+    se copian con `take`. `uniones` es una lista de
+    (dimension, clave, columnas o None = todas, sufijos para nombres repetidos).
+    Falla si una clave de dimensión se repite e informa las claves huérfanas.
+    """
+    columnas = {col: hechos[col].array for col in hechos.columns}
+    for dimension, clave, seleccion, sufijos in uniones:
+        repetidas = dimension[clave][dimension[clave].duplicated()]
+        if len(repetidas):
+            raise ValueError(f"La clave '{clave}' se repite en la dimensión: {repetidas.unique()[:5].tolist()}")
+        
+        with medir_etapa(f"union_{clave}", len(hechos), filas_dimension=len(dimension)) as span:
+            claves = pd.Series(columnas[clave])
+            posiciones = posiciones_por_clave(dimension[clave], claves)
+            huerfanas = (posiciones == -1) & claves.notna().to_numpy()
+            span["huerfanas"] = int(huerfanas.sum())
+            if huerfanas.any():
+                ejemplos = claves[huerfanas].unique()[:5].tolist()
+                print(f"⚠️ {int(huerfanas.sum())} filas con '{clave}' sin correspondencia en la dimensión (ej.: {ejemplos})")
+            
+            nuevas = [c for c in (seleccion or dimension.columns) if c != clave]
+            # Nombres repetidos: se renombran las dos columnas, como en merge
+            repetidos = {c for c in nuevas if c in columnas}
+            columnas = {(c + sufijos[0] if c in repetidos else c): v for c, v in columnas.items()}
+            for col in nuevas:
+                valores = pd.api.extensions.take(dimension[col].array, posiciones, allow_fill=True)
+                columnas[col + sufijos[1] if col in repetidos else col] = valores
+            span["filas_salida"] = len(posiciones)
+    # copy=False: cada columna queda en su propio bloque, sin una copia de consolidación
+    return pd.DataFrame(columnas, copy=False)
+
+
+def unificar_tablas(clientes, productos, ventas, detalle):
+    """Corrige categorías, imputa importes y une las cuatro tablas en df_maestro"""
+    print("🔧 Corrigiendo categorías de productos...")
+    with medir_etapa("corregir_categorias", len(productos)) as span:
+        productos["categoria_corregida"] = corregir_categorias(productos["nombre_producto"])
+        span["filas_salida"] = len(productos)
+    
+    # Imputación de importes faltantes
+    print("🔧 Imputando importes faltantes...")
+    with medir_etapa("imputar_importes", len(detalle)) as span:
+        span["imputados"] = int(detalle["importe"].isna().sum())
+        imputar_importes(detalle)
+        span["filas_salida"] = len(detalle)
+    
+    return unir_tablas(clientes, productos, ventas, detalle)
+
+
+def unir_tablas(clientes, productos, ventas, detalle):
+    """Une detalle con productos, ventas y clientes (mismo resultado que los merges en cascada)"""
+    print("🔗 Uniendo tablas por índice de claves...")
+    return unir_dimensiones(detalle, [
+        (productos, "id_producto", ["categoria_corregida", "precio_unitario"], ("", "_producto")),
+        (ventas, "id_venta", ["fecha", "id_cliente", "medio_pago"], ("_x", "_y")),
+        (clientes, "id_cliente", ["nombre_cliente", "email", "ciudad", "fecha_alta"], ("_x", "_y")),
+    ])
+
+# =====================================================
+# ACTUALIZACIÓN INCREMENTAL (solo ventas nuevas)
+# =====================================================
+# ventas.xlsx y detalle_ventas.xlsx se tratan como registros de solo
+# agregado: se guarda cuántas filas de cada uno ya se unificaron. Una
+# actualización lee solo las filas posteriores, une los detalles nuevos
+# contra todas las cabeceras de venta leídas hasta ahora (guardadas en la
+# caché, como productos y clientes) y agrega las filas nuevas al CSV y una
+# parte nueva a la caché columnar. Un detalle cuya venta todavía no está en
+# ventas.xlsx detiene la actualización sin agregar nada.
+
+def rutas_incremental(database_dir):
+    cache_dir = os.path.join(database_dir, "cache")
+    return (
+        os.path.join(cache_dir, "incremental.json"),
+        os.path.join(cache_dir, "dimensiones"),
+    )
+
+
+def escribir_json_atomico(ruta, datos):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2)
+    os.replace(temporal, ruta)
+
+
+def huella_archivo(database_dir, nombre):
+    estado = os.stat(os.path.join(database_dir, nombre))
+    return {"mtime_ns": estado.st_mtime_ns, "tamano": estado.st_size}
+
+
+def guardar_estado_incremental(database_dir, estado, marca, filas_ventas, filas_detalle):
+    estado_path, _ = rutas_incremental(database_dir)
+    estado.update({
+        "marca_id_venta": int(marca),
+        "filas": {"ventas.xlsx": int(filas_ventas), "detalle_ventas.xlsx": int(filas_detalle)},
+        "fuentes": {nombre: huella_archivo(database_dir, nombre) for nombre in ("ventas.xlsx", "detalle_ventas.xlsx")},
+    })
+    escribir_json_atomico(estado_path, estado)
+
+
+def cargar_dimension(database_dir, nombre, estado):
+    """
+    productos o clientes desde la caché de dimensiones (Parquet) si el Excel
+    no cambió; si no, se lee el Excel y se vuelve a guardar.
+    """
+    _, dimensiones_dir = rutas_incremental(database_dir)
+    archivo = f"{nombre}.xlsx"
+    ruta_cache = os.path.join(dimensiones_dir, f"{nombre}.parquet")
+    huella = huella_archivo(database_dir, archivo)
+    if pyarrow_disponible() and estado.get("dimensiones", {}).get(archivo) == huella and os.path.exists(ruta_cache):
+        return pd.read_parquet(ruta_cache)
+    tabla = leer_excels_en_paralelo(database_dir, {archivo: {}})[archivo]
+    if pyarrow_disponible():
+        os.makedirs(dimensiones_dir, exist_ok=True)
+        tabla.to_parquet(ruta_cache, index=False)
+        estado.setdefault("dimensiones", {})[archivo] = huella
+    return tabla
+
+
+def ruta_ventas_unificadas(database_dir):
+    _, dimensiones_dir = rutas_incremental(database_dir)
+    return os.path.join(dimensiones_dir, "ventas")
+
+
+def guardar_ventas_unificadas(database_dir, ventas, reiniciar=False):
+    """
+    Guarda las cabeceras de ventas.xlsx ya leídas como una parte más de
+    cache/dimensiones/ventas/ (con `reiniciar`, en lugar de las anteriores).
+    Devuelve False si no se pudo (sin pyarrow).
+    """
+    if not pyarrow_disponible():
+        return False
+    carpeta = ruta_ventas_unificadas(database_dir)
+    if reiniciar and os.path.exists(carpeta):
+        shutil.rmtree(carpeta)
+    os.makedirs(carpeta, exist_ok=True)
+    if len(ventas):
+        parte = len([a for a in os.listdir(carpeta) if a.endswith(".parquet")])
+        columnas = [c for c in COLUMNAS_EXCEL["ventas.xlsx"] if c in ventas.columns]
+        ventas[columnas].to_parquet(os.path.join(carpeta, f"parte-{parte:04d}.parquet"), index=False)
+    return True
+
+
+def cabeceras_de_ventas(database_dir, estado, ventas_nuevas, ids):
+    """
+    Filas de ventas.xlsx (ya unificadas o nuevas) de los id_venta `ids`.
+    Las ya unificadas salen de la caché de ventas si está al día; si no, se
+    leen de ventas.xlsx. Devuelve (cabeceras, ventas ya unificadas leídas
+    del Excel o None si vinieron de la caché).
+    """
+    carpeta = ruta_ventas_unificadas(database_dir)
+    filas_previas = estado["filas"]["ventas.xlsx"]
+    previas_excel = None
+    if pyarrow_disponible() and estado.get("ventas_unificadas") == filas_previas and os.path.isdir(carpeta):
+        archivos = sorted(os.path.join(carpeta, a) for a in os.listdir(carpeta) if a.endswith(".parquet"))
+        previas = (ds.dataset(archivos, format="parquet").to_table(filter=ds.field("id_venta").isin(ids)).to_pandas()
+                   if archivos else ventas_nuevas.iloc[:0])
+    elif filas_previas:
+        previas_excel = leer_excels_en_paralelo(database_dir, {"ventas.xlsx": {"nrows": filas_previas}})["ventas.xlsx"]
+        previas = previas_excel
+    else:
+        previas_excel = previas = ventas_nuevas.iloc[:0]
+    cabeceras = pd.concat([previas, ventas_nuevas], ignore_index=True)
+    cabeceras = cabeceras[cabeceras["id_venta"].isin(ids)].drop_duplicates("id_venta", keep="last")
+    return cabeceras, previas_excel
+
+
+def leer_filas_nuevas(database_dir, filas_previas):
+    """
+    Filas de ventas.xlsx y detalle_ventas.xlsx posteriores a las ya
+    unificadas (`filas_previas` por archivo).
+    Devuelve {archivo: (filas nuevas, filas totales del archivo)}.
+    """
+    lecturas = {nombre: {"skiprows": range(1, filas + 1) if filas else None}
+                for nombre, filas in filas_previas.items()}
+    tablas = leer_excels_en_paralelo(database_dir, lecturas)
+    return {nombre: (tabla, filas_previas[nombre] + len(tabla)) for nombre, tabla in tablas.items()}
+
+
+def actualizar_tabla_incremental(database_dir=None):
+    """
+    Agrega a tabla_unificada.csv (y a la caché columnar, si estaba al día)
+    las ventas posteriores a la última actualización. Devuelve la cantidad
+    de filas agregadas, o None si hace falta una reconstrucción completa.
+    """
+    database_dir = database_dir or obtener_directorio_database()
+    csv_path = os.path.join(database_dir, "tabla_unificada.csv")
+    estado_path, _ = rutas_incremental(database_dir)
+    if not os.path.exists(csv_path):
+        print("⚠️ No existe tabla_unificada.csv: se necesita una reconstrucción completa.")
+        return None
+    faltantes = [n for n in ("ventas.xlsx", "detalle_ventas.xlsx", "productos.xlsx", "clientes.xlsx")
+                 if not os.path.exists(os.path.join(database_dir, n))]
+    if faltantes:
+        print(f"⚠️ No se puede actualizar: faltan {', '.join(faltantes)} en {database_dir}")
+        return None
+    
+    estado = {}
+    if os.path.exists(estado_path):
+        try:
+            with open(estado_path, encoding="utf-8") as f:
+                estado = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Estado incremental ilegible, se recalcula: {e}")
+    if verificar_registro_csv(csv_path) is None:
+        print("   Borra tabla_unificada.csv para reconstruirla completa desde los Excel.")
+        return None
+    primera_vez = "marca_id_venta" not in estado
+    if primera_vez:
+        # Sin estado no se sabe qué filas de los Excel ya están en el CSV: se
+        # supone que todas las de id_venta hasta el mayor del CSV
+        estado["marca_id_venta"] = int(pd.read_csv(csv_path, usecols=["id_venta"])["id_venta"].max())
+        estado["filas"] = {"ventas.xlsx": 0, "detalle_ventas.xlsx": 0}
+    
+    fuentes = {nombre: huella_archivo(database_dir, nombre) for nombre in ("ventas.xlsx", "detalle_ventas.xlsx")}
+    if estado.get("fuentes") == fuentes:
+        print(f"✅ Sin ventas nuevas desde la última actualización (id_venta ≤ {estado['marca_id_venta']}).")
+        return 0
+    
+    inicio = time.perf_counter()
+    marca = estado["marca_id_venta"]
+    print(f"🔄 Buscando filas nuevas (ventas.xlsx después de la fila {estado['filas']['ventas.xlsx']:,}, "
+          f"detalle_ventas.xlsx después de la fila {estado['filas']['detalle_ventas.xlsx']:,})...")
+    nuevas_filas = leer_filas_nuevas(database_dir, estado["filas"])
+    ventas, filas_ventas = nuevas_filas["ventas.xlsx"]
+    detalle, filas_detalle = nuevas_filas["detalle_ventas.xlsx"]
+    if primera_vez:
+        detalle = detalle[detalle["id_venta"] > marca]
+    elif len(detalle) and (detalle["id_venta"] <= marca).any():
+        print(f"🔄 {int((detalle['id_venta'] <= marca).sum())} líneas nuevas son de ventas ya unificadas "
+              f"(id_venta ≤ {marca}): se agregan a esas ventas.")
+    
+    # Cada detalle se une contra todas las ventas leídas, no solo las de esta actualización
+    cabeceras, ventas_previas = cabeceras_de_ventas(database_dir, estado, ventas, detalle["id_venta"].unique().tolist())
+    sin_venta = sorted(set(detalle["id_venta"].tolist()) - set(cabeceras["id_venta"].tolist()))
+    if sin_venta:
+        ejemplos = ", ".join(str(i) for i in sin_venta[:10]) + (", ..." if len(sin_venta) > 10 else "")
+        print(f"⚠️ detalle_ventas.xlsx tiene líneas de {len(sin_venta)} ventas que no están en ventas.xlsx: {ejemplos}")
+        print("   No se agregó nada: completa ventas.xlsx y vuelve a actualizar.")
+        return None
+    
+    nuevas = 0
+    if len(detalle):
+        clientes = cargar_dimension(database_dir, "clientes", estado)
+        productos = cargar_dimension(database_dir, "productos", estado)
+        encabezado = pd.read_csv(csv_path, nrows=0).columns.tolist()
+        df_nuevo = unificar_tablas(clientes, productos.copy(), cabeceras, detalle)[encabezado]
+        
+        # La caché columnar solo se extiende si reflejaba el CSV actual
+        metadatos = None
+        datos_dir, metadatos_path = rutas_cache_columnar(database_dir)
+        if pyarrow_disponible() and os.path.exists(metadatos_path):
+            with open(metadatos_path, encoding="utf-8") as f:
+                metadatos = json.load(f)
+            huella_csv = metadatos.get("huella", {}).get("tabla_unificada.csv", {})
+            if ({k: huella_csv.get(k) for k in ("mtime_ns", "tamano")} != huella_archivo(database_dir, "tabla_unificada.csv")
+                    or metadatos.get("esquema") != ESQUEMA_TABLA_UNIFICADA
+                    or metadatos.get("particion") != COLUMNA_PARTICION):
+                metadatos = None
+        
+        escribir_csv(df_nuevo, csv_path, agregar=True)
+        nuevas = len(df_nuevo)
+        ids_previos = df_nuevo.loc[df_nuevo["id_venta"] <= marca, "id_venta"].unique().tolist()
+        marca = max(marca, int(df_nuevo["id_venta"].max()))
+        
+        if metadatos is not None:
+            # Líneas ya unificadas de las ventas que reciben líneas nuevas (antes de escribir la parte nueva)
+            previas = None
+            if ids_previos and metadatos.get("cubo") == DIMENSIONES_CUBO:
+                previas = lineas_de_ventas(datos_dir, ids_previos, DIMENSIONES_CUBO + ["id_venta", "importe", "cantidad"])
+            # Sin metadatos vigentes mientras se escribe la parte nueva
+            os.remove(metadatos_path)
+            df_nuevo = aplicar_esquema(df_nuevo)
+            escritas, filas_partes, orden = escribir_particiones(df_nuevo, datos_dir)
+            if metadatos.get("numericas"):
+                try:
+                    extender_almacen_numerico(df_nuevo, orden, partes_almacen(datos_dir, escritas, filas_partes),
+                                              database_dir, metadatos["numericas"])
+                except Exception as e:
+                    print(f"⚠️ No se pudo extender el almacén numérico; se regenerará con la próxima caché: {e}")
+                    metadatos["numericas"] = None
+            if metadatos.get("cubo") == DIMENSIONES_CUBO and os.path.exists(ruta_cubo(database_dir)):
+                try:
+                    print(f"🧊 Cubo de ventas extendido: {extender_cubo(df_nuevo, database_dir, previas):,} celdas")
+                except Exception as e:
+                    print(f"⚠️ No se pudo extender el cubo de ventas; se reconstruirá con la próxima caché: {e}")
+                    metadatos["cubo"] = None
+            metadatos["huella"] = calcular_huella_fuentes(database_dir)
+            metadatos["filas"] += nuevas
+            escribir_json_atomico(metadatos_path, metadatos)
+            print(f"💾 Caché columnar extendida: "
+                  f"{', '.join(os.path.relpath(r, datos_dir) for r in escritas)}")
+    
+    if ventas_previas is None:
+        guardado = guardar_ventas_unificadas(database_dir, ventas)
+    else:
+        guardado = guardar_ventas_unificadas(database_dir, pd.concat([ventas_previas, ventas], ignore_index=True),
+                                             reiniciar=True)
+    estado["ventas_unificadas"] = filas_ventas if guardado else None
+    guardar_estado_incremental(database_dir, estado, marca, filas_ventas, filas_detalle)
+    print(f"✅ {nuevas} filas nuevas agregadas a tabla_unificada.csv en {time.perf_counter() - inicio:.2f} s "
+          f"(id_venta ≤ {marca})")
+    return nuevas
+
+# Carpeta donde se guardan las figuras en modo reporte (None = mostrar en pantalla)
+DIRECTORIO_FIGURAS = None
+
+
+def mostrar_figura(nombre):
+    """Muestra la figura actual o, en modo reporte, la guarda como PNG"""
+    if DIRECTORIO_FIGURAS is None:
+        plt.show()
+        return
+    ruta = os.path.join(DIRECTORIO_FIGURAS, f"{nombre}.png")
+    plt.savefig(ruta, dpi=120)
+    plt.close()
+    print(f"🖼️ Figura guardada en: {ruta}")
+
+
+def visualizar_tabla_unificada(df_maestro, filtro=None):
+    """Opción 7: Visualizar tabla unificada"""
+    print("\n" + "="*60)
+    print("📊 VISUALIZAR TABLA UNIFICADA")
+    print("="*60)
+    
+    df_maestro = filtrar_tabla(df_maestro, filtro)
+    if sin_filas(df_maestro):
+        return
+    
+    print(f"\n✅ Dimensiones (filas, columnas): {df_maestro.shape}")
+    print(f"\n✅ Columnas disponibles:")
+    print(df_maestro.columns.tolist())
+    print(f"\n✅ Muestra de datos (primeras 5 filas):")
+    print(df_maestro.head())
+    print(f"\n✅ Valores nulos por columna:")
+    nulos = df_maestro.isnull().sum()
+    print(nulos)
+    resumen = nulos.rename("nulos").to_frame()
+    mostrar_calidad(calidad_datos(df_maestro))
+    try:
+        cardinalidad = memoizar(df_maestro, "cardinalidades", lambda: cardinalidades(df_maestro),
+                                modo_distintos(), precision_hll())
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return resumen
+    mostrar_cardinalidades(cardinalidad)
+    por_columna = cardinalidad.set_index("columna")
+    resumen["distintos"] = por_columna["distintos"].reindex(resumen.index).astype("Int64")
+    resumen["metodo"] = por_columna["metodo"].reindex(resumen.index)
+    return resumen
+
+def resultados_estadisticos_generales(df_maestro, filtro=None):
+    """Opción 8: Resultados estadísticos generales"""
+    print("\n" + "="*60)
+    print("📈 RESULTADOS ESTADÍSTICOS GENERALES")
+    print("="*60)
+    
+    df_maestro = filtrar_tabla(df_maestro, filtro)
+    if sin_filas(df_maestro):
+        return
+    
+    if isinstance(df_maestro, TablaSQL):
+        descripcion = memoizar(df_maestro, "describe", lambda: describir_sql(df_maestro))
+        print("\n✅ Estadísticas descriptivas (DuckDB):")
+        print(descripcion.round(2))
+        print("\n✅ Información sobre tipos de datos:")
+        print(pd.Series(df_maestro.tipos(), name="tipo"))
+        return descripcion
+    
+    if isinstance(df_maestro, TablaPorBloques):
+        descripcion, filas, tipos = memoizar(df_maestro, "describe", lambda: describir_por_bloques(df_maestro))
+        print("\n✅ Estadísticas descriptivas (variables numéricas, por bloques):")
+        print(descripcion.round(2))
+        print(f"   (percentiles aproximados con sketch KLL, error de rango ±{SketchCuantiles().error_rango()*100:.2f}%)")
+        print("\n✅ Información sobre tipos de datos:")
+        print(f"Filas: {filas}")
+        print(tipos)
+        return descripcion
+    
+    print("\n✅ Estadísticas descriptivas (variables numéricas):")
+    descripcion = describir_con_kernel(df_maestro)
+    print(descripcion.round(2))
+    
+    print("\n✅ Información sobre tipos de datos:")
+    print(df_maestro.info())
+    return descripcion
+
+def medios_pago_conteo_porcentaje(df_maestro, filtro=None):
+    """Opción 9: Medios de pago - conteo y porcentaje"""
+    print("\n" + "="*60)
+    print("💳 MEDIOS DE PAGO: CONTEO Y PORCENTAJE")
+    print("="*60)
+    
+    df_maestro = filtrar_tabla(df_maestro, filtro)
+    if sin_filas(df_maestro):
+        return
+    
+    print("\n✅ Conteo de medios de pago:")
+    conteo = conteo_valores(df_maestro, "medio_pago")
+    print(conteo)
+    
+    print("\n✅ Porcentaje de participación:")
+    porcentaje = (conteo / conteo.sum() * 100).round(2).rename("proportion")
+    print(porcentaje)
+    
+    # Tabla combinada
+    resumen_medios = pd.DataFrame({
+        "Frecuencia": conteo,
+        "Porcentaje (%)": porcentaje
+    })
+    print("\n✅ Resumen combinado:")
+    print(resumen_medios)
+    return resumen_medios
+
+def matriz_correlaciones(df_maestro, filtro=None):
+    """Opción 10: Matriz de correlaciones"""
+    print("\n" + "="*60)
+    print("📊 MATRIZ DE CORRELACIONES")
+    print("="*60)
+    
+    df_maestro = filtrar_tabla(df_maestro, filtro)
+    if sin_filas(df_maestro):
+        return
+    
+    # Seleccionar solo columnas numéricas
+    cols_numericas = VARIABLES_NUMERICAS
+    
+    # Verificar que las columnas existan
+    cols_disponibles = [col for col in cols_numericas if col in df_maestro.columns]
+    
+    if not cols_disponibles:
+        print("❌ Error: No se encontraron columnas numéricas esperadas.")
+        return
+    
+    print("\n✅ Matriz de Correlación (Pearson):")
+    corr_matrix = matriz_correlacion(df_maestro, cols_disponibles)
+    print(corr_matrix.round(2))
+    
+    # Visualizar con heatmap
+    print("\n✅ Generando heatmap de correlaciones...")
+    presentar_grafico("matriz_correlaciones", {"corr": corr_matrix})
+    return corr_matrix
+
+def deteccion_outliers(df_maestro, modo=None, filtro=None):
+    """
+    Opción 11: Detección de outliers (IQR)
+
+    `modo` (o AURELION_MODO_CUANTILES): "exacto" (por defecto), "aproximado"
+    (sketch KLL de una pasada) o "comparar" (ambos, con sus diferencias).
+    `filtro` (FiltroTabla) restringe el análisis a un rango de fechas y ciudades.
+    """
+    print("\n" + "="*60)
+    print("🎯 DETECCIÓN DE OUTLIERS (MÉTODO IQR)")
+    print("="*60)
+    
+    df_maestro = filtrar_tabla(df_maestro, filtro)
+    if sin_filas(df_maestro):
+        return
+    
+    modo = modo or os.environ.get("AURELION_MODO_CUANTILES", "exacto")
+    if modo not in MODOS_CUANTILES:
+        print(f"❌ Error: Modo de cuantiles desconocido '{modo}'. Usa uno de: {', '.join(MODOS_CUANTILES)}.")
+        return
+    if isinstance(df_maestro, TablaSQL) and modo != "exacto":
+        print("⚠️ El backend SQL calcula los cuantiles exactos; se usa el modo exacto.")
+        modo = "exacto"
+    
+    variables_numericas = VARIABLES_NUMERICAS
+    
+    if modo in ("exacto", "comparar"):
+        exactos, total_filas = memoizar(df_maestro, "outliers_exactos",
+                                        lambda: outliers_iqr_exactos(df_maestro, variables_numericas))
+    if modo in ("aproximado", "comparar"):
+        aproximados, total_filas = memoizar(df_maestro, "outliers_aproximados",
+                                            lambda: outliers_iqr_aproximados(df_maestro, variables_numericas))
+    
+    print("\n✅ Análisis de outliers por variable:\n")
+    
+    for var in variables_numericas:
+        r = exactos[var] if modo != "aproximado" else aproximados[var]
+        print(f"📍 Variable: {var}")
+        print(f"   - Rango Intercuartílico (IQR): {r['IQR']:.2f}")
+        print(f"   - Límite inferior: {r['limite_inferior']:.2f}")
+        print(f"   - Límite superior: {r['limite_superior']:.2f}")
+        print(f"   - Outliers detectados: {r['outliers']} registros ({(r['outliers']/total_filas*100):.2f}%)")
+        if modo == "aproximado":
+            print(f"   - Error de rango del sketch: ±{r['error_rango']*100:.2f}% (±{r['error_rango']*total_filas:.0f} registros)")
+        elif modo == "comparar":
+            a = aproximados[var]
+            print(f"   - Aproximado (KLL): Q1={a['Q1']:.2f}  Q3={a['Q3']:.2f}  outliers={a['outliers']}")
+            print(f"   - Diferencia: ΔQ1={a['Q1'] - r['Q1']:+.2f}  ΔQ3={a['Q3'] - r['Q3']:+.2f}  "
+                  f"Δoutliers={a['outliers'] - r['outliers']:+d} (cota: ±{a['error_rango']*total_filas:.0f})")
+        print()
+    
+    return pd.DataFrame(exactos if modo != "aproximado" else aproximados).T
+
+def grafico_frecuencia_medios_pago(df_maestro, filtro=None):
+    """Opción 12: Gráfico - Frecuencia de medios de pago"""
+    print("\n" + "="*60)
+    print("📊 GRÁFICO: FRECUENCIA DE MEDIOS DE PAGO")
+    print("="*60)
+    
+    df_maestro = filtrar_tabla(df_maestro, filtro)
+    if sin_filas(df_maestro):
+        return
+    
+    datos = datos_grafico(df_maestro, "frecuencia_medios_pago")
+    presentar_grafico("frecuencia_medios_pago", datos)
+    return datos["conteo"]
+
+def grafico_distribucion_importe(df_maestro, filtro=None):
+    """Opción 13: Gráfico - Distribución de importe"""
+    print("\n" + "="*60)
+    print("📊 GRÁFICO: DISTRIBUCIÓN DE IMPORTE")
+    print("="*60)
+    
+    df_maestro = filtrar_tabla(df_maestro, filtro)
+    if sin_filas(df_maestro):
+        return
+    
+    presentar_grafico("distribucion_importe", datos_grafico(df_maestro, "distribucion_importe"))
+
+def grafico_boxplot_importe_medio_pago(df_maestro, filtro=None):
+    """Opción 14: Gráfico - Boxplot de importe por medio de pago"""
+    print("\n" + "="*60)
+    print("📊 GRÁFICO: BOXPLOT DE IMPORTE POR MEDIO DE PAGO")
+    print("="*60)
+    
+    df_maestro = filtrar_tabla(df_maestro, filtro)
+    if sin_filas(df_maestro):
+        return
+    
+    presentar_grafico("boxplot_importe_medio_pago", datos_grafico(df_maestro, "boxplot_importe_medio_pago"))
+
+# =====================================================
+# GRÁFICOS PRECALCULADOS
+# =====================================================
+# Cada gráfico se dibuja a partir de un resumen ya agregado (conteos,
+# bins, grilla KDE, estadísticos de caja), así el costo de dibujar depende
+# de la cantidad de bins y categorías y no de las filas de df_maestro.
+
+# Gráfico que genera cada opción del menú
+FIGURAS_POR_OPCION = {
+    10: "matriz_correlaciones",
+    12: "frecuencia_medios_pago",
+    13: "distribucion_importe",
+    14: "boxplot_importe_medio_pago",
+}
+
+# Figuras ya guardadas por renderizar_graficos_en_paralelo (modo reporte)
+FIGURAS_PRERENDERIZADAS = set()
+
+
+def orden_categorias(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return [c for c in serie.cat.categories if c in set(serie.dropna().unique())]
+    return list(pd.unique(serie.dropna()))
+
+
+def datos_frecuencia_medios_pago(df_maestro):
+    return {"conteo": conteo_valores(df_maestro, "medio_pago")}
+
+
+def datos_matriz_correlaciones(df_maestro):
+    cols = [c for c in VARIABLES_NUMERICAS if c in df_maestro.columns]
+    return {"corr": matriz_correlacion(df_maestro, cols)}
+
+
+def kde_binned(histograma_fino, grilla):
+    """
+    KDE gaussiana evaluada sobre el histograma fino del kernel estadístico:
+    una convolución de pocos miles de puntos en lugar de sumar un kernel
+    por cada fila.
+    """
+    conteos, bordes = histograma_fino["conteos"], histograma_fino["bordes"]
+    n, h = histograma_fino["n"], histograma_fino["h"]
+    paso = bordes[1] - bordes[0]
+    centros = bordes[:-1] + paso / 2
+    alcance = min(int(np.ceil(4 * h / paso)), len(conteos))
+    desplazamientos = np.arange(-alcance, alcance + 1) * paso
+    kernel = np.exp(-0.5 * (desplazamientos / h) ** 2) / (h * np.sqrt(2 * np.pi))
+    densidad = np.convolve(conteos, kernel, mode="same") / n
+    return np.interp(grilla, centros, densidad)
+
+
+def datos_distribucion_importe(df_maestro, puntos_kde=200):
+    kernel = kernel_estadistico(df_maestro)
+    conteos, bordes = kernel["histogramas"]["importe"]
+    datos = {"conteos": conteos, "bordes": bordes, "kde_x": None, "kde_y": None}
+    histograma_fino = kernel["kde"]["importe"]
+    if histograma_fino is not None:
+        resumen = kernel["resumen"]["importe"]
+        grilla = np.linspace(resumen["min"], resumen["max"], puntos_kde)
+        # Escala de la KDE a conteos por bin, como histplot(kde=True)
+        datos["kde_x"] = grilla
+        datos["kde_y"] = kde_binned(histograma_fino, grilla) * histograma_fino["n"] * (bordes[1] - bordes[0])
+    return datos
+
+
+def datos_boxplot_importe(df_maestro, max_atipicos=200):
+    """Estadísticos de caja por medio de pago (bigotes a 1,5·IQR, como seaborn)"""
+    df = df_maestro[["medio_pago", "importe"]].dropna()
+    cuartiles = df.groupby("medio_pago", observed=True)["importe"].quantile([0.25, 0.5, 0.75]).unstack()
+    iqr = cuartiles[0.75] - cuartiles[0.25]
+    lim_inf = (cuartiles[0.25] - 1.5 * iqr).reindex(df["medio_pago"]).to_numpy()
+    lim_sup = (cuartiles[0.75] + 1.5 * iqr).reindex(df["medio_pago"]).to_numpy()
+    importe = df["importe"].to_numpy()
+    dentro = (importe >= lim_inf) & (importe <= lim_sup)
+    bigotes = df[dentro].groupby("medio_pago", observed=True)["importe"].agg(["min", "max"])
+    atipicos = df[~dentro]
+    estadisticos = []
+    for medio in orden_categorias(df["medio_pago"]):
+        fuera = atipicos.loc[atipicos["medio_pago"] == medio, "importe"]
+        if len(fuera) > max_atipicos:
+            fuera = fuera.sample(max_atipicos, random_state=0)
+        estadisticos.append({
+            "label": str(medio),
+            "q1": cuartiles.loc[medio, 0.25],
+            "med": cuartiles.loc[medio, 0.5],
+            "q3": cuartiles.loc[medio, 0.75],
+            "whislo": bigotes.loc[medio, "min"],
+            "whishi": bigotes.loc[medio, "max"],
+            "fliers": fuera.to_numpy(),
+        })
+    return {"estadisticos": estadisticos}
+
+
+PREPARADORES_GRAFICOS = {
+    "matriz_correlaciones": datos_matriz_correlaciones,
+    "frecuencia_medios_pago": datos_frecuencia_medios_pago,
+    "distribucion_importe": datos_distribucion_importe,
+    "boxplot_importe_medio_pago": datos_boxplot_importe,
+}
+
+
+def datos_grafico(df_maestro, nombre):
+    """Datos agregados del gráfico `nombre`, calculados una vez por tabla"""
+    return memoizar(df_maestro, "grafico_" + nombre, lambda: PREPARADORES_GRAFICOS[nombre](df_maestro))
+
+
+def dibujar_grafico(nombre, datos):
+    """Dibuja en una figura nueva el gráfico `nombre` a partir de sus datos agregados"""
+    if nombre == "matriz_correlaciones":
+        plt.figure(figsize=(6, 4))
+        sns.heatmap(datos["corr"], annot=True, cmap="coolwarm", fmt=".2f", linewidths=0.5)
+        plt.title("Mapa de Calor – Correlación entre Variables Numéricas", fontsize=13, weight="bold")
+    elif nombre == "frecuencia_medios_pago":
+        conteo = datos["conteo"]
+        plt.figure(figsize=(8, 5))
+        plt.bar([str(i) for i in conteo.index], conteo.values, color=sns.color_palette("crest", len(conteo)))
+        plt.title("Distribución de Medios de Pago", fontsize=13, weight="bold")
+        plt.xlabel("Medio de Pago")
+        plt.ylabel("Cantidad de Operaciones")
+    elif nombre == "distribucion_importe":
+        bordes = datos["bordes"]
+        plt.figure(figsize=(10, 5))
+        plt.bar(bordes[:-1], datos["conteos"], width=np.diff(bordes), align="edge",
+                color=sns.color_palette()[0], alpha=0.6, edgecolor="white")
+        if datos["kde_x"] is not None:
+            plt.plot(datos["kde_x"], datos["kde_y"], color=sns.color_palette()[0])
+        plt.title("Distribución del Importe", fontsize=13, weight="bold")
+        plt.xlabel("Importe ($)")
+        plt.ylabel("Frecuencia")
+    elif nombre == "boxplot_importe_medio_pago":
+        estadisticos = datos["estadisticos"]
+        plt.figure(figsize=(10, 5))
+        cajas = plt.gca().bxp(estadisticos, patch_artist=True, medianprops={"color": "0.25"})
+        for caja, color in zip(cajas["boxes"], sns.color_palette("Set2", len(estadisticos))):
+            caja.set_facecolor(color)
+        plt.title("Distribución del Importe por Medio de Pago", fontsize=13, weight="bold")
+        plt.xlabel("Medio de Pago")
+        plt.ylabel("Importe ($)")
+    else:
+        raise ValueError(f"Gráfico desconocido: {nombre}")
+    if nombre != "matriz_correlaciones":
+        plt.grid(axis="y", linestyle="--", alpha=0.5)
+    plt.tight_layout()
+
+
+def presentar_grafico(nombre, datos):
+    """Dibuja y muestra (o guarda) un gráfico, salvo que ya se haya renderizado en paralelo"""
+    if nombre in FIGURAS_PRERENDERIZADAS:
+        print(f"🖼️ Figura ya generada: {os.path.join(DIRECTORIO_FIGURAS, nombre + '.png')}")
+        return
+    dibujar_grafico(nombre, datos)
+    mostrar_figura(nombre)
+
+
+def renderizar_grafico(nombre, datos, ruta):
+    """Tarea de un proceso del pool: dibuja con backend Agg y guarda el PNG"""
+    plt.switch_backend("Agg")
+    dibujar_grafico(nombre, datos)
+    plt.savefig(ruta, dpi=120)
+    plt.close("all")
+    return ruta
+
+
+def renderizar_graficos_en_paralelo(df_maestro, directorio, nombres=None):
+    """
+    Precalcula en el proceso principal los datos de cada gráfico y los
+    dibuja en simultáneo en un pool de procesos. Devuelve {nombre: ruta}.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    nombres = nombres or list(PREPARADORES_GRAFICOS)
+    tareas = {nombre: datos_grafico(df_maestro, nombre) for nombre in nombres}
+    rutas = {nombre: os.path.join(directorio, f"{nombre}.png") for nombre in nombres}
+    try:
+        with ProcessPoolExecutor(max_workers=min(len(tareas), os.cpu_count() or 1)) as pool:
+            futuros = {nombre: pool.submit(renderizar_grafico, nombre, datos, rutas[nombre])
+                       for nombre, datos in tareas.items()}
+            for futuro in futuros.values():
+                futuro.result()
+    except (OSError, RuntimeError) as e:
+        # Entornos sin multiprocessing: se dibuja en serie con el mismo código
+        print(f"⚠️ Pool de procesos no disponible ({e}); se dibuja en serie.")
+        for nombre, datos in tareas.items():
+            renderizar_grafico(nombre, datos, rutas[nombre])
+    for ruta in rutas.values():
+        print(f"🖼️ Figura guardada en: {ruta}")
+    return rutas
+
+# =====================================================
+# MODO STREAMING (tablas más grandes que la memoria)
+# =====================================================
+
+# Filas por bloque; la memoria pico depende de este valor, no del tamaño del archivo
+TAMANO_BLOQUE_DEFECTO = int(os.environ.get("AURELION_TAMANO_BLOQUE", "250000"))
+
+# Opciones del menú que funcionan sobre una TablaPorBloques
+OPCIONES_POR_BLOQUES = {8, 9, 11}
+
+
+class TablaPorBloques:
+    """
+    Referencia a la tabla unificada en disco que se recorre por bloques.
+    Se usa en lugar de df_maestro cuando AURELION_STREAMING=1: lee la caché
+    columnar si está vigente y, si no, tabla_unificada.csv.
+    """
+    def __init__(self, database_dir=None, tamano_bloque=None, filtro=None):
+        self.database_dir = database_dir or obtener_directorio_database()
+        self.tamano_bloque = tamano_bloque or TAMANO_BLOQUE_DEFECTO
+        self.csv_path = os.path.join(self.database_dir, "tabla_unificada.csv")
+        self.filtro = filtro
+        self._metadatos = None
+        self._validada = False
+
+    def metadatos_cache(self):
+        """Metadatos de la caché columnar vigente (None: se lee el CSV), validados una vez por tabla"""
+        if not self._validada:
+            self._metadatos = leer_metadatos_cache(self.database_dir, AVISO_CACHE_SOLO_LECTURA)
+            self._validada = True
+        return self._metadatos
+
+    def _dataset(self):
+        metadatos = self.metadatos_cache()
+        return dataset_cache(self.database_dir, self.filtro, metadatos) if metadatos is not None else None
+
+    @property
+    def empty(self):
+        """
+        True si ninguna fila cumple el filtro. En la caché se cuentan las
+        filas de las particiones del rango; en el CSV la lectura se corta
+        en el primer bloque con filas.
+        """
+        abierto = self._dataset()
+        if abierto is not None:
+            expresion = self.filtro.expresion_arrow() if self.filtro is not None else None
+            return abierto[0].count_rows(filter=expresion) == 0
+        if self.filtro is None:
+            return pd.read_csv(self.csv_path, nrows=1, usecols=[0]).empty
+        return not any(len(bloque) for bloque in self._bloques(self.filtro.columnas()))
+
+    def iterar(self, columnas=None):
+        """
+        Genera DataFrames de a lo sumo `tamano_bloque` filas con las columnas
+        pedidas. Con filtro, desde la caché solo se abren las particiones del
+        rango; desde el CSV cada bloque se filtra al leerlo.
+        """
+        # El span de una pasada incluye el tiempo de quien consume los bloques
+        with medir_etapa("pasada_por_bloques", columnas=columnas) as span:
+            filas = bloques = 0
+            for bloque in self._bloques(columnas):
+                filas += len(bloque)
+                bloques += 1
+                yield bloque
+            span["filas_salida"] = filas
+            span["bloques"] = bloques
+
+    def _bloques(self, columnas):
+        abierto = self._dataset()
+        if abierto is not None:
+            dataset, metadatos = abierto
+            if columnas is not None:
+                columnas = [c for c in columnas if c in metadatos["columnas"]]
+            expresion = self.filtro.expresion_arrow() if self.filtro is not None else None
+            for lote in dataset.to_batches(columns=columnas, filter=expresion, batch_size=self.tamano_bloque):
+                if lote.num_rows:
+                    yield lote.to_pandas()
+        elif self.filtro is None:
+            argumentos = argumentos_read_csv(self.csv_path, columnas)
+            yield from pd.read_csv(self.csv_path, chunksize=self.tamano_bloque, **argumentos)
+        else:
+            leidas = None if columnas is None else columnas + [c for c in self.filtro.columnas() if c not in columnas]
+            argumentos = argumentos_read_csv(self.csv_path, leidas)
+            for bloque in pd.read_csv(self.csv_path, chunksize=self.tamano_bloque, **argumentos):
+                bloque = bloque[self.filtro.mascara(bloque)]
+                yield bloque if columnas is None else bloque[[c for c in columnas if c in bloque.columns]]
+
+
+def abrir_tabla_por_bloques(filtro=None):
+    """Opción 6 en modo streaming: no carga datos, solo valida que haya una fuente"""
+    print("\n" + "="*60)
+    print("📁 ABRIR TABLA UNIFICADA EN MODO STREAMING")
+    print("="*60)
+    tabla = TablaPorBloques(filtro=filtro)
+    if tabla.metadatos_cache() is None:
+        if not os.path.exists(tabla.csv_path):
+            print(f"❌ Error: No existe {tabla.csv_path}. Desactiva AURELION_STREAMING y ejecuta la opción 6 para generarla.")
+            return None
+        if verificar_registro_csv(tabla.csv_path) is None:
+            print("❌ Error: tabla_unificada.csv no coincide con su registro. Desactiva AURELION_STREAMING y "
+                  "ejecuta la opción 6 para reconstruirla.")
+            return None
+    print(f"✅ Tabla lista para recorrer en bloques de {tabla.tamano_bloque:,} filas")
+    if filtro is not None:
+        print(f"   🔎 Filtro: {filtro.descripcion()}")
+    print(f"   Opciones disponibles en este modo: {sorted(OPCIONES_POR_BLOQUES)}")
+    return tabla
+
+
+class AcumuladorDescribe:
+    """
+    Estadísticos combinables por columna: conteo, suma, suma de cuadrados
+    centrada (M2), mínimo y máximo. Los bloques se combinan con la fórmula
+    de Chan, que evita la cancelación numérica de sum(x²) - n·media².
+    """
+
+    def __init__(self):
+        self.n = None
+
+    def actualizar(self, bloque):
+        bloque = bloque.select_dtypes("number").astype("float64")
+        n = bloque.count()
+        suma = bloque.sum()
+        media = suma / n
+        m2 = ((bloque - media) ** 2).sum()
+        self.combinar_parcial(n, suma, m2, bloque.min(), bloque.max())
+
+    def combinar_parcial(self, n, suma, m2, minimo, maximo):
+        if self.n is None:
+            self.n, self.suma, self.m2, self.minimo, self.maximo = n, suma, m2, minimo, maximo
+            return
+        total = self.n + n
+        delta = (suma / n).fillna(0) - (self.suma / self.n).fillna(0)
+        self.m2 = self.m2 + m2 + delta ** 2 * self.n * n / total.where(total > 0)
+        self.m2 = self.m2.fillna(0)
+        self.n = total
+        self.suma = self.suma + suma
+        self.minimo = pd.concat([self.minimo, minimo], axis=1).min(axis=1)
+        self.maximo = pd.concat([self.maximo, maximo], axis=1).max(axis=1)
+
+    def combinar(self, otro):
+        if otro.n is not None:
+            self.combinar_parcial(otro.n, otro.suma, otro.m2, otro.minimo, otro.maximo)
+
+    def resultado(self):
+        """Tabla con el formato de DataFrame.describe() (sin percentiles)"""
+        n = self.n.where(self.n > 0)
+        return pd.DataFrame({
+            "count": self.n,
+            "mean": self.suma / n,
+            "std": (self.m2 / (n - 1)) ** 0.5,
+            "min": self.minimo,
+            "max": self.maximo,
+        }).T
+
+
+class ContadorValores:
+    """Frecuencias combinables (tabla hash valor → conteo) para value_counts por bloques"""
+
+    def __init__(self):
+        self.conteos = {}
+
+    def actualizar(self, serie):
+        for valor, conteo in serie.value_counts().items():
+            if conteo:
+                self.conteos[valor] = self.conteos.get(valor, 0) + int(conteo)
+
+    def combinar(self, otro):
+        for valor, conteo in otro.conteos.items():
+            self.conteos[valor] = self.conteos.get(valor, 0) + conteo
+
+    def resultado(self, nombre=None):
+        serie = pd.Series(self.conteos, dtype="int64", name="count")
+        serie.index.name = nombre
+        return serie.sort_values(ascending=False, kind="stable")
+
+
+class AcumuladorClientes:
+    """
+    Acumuladores por cliente para analisis_clientes: primer nombre y ciudad,
+    suma e importes no nulos (ticket promedio), última fecha y los pares
+    (cliente, venta) distintos para contar compras. En modo "auto", cuando
+    los pares superan `limite` se reemplazan por un HyperLogLog por cliente
+    (SketchDistintosPorGrupo); en modo "aproximado" se usa desde el inicio.
+    """
+
+    def __init__(self, modo="auto", limite=None):
+        self.parcial = None
+        self.ventas = None
+        self.modo = modo
+        self.limite = limite or LIMITE_DISTINTOS_EXACTOS
+        self.sketch = SketchDistintosPorGrupo() if modo == "aproximado" else None
+
+    def actualizar(self, bloque):
+        agregado = bloque.groupby("id_cliente").agg(
+            nombre_cliente=("nombre_cliente", "first"),
+            ciudad=("ciudad", "first"),
+            total_gastado=("importe", "sum"),
+            importes=("importe", "count"),
+            fecha_ultima_compra=("fecha", "max"),
+        )
+        pares = bloque[["id_cliente", "id_venta"]].drop_duplicates()
+        self.combinar_parcial(agregado, pares)
+
+    def combinar_parcial(self, agregado, pares=None, sketch=None):
+        if self.parcial is None:
+            self.parcial = agregado
+        else:
+            self.parcial = pd.concat([self.parcial, agregado]).groupby(level=0).agg({
+                "nombre_cliente": "first",
+                "ciudad": "first",
+                "total_gastado": "sum",
+                "importes": "sum",
+                "fecha_ultima_compra": "max",
+            })
+        if pares is not None:
+            if self.sketch is not None:
+                self.sketch.actualizar(pares["id_cliente"], pares["id_venta"])
+            else:
+                self.ventas = pares if self.ventas is None else pd.concat([self.ventas, pares]).drop_duplicates()
+                if self.modo == "auto" and len(self.ventas) > self.limite:
+                    self.pasar_a_sketch()
+        if sketch is not None:
+            if self.sketch is None:
+                self.pasar_a_sketch()
+            self.sketch.combinar(sketch)
+
+    def pasar_a_sketch(self):
+        self.sketch = SketchDistintosPorGrupo()
+        if self.ventas is not None:
+            self.sketch.actualizar(self.ventas["id_cliente"], self.ventas["id_venta"])
+        self.ventas = None
+
+    def combinar(self, otro):
+        if otro.parcial is not None:
+            self.combinar_parcial(otro.parcial, otro.ventas, otro.sketch)
+
+    def resultado(self):
+        """Misma tabla que el groupby de analisis_clientes (compras estimadas si se pasó a HyperLogLog)"""
+        if self.sketch is not None:
+            compras = self.sketch.estimar().reindex(self.parcial.index, fill_value=0)
+        else:
+            compras = self.ventas.groupby("id_cliente").size()
+        agrupado = self.parcial.assign(
+            compras=compras,
+            ticket_promedio_cliente=self.parcial["total_gastado"] / self.parcial["importes"],
+        )
+        return agrupado.reset_index()[[
+            "id_cliente", "nombre_cliente", "ciudad", "compras",
+            "total_gastado", "ticket_promedio_cliente", "fecha_ultima_compra",
+        ]]
+
+
+def cuantil_desde_frecuencias(conteo, q):
+    """Cuantil exacto (interpolación lineal, como Series.quantile) a partir de un value_counts"""
+    conteo = conteo.sort_index()
+    acumulado = conteo.cumsum().to_numpy()
+    valores = conteo.index.to_numpy(dtype="float64")
+    posicion = (acumulado[-1] - 1) * q
+    inferior = valores[np.searchsorted(acumulado, np.floor(posicion), side="right")]
+    superior = valores[np.searchsorted(acumulado, np.ceil(posicion), side="right")]
+    return inferior + (superior - inferior) * (posicion - np.floor(posicion))
+
+
+def describir_por_bloques(tabla):
+    """describe() por bloques; los percentiles salen de sketches KLL (aproximados)"""
+    acumulador = AcumuladorDescribe()
+    sketches = {}
+    filas = 0
+    tipos = None
+    for bloque in tabla.iterar():
+        if tipos is None:
+            tipos = bloque.dtypes
+        acumulador.actualizar(bloque)
+        for col in bloque.select_dtypes("number").columns:
+            sketch = sketches.setdefault(col, SketchCuantiles(semilla=0))
+            sketch.actualizar(bloque[col].to_numpy(dtype="float64", na_value=np.nan))
+        filas += len(bloque)
+    descripcion = acumulador.resultado()
+    for etiqueta, q in (("25%", 0.25), ("50%", 0.5), ("75%", 0.75)):
+        descripcion.loc[etiqueta] = {col: s.cuantil(q) if s.n else np.nan for col, s in sketches.items()}
+    descripcion = descripcion.loc[["count", "mean", "std", "min", "25%", "50%", "75%", "max"]]
+    return descripcion, filas, tipos
+
+
+def contar_valores_por_bloques(tabla, columna):
+    contador = ContadorValores()
+    for bloque in tabla.iterar([columna]):
+        contador.actualizar(bloque[columna])
+    return contador.resultado(columna)
+
+
+def frecuencias_numericas_por_bloques(tabla, columnas):
+    """
+    Un value_counts por columna en una sola pasada. La memoria depende de la
+    cantidad de valores distintos (precios y cantidades de un catálogo), no de filas.
+    """
+    contadores = {col: ContadorValores() for col in columnas}
+    filas = 0
+    for bloque in tabla.iterar(columnas):
+        filas += len(bloque)
+        for col in columnas:
+            contadores[col].actualizar(bloque[col])
+    return {col: contador.resultado(col) for col, contador in contadores.items()}, filas
+
+
+def metricas_clientes_por_bloques(tabla, modo=None):
+    acumulador = AcumuladorClientes(modo_distintos(modo))
+    columnas = ["id_cliente", "id_venta", "nombre_cliente", "ciudad", "importe", "fecha"]
+    for bloque in tabla.iterar(columnas):
+        acumulador.actualizar(bloque)
+    return acumulador.resultado()
+
+# =====================================================
+# MÉTRICAS DE CLIENTES EN PARALELO
+# =====================================================
+# Cada columna se reduce a códigos enteros (factorize) y las filas se
+# reparten por id_cliente entre procesos: cada cliente cae en una sola
+# partición, así los resultados parciales se concatenan sin combinar.
+
+# Filas desde las que conviene repartir el trabajo en un pool de procesos
+FILAS_CLIENTES_PARALELO = 1_000_000
+
 
-def cargar_mejoras_copilot():
-    """Opción 5: Sugerencias y mejoras con Copilot"""
-    print("\n" + "="*60)
-    print("💡 SUGERENCIAS Y MEJORAS APLICADAS CON COPILOT")
-    print("="*60)
-    print("""
-MEJORAS IMPLEMENTADAS:
+def primero_no_nulo(codigos, grupo, grupos):
+    """Primer código >= 0 de cada grupo en orden de filas, -1 si el grupo no tiene"""
+    validos = codigos >= 0
+    primeras = np.full(grupos, len(codigos), dtype=np.int64)
+    np.minimum.at(primeras, grupo[validos], np.flatnonzero(validos))
+    return np.where(primeras < len(codigos), codigos[np.minimum(primeras, len(codigos) - 1)], -1)
 
-1. Optimización del pseudocódigo
-   - Mejorada la lógica de control de opciones
-   - Se evitaron condiciones redundantes
-   
-2. Validación de entrada
-   - Manejo de opciones inválidas
-   - Control de errores en conversión de tipos
-   
-3. Claridad en la estructura
-   - Simplificación del flujo de control
-   - Mejor comprensión del programa
-   
-4. Eficiencia
-   - Reducción de líneas de código
-   - Reutilización de funciones
-   
-5. Eliminación de funcionalidad redundante
-   - Removido One-Hot Encoding (opción 9 anterior)
-   - Información ya disponible en análisis de correlaciones
-    """)
 
-def cargar_ejecutar_documentacion(df_maestro):
-    """Opción 6: Cargar tabla_unificada.csv y ejecutar documentación"""
-    print("\n" + "="*60)
-    print("📁 CARGAR TABLA UNIFICADA Y EJECUTAR DOCUMENTACIÓN")
-    print("="*60)
+def metricas_clientes_particion(cliente, venta, importe, fecha, nombre, ciudad):
+    """
+    Tarea de un proceso del pool. Recibe códigos enteros (-1 = nulo) e
+    importes de las filas de una partición y devuelve, por cliente: compras
+    (ventas distintas), suma y cantidad de importes, mayor código de fecha y
+    primer nombre y ciudad no nulos.
+    """
+    if not len(cliente):
+        vacio = np.array([], dtype=np.int64)
+        return vacio, vacio, np.array([]), vacio, vacio, vacio, vacio
+    # Los códigos de cliente son densos: el grupo sale de una tabla indexada por código
+    claves = np.flatnonzero(np.bincount(cliente))
+    mapa = np.zeros(int(claves[-1]) + 1, dtype=np.int64)
+    mapa[claves] = np.arange(len(claves))
+    grupo = mapa[cliente]
     
-    try:
-        # Obtener la ruta base del script actual
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Construir la ruta a la carpeta database
-        database_dir = os.path.join(script_dir, "..", "database")
-        database_dir = os.path.normpath(database_dir)
-        
-        csv_path = os.path.join(database_dir, "tabla_unificada.csv")
-        csv_path = os.path.normpath(csv_path)
-        
-        print(f"🔍 Buscando tabla unificada en: {csv_path}")
-        
-        # Intentar cargar la tabla unificada
-        if os.path.exists(csv_path):
-            df_maestro = pd.read_csv(csv_path)
-            print("✅ Tabla unificada cargada exitosamente desde tabla_unificada.csv")
-            print(f"   Dimensiones: {df_maestro.shape}")
-            print(f"   Columnas: {df_maestro.columns.tolist()}")
-            return df_maestro
-        else:
-            print(f"⚠️ Archivo tabla_unificada.csv no encontrado en: {csv_path}")
-            print("   Intentando cargar desde fuentes individuales (Excel)...\n")
-            
-            # Rutas a los archivos Excel
-            clientes_path = os.path.join(database_dir, "clientes.xlsx")
-            productos_path = os.path.join(database_dir, "productos.xlsx")
-            ventas_path = os.path.join(database_dir, "ventas.xlsx")
-            detalle_path = os.path.join(database_dir, "detalle_ventas.xlsx")
-            
-            # Verificar que todos los archivos existan
-            archivos_requeridos = {
-                "clientes.xlsx": clientes_path,
-                "productos.xlsx": productos_path,
-                "ventas.xlsx": ventas_path,
-                "detalle_ventas.xlsx": detalle_path
-            }
-            
-            archivos_faltantes = [nombre for nombre, ruta in archivos_requeridos.items() if not os.path.exists(ruta)]
-            
-            if archivos_faltantes:
-                print(f"❌ Error: Faltan los siguientes archivos en {database_dir}:")
-                for archivo in archivos_faltantes:
-                    print(f"   - {archivo}")
-                return None
-            
-            print("📥 Cargando archivos Excel...")
-            clientes = pd.read_excel(clientes_path)
-            productos = pd.read_excel(productos_path)
-            ventas = pd.read_excel(ventas_path)
-            detalle = pd.read_excel(detalle_path)
-            
-            print("✅ Archivos Excel cargados correctamente")
-            
-            # Corrección de categorías
-            keywords_alimentos = [
-                "gallet", "harina", "fideo", "aceite", "azúcar", "yerba",
-                "arroz", "leche", "pan", "helado", "coca", "pepsi", "sprite",
-                "fanta", "agua", "medialuna", "aceituna", "café", "vino",
-                "fernet", "cerveza", "hamburguesa", "queso", "jamón"
-            ]
-            
-            def corregir_categoria(nombre):
-                nombre_lower = nombre.lower()
-                for palabra in keywords_alimentos:
-                    if palabra in nombre_lower:
-                        return "Alimentos"
-                return "Limpieza"
-            
-            print("🔧 Corrigiendo categorías de productos...")
-            productos["categoria_corregida"] = productos["nombre_producto"].apply(corregir_categoria)
-            
-            # Imputación de importes faltantes
-            print("🔧 Imputando importes faltantes...")
-            detalle["importe"] = detalle.apply(
-                lambda row: row["cantidad"] * row["precio_unitario"] 
-                if pd.isna(row["importe"]) else row["importe"],
-                axis=1
-            )
-            
-            # Merges en cascada
-            print("🔗 Uniendo tablas en cascada...")
-            detalle_productos = detalle.merge(
-                productos[["id_producto", "categoria_corregida", "precio_unitario"]],
-                on="id_producto", how="left"
-            )
-            
-            detalle_ventas = detalle_productos.merge(
-                ventas[["id_venta", "fecha", "id_cliente", "medio_pago"]],
-                on="id_venta", how="left"
-            )
-            
-            df_maestro = detalle_ventas.merge(
-                clientes[["id_cliente", "nombre_cliente", "email", "ciudad", "fecha_alta"]],
-                on="id_cliente", how="left"
-            )
-            
-            # Guardar tabla unificada
-            print(f"💾 Guardando tabla unificada en: {csv_path}")
-            df_maestro.to_csv(csv_path, index=False)
-            print("✅ Tabla unificada creada y guardada en tabla_unificada.csv")
-            print(f"   Dimensiones: {df_maestro.shape}")
-            
-            return df_maestro
+    validos = ~np.isnan(importe)
+    total = np.bincount(grupo, weights=np.where(validos, importe, 0.0), minlength=len(claves))
+    conteo = np.bincount(grupo, weights=validos, minlength=len(claves)).astype(np.int64)
     
-    except FileNotFoundError as e:
-        print(f"❌ Error: Archivo no encontrado: {e}")
-        return None
-    except Exception as e:
-        print(f"❌ Error inesperado al cargar datos: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+    con_venta = venta >= 0
+    base = int(venta.max()) + 1 if con_venta.any() else 1
+    pares = np.sort(grupo[con_venta].astype(np.int64) * base + venta[con_venta])
+    distintos = pares[np.r_[True, pares[1:] != pares[:-1]]] if len(pares) else pares
+    compras = np.bincount(distintos // base, minlength=len(claves))
+    
+    fecha_max = np.full(len(claves), -1, dtype=np.int64)
+    np.maximum.at(fecha_max, grupo, fecha)
+    return (claves, compras, total, conteo, fecha_max,
+            primero_no_nulo(nombre, grupo, len(claves)), primero_no_nulo(ciudad, grupo, len(claves)))
 
-def visualizar_tabla_unificada(df_maestro):
-    """Opción 7: Visualizar tabla unificada"""
-    print("\n" + "="*60)
-    print("📊 VISUALIZAR TABLA UNIFICADA")
-    print("="*60)
+
+def metricas_clientes(df, procesos=None):
+    """
+    Misma tabla que el groupby("id_cliente") original de analisis_clientes
+    (first, nunique, sum, mean y max), calculada sobre arreglos tipados y,
+    con muchas filas, repartida por id_cliente en un pool de procesos.
+    """
+    def codigos(col, orden=False):
+        return pd.factorize(df[col], sort=orden)
     
-    if df_maestro is None or df_maestro.empty:
-        print("❌ Error: No hay datos cargados. Ejecuta la opción 6 primero.")
-        return
+    clientes, claves_cliente = codigos("id_cliente", orden=True)
+    ventas = codigos("id_venta")[0] if "id_venta" in df.columns else np.arange(len(df))
+    fechas, valores_fecha = codigos("fecha", orden=True) if "fecha" in df.columns else (clientes, claves_cliente)
+    nombres, valores_nombre = codigos("nombre_cliente") if "nombre_cliente" in df.columns else (clientes, claves_cliente)
+    ciudades, valores_ciudad = codigos("ciudad") if "ciudad" in df.columns else (clientes, claves_cliente)
+    importes = df["importe"].to_numpy(dtype="float64", na_value=np.nan)
+    columnas = (clientes, ventas, importes, fechas, nombres, ciudades)
+    # Como el groupby, las filas sin id_cliente (código -1) no forman grupo
+    con_cliente = clientes >= 0
+    if not con_cliente.all():
+        columnas = tuple(c[con_cliente] for c in columnas)
+        clientes = columnas[0]
     
-    print(f"\n✅ Dimensiones (filas, columnas): {df_maestro.shape}")
-    print(f"\n✅ Columnas disponibles:")
-    print(df_maestro.columns.tolist())
-    print(f"\n✅ Muestra de datos (primeras 5 filas):")
-    print(df_maestro.head())
-    print(f"\n✅ Valores nulos por columna:")
-    print(df_maestro.isnull().sum())
-
-def resultados_estadisticos_generales(df_maestro):
-    """Opción 8: Resultados estadísticos generales"""
-    print("\n" + "="*60)
-    print("📈 RESULTADOS ESTADÍSTICOS GENERALES")
-    print("="*60)
+    procesos = procesos or os.cpu_count() or 1
+    if procesos > 1 and len(df) >= FILAS_CLIENTES_PARALELO:
+        from concurrent.futures import ProcessPoolExecutor
+        
+        particion = clientes % procesos
+        tareas = [[c[particion == p] for c in columnas] for p in range(procesos)]
+        try:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                parciales = list(pool.map(metricas_clientes_particion, *zip(*tareas)))
+        except (OSError, RuntimeError) as e:
+            print(f"⚠️ Pool de procesos no disponible ({e}); se calcula en un solo proceso.")
+            parciales = [metricas_clientes_particion(*columnas)]
+    else:
+        parciales = [metricas_clientes_particion(*columnas)]
     
-    if df_maestro is None or df_maestro.empty:
-        print("❌ Error: No hay datos cargados. Ejecuta la opción 6 primero.")
-        return
+    claves, compras, total, conteo, fecha_max, nombre, ciudad = (np.concatenate(p) for p in zip(*parciales))
+    orden = np.argsort(claves)
+    claves, compras, total, conteo, fecha_max, nombre, ciudad = (
+        a[orden] for a in (claves, compras, total, conteo, fecha_max, nombre, ciudad))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ticket = np.where(conteo > 0, total / conteo, np.nan)
+    def valores(unicos, codigos_):
+        # -1 (grupo sin valores no nulos) se completa con el nulo del tipo
+        return pd.api.extensions.take(unicos.array, codigos_, allow_fill=True)
     
-    print("\n✅ Estadísticas descriptivas (variables numéricas):")
-    print(df_maestro.describe().round(2))
+    return pd.DataFrame({
+        "id_cliente": valores(claves_cliente, claves),
+        "nombre_cliente": valores(valores_nombre, nombre),
+        "ciudad": valores(valores_ciudad, ciudad),
+        "compras": compras,
+        "total_gastado": total,
+        "ticket_promedio_cliente": ticket,
+        "fecha_ultima_compra": valores(valores_fecha, fecha_max),
+    })
+
+
+def top_clientes(agrupado, n=10, columna="total_gastado"):
+    """Las `n` filas con mayor `columna`, con selección parcial (argpartition) en lugar de ordenar todo"""
+    valores = agrupado[columna].to_numpy(dtype="float64", na_value=-np.inf)
+    if len(valores) > n:
+        candidatos = np.argpartition(-valores, n - 1)[:n]
+    else:
+        candidatos = np.arange(len(valores))
+    candidatos = candidatos[np.argsort(-valores[candidatos], kind="stable")]
+    return agrupado.iloc[candidatos]
+
+# =====================================================
+# CUANTILES APROXIMADOS (SKETCH KLL)
+# =====================================================
+
+MODOS_CUANTILES = ("exacto", "aproximado", "comparar")
+
+
+class SketchCuantiles:
+    """
+    Sketch KLL (Karnin, Lang y Liberty, 2016) para cuantiles en una pasada.
+
+    Guarda a lo sumo ~3·k valores en niveles de peso 2^h; cuando un nivel se
+    llena se ordena y se promueve uno de cada dos elementos (desplazamiento
+    al azar). Dos sketches se combinan uniendo nivel a nivel, así que cada
+    bloque o proceso puede construir el suyo.
+
+    Error: el rango estimado de cualquier valor difiere del real en a lo sumo
+    error_rango() · n con 99 % de confianza; para k=200 son ±1,33 % de las filas
+    (constantes empíricas de Apache DataSketches).
+    """
+
+    def __init__(self, k=200, semilla=None):
+        self.k = k
+        self.n = 0
+        self.niveles = [np.empty(0)]
+        self.rng = np.random.default_rng(semilla)
+
+    def error_rango(self):
+        return 2.296 / self.k ** 0.9723
+
+    def capacidad(self, nivel):
+        profundidad = len(self.niveles) - nivel - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** profundidad)), 2)
+
+    def actualizar(self, valores):
+        valores = np.asarray(valores, dtype="float64")
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return
+        self.n += len(valores)
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self.compactar()
+
+    def combinar(self, otro):
+        while len(self.niveles) < len(otro.niveles):
+            self.niveles.append(np.empty(0))
+        for nivel, datos in enumerate(otro.niveles):
+            self.niveles[nivel] = np.concatenate([self.niveles[nivel], datos])
+        self.n += otro.n
+        self.compactar()
+
+    def compactar(self):
+        nivel = 0
+        while nivel < len(self.niveles):
+            datos = self.niveles[nivel]
+            if len(datos) > self.capacidad(nivel):
+                if nivel + 1 == len(self.niveles):
+                    self.niveles.append(np.empty(0))
+                datos = np.sort(datos)
+                # Con cantidad impar, el mayor se queda en este nivel para no perder peso
+                resto = datos[-1:] if len(datos) % 2 else datos[:0]
+                pares = datos[:len(datos) - len(resto)]
+                promovidos = pares[self.rng.integers(0, 2)::2]
+                self.niveles[nivel] = resto
+                self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1], promovidos])
+            nivel += 1
+
+    def valores_ponderados(self):
+        valores = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(d), 2 ** h, dtype="int64") for h, d in enumerate(self.niveles)])
+        orden = np.argsort(valores, kind="stable")
+        return valores[orden], pesos[orden]
+
+    def cuantil(self, q):
+        valores, pesos = self.valores_ponderados()
+        acumulado = np.cumsum(pesos)
+        return float(valores[min(np.searchsorted(acumulado, q * acumulado[-1]), len(valores) - 1)])
+
+    def contar_menores(self, x):
+        valores, pesos = self.valores_ponderados()
+        return int(pesos[valores < x].sum())
+
+    def contar_mayores(self, x):
+        valores, pesos = self.valores_ponderados()
+        return int(pesos[valores > x].sum())
+
+
+def resumen_iqr(Q1, Q3):
+    IQR = Q3 - Q1
+    return {"Q1": Q1, "Q3": Q3, "IQR": IQR, "limite_inferior": Q1 - 1.5 * IQR, "limite_superior": Q3 + 1.5 * IQR}
+
+
+def outliers_iqr_exactos(df_maestro, variables):
+    """Límites IQR y outliers exactos, en memoria, por bloques (frecuencias) o con DuckDB"""
+    if isinstance(df_maestro, TablaSQL):
+        return outliers_iqr_sql(df_maestro, variables)
+    resultados = {}
+    if isinstance(df_maestro, TablaPorBloques):
+        frecuencias, total_filas = frecuencias_numericas_por_bloques(df_maestro, variables)
+        for var in variables:
+            conteo = frecuencias[var]
+            r = resumen_iqr(cuantil_desde_frecuencias(conteo, 0.25), cuantil_desde_frecuencias(conteo, 0.75))
+            fuera = (conteo.index < r["limite_inferior"]) | (conteo.index > r["limite_superior"])
+            r["outliers"] = int(conteo[fuera].sum())
+            resultados[var] = r
+        return resultados, total_filas
+    kernel = kernel_estadistico(df_maestro)
+    for var in variables:
+        resultados[var] = dict(kernel["outliers"][var])
+    return resultados, kernel["filas"]
+
+
+def sketches_por_variable(df_maestro, variables):
+    """Un SketchCuantiles por variable, construido en una sola pasada"""
+    sketches = {var: SketchCuantiles(semilla=0) for var in variables}
+    if isinstance(df_maestro, TablaPorBloques):
+        bloques = df_maestro.iterar(variables)
+    else:
+        bloques = [df_maestro[variables]]
+    total_filas = 0
+    for bloque in bloques:
+        total_filas += len(bloque)
+        for var in variables:
+            sketches[var].actualizar(bloque[var].to_numpy(dtype="float64", na_value=np.nan))
+    return sketches, total_filas
+
+
+def outliers_iqr_aproximados(df_maestro, variables):
+    """Límites IQR y conteo de outliers estimados con sketches KLL"""
+    sketches, total_filas = sketches_por_variable(df_maestro, variables)
+    resultados = {}
+    for var, sketch in sketches.items():
+        r = resumen_iqr(sketch.cuantil(0.25), sketch.cuantil(0.75))
+        r["outliers"] = sketch.contar_menores(r["limite_inferior"]) + sketch.contar_mayores(r["limite_superior"])
+        r["error_rango"] = sketch.error_rango()
+        resultados[var] = r
+    return resultados, total_filas
+
+# =====================================================
+# VALORES DISTINTOS (HYPERLOGLOG)
+# =====================================================
+# Contar valores distintos exactos exige guardar todos los valores (o
+# pares cliente-venta) vistos. Un HyperLogLog guarda solo 2^p registros de
+# un byte: cada valor se convierte en un hash de 64 bits, los primeros p
+# bits eligen el registro y el registro guarda la mayor posición del
+# primer 1 en el resto. Dos sketches de la misma precisión se combinan con
+# un máximo registro a registro, así que cada bloque o proceso arma el suyo.
+# Las compras por cliente en memoria siguen siendo exactas: metricas_clientes
+# ordena los pares cliente-venta en lugar de armar un conjunto por cliente.
+
+# "auto": exacto mientras los valores guardados no superen LIMITE_DISTINTOS_EXACTOS
+MODOS_DISTINTOS = ("auto", "exacto", "aproximado")
+
+# Precisión p (2^p registros; error estándar 1,04/√2^p) del informe de
+# cardinalidad y de las compras por cliente (un sketch por cliente)
+PRECISION_HLL = 14
+PRECISION_HLL_CLIENTES = 8
+
+# Valores distintos (o pares cliente-venta) que se guardan exactos en modo "auto"
+LIMITE_DISTINTOS_EXACTOS = 1_000_000
+
+# Columnas del informe de cardinalidad de la opción 7
+COLUMNAS_CARDINALIDAD = {
+    "ventas": "id_venta",
+    "clientes": "id_cliente",
+    "productos": "id_producto",
+    "emails": "email",
+}
+
+
+def modo_distintos(modo=None):
+    """Modo elegido (o AURELION_MODO_DISTINTOS); ValueError si no es uno de MODOS_DISTINTOS"""
+    modo = modo or os.environ.get("AURELION_MODO_DISTINTOS", "auto")
+    if modo not in MODOS_DISTINTOS:
+        raise ValueError(f"Modo de conteo de distintos desconocido '{modo}'. Usa uno de: {', '.join(MODOS_DISTINTOS)}.")
+    return modo
+
+
+def precision_hll(precision=None):
+    """Precisión del informe de cardinalidad (o AURELION_HLL_PRECISION), entre 4 y 18"""
+    precision = int(precision or os.environ.get("AURELION_HLL_PRECISION", PRECISION_HLL))
+    if not 4 <= precision <= 18:
+        raise ValueError(f"La precisión de HyperLogLog debe estar entre 4 y 18 (se pidió {precision})")
+    return precision
+
+
+def hash_valores(valores):
+    """
+    Hash de 64 bits de cada valor no nulo. El mismo valor da el mismo hash
+    en cualquier bloque o proceso, sea entero, flotante entero, texto o category.
+    """
+    serie = pd.Series(valores).dropna()
+    if serie.dtype.kind == "f" and np.all(np.mod(serie.to_numpy(), 1) == 0):
+        serie = serie.astype("int64")
+    elif pd.api.types.is_integer_dtype(serie.dtype) or pd.api.types.is_bool_dtype(serie.dtype):
+        serie = serie.astype("int64")
+    return pd.util.hash_pandas_object(serie, index=False).to_numpy()
+
+
+def posiciones_hll(hashes, precision):
+    """(registro, rango) de cada hash: los primeros `precision` bits y 1 + ceros iniciales del resto"""
+    indice = (hashes >> np.uint64(64 - precision)).astype(np.intp)
+    # El 1 agregado después del resto acota el rango a 64 - precision + 1
+    resto = (hashes << np.uint64(precision)) | np.uint64(1 << (precision - 1))
+    longitud = np.zeros(len(hashes), dtype=np.uint8)
+    for desplazamiento in (32, 16, 8, 4, 2, 1):
+        alto = resto >> np.uint64(desplazamiento)
+        mayor = alto != 0
+        longitud[mayor] += desplazamiento
+        resto = np.where(mayor, alto, resto)
+    return indice, (64 - longitud).astype(np.uint8)
+
+
+def sigma_hll(x):
+    """σ(x) = x + Σ x^(2^k)·2^(k-1) del estimador de Ertl (infinito en x = 1)"""
+    x = np.asarray(x, dtype="float64")
+    z, y, potencia = x.copy(), 1.0, x.copy()
+    for _ in range(64):
+        potencia = potencia * potencia
+        z += potencia * y
+        y += y
+    return np.where(x == 1, np.inf, z)
+
+
+def tau_hll(x):
+    """τ(x) = (1 - x - Σ (1 - x^(2^-k))²·2^-k) / 3 del estimador de Ertl"""
+    x = np.asarray(x, dtype="float64")
+    z, y, raiz = 1 - x, 1.0, x.copy()
+    for _ in range(64):
+        raiz = np.sqrt(raiz)
+        y *= 0.5
+        z -= (1 - raiz) ** 2 * y
+    return np.where((x == 0) | (x == 1), 0.0, z / 3)
+
+
+def estimar_hll(registros):
+    """
+    Estimación por fila de `registros` con el estimador mejorado de Ertl
+    (2017): usa el histograma de valores de los registros y no tiene sesgo
+    en todo el rango, sin tablas empíricas ni el cambio a linear counting
+    del HyperLogLog original.
+    """
+    registros = np.atleast_2d(registros)
+    filas, m = registros.shape
+    q = 64 - int(np.log2(m))
+    desplazados = registros.astype(np.intp) + (np.arange(filas, dtype=np.intp) * (q + 2))[:, None]
+    conteos = np.bincount(desplazados.ravel(), minlength=filas * (q + 2)).reshape(filas, q + 2)
+    z = m * tau_hll(1 - conteos[:, q + 1] / m)
+    for k in range(q, 0, -1):
+        z = 0.5 * (z + conteos[:, k])
+    z = z + m * sigma_hll(conteos[:, 0] / m)
+    with np.errstate(divide="ignore"):
+        estimacion = m * m / (2 * np.log(2)) / z
+    return estimacion if filas > 1 else estimacion[0]
+
+
+class SketchDistintos:
+    """
+    HyperLogLog (Flajolet, Fusy, Gandouet y Meunier, 2007) de una columna.
+    Error estándar relativo 1,04/√2^p: para p=14 (16 KB) son ±0,81 %.
+    """
+
+    def __init__(self, precision=PRECISION_HLL):
+        self.precision = precision
+        self.registros = np.zeros(1 << precision, dtype=np.uint8)
+
+    def error_estandar(self):
+        return 1.04 / np.sqrt(len(self.registros))
+
+    def actualizar(self, valores):
+        self.actualizar_hashes(hash_valores(valores))
+
+    def actualizar_hashes(self, hashes):
+        indice, rango = posiciones_hll(hashes, self.precision)
+        np.maximum.at(self.registros, indice, rango)
+
+    def combinar(self, otro):
+        if otro.precision != self.precision:
+            raise ValueError(f"No se combinan sketches de precisión {self.precision} y {otro.precision}")
+        np.maximum(self.registros, otro.registros, out=self.registros)
+
+    def estimar(self):
+        return float(estimar_hll(self.registros))
+
+
+class SketchDistintosPorGrupo:
+    """
+    Un HyperLogLog por clave de grupo (por ejemplo, ventas distintas de cada
+    cliente), en una matriz grupos × 2^p. Con p=8 cada grupo ocupa 256
+    bytes y el error estándar es ±6,5 %; con pocas compras por cliente
+    (muchos registros en cero) la estimación es casi exacta.
+    """
+
+    def __init__(self, precision=PRECISION_HLL_CLIENTES):
+        self.precision = precision
+        self.claves = np.empty(0, dtype=np.int64)
+        self.registros = np.zeros((0, 1 << precision), dtype=np.uint8)
+
+    def error_estandar(self):
+        return 1.04 / np.sqrt(self.registros.shape[1])
+
+    def actualizar(self, grupos, valores):
+        grupos = pd.Series(grupos).reset_index(drop=True)
+        valores = pd.Series(valores).reset_index(drop=True)
+        validos = (grupos.notna() & valores.notna()).to_numpy()
+        claves, codigos = np.unique(grupos[validos].to_numpy(dtype="int64"), return_inverse=True)
+        indice, rango = posiciones_hll(hash_valores(valores[validos]), self.precision)
+        registros = np.zeros((len(claves), 1 << self.precision), dtype=np.uint8)
+        np.maximum.at(registros.reshape(-1), codigos * registros.shape[1] + indice, rango)
+        self.combinar_registros(claves, registros)
+
+    def combinar_registros(self, claves, registros):
+        todas = np.union1d(self.claves, claves)
+        combinados = np.zeros((len(todas), registros.shape[1]), dtype=np.uint8)
+        combinados[np.searchsorted(todas, self.claves)] = self.registros
+        posiciones = np.searchsorted(todas, claves)
+        combinados[posiciones] = np.maximum(combinados[posiciones], registros)
+        self.claves, self.registros = todas, combinados
+
+    def combinar(self, otro):
+        if otro.precision != self.precision:
+            raise ValueError(f"No se combinan sketches de precisión {self.precision} y {otro.precision}")
+        self.combinar_registros(otro.claves, otro.registros)
+
+    def estimar(self):
+        """Distintos estimados por grupo, redondeados (Series indexada por clave)"""
+        estimacion = estimar_hll(self.registros) if len(self.claves) else np.empty(0)
+        return pd.Series(np.rint(np.atleast_1d(estimacion)).astype("int64"), index=self.claves)
+
+
+def hashes_distintos(hashes):
+    """Hashes distintos ordenados (ordenar y comparar vecinos es más rápido que np.unique en uint64)"""
+    ordenados = np.sort(hashes)
+    return ordenados[np.r_[True, ordenados[1:] != ordenados[:-1]]] if len(ordenados) else ordenados
+
+
+class ContadorDistintos:
+    """
+    Valores distintos de una columna recorrida por bloques. Guarda los
+    hashes distintos (exacto salvo colisiones de 64 bits, improbables por
+    debajo del límite) hasta `limite` valores y después pasa a un
+    SketchDistintos. Dos contadores se combinan aunque uno ya sea aproximado.
+    """
+
+    def __init__(self, modo="auto", precision=PRECISION_HLL, limite=LIMITE_DISTINTOS_EXACTOS):
+        self.modo = modo
+        self.limite = limite
+        self.precision = precision
+        self.hashes = np.empty(0, dtype=np.uint64)
+        # Hashes distintos de cada bloque aún sin unir: se unen cuando suman
+        # tantos como los ya unidos, así cada hash se ordena O(log n) veces
+        self.pendientes = []
+        self.cantidad_pendiente = 0
+        self.sketch = SketchDistintos(precision) if modo == "aproximado" else None
+
+    def actualizar(self, valores):
+        self.agregar_hashes(hash_valores(valores))
+
+    def agregar_hashes(self, hashes):
+        if self.sketch is not None:
+            self.sketch.actualizar_hashes(hashes)
+            return
+        unicos = hashes_distintos(hashes)
+        self.pendientes.append(unicos)
+        self.cantidad_pendiente += len(unicos)
+        if self.cantidad_pendiente >= max(len(self.hashes), 1 << 16):
+            self.consolidar()
+
+    def consolidar(self):
+        if self.pendientes:
+            self.hashes = hashes_distintos(np.concatenate([self.hashes] + self.pendientes))
+            self.pendientes, self.cantidad_pendiente = [], 0
+        if self.modo == "auto" and self.sketch is None and len(self.hashes) > self.limite:
+            self.pasar_a_sketch()
+
+    def pasar_a_sketch(self):
+        self.sketch = SketchDistintos(self.precision)
+        for hashes in [self.hashes] + self.pendientes:
+            self.sketch.actualizar_hashes(hashes)
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.pendientes, self.cantidad_pendiente = [], 0
+
+    def combinar(self, otro):
+        if otro.sketch is not None:
+            if self.sketch is None:
+                self.pasar_a_sketch()
+            self.sketch.combinar(otro.sketch)
+        else:
+            for hashes in [otro.hashes] + otro.pendientes:
+                self.agregar_hashes(hashes)
+
+    def es_exacto(self):
+        self.consolidar()
+        return self.sketch is None
+
+    def estimar(self):
+        self.consolidar()
+        return len(self.hashes) if self.sketch is None else int(round(self.sketch.estimar()))
+
+
+def mostrar_cardinalidades(cardinalidad):
+    print("\n✅ Cardinalidad (valores distintos):")
+    for nombre, fila in cardinalidad.iterrows():
+        error = f" ±{fila['error_estandar']*100:.2f}% (error estándar)" if fila["error_estandar"] > 0 else ""
+        print(f"   - {nombre:<10} ({fila['columna']}): {fila['distintos']:,} [{fila['metodo']}]{error}")
+
+
+def cardinalidades(df_maestro, modo=None, precision=None):
+    """
+    Valores distintos de cada columna de COLUMNAS_CARDINALIDAD presente en
+    la tabla, con el método usado y su error estándar relativo. En memoria
+    con pocas filas se usa nunique; con muchas (o en modo "aproximado"), un
+    SketchDistintos por columna. Por bloques se usa un ContadorDistintos.
+    DuckDB cuenta siempre exacto con count(DISTINCT), que puede usar disco:
+    su approx_count_distinct no informa la precisión.
+    """
+    modo = modo_distintos(modo)
+    precision = precision_hll(precision)
+    if isinstance(df_maestro, TablaSQL):
+        disponibles = {n: c for n, c in COLUMNAS_CARDINALIDAD.items() if c in df_maestro.tipos()}
+    elif isinstance(df_maestro, TablaPorBloques):
+        disponibles = dict(COLUMNAS_CARDINALIDAD)
+    else:
+        disponibles = {n: c for n, c in COLUMNAS_CARDINALIDAD.items() if c in df_maestro.columns}
     
-    print("\n✅ Información sobre tipos de datos:")
-    print(df_maestro.info())
+    def fila(nombre, distintos, exacto):
+        return {
+            "columna": disponibles[nombre],
+            "distintos": int(distintos),
+            "metodo": "exacto" if exacto else f"HyperLogLog p={precision}",
+            "error_estandar": 0.0 if exacto else 1.04 / np.sqrt(1 << precision),
+        }
+    
+    filas = {}
+    if isinstance(df_maestro, TablaSQL) and disponibles:
+        resultado = df_maestro.consultar(", ".join(
+            f"count(DISTINCT {identificador_sql(c)}) AS {identificador_sql(n)}" for n, c in disponibles.items()
+        )).iloc[0]
+        for nombre in disponibles:
+            filas[nombre] = fila(nombre, resultado[nombre], True)
+    elif isinstance(df_maestro, TablaPorBloques):
+        contadores = {n: ContadorDistintos(modo, precision) for n in disponibles}
+        leidas = set()
+        for bloque in df_maestro.iterar(list(disponibles.values())):
+            for nombre, columna in disponibles.items():
+                if columna in bloque.columns:
+                    leidas.add(nombre)
+                    contadores[nombre].actualizar(bloque[columna])
+        for nombre, contador in contadores.items():
+            if nombre in leidas:
+                filas[nombre] = fila(nombre, contador.estimar(), contador.es_exacto())
+    else:
+        exacto = modo == "exacto" or (modo == "auto" and len(df_maestro) <= LIMITE_DISTINTOS_EXACTOS)
+        for nombre, columna in disponibles.items():
+            if exacto:
+                filas[nombre] = fila(nombre, df_maestro[columna].nunique(), True)
+                continue
+            sketch = SketchDistintos(precision)
+            for inicio in range(0, len(df_maestro), TAMANO_BLOQUE_DEFECTO):
+                sketch.actualizar(df_maestro[columna].iloc[inicio:inicio + TAMANO_BLOQUE_DEFECTO])
+            filas[nombre] = fila(nombre, round(sketch.estimar()), False)
+    return pd.DataFrame.from_dict(filas, orient="index")
+
+
+# =====================================================
+# CALIDAD DE DATOS (REGLAS VECTORIZADAS)
+# =====================================================
+# Reglas declarativas que se evalúan como máscaras booleanas de numpy, todas
+# sobre el mismo bloque en una sola pasada: sobre df_maestro completo al
+# cargarlo o bloque a bloque sobre tabla_unificada en disco. Cada regla
+# marca las filas que la violan; los nulos solo los informan las reglas
+# "no_nulo" (el resto ignora las filas con sus columnas vacías). Las reglas
+# cuyas columnas no se cargaron se omiten.
+
+REGLAS_CALIDAD = [
+    {"nombre": "claves_no_nulas", "tipo": "no_nulo", "columnas": ["id_venta", "id_producto", "id_cliente", "fecha"],
+     "descripcion": "id_venta, id_producto, id_cliente y fecha presentes"},
+    {"nombre": "importe_no_nulo", "tipo": "no_nulo", "columnas": ["importe"],
+     "descripcion": "importe presente"},
+    {"nombre": "cantidad_positiva", "tipo": "rango", "columna": "cantidad", "minimo": 1,
+     "descripcion": "cantidad ≥ 1"},
+    {"nombre": "precio_positivo", "tipo": "rango", "columna": "precio_unitario", "minimo": 1,
+     "descripcion": "precio_unitario ≥ 1"},
+    {"nombre": "importe_calculado", "tipo": "producto", "columna": "importe",
+     "factores": ["cantidad", "precio_unitario"], "tolerancia": 0.01,
+     "descripcion": "importe = cantidad × precio_unitario (±0,01)"},
+    {"nombre": "precio_de_catalogo", "tipo": "iguales", "columnas": ["precio_unitario", "precio_unitario_producto"],
+     "descripcion": "precio_unitario igual al de productos.xlsx"},
+    {"nombre": "producto_existente", "tipo": "referencia", "clave": "id_producto",
+     "columnas": ["categoria_corregida", "precio_unitario_producto"],
+     "descripcion": "id_producto existe en productos.xlsx"},
+    {"nombre": "venta_existente", "tipo": "referencia", "clave": "id_venta", "columnas": ["fecha", "medio_pago"],
+     "descripcion": "id_venta existe en ventas.xlsx"},
+    {"nombre": "cliente_existente", "tipo": "referencia", "clave": "id_cliente",
+     "columnas": ["nombre_cliente", "email", "ciudad"],
+     "descripcion": "id_cliente existe en clientes.xlsx"},
+    {"nombre": "email_valido", "tipo": "formato", "columna": "email", "patron": r"[^@\s]+@[^@\s]+\.[A-Za-z]{2,}",
+     "descripcion": "email con formato usuario@dominio.ext"},
+    {"nombre": "medio_pago_conocido", "tipo": "valores", "columna": "medio_pago",
+     "valores": ["efectivo", "tarjeta", "qr", "transferencia"],
+     "descripcion": "medio_pago es efectivo, tarjeta, qr o transferencia"},
+    {"nombre": "alta_antes_de_compra", "tipo": "orden", "menor": "fecha_alta", "mayor": "fecha",
+     "descripcion": "fecha_alta del cliente ≤ fecha de la venta"},
+]
+
+# id_venta de ejemplo que se guardan por regla
+EJEMPLOS_CALIDAD = 5
+
+
+def validacion_activada():
+    """AURELION_CALIDAD=0 apaga la validación al cargar (la opción 7 y `calidad` la hacen igual)"""
+    return os.environ.get("AURELION_CALIDAD", "1") != "0"
+
+
+def columnas_regla(regla):
+    if regla["tipo"] in ("no_nulo", "iguales"):
+        return list(regla["columnas"])
+    if regla["tipo"] == "producto":
+        return [regla["columna"]] + regla["factores"]
+    if regla["tipo"] == "referencia":
+        return [regla["clave"]] + regla["columnas"]
+    if regla["tipo"] == "orden":
+        return [regla["menor"], regla["mayor"]]
+    return [regla["columna"]]
+
+
+def reglas_aplicables(columnas, reglas=None):
+    """Reglas cuyas columnas están todas en `columnas`"""
+    return [r for r in reglas or REGLAS_CALIDAD if all(c in columnas for c in columnas_regla(r))]
+
+
+def numeros(serie):
+    """
+    Valores de la serie como arreglo de numpy: sin copiar si ya es numérica
+    de numpy; los enteros con nulos (Int32, Int16...) pasan a float64 con NaN.
+    """
+    if serie.dtype.kind in "iuf" and isinstance(serie.dtype, np.dtype):
+        return serie.to_numpy()
+    return serie.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def presentes(valores):
+    """Máscara de valores no nulos de un arreglo de numeros() o fechas()"""
+    if valores.dtype.kind in "fmM":
+        return ~np.isnan(valores)
+    return np.ones(len(valores), dtype=bool)
+
+
+def fechas(serie):
+    if serie.dtype.kind == "M":
+        return serie.to_numpy()
+    return pd.to_datetime(serie, errors="coerce").to_numpy()
+
+
+def mascara_textos(serie, condicion):
+    """
+    Filas no nulas cuyo texto NO cumple `condicion` (función sobre un Index
+    de textos). En una category se evalúa una vez por categoría.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        malas = ~np.asarray(condicion(serie.cat.categories.astype(str)), dtype=bool)
+        codigos = serie.cat.codes.to_numpy()
+        return (codigos >= 0) & malas[np.maximum(codigos, 0)]
+    presentes = serie.notna().to_numpy()
+    malas = np.zeros(len(serie), dtype=bool)
+    malas[presentes] = ~np.asarray(condicion(pd.Index(serie[presentes].astype(str))), dtype=bool)
+    return malas
+
+
+def mascara_regla(bloque, regla):
+    """Máscara booleana (numpy) de las filas de `bloque` que violan `regla`"""
+    tipo = regla["tipo"]
+    if tipo == "no_nulo":
+        return np.logical_or.reduce([bloque[c].isna().to_numpy() for c in regla["columnas"]])
+    if tipo == "rango":
+        valores = numeros(bloque[regla["columna"]])
+        mascara = np.zeros(len(bloque), dtype=bool)
+        if "minimo" in regla:
+            mascara |= valores < regla["minimo"]
+        if "maximo" in regla:
+            mascara |= valores > regla["maximo"]
+        return mascara
+    if tipo == "producto":
+        esperado = np.ones(len(bloque))
+        for columna in regla["factores"]:
+            esperado *= numeros(bloque[columna])
+        with np.errstate(invalid="ignore"):
+            return np.abs(numeros(bloque[regla["columna"]]) - esperado) > regla["tolerancia"]
+    if tipo == "iguales":
+        primera, *resto = [numeros(bloque[c]) for c in regla["columnas"]]
+        return np.logical_or.reduce([(primera != otra) & presentes(primera) & presentes(otra) for otra in resto])
+    if tipo == "referencia":
+        huerfanas = np.logical_and.reduce([bloque[c].isna().to_numpy() for c in regla["columnas"]])
+        return bloque[regla["clave"]].notna().to_numpy() & huerfanas
+    if tipo == "formato":
+        return mascara_textos(bloque[regla["columna"]], lambda textos: textos.str.fullmatch(regla["patron"]))
+    if tipo == "valores":
+        return mascara_textos(bloque[regla["columna"]], lambda textos: textos.isin(regla["valores"]))
+    if tipo == "orden":
+        return fechas(bloque[regla["menor"]]) > fechas(bloque[regla["mayor"]])
+    raise ValueError(f"Tipo de regla desconocido: {tipo}")
+
+
+class AcumuladorCalidad:
+    """
+    Violaciones de cada regla acumuladas bloque a bloque: cantidad de filas
+    y los primeros EJEMPLOS_CALIDAD id_venta (o posiciones, sin id_venta).
+    """
+
+    def __init__(self, reglas, ejemplos=EJEMPLOS_CALIDAD):
+        self.reglas = reglas
+        self.max_ejemplos = ejemplos
+        self.filas = 0
+        self.violaciones = {r["nombre"]: 0 for r in reglas}
+        self.ejemplos = {r["nombre"]: [] for r in reglas}
+
+    def agregar(self, bloque):
+        ids = bloque["id_venta"].to_numpy() if "id_venta" in bloque.columns else None
+        for regla in self.reglas:
+            mascara = mascara_regla(bloque, regla)
+            cantidad = int(np.count_nonzero(mascara))
+            if not cantidad:
+                continue
+            nombre = regla["nombre"]
+            self.violaciones[nombre] += cantidad
+            faltan = self.max_ejemplos - len(self.ejemplos[nombre])
+            if faltan > 0:
+                posiciones = np.flatnonzero(mascara)[:faltan]
+                self.ejemplos[nombre] += (ids[posiciones] if ids is not None else posiciones + self.filas).tolist()
+        self.filas += len(bloque)
+
+    def resultado(self):
+        """DataFrame indexado por regla: descripción, violaciones, % de filas y ejemplos"""
+        return pd.DataFrame({
+            "descripcion": [r["descripcion"] for r in self.reglas],
+            "violaciones": [self.violaciones[r["nombre"]] for r in self.reglas],
+            "porcentaje": [round(self.violaciones[r["nombre"]] / max(self.filas, 1) * 100, 3) for r in self.reglas],
+            "ejemplos_id_venta": [", ".join(str(i) for i in self.ejemplos[r["nombre"]]) for r in self.reglas],
+        }, index=pd.Index([r["nombre"] for r in self.reglas], name="regla"))
+
+
+def calidad_por_bloques(tabla, reglas=None):
+    """Todas las reglas en una sola pasada por bloques, leyendo solo sus columnas"""
+    reglas = reglas or REGLAS_CALIDAD
+    columnas = list(dict.fromkeys(c for r in reglas for c in columnas_regla(r) + ["id_venta"]))
+    acumulador = None
+    for bloque in tabla.iterar(columnas):
+        if acumulador is None:
+            acumulador = AcumuladorCalidad(reglas_aplicables(bloque.columns, reglas))
+        acumulador.agregar(bloque)
+    return acumulador.resultado() if acumulador is not None else AcumuladorCalidad([]).resultado()
+
 
-def medios_pago_conteo_porcentaje(df_maestro):
-    """Opción 9: Medios de pago - conteo y porcentaje"""
-    print("\n" + "="*60)
-    print("💳 MEDIOS DE PAGO: CONTEO Y PORCENTAJE")
-    print("="*60)
-    
-    if df_maestro is None or df_maestro.empty:
-        print("❌ Error: No hay datos cargados. Ejecuta la opción 6 primero.")
-        return
-    
-    print("\n✅ Conteo de medios de pago:")
-    conteo = df_maestro["medio_pago"].value_counts()
-    print(conteo)
-    
-    print("\n✅ Porcentaje de participación:")
-    porcentaje = (df_maestro["medio_pago"].value_counts(normalize=True) * 100).round(2)
-    print(porcentaje)
+def calidad_datos(df_maestro, reglas=None):
+    """Reporte de calidad de df_maestro (o de una tabla por bloques), memoizado por huella"""
+    if isinstance(df_maestro, TablaSQL):
+        # DuckDB no tiene las máscaras: se recorren las mismas fuentes por bloques
+        df_maestro = TablaPorBloques(df_maestro.database_dir, filtro=df_maestro.filtro)
+    if isinstance(df_maestro, TablaPorBloques):
+        return memoizar(df_maestro, "calidad_datos", lambda: calidad_por_bloques(df_maestro, reglas))
     
-    # Tabla combinada
-    resumen_medios = pd.DataFrame({
-        "Frecuencia": conteo,
-        "Porcentaje (%)": porcentaje
-    })
-    print("\n✅ Resumen combinado:")
-    print(resumen_medios)
+    def calcular():
+        with medir_etapa("validar_calidad", len(df_maestro)) as span:
+            acumulador = AcumuladorCalidad(reglas_aplicables(df_maestro.columns, reglas))
+            acumulador.agregar(df_maestro)
+            span["reglas"] = len(acumulador.reglas)
+            span["violaciones"] = sum(acumulador.violaciones.values())
+        return acumulador.resultado()
+    return memoizar(df_maestro, "calidad_datos", calcular)
 
-def matriz_correlaciones(df_maestro):
-    """Opción 10: Matriz de correlaciones"""
-    print("\n" + "="*60)
-    print("📊 MATRIZ DE CORRELACIONES")
-    print("="*60)
-    
-    if df_maestro is None or df_maestro.empty:
-        print("❌ Error: No hay datos cargados. Ejecuta la opción 6 primero.")
+
+def mostrar_calidad(reporte, solo_violaciones=False):
+    """Imprime el reporte de calidad; con `solo_violaciones` resume las reglas que se cumplen"""
+    violadas = reporte[reporte["violaciones"] > 0]
+    if not len(reporte):
+        print("\n⚠️ Calidad de datos: ninguna regla aplica a las columnas cargadas.")
         return
-    
-    # Seleccionar solo columnas numéricas
-    cols_numericas = ["cantidad", "precio_unitario", "importe"]
-    
-    # Verificar que las columnas existan
-    cols_disponibles = [col for col in cols_numericas if col in df_maestro.columns]
-    
-    if not cols_disponibles:
-        print("❌ Error: No se encontraron columnas numéricas esperadas.")
+    if solo_violaciones and not len(violadas):
+        print(f"🧪 Calidad de datos: {len(reporte)} reglas sin violaciones")
         return
-    
-    print("\n✅ Matriz de Correlación (Pearson):")
-    corr_matrix = df_maestro[cols_disponibles].corr(method="pearson")
-    print(corr_matrix.round(2))
-    
-    # Visualizar con heatmap
-    print("\n✅ Generando heatmap de correlaciones...")
-    plt.figure(figsize=(6, 4))
-    sns.heatmap(corr_matrix, annot=True, cmap="coolwarm", fmt=".2f", linewidths=0.5)
-    plt.title("Mapa de Calor – Correlación entre Variables Numéricas", fontsize=13, weight="bold")
-    plt.tight_layout()
-    plt.show()
+    print(f"\n🧪 Calidad de datos: {len(violadas)} de {len(reporte)} reglas con violaciones")
+    for regla, fila in (violadas if solo_violaciones else reporte).iterrows():
+        if fila["violaciones"]:
+            print(f"   ⚠️ {regla:<22} {fila['violaciones']:>10,} filas ({fila['porcentaje']:.3f}%)  "
+                  f"{fila['descripcion']}")
+            print(f"      id_venta de ejemplo: {fila['ejemplos_id_venta']}")
+        else:
+            print(f"   ✅ {regla:<22} {0:>10,} filas ({0:.3f}%)  {fila['descripcion']}")
 
-def deteccion_outliers(df_maestro):
-    """Opción 11: Detección de outliers (IQR)"""
-    print("\n" + "="*60)
-    print("🎯 DETECCIÓN DE OUTLIERS (MÉTODO IQR)")
-    print("="*60)
-    
-    if df_maestro is None or df_maestro.empty:
-        print("❌ Error: No hay datos cargados. Ejecuta la opción 6 primero.")
-        return
-    
-    variables_numericas = ["cantidad", "precio_unitario", "importe"]
-    
-    print("\n✅ Análisis de outliers por variable:\n")
-    
-    for var in variables_numericas:
-        Q1 = df_maestro[var].quantile(0.25)
-        Q3 = df_maestro[var].quantile(0.75)
-        IQR = Q3 - Q1
-        limite_inferior = Q1 - 1.5 * IQR
-        limite_superior = Q3 + 1.5 * IQR
-        
-        outliers = df_maestro[(df_maestro[var] < limite_inferior) | (df_maestro[var] > limite_superior)]
-        cantidad_outliers = outliers.shape[0]
-        
-        print(f"📍 Variable: {var}")
-        print(f"   - Rango Intercuartílico (IQR): {IQR:.2f}")
-        print(f"   - Límite inferior: {limite_inferior:.2f}")
-        print(f"   - Límite superior: {limite_superior:.2f}")
-        print(f"   - Outliers detectados: {cantidad_outliers} registros ({(cantidad_outliers/len(df_maestro)*100):.2f}%)")
-        print()
 
-def grafico_frecuencia_medios_pago(df_maestro):
-    """Opción 12: Gráfico - Frecuencia de medios de pago"""
-    print("\n" + "="*60)
-    print("📊 GRÁFICO: FRECUENCIA DE MEDIOS DE PAGO")
-    print("="*60)
-    
-    if df_maestro is None or df_maestro.empty:
-        print("❌ Error: No hay datos cargados. Ejecuta la opción 6 primero.")
+def validar_al_cargar(df_maestro):
+    """Validación de la opción 6 sobre la tabla ya cargada (no se detiene si falla)"""
+    if not validacion_activada():
         return
-    
-    conteo = df_maestro["medio_pago"].value_counts()
-    
-    plt.figure(figsize=(8, 5))
-    sns.barplot(x=conteo.index, y=conteo.values, palette="crest")
-    plt.title("Distribución de Medios de Pago", fontsize=13, weight="bold")
-    plt.xlabel("Medio de Pago")
-    plt.ylabel("Cantidad de Operaciones")
-    plt.grid(axis="y", linestyle="--", alpha=0.5)
-    plt.tight_layout()
-    plt.show()
+    try:
+        mostrar_calidad(calidad_datos(df_maestro), solo_violaciones=True)
+    except Exception as e:
+        print(f"⚠️ No se pudo validar la calidad de los datos: {e}")
 
-def grafico_distribucion_importe(df_maestro):
-    """Opción 13: Gráfico - Distribución de importe"""
-    print("\n" + "="*60)
-    print("📊 GRÁFICO: DISTRIBUCIÓN DE IMPORTE")
-    print("="*60)
-    
-    if df_maestro is None or df_maestro.empty:
-        print("❌ Error: No hay datos cargados. Ejecuta la opción 6 primero.")
-        return
+
+def revisar_calidad(salida=None):
+    """
+    Subcomando `calidad`: todas las reglas sobre la tabla (en memoria, por
+    bloques con AURELION_STREAMING=1 o con AURELION_BACKEND=duckdb). Con
+    `salida` guarda el reporte en CSV. Devuelve 1 si alguna regla tiene
+    violaciones y 0 si no.
+    """
+    import io
     
-    plt.figure(figsize=(10, 5))
-    sns.histplot(df_maestro["importe"], kde=True, bins=30)
-    plt.title("Distribución del Importe", fontsize=13, weight="bold")
-    plt.xlabel("Importe ($)")
-    plt.ylabel("Frecuencia")
-    plt.grid(axis="y", linestyle="--", alpha=0.5)
-    plt.tight_layout()
-    plt.show()
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_maestro = abrir_tabla(None, filtro=FiltroTabla.desde_entorno())
+    if df_maestro is None:
+        print("❌ No se pudieron cargar los datos.")
+        return 1
+    inicio = time.perf_counter()
+    reporte = calidad_datos(df_maestro)
+    mostrar_calidad(reporte)
+    print(f"\n⏱️ {len(reporte)} reglas evaluadas en {time.perf_counter() - inicio:.2f} s")
+    if salida:
+        os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+        reporte.to_csv(salida)
+        print(f"💾 Reporte de calidad guardado en: {salida}")
+    return 1 if (reporte["violaciones"] > 0).any() else 0
 
-def grafico_boxplot_importe_medio_pago(df_maestro):
-    """Opción 14: Gráfico - Boxplot de importe por medio de pago"""
+# =====================================================
+# BACKEND SQL (DUCKDB)
+# =====================================================
+# Con AURELION_BACKEND=duckdb la opción 6 no carga la tabla: las opciones
+# 8 a 11 y analisis_clientes se resuelven con consultas de DuckDB (motor
+# embebido, vectorizado y multihilo) directo sobre las partes Parquet de la
+# caché columnar o, si no está vigente, sobre tabla_unificada.csv.
+
+# Backends de análisis disponibles (AURELION_BACKEND)
+BACKENDS = ("pandas", "duckdb")
+
+# Opciones del menú que funcionan sobre una TablaSQL
+OPCIONES_SQL = {8, 9, 10, 11}
+
+# Tolerancia relativa al comparar los resultados de ambos backends
+TOLERANCIA_BACKENDS = 1e-7
+
+
+def duckdb_disponible():
+    return importlib.util.find_spec("duckdb") is not None
+
+
+def literal_sql(texto):
+    return "'" + str(texto).replace("'", "''") + "'"
+
+
+def identificador_sql(nombre):
+    return '"' + str(nombre).replace('"', '""') + '"'
+
+
+class TablaSQL:
+    """
+    Referencia a la tabla unificada en disco consultada con DuckDB. Con
+    filtro, desde la caché solo se leen las particiones de su rango de
+    fechas y el resto de la condición va en el WHERE de cada consulta.
+    """
+    def __init__(self, database_dir=None, filtro=None):
+        self.database_dir = database_dir or obtener_directorio_database()
+        self.csv_path = os.path.join(self.database_dir, "tabla_unificada.csv")
+        self.filtro = filtro
+        self.conexion = None
+        self._tipos = None
+        self._metadatos = None
+        self._validada = False
+
+    def metadatos_cache(self):
+        """Metadatos de la caché columnar vigente (None: se consulta el CSV), validados una vez por tabla"""
+        if not self._validada:
+            self._metadatos = leer_metadatos_cache(self.database_dir, AVISO_CACHE_SOLO_LECTURA)
+            self._validada = True
+        return self._metadatos
+
+    @property
+    def empty(self):
+        """True si ninguna fila cumple el filtro (la consulta se corta en la primera)"""
+        return self.consultar("1", limite=1).empty
+
+    def origen(self):
+        """Expresión FROM de DuckDB: las partes Parquet vigentes o el CSV"""
+        if self.metadatos_cache() is not None:
+            datos_dir, _ = rutas_cache_columnar(self.database_dir)
+            seleccionadas, todas = archivos_cache(datos_dir, self.filtro)
+            if todas:
+                # Sin particiones en el rango alcanza con una parte: el WHERE descarta todas sus filas
+                partes = ", ".join(literal_sql(r) for r in (seleccionadas or todas[:1]))
+                return f"read_parquet([{partes}], hive_partitioning = false)"
+        return f"read_csv({literal_sql(self.csv_path)}, header = true)"
+
+    def ejecutar(self, sql, parametros=()):
+        if self.conexion is None:
+            self.conexion = duckdb.connect()
+        return self.conexion.execute(sql, list(parametros))
+
+    def consultar(self, select, agrupar=None, ordenar=None, donde=None, limite=None, parametros=()):
+        """
+        DataFrame con `SELECT select FROM tabla [WHERE filtro AND donde]
+        [GROUP BY] [ORDER BY] [LIMIT]`; `parametros` son los `?` de `select`.
+        """
+        sql = f"SELECT {select} FROM {self.origen()}"
+        parametros = list(parametros)
+        condiciones = [donde] if donde else []
+        if self.filtro is not None:
+            condicion, parametros_filtro = self.filtro.condicion_sql()
+            condiciones.insert(0, condicion)
+            parametros += parametros_filtro
+        if condiciones:
+            sql += " WHERE " + " AND ".join(f"({c})" for c in condiciones)
+        if agrupar:
+            sql += f" GROUP BY {agrupar}"
+        if ordenar:
+            sql += f" ORDER BY {ordenar}"
+        if limite is not None:
+            sql += f" LIMIT {int(limite)}"
+        with medir_etapa("consulta_sql", sql=sql) as span:
+            resultado = self.ejecutar(sql, parametros).df()
+            span["filas_salida"] = len(resultado)
+        return resultado
+
+    def tipos(self):
+        """{columna: tipo de DuckDB} de la tabla"""
+        if self._tipos is None:
+            filas = self.ejecutar(f"DESCRIBE SELECT * FROM {self.origen()}").fetchall()
+            self._tipos = {fila[0]: fila[1] for fila in filas}
+        return self._tipos
+
+    @property
+    def columns(self):
+        return list(self.tipos())
+
+
+def abrir_tabla_sql(filtro=None):
+    """Opción 6 con el backend DuckDB: no carga datos, solo valida que haya una fuente"""
     print("\n" + "="*60)
-    print("📊 GRÁFICO: BOXPLOT DE IMPORTE POR MEDIO DE PAGO")
+    print("🦆 ABRIR TABLA UNIFICADA CON EL BACKEND SQL (DUCKDB)")
     print("="*60)
-    
-    if df_maestro is None or df_maestro.empty:
-        print("❌ Error: No hay datos cargados. Ejecuta la opción 6 primero.")
-        return
-    
-    plt.figure(figsize=(10, 5))
-    sns.boxplot(data=df_maestro, x="medio_pago", y="importe", palette="Set2")
-    plt.title("Distribución del Importe por Medio de Pago", fontsize=13, weight="bold")
-    plt.xlabel("Medio de Pago")
-    plt.ylabel("Importe ($)")
-    plt.grid(axis="y", linestyle="--", alpha=0.5)
-    plt.tight_layout()
-    plt.show()
+    if not duckdb_disponible():
+        print("❌ Error: duckdb no está instalado (pip install duckdb). Usa AURELION_BACKEND=pandas.")
+        return None
+    tabla = TablaSQL(filtro=filtro)
+    if tabla.metadatos_cache() is None:
+        if not os.path.exists(tabla.csv_path):
+            print(f"❌ Error: No existe {tabla.csv_path}. Usa AURELION_BACKEND=pandas y ejecuta la opción 6 para generarla.")
+            return None
+        if verificar_registro_csv(tabla.csv_path) is None:
+            print("❌ Error: tabla_unificada.csv no coincide con su registro. Usa AURELION_BACKEND=pandas y "
+                  "ejecuta la opción 6 para reconstruirla.")
+            return None
+    origen = "caché columnar (Parquet)" if tabla.metadatos_cache() is not None else "tabla_unificada.csv"
+    print(f"✅ Consultas sobre {origen}")
+    if filtro is not None:
+        print(f"   🔎 Filtro: {filtro.descripcion()}")
+    print(f"   Opciones disponibles con este backend: {sorted(OPCIONES_SQL)}")
+    return tabla
+
+
+def columnas_sql(tabla, tipo):
+    """Columnas numéricas (`tipo`="numero") o de fecha ("fecha") de una TablaSQL"""
+    numericos = ("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "FLOAT", "DOUBLE", "DECIMAL")
+    if tipo == "numero":
+        return [c for c, t in tabla.tipos().items() if t.startswith(numericos) and "UNSIGNED" not in t]
+    return [c for c, t in tabla.tipos().items() if t.startswith(("DATE", "TIMESTAMP"))]
+
+
+def describir_sql(tabla):
+    """describe() de pandas en una sola consulta (cuantiles lineales, como pandas)"""
+    numericas = columnas_sql(tabla, "numero")
+    fechas = columnas_sql(tabla, "fecha")
+    estadisticos = {"count": "count({})", "mean": "avg({})", "std": "stddev_samp({})", "min": "min({})",
+                    "25%": "quantile_cont({}, 0.25)", "50%": "quantile_cont({}, 0.5)",
+                    "75%": "quantile_cont({}, 0.75)", "max": "max({})"}
+    expresiones = []
+    for c in numericas:
+        valor = f"CAST({identificador_sql(c)} AS DOUBLE)"
+        expresiones += [f"{e.format(valor)} AS {identificador_sql(c + '|' + n)}" for n, e in estadisticos.items()]
+    # Las fechas se resumen sobre nanosegundos (enteros), igual que pandas
+    for c in fechas:
+        valor = f"epoch_ns({identificador_sql(c)})"
+        expresiones += [f"{e.format(valor)} AS {identificador_sql(c + '|' + n)}"
+                        for n, e in estadisticos.items() if n != "std"]
+    fila = tabla.consultar(", ".join(expresiones)).iloc[0]
+    descripcion = pd.DataFrame({c: [fila[f"{c}|{n}"] for n in estadisticos] for c in numericas},
+                               index=list(estadisticos), dtype="float64")
+    if not fechas:
+        return descripcion
+    descripcion_fechas = pd.DataFrame({
+        c: {n: fila[f"{c}|{n}"] if n == "count" else pd.to_datetime(fila[f"{c}|{n}"], unit="ns")
+            for n in estadisticos if n != "std"}
+        for c in fechas
+    })
+    return combinar_descripcion_fechas(descripcion, descripcion_fechas, tabla.columns)
+
+
+def conteo_valores_sql(tabla, columna):
+    conteo = tabla.consultar(f"{identificador_sql(columna)}, count(*) AS n", agrupar="1", ordenar="n DESC, 1")
+    conteo = conteo.dropna(subset=[columna])
+    return pd.Series(conteo["n"].to_numpy(), index=pd.Index(conteo[columna], name=columna), name="count")
+
+
+def correlacion_sql(tabla, columnas):
+    """Pearson por pares de filas completas, como DataFrame.corr()"""
+    pares = [(a, b) for i, a in enumerate(columnas) for b in columnas[i + 1:]]
+    corr = pd.DataFrame(np.eye(len(columnas)), index=columnas, columns=columnas)
+    if pares:
+        fila = tabla.consultar(", ".join(
+            f"corr({identificador_sql(a)}, {identificador_sql(b)}) AS {identificador_sql(a + '|' + b)}" for a, b in pares
+        )).iloc[0]
+        for a, b in pares:
+            corr.loc[a, b] = corr.loc[b, a] = fila[f"{a}|{b}"]
+    return corr
+
+
+def outliers_iqr_sql(tabla, variables):
+    """Límites IQR con cuantiles exactos y conteo de outliers: dos consultas en total"""
+    fila = tabla.consultar(", ".join(
+        f"quantile_cont({identificador_sql(v)}, 0.25) AS {identificador_sql(v + '|Q1')}, "
+        f"quantile_cont({identificador_sql(v)}, 0.75) AS {identificador_sql(v + '|Q3')}" for v in variables
+    ) + ", count(*) AS filas").iloc[0]
+    resultados = {v: resumen_iqr(float(fila[f"{v}|Q1"]), float(fila[f"{v}|Q3"])) for v in variables}
+    # Sin valores no nulos los límites son NaN y, como en pandas, no hay outliers
+    con_limites = [v for v, r in resultados.items() if not np.isnan(r["IQR"])]
+    for v in resultados:
+        resultados[v]["outliers"] = 0
+    if con_limites:
+        parametros = []
+        for v in con_limites:
+            parametros += [resultados[v]["limite_inferior"], resultados[v]["limite_superior"]]
+        conteos = tabla.consultar(", ".join(
+            f"count_if({identificador_sql(v)} < ? OR {identificador_sql(v)} > ?) AS {identificador_sql(v)}"
+            for v in con_limites
+        ), parametros=parametros).iloc[0]
+        for v in con_limites:
+            resultados[v]["outliers"] = int(conteos[v])
+    return resultados, int(fila["filas"])
+
+
+def metricas_clientes_sql(tabla):
+    """
+    Misma tabla que metricas_clientes. Nombre y ciudad vienen de la
+    dimensión clientes (iguales en todas las filas del cliente), así que el
+    primero no nulo es cualquiera de ellos.
+    """
+    return tabla.consultar(
+        "id_cliente, any_value(nombre_cliente) AS nombre_cliente, any_value(ciudad) AS ciudad, "
+        "count(DISTINCT id_venta) AS compras, coalesce(sum(importe), 0) AS total_gastado, "
+        "avg(importe) AS ticket_promedio_cliente, max(fecha) AS fecha_ultima_compra",
+        agrupar="id_cliente", ordenar="id_cliente", donde="id_cliente IS NOT NULL",
+    )
+
+
+def valor_comparable(valor):
+    """Fechas a nanosegundos y números a float, para comparar resultados de ambos backends"""
+    if isinstance(valor, pd.Timestamp):
+        return float(valor.value)
+    if isinstance(valor, (int, float, np.number)) and not isinstance(valor, bool):
+        return float(valor)
+    return valor
+
+
+def diferencias_resultados(esperado, obtenido, tolerancia=TOLERANCIA_BACKENDS):
+    """Lista de diferencias entre dos tablas de resultados (vacía si coinciden)"""
+    esperado, obtenido = pd.DataFrame(esperado), pd.DataFrame(obtenido)
+    # Las categorías sin filas (value_counts de pandas) no existen para SQL
+    if "Frecuencia" in esperado.columns:
+        esperado = esperado[esperado["Frecuencia"] > 0]
+    for tabla in (esperado, obtenido):
+        # Los grupos de varias columnas (MultiIndex) se comparan como tuplas
+        tabla.index = tabla.index.to_flat_index().astype(str)
+        tabla.columns = tabla.columns.astype(str)
+    if sorted(esperado.index) != sorted(obtenido.index) or sorted(esperado.columns) != sorted(obtenido.columns):
+        return [f"filas/columnas distintas: {esperado.shape} vs {obtenido.shape}"]
+    obtenido = obtenido.loc[esperado.index, esperado.columns]
+    diferencias = []
+    for col in esperado.columns:
+        for fila, a, b in zip(esperado.index, esperado[col].map(valor_comparable), obtenido[col].map(valor_comparable)):
+            if isinstance(a, float) and isinstance(b, float):
+                iguales = (np.isnan(a) and np.isnan(b)) or np.isclose(a, b, rtol=tolerancia, atol=0)
+            else:
+                iguales = (pd.isna(a) and pd.isna(b)) or str(a) == str(b)
+            if not iguales:
+                diferencias.append(f"[{fila}, {col}]: {a!r} vs {b!r}")
+    return diferencias
 
 # =====================================================
 # PROGRAMA PRINCIPAL
 # =====================================================
 
+def backend_configurado():
+    backend = os.environ.get("AURELION_BACKEND", "pandas")
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido '{backend}'. Usa uno de: {', '.join(BACKENDS)}.")
+    return backend
+
+
+def abrir_tabla(df_maestro, columnas=None, filtro=None):
+    """Opción 6 según el modo: DuckDB, streaming por bloques o tabla en memoria"""
+    with medir_etapa("opcion_6", backend=backend_configurado()) as span:
+        if backend_configurado() == "duckdb":
+            return abrir_tabla_sql(filtro)
+        if os.environ.get("AURELION_STREAMING") == "1":
+            return abrir_tabla_por_bloques(filtro)
+        df_maestro = cargar_ejecutar_documentacion(df_maestro, columnas=columnas, filtro=filtro)
+        span["filas_salida"] = len(df_maestro) if df_maestro is not None else None
+        return df_maestro
+
+
+def opciones_soportadas(df_maestro):
+    """Opciones 7 a 14 que se pueden ejecutar sobre df_maestro"""
+    if isinstance(df_maestro, TablaSQL):
+        return OPCIONES_SQL
+    if isinstance(df_maestro, TablaPorBloques):
+        return OPCIONES_POR_BLOQUES
+    return set(range(7, 15))
+
+
 def main():
     """Función principal con menú interactivo"""
+    global CACHE_RESULTADOS
     df_maestro = None
+    CACHE_RESULTADOS = crear_cache_resultados()
     
     print("\n" + "="*60)
     print("🏪 BIENVENIDO AL PROGRAMA DE ANÁLISIS DE TIENDA")
@@ -737,7 +4740,12 @@ def main():
             elif opcion == "5":
                 cargar_mejoras_copilot()
             elif opcion == "6":
-                df_maestro = cargar_ejecutar_documentacion(df_maestro)
+                df_maestro = abrir_tabla(df_maestro, filtro=FiltroTabla.desde_entorno())
+                if os.environ.get("AURELION_NOTEBOOK") == "1":
+                    ejecutar_documentacion_notebook()
+            elif opcion.isdigit() and 7 <= int(opcion) <= 14 and int(opcion) not in opciones_soportadas(df_maestro):
+                print("⚠️ Esta opción necesita la tabla completa en memoria.")
+                print("   Desactiva AURELION_STREAMING o AURELION_BACKEND y vuelve a ejecutar la opción 6.")
             elif opcion == "7":
                 visualizar_tabla_unificada(df_maestro)
             elif opcion == "8":
@@ -755,6 +4763,9 @@ def main():
             elif opcion == "14":
                 grafico_boxplot_importe_medio_pago(df_maestro)
             elif opcion == "15":
+                if EJECUCION_NOTEBOOK is not None and EJECUCION_NOTEBOOK.is_alive():
+                    print("⏳ Esperando a que termine SPRINT2.ipynb (Ctrl+C para salir igual)...")
+                    EJECUCION_NOTEBOOK.join()
                 print("\n👋 ¡Hasta luego! Gracias por usar el programa de análisis.")
                 break
             else:
@@ -766,6 +4777,585 @@ def main():
         except Exception as e:
             print(f"❌ Error inesperado: {e}")
             print("   Por favor, intenta de nuevo.")
+    
+    CACHE_RESULTADOS.guardar()
+
+# =====================================================
+# MODO REPORTE (sin interacción)
+# =====================================================
+
+# Opciones del menú que se pueden ejecutar en un reporte
+FUNCIONES_REPORTE = {
+    7: ("tabla_unificada", visualizar_tabla_unificada),
+    8: ("estadisticos_generales", resultados_estadisticos_generales),
+    9: ("medios_pago", medios_pago_conteo_porcentaje),
+    10: ("matriz_correlaciones", matriz_correlaciones),
+    11: ("outliers", deteccion_outliers),
+    12: ("frecuencia_medios_pago", grafico_frecuencia_medios_pago),
+    13: ("distribucion_importe", grafico_distribucion_importe),
+    14: ("boxplot_importe_medio_pago", grafico_boxplot_importe_medio_pago),
+}
+
+
+def columnas_necesarias(opciones):
+    """Unión de las columnas que leen las opciones (None si alguna necesita todas)"""
+    columnas = []
+    for opcion in opciones:
+        requeridas = COLUMNAS_POR_OPCION.get(opcion)
+        if requeridas is None:
+            return None
+        columnas += [c for c in requeridas if c not in columnas]
+    return columnas
+
+
+def guardar_tabla(tabla, ruta_base):
+    if isinstance(tabla, pd.Series):
+        tabla = tabla.to_frame()
+    tabla.to_csv(f"{ruta_base}.csv")
+    tabla.to_json(f"{ruta_base}.json", orient="split", date_format="iso", force_ascii=False, indent=2)
+    return [f"{ruta_base}.csv", f"{ruta_base}.json"]
+
+
+def ejecutar_reporte(opciones, directorio_salida, filtro=None):
+    """
+    Carga los datos una vez, ejecuta las opciones pedidas y guarda las tablas
+    (CSV y JSON) y las figuras (PNG) en `directorio_salida`. Con `filtro`
+    (FiltroTabla) solo se leen las particiones de su rango de fechas.
+    Devuelve el código de salida: 0 si todo salió bien, 1 si falló alguna
+    opción y 2 si no se pudieron cargar los datos.
+    """
+    global DIRECTORIO_FIGURAS, CACHE_RESULTADOS
+    
+    os.makedirs(directorio_salida, exist_ok=True)
+    CACHE_RESULTADOS = crear_cache_resultados()
+    plt.switch_backend("Agg")
+    DIRECTORIO_FIGURAS = directorio_salida
+    
+    df_maestro = abrir_tabla(None, columnas=columnas_necesarias(opciones), filtro=filtro)
+    if df_maestro is None:
+        print("❌ Reporte cancelado: no se pudieron cargar los datos.")
+        return 2
+    
+    # Todas las figuras se dibujan a la vez antes de recorrer las opciones
+    figuras = [FIGURAS_POR_OPCION[o] for o in opciones if o in FIGURAS_POR_OPCION]
+    if figuras and isinstance(df_maestro, pd.DataFrame):
+        try:
+            FIGURAS_PRERENDERIZADAS.update(renderizar_graficos_en_paralelo(df_maestro, directorio_salida, figuras))
+        except Exception as e:
+            print(f"⚠️ No se pudieron generar las figuras en paralelo: {e}")
+    
+    resumen = []
+    for opcion in opciones:
+        nombre, funcion = FUNCIONES_REPORTE[opcion]
+        ruta_base = os.path.join(directorio_salida, f"opcion_{opcion:02d}_{nombre}")
+        inicio = time.perf_counter()
+        estado = {"opcion": opcion, "nombre": nombre, "archivos": []}
+        try:
+            if opcion not in opciones_soportadas(df_maestro):
+                raise RuntimeError("la opción necesita la tabla completa en memoria "
+                                   "(AURELION_STREAMING=1 o AURELION_BACKEND=duckdb)")
+            tabla = funcion(df_maestro)
+            if tabla is not None:
+                estado["archivos"] += guardar_tabla(tabla, ruta_base)
+            figura = os.path.join(directorio_salida, f"{nombre}.png")
+            if os.path.exists(figura):
+                estado["archivos"].append(figura)
+            estado["ok"] = True
+        except Exception as e:
+            plt.close("all")
+            print(f"❌ Error en la opción {opcion}: {e}")
+            estado["ok"] = False
+            estado["error"] = str(e)
+        estado["segundos"] = round(time.perf_counter() - inicio, 3)
+        resumen.append(estado)
+    
+    with open(os.path.join(directorio_salida, "resumen.json"), "w", encoding="utf-8") as f:
+        json.dump(resumen, f, indent=2, ensure_ascii=False)
+    CACHE_RESULTADOS.guardar()
+    fallidas = [e["opcion"] for e in resumen if not e["ok"]]
+    if fallidas:
+        print(f"\n⚠️ Reporte generado en {directorio_salida} con errores en las opciones: {fallidas}")
+        return 1
+    print(f"\n✅ Reporte generado en: {directorio_salida}")
+    return 0
+
+
+# =====================================================
+# MODO SERVIDOR (datos en memoria entre consultas)
+# =====================================================
+# `python Programa.py servir` carga la tabla una vez (opción 6), precalcula
+# los análisis del menú y los sirve como JSON por HTTP en localhost (o en un
+# socket Unix). Un hilo vigila la huella de los archivos de origen y, si
+# cambian, carga y precalcula una versión nueva en segundo plano; las
+# consultas siguen respondiendo con la anterior hasta que la nueva está lista.
+
+HOST_SERVIDOR = "127.0.0.1"
+PUERTO_SERVIDOR = 8765
+
+# Segundos entre dos revisiones de la huella de los archivos de origen
+INTERVALO_RECARGA_S = 2.0
+
+# Columnas por las que se puede ordenar el top de clientes
+ORDENES_CLIENTES = ("total_gastado", "compras", "ticket_promedio_cliente")
+MAXIMO_TOP_CLIENTES = 1000
+
+
+def endpoint_estadisticos(df, parametros):
+    if isinstance(df, TablaSQL):
+        return describir_sql(df)
+    if isinstance(df, TablaPorBloques):
+        return describir_por_bloques(df)[0]
+    return describir_con_kernel(df)
+
+
+def endpoint_medios_pago(df, parametros):
+    conteo = conteo_valores(df, "medio_pago")
+    conteo = conteo[conteo > 0]
+    porcentaje = (conteo / conteo.sum() * 100).round(2)
+    return pd.DataFrame({"Frecuencia": conteo, "Porcentaje (%)": porcentaje})
+
+
+def endpoint_correlaciones(df, parametros):
+    return matriz_correlacion(df, [c for c in VARIABLES_NUMERICAS if c in df.columns])
+
+
+def endpoint_outliers(df, parametros):
+    if parametros["modo"] == "aproximado" and not isinstance(df, TablaSQL):
+        resultados, filas = outliers_iqr_aproximados(df, VARIABLES_NUMERICAS)
+    else:
+        resultados, filas = outliers_iqr_exactos(df, VARIABLES_NUMERICAS)
+    tabla = pd.DataFrame(resultados).T
+    tabla["porcentaje"] = (tabla["outliers"].astype("float64") / filas * 100).round(4)
+    return tabla
+
+
+def endpoint_top_clientes(df, parametros):
+    # Las métricas se calculan una vez por filtro; cada n y orden solo recorta
+    agrupado = memoizar(df, "metricas_clientes", lambda: metricas_clientes_tabla(df))
+    if agrupado is None:
+        raise ValueError("la tabla no tiene id_cliente e importe")
+    return top_clientes(agrupado, parametros["n"], parametros["orden"]).reset_index(drop=True)
+
+
+def endpoint_cubo(df, parametros):
+    abierto = cubo_para(df)
+    if abierto is None:
+        raise LookupError("no hay un cubo de ventas vigente para estos datos (necesita pyarrow y la caché columnar)")
+    return resumen_cubo(*abierto, parametros["agrupar"]).reset_index()
+
+
+def endpoint_calidad(df, parametros):
+    return calidad_datos(df).reset_index()
+
+
+# Ruta → (opción del menú que calcula lo mismo, función). Los parámetros
+# comunes son desde, hasta y ciudad (filtro); cada ruta agrega los suyos.
+ENDPOINTS_SERVIDOR = {
+    "/estadisticos": (8, endpoint_estadisticos),
+    "/medios-pago": (9, endpoint_medios_pago),
+    "/correlaciones": (10, endpoint_correlaciones),
+    "/outliers": (11, endpoint_outliers),
+    "/clientes/top": (None, endpoint_top_clientes),
+    "/cubo": (None, endpoint_cubo),
+    "/calidad": (None, endpoint_calidad),
+}
+
+# Nombres que acepta /cubo?agrupar= (columna del cubo o "mes")
+AGRUPACIONES_CUBO = {"fecha": "fecha", "dia": "fecha", "mes": "mes", "ciudad": "ciudad",
+                     "medio_pago": "medio_pago", "categoria": "categoria_corregida",
+                     "categoria_corregida": "categoria_corregida"}
+
+
+def leer_parametros_consulta(ruta, consulta):
+    """
+    Parámetros de una consulta (dict de listas de parse_qs) validados y
+    normalizados; la tupla ordenada de sus valores es la clave de la caché.
+    Lanza ValueError con un mensaje para el cliente si algo no es válido.
+    """
+    def unico(nombre, defecto=None):
+        valores = consulta.get(nombre)
+        return valores[-1] if valores else defecto
+    
+    fechas = {}
+    for nombre in ("desde", "hasta"):
+        texto = unico(nombre)
+        if texto:
+            try:
+                fechas[nombre] = pd.Timestamp(texto)
+            except ValueError:
+                raise ValueError(f"fecha inválida en '{nombre}': {texto!r} (usa AAAA-MM-DD)")
+    ciudades = [c.strip() for grupo in consulta.get("ciudad", []) for c in grupo.split(",") if c.strip()]
+    filtro = None
+    if fechas or ciudades:
+        filtro = FiltroTabla(fechas.get("desde"), fechas.get("hasta"), ciudades)
+    parametros = {"filtro": filtro}
+    if ruta == "/outliers":
+        parametros["modo"] = unico("modo", "exacto")
+        if parametros["modo"] not in ("exacto", "aproximado"):
+            raise ValueError("modo debe ser 'exacto' o 'aproximado'")
+    if ruta == "/clientes/top":
+        try:
+            parametros["n"] = int(unico("n", "10"))
+        except ValueError:
+            raise ValueError(f"n debe ser un entero: {unico('n')!r}")
+        if not 1 <= parametros["n"] <= MAXIMO_TOP_CLIENTES:
+            raise ValueError(f"n debe estar entre 1 y {MAXIMO_TOP_CLIENTES}")
+        parametros["orden"] = unico("orden", "total_gastado")
+        if parametros["orden"] not in ORDENES_CLIENTES:
+            raise ValueError(f"orden debe ser uno de: {', '.join(ORDENES_CLIENTES)}")
+    if ruta == "/cubo":
+        nombres = [c.strip() for c in unico("agrupar", "medio_pago").split(",") if c.strip()]
+        invalidos = [c for c in nombres if c not in AGRUPACIONES_CUBO]
+        if invalidos or not nombres:
+            raise ValueError(f"agrupar admite: {', '.join(AGRUPACIONES_CUBO)}")
+        parametros["agrupar"] = tuple(dict.fromkeys(AGRUPACIONES_CUBO[c] for c in nombres))
+    return parametros
+
+
+class DatosServidor:
+    """
+    Una versión de los datos servidos: la tabla de la opción 6, la huella
+    de las fuentes con la que se cargó y las respuestas ya calculadas (LRU).
+    Se reemplaza entera al recargar; nunca se modifica la tabla.
+    """
+
+    # Los cálculos comparten CACHE_RESULTADOS (y pandas no es seguro entre
+    # hilos): se hace uno por vez, aunque sean de versiones distintas
+    calculo = threading.Lock()
+
+    def __init__(self, df_maestro, huella, version):
+        self.df_maestro = df_maestro
+        self.huella = huella
+        self.version = version
+        self.cargada = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.respuestas = CacheResultados()
+        self.bloqueo = threading.Lock()
+
+    def filas(self):
+        return len(self.df_maestro) if isinstance(self.df_maestro, pd.DataFrame) else None
+
+    def responder(self, ruta, parametros):
+        """Resultado JSON de `ruta`; calculado una vez por combinación de parámetros"""
+        opcion, funcion = ENDPOINTS_SERVIDOR[ruta]
+        if opcion is not None and opcion not in opciones_soportadas(self.df_maestro):
+            raise LookupError(f"{ruta} necesita la tabla completa en memoria (opción {opcion})")
+        filtro = parametros["filtro"]
+        clave = (ruta, filtro.descripcion() if filtro is not None else None) + tuple(
+            (nombre, valor) for nombre, valor in sorted(parametros.items()) if nombre != "filtro")
+        
+        def calcular():
+            df = filtrar_tabla(self.df_maestro, filtro)
+            if df.empty:
+                return {"datos": None, "aviso": "Ninguna venta cumple el filtro."}
+            tabla = funcion(df, parametros)
+            return {"datos": json.loads(tabla.to_json(orient="split", date_format="iso", force_ascii=False))}
+        
+        with self.bloqueo:
+            reutilizada = clave in self.respuestas
+            if reutilizada:
+                respuesta = self.respuestas.obtener(clave, calcular)
+        if not reutilizada:
+            with DatosServidor.calculo:
+                calculada = calcular()
+            with self.bloqueo:
+                respuesta = self.respuestas.obtener(clave, lambda: calculada)
+        return {
+            "endpoint": ruta,
+            "filtro": filtro.descripcion() if filtro is not None else None,
+            "version_datos": self.version,
+            "desde_cache": reutilizada,
+            **respuesta,
+        }
+
+    def precalcular(self):
+        """Calcula las respuestas sin filtro de todas las rutas disponibles"""
+        inicio = time.perf_counter()
+        listas = []
+        for ruta, (opcion, _) in ENDPOINTS_SERVIDOR.items():
+            if opcion is not None and opcion not in opciones_soportadas(self.df_maestro):
+                continue
+            try:
+                self.responder(ruta, leer_parametros_consulta(ruta, {}))
+                listas.append(ruta)
+            except Exception as e:
+                print(f"⚠️ No se pudo precalcular {ruta}: {e}")
+        print(f"♻️ Respuestas precalculadas ({', '.join(listas)}) en {time.perf_counter() - inicio:.2f} s")
+
+
+class ServicioAnalisis:
+    """Estado del servidor: la versión de datos vigente y la recarga en caliente"""
+
+    def __init__(self, filtro=None, intervalo=INTERVALO_RECARGA_S):
+        self.database_dir = obtener_directorio_database()
+        self.filtro = filtro
+        self.intervalo = intervalo
+        self.datos = None
+        self.huella_vista = None
+        self.detenido = threading.Event()
+
+    def cargar(self):
+        """Carga y precalcula una versión nueva; la vigente se reemplaza solo si todo salió bien"""
+        huella_previa = self.datos.huella if self.datos is not None else None
+        huella = calcular_huella_fuentes(self.database_dir)
+        if huella_previa is not None and os.path.exists(os.path.join(self.database_dir, "tabla_unificada.csv")):
+            cambiados = [n for n in ARCHIVOS_FUENTE if huella.get(n) != huella_previa.get(n)]
+            if any(n in cambiados for n in ("ventas.xlsx", "detalle_ventas.xlsx")):
+                actualizar_tabla_incremental(self.database_dir)
+            if any(n in cambiados for n in ("productos.xlsx", "clientes.xlsx")):
+                print("⚠️ Cambiaron productos.xlsx o clientes.xlsx: las ventas ya unificadas no se "
+                      "reescriben. Borra tabla_unificada.csv para reconstruirla completa.")
+        df_maestro = abrir_tabla(None, filtro=self.filtro)
+        # La carga puede reescribir la caché y el CSV: la huella se toma después
+        self.huella_vista = calcular_huella_fuentes(self.database_dir)
+        if df_maestro is None:
+            print("❌ No se pudieron cargar los datos; se siguen sirviendo los anteriores.")
+            return False
+        datos = DatosServidor(df_maestro, self.huella_vista, (self.datos.version + 1) if self.datos else 1)
+        datos.precalcular()
+        self.datos = datos
+        filas = f"{datos.filas():,} filas" if datos.filas() is not None else f"backend {backend_configurado()}"
+        print(f"✅ Datos versión {datos.version} en servicio ({filas})")
+        return True
+
+    def vigilar(self):
+        """Hilo de recarga: revisa la huella de las fuentes cada `intervalo` segundos"""
+        while not self.detenido.wait(self.intervalo):
+            try:
+                if calcular_huella_fuentes(self.database_dir) != self.huella_vista:
+                    print("🔄 Cambiaron los archivos de origen: recargando en segundo plano...")
+                    self.cargar()
+            except Exception as e:
+                print(f"❌ Error al recargar: {e}")
+
+    def estado(self):
+        datos = self.datos
+        return {
+            "estado": "ok",
+            "version_datos": datos.version,
+            "cargada": datos.cargada,
+            "filas": datos.filas(),
+            "columnas": list(datos.df_maestro.columns) if hasattr(datos.df_maestro, "columns") else None,
+            "backend": backend_configurado(),
+            "filtro_base": self.filtro.descripcion() if self.filtro is not None else None,
+            "fuentes": datos.huella,
+            "endpoints": ["/salud"] + [ruta for ruta, (opcion, _) in ENDPOINTS_SERVIDOR.items()
+                                       if opcion is None or opcion in opciones_soportadas(datos.df_maestro)],
+        }
+
+    def atender(self, ruta, consulta):
+        """(código HTTP, cuerpo JSON) de una consulta GET"""
+        if ruta in ("/", "/salud"):
+            return 200, self.estado()
+        if ruta not in ENDPOINTS_SERVIDOR:
+            return 404, {"error": f"ruta desconocida: {ruta}", "endpoints": self.estado()["endpoints"]}
+        try:
+            parametros = leer_parametros_consulta(ruta, consulta)
+            return 200, self.datos.responder(ruta, parametros)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except LookupError as e:
+            return 409, {"error": str(e)}
+
+
+def crear_servidor_http(servicio, host=HOST_SERVIDOR, puerto=PUERTO_SERVIDOR, socket_unix=None):
+    """ThreadingHTTPServer en host:puerto, o en el socket Unix `socket_unix`"""
+    import socketserver
+    import stat
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlsplit
+    
+    class ManejadorAnalisis(BaseHTTPRequestHandler):
+        server_version = "TiendaAurelion"
+        
+        def do_GET(self):
+            inicio = time.perf_counter()
+            partes = urlsplit(self.path)
+            try:
+                codigo, cuerpo = servicio.atender(partes.path.rstrip("/") or "/", parse_qs(partes.query))
+            except Exception as e:
+                print(f"❌ Error en {self.path}: {e}")
+                codigo, cuerpo = 500, {"error": str(e)}
+            milisegundos = (time.perf_counter() - inicio) * 1000
+            if isinstance(cuerpo, dict) and "endpoint" in cuerpo:
+                cuerpo["milisegundos"] = round(milisegundos, 3)
+            datos = json.dumps(cuerpo, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+            print(f"   GET {self.path} → {codigo} ({milisegundos:.1f} ms)")
+        
+        def log_message(self, formato, *args):
+            # Cada consulta ya se informa en do_GET
+            pass
+        
+        def address_string(self):
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+    
+    if socket_unix is None:
+        return ThreadingHTTPServer((host, puerto), ManejadorAnalisis)
+    if not hasattr(socketserver, "UnixStreamServer"):
+        raise OSError("este sistema no admite sockets Unix; usa --host y --puerto")
+    
+    class ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+    
+    if os.path.exists(socket_unix):
+        # Solo se reemplaza un socket que quedó de una ejecución anterior
+        if not stat.S_ISSOCK(os.stat(socket_unix).st_mode):
+            raise OSError(f"{socket_unix} existe y no es un socket")
+        os.remove(socket_unix)
+    return ServidorUnix(socket_unix, ManejadorAnalisis)
+
+
+def servir(host=HOST_SERVIDOR, puerto=PUERTO_SERVIDOR, socket_unix=None, intervalo=INTERVALO_RECARGA_S, filtro=None):
+    """
+    Modo servidor: carga los datos una vez y responde consultas JSON hasta
+    Ctrl+C. Devuelve el código de salida (2 si no se pudieron cargar los datos).
+    """
+    global CACHE_RESULTADOS
+    
+    plt.switch_backend("Agg")
+    CACHE_RESULTADOS = crear_cache_resultados()
+    servicio = ServicioAnalisis(filtro, intervalo)
+    if not servicio.cargar():
+        return 2
+    try:
+        servidor = crear_servidor_http(servicio, host, puerto, socket_unix)
+    except OSError as e:
+        print(f"❌ No se pudo abrir el servidor: {e}")
+        return 1
+    vigilante = threading.Thread(target=servicio.vigilar, name="recarga", daemon=True)
+    vigilante.start()
+    
+    direccion = socket_unix if socket_unix else "http://{}:{}".format(*servidor.server_address[:2])
+    print("\n" + "="*60)
+    print(f"🌐 Servidor de análisis escuchando en {direccion}")
+    print("="*60)
+    print(f"   Endpoints: {', '.join(servicio.estado()['endpoints'])}")
+    print("   Filtro opcional en cada consulta: ?desde=AAAA-MM-DD&hasta=AAAA-MM-DD&ciudad=Cordoba")
+    print("   Ctrl+C para detener.")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servidor detenido.")
+    finally:
+        servicio.detenido.set()
+        servidor.server_close()
+        if socket_unix and os.path.exists(socket_unix):
+            os.remove(socket_unix)
+        CACHE_RESULTADOS.guardar()
+    return 0
+
+
+def leer_opciones(texto):
+    try:
+        opciones = [int(o) for o in texto.split(",") if o.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"lista de opciones inválida: {texto!r}")
+    invalidas = [o for o in opciones if o not in FUNCIONES_REPORTE]
+    if invalidas or not opciones:
+        raise argparse.ArgumentTypeError(
+            f"opciones no disponibles en el reporte: {invalidas}. Válidas: {sorted(FUNCIONES_REPORTE)}"
+        )
+    return opciones
+
+
+def leer_fecha(texto):
+    try:
+        return pd.Timestamp(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha inválida: {texto!r} (usa AAAA-MM-DD)")
+
+
+def cli(argv=None):
+    """
+    Punto de entrada. Sin argumentos abre el menú interactivo; con
+    `report` ejecuta un reporte sin interacción, por ejemplo:
+
+        python Programa.py report --options 8,9,10,11 --out report/
+        python Programa.py report --desde 2024-03-01 --hasta 2024-03-31 --ciudad Cordoba
+    """
+    parser = argparse.ArgumentParser(prog="Programa.py", description="Análisis de datos de Tienda Aurelion")
+    parser.add_argument("--traza", metavar="RUTA",
+                        help="registra tiempo, CPU, filas y memoria de cada etapa (.json = Chrome trace, "
+                             "otra extensión = JSON lines); equivale a AURELION_TRAZA")
+    subcomandos = parser.add_subparsers(dest="comando")
+    reporte = subcomandos.add_parser("report", aliases=["reporte"], help="genera un reporte sin interacción")
+    reporte.add_argument("--options", "--opciones", dest="opciones", type=leer_opciones,
+                         default=sorted(FUNCIONES_REPORTE), help="opciones del menú separadas por coma (7-14)")
+    reporte.add_argument("--out", "--salida", dest="salida", default="report",
+                         help="carpeta de salida para tablas y figuras")
+    reporte.add_argument("--desde", type=leer_fecha, help="primera fecha de venta incluida (AAAA-MM-DD)")
+    reporte.add_argument("--hasta", type=leer_fecha, help="última fecha de venta incluida (AAAA-MM-DD)")
+    reporte.add_argument("--ciudad", dest="ciudades", action="append",
+                         help="ciudad a incluir; se puede repetir o separar por coma")
+    subcomandos.add_parser("actualizar",
+                           help="agrega a tabla_unificada.csv solo las ventas nuevas de los Excel")
+    calidad = subcomandos.add_parser("calidad",
+                                     help="evalúa las reglas de calidad de datos y muestra las violaciones")
+    calidad.add_argument("--salida", help="guarda el reporte por regla en este CSV")
+    exportar = subcomandos.add_parser("exportar",
+                                      help="exporta la tabla unificada a CSV (opcionalmente comprimido)")
+    exportar.add_argument("--salida",
+                          help="archivo de destino (por defecto tabla_unificada.csv con la extensión de la compresión)")
+    exportar.add_argument("--compresion", choices=list(COMPRESIONES_CSV),
+                          default="ninguna", help="compresión del CSV (gzip o zstd; zstd necesita pyarrow)")
+    notebook = subcomandos.add_parser("notebook", aliases=["ejecutar-notebook"],
+                                      help="ejecuta SPRINT2.ipynb mostrando las salidas de cada celda")
+    notebook.add_argument("--forzar", action="store_true",
+                          help="lo ejecuta aunque no hayan cambiado su código ni los Excel")
+    servidor = subcomandos.add_parser("servir",
+                                      help="sirve los análisis como JSON con los datos en memoria")
+    servidor.add_argument("--host", default=HOST_SERVIDOR, help="dirección donde escuchar (por defecto solo localhost)")
+    servidor.add_argument("--puerto", type=int, default=PUERTO_SERVIDOR,
+                          help="puerto TCP (0 = uno libre)")
+    servidor.add_argument("--socket", dest="socket_unix", metavar="RUTA",
+                          help="escucha en un socket Unix en lugar de TCP")
+    servidor.add_argument("--intervalo", type=float, default=INTERVALO_RECARGA_S,
+                          help="segundos entre revisiones de los archivos de origen para recargar")
+    args = parser.parse_args(argv)
+    try:
+        backend_configurado()
+    except ValueError as e:
+        parser.error(str(e))
+    if args.traza:
+        os.environ["AURELION_TRAZA"] = args.traza
+    global TRAZA
+    TRAZA = crear_traza()
+    try:
+        return ejecutar_comando(args, parser)
+    finally:
+        if TRAZA is not None:
+            TRAZA.exportar()
+
+
+def ejecutar_comando(args, parser):
+    """Despacha el subcomando elegido (o el menú interactivo)"""
+    if args.comando == "calidad":
+        return revisar_calidad(args.salida)
+    if args.comando == "exportar":
+        return exportar_tabla_csv(args.salida, args.compresion, FiltroTabla.desde_entorno())
+    if args.comando == "actualizar":
+        return 0 if actualizar_tabla_incremental() is not None else 1
+    if args.comando in ("report", "reporte"):
+        ciudades = [c.strip() for grupo in args.ciudades or [] for c in grupo.split(",") if c.strip()]
+        if args.desde is not None or args.hasta is not None or ciudades:
+            try:
+                filtro = FiltroTabla(args.desde, args.hasta, ciudades)
+            except ValueError as e:
+                parser.error(str(e))
+        else:
+            filtro = FiltroTabla.desde_entorno()
+        return ejecutar_reporte(args.opciones, args.salida, filtro)
+    if args.comando in ("notebook", "ejecutar-notebook"):
+        return 0 if ejecutar_documentacion_notebook(en_segundo_plano=False, forzar=args.forzar) else 1
+    if args.comando == "servir":
+        return servir(args.host, args.puerto, args.socket_unix, args.intervalo, FiltroTabla.desde_entorno())
+    main()
+    return 0
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(cli())
\ No newline at end of file
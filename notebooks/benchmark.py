@@ -0,0 +1,484 @@
+"""
+Benchmarks de la reconstrucción de la tabla unificada.
+
+Compara las implementaciones originales (apply fila por fila y merges en
+cascada) con las etapas vectorizadas de Programa.py sobre datos sintéticos,
+y mide cada etapa del programa (carga, unión, análisis del menú) sobre una
+base sintética con el mismo esquema que database/.
+
+Uso:
+    python benchmark.py                 # 10.000.000 de filas
+    python benchmark.py --filas 1000000
+    python benchmark.py --solo etapas --filas 1000000 --guardar base.json
+    python benchmark.py --solo etapas --filas 1000000 --comparar base.json
+    python benchmark.py --generar /tmp/database_10M --filas 10000000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import Programa
+
+
+# =====================================================
+# IMPLEMENTACIÓN ORIGINAL (referencia)
+# =====================================================
+
+def corregir_categoria_original(nombre):
+    nombre_lower = nombre.lower()
+    for palabra in Programa.KEYWORDS_ALIMENTOS:
+        if palabra in nombre_lower:
+            return "Alimentos"
+    return "Limpieza"
+
+
+def imputar_importes_original(detalle):
+    return detalle.apply(
+        lambda row: row["cantidad"] * row["precio_unitario"]
+        if pd.isna(row["importe"]) else row["importe"],
+        axis=1
+    )
+
+
+def unir_tablas_original(clientes, productos, ventas, detalle):
+    detalle_productos = detalle.merge(
+        productos[["id_producto", "categoria_corregida", "precio_unitario"]],
+        on="id_producto", how="left", suffixes=("", "_producto")
+    )
+    detalle_ventas = detalle_productos.merge(
+        ventas[["id_venta", "fecha", "id_cliente", "medio_pago"]],
+        on="id_venta", how="left"
+    )
+    return detalle_ventas.merge(
+        clientes[["id_cliente", "nombre_cliente", "email", "ciudad", "fecha_alta"]],
+        on="id_cliente", how="left"
+    )
+
+
+# =====================================================
+# DATOS SINTÉTICOS
+# =====================================================
+
+NOMBRES_BASE = [
+    "Coca Cola 1.5L", "Pepsi 1.5L", "Yerba Mate Suave 1kg", "Galletitas Dulces",
+    "Harina 000 1kg", "Fideos Spaghetti", "Aceite de Girasol", "Leche Entera 1L",
+    "Detergente Líquido", "Lavandina 1L", "Jabón en Polvo", "Toallas Húmedas x50",
+    "Desodorante Aerosol", "Shampoo Neutro", "Esponja Multiuso", "Queso Rallado",
+]
+
+
+def generar_detalle_sintetico(filas, semilla=42):
+    rng = np.random.default_rng(semilla)
+    # Variantes numeradas para que haya miles de nombres distintos, como en un catálogo real
+    catalogo = np.array([f"{nombre} v{i}" for i in range(250) for nombre in NOMBRES_BASE])
+    cantidad = rng.integers(1, 6, filas)
+    precio = rng.integers(200, 5000, filas)
+    importe = (cantidad * precio).astype("float64")
+    importe[rng.random(filas) < 0.1] = np.nan
+    return pd.DataFrame({
+        "id_venta": rng.integers(1, filas // 3 + 2, filas),
+        "nombre_producto": catalogo[rng.integers(0, len(catalogo), filas)],
+        "cantidad": cantidad,
+        "precio_unitario": precio,
+        "importe": importe,
+    })
+
+
+def generar_dimensiones_sinteticas(detalle, semilla=42):
+    """productos, ventas y clientes con ids densos para las claves de `detalle`"""
+    rng = np.random.default_rng(semilla)
+    n_productos = int(detalle["id_producto"].max()) if "id_producto" in detalle else 4000
+    n_ventas = int(detalle["id_venta"].max())
+    n_clientes = max(n_ventas // 20, 1)
+    productos = pd.DataFrame({
+        "id_producto": np.arange(1, n_productos + 1),
+        "categoria_corregida": rng.choice(["Alimentos", "Limpieza"], n_productos),
+        "precio_unitario": rng.integers(200, 5000, n_productos),
+    })
+    ventas = pd.DataFrame({
+        "id_venta": np.arange(1, n_ventas + 1),
+        "fecha": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n_ventas), unit="D"),
+        "id_cliente": rng.integers(1, n_clientes + 1, n_ventas),
+        "medio_pago": rng.choice(["efectivo", "qr", "tarjeta", "transferencia"], n_ventas),
+    })
+    clientes = pd.DataFrame({
+        "id_cliente": np.arange(1, n_clientes + 1),
+        "nombre_cliente": [f"Cliente {i}" for i in range(1, n_clientes + 1)],
+        "email": [f"cliente{i}@mail.com" for i in range(1, n_clientes + 1)],
+        "ciudad": rng.choice(["Cordoba", "Carlos Paz", "Rio Cuarto", "Villa Maria"], n_clientes),
+        "fecha_alta": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365, n_clientes), unit="D"),
+    })
+    return clientes, productos, ventas
+
+
+# =====================================================
+# BASE SINTÉTICA CON EL ESQUEMA DE database/
+# =====================================================
+# Proporciones tomadas de los Excel de database/: medios de pago y ciudades
+# con sus frecuencias, 1 a 5 líneas por venta, cantidades de 1 a 5, precios
+# entre 250 y 5000 y ~1,5 % de importes vacíos (se imputan al unificar).
+
+MEDIOS_PAGO = {"efectivo": 0.31, "qr": 0.25, "transferencia": 0.22, "tarjeta": 0.22}
+CIUDADES = {"Rio Cuarto": 0.23, "Alta Gracia": 0.21, "Carlos Paz": 0.15, "Villa Maria": 0.15,
+            "Cordoba": 0.13, "Mendiolaza": 0.13}
+NOMBRES_PILA = ["Mariana", "Nicolas", "Hernan", "Guadalupe", "Olivia", "Tomas", "Agustina", "Camila",
+                "Yamila", "Ivana", "Lucas", "Martin", "Sofia", "Julieta", "Bruno", "Valentina"]
+APELLIDOS = ["Lopez", "Rojas", "Martinez", "Romero", "Gomez", "Acosta", "Flores", "Ruiz",
+             "Rodriguez", "Torres", "Molina", "Castro", "Diaz", "Sosa", "Perez", "Fernandez"]
+TASA_IMPORTE_NULO = 0.015
+FECHA_INICIAL = "2024-01-01"
+DIAS_DE_VENTAS = 730
+
+# Excel admite 1.048.576 filas por hoja (una es el encabezado)
+LIMITE_FILAS_EXCEL = 1_048_575
+# Por encima de esto la base de `--solo etapas` se escribe sin .xlsx: openpyxl tarda minutos
+FILAS_EXCEL_BENCHMARK = 20_000
+# Líneas de detalle por bloque al escribir la base (acota la memoria del generador)
+LINEAS_POR_BLOQUE = 2_000_000
+
+
+def elegir(rng, proporciones, n):
+    return rng.choice(list(proporciones), n, p=np.array(list(proporciones.values())) / sum(proporciones.values()))
+
+
+def generar_clientes_y_productos(lineas, semilla=42):
+    """clientes y productos con el esquema de los Excel, en proporción a `lineas`"""
+    rng = np.random.default_rng(semilla)
+    n_clientes = max(100, lineas // 30)
+    n_productos = min(max(100, lineas // 1000), 10_000)
+    pila = rng.choice(NOMBRES_PILA, n_clientes)
+    apellido = rng.choice(APELLIDOS, n_clientes)
+    ids = np.arange(1, n_clientes + 1)
+    clientes = pd.DataFrame({
+        "id_cliente": ids,
+        "nombre_cliente": pd.Series(pila, dtype=object) + " " + apellido,
+        "email": [f"{n.lower()}.{a.lower()}{i}@mail.com" for n, a, i in zip(pila, apellido, ids)],
+        "ciudad": elegir(rng, CIUDADES, n_clientes),
+        "fecha_alta": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365, n_clientes), unit="D"),
+    })
+    nombres = [f"{nombre} v{i}" if i else nombre for i in range(n_productos // len(NOMBRES_BASE) + 1)
+               for nombre in NOMBRES_BASE][:n_productos]
+    productos = pd.DataFrame({
+        "id_producto": np.arange(1, n_productos + 1),
+        "nombre_producto": nombres,
+        # Como en el Excel original, la categoría viene sin corregir
+        "categoria": rng.choice(["Alimentos", "Limpieza"], n_productos),
+        "precio_unitario": rng.integers(250, 5000, n_productos),
+    })
+    return clientes, productos
+
+
+def generar_ventas_sinteticas(lineas, clientes, productos, id_inicial=1, semilla=42):
+    """ventas y detalle_ventas con exactamente `lineas` líneas de detalle, ids desde `id_inicial`"""
+    rng = np.random.default_rng([semilla, id_inicial])
+    lineas_por_venta = rng.integers(1, 6, lineas // 3 + 1)
+    while lineas_por_venta.sum() < lineas:
+        lineas_por_venta = np.concatenate([lineas_por_venta, rng.integers(1, 6, lineas // 3 + 1)])
+    ultima = int(np.searchsorted(np.cumsum(lineas_por_venta), lineas))
+    lineas_por_venta = lineas_por_venta[:ultima + 1]
+    lineas_por_venta[-1] -= lineas_por_venta.sum() - lineas
+    n_ventas = len(lineas_por_venta)
+    
+    id_venta = np.arange(id_inicial, id_inicial + n_ventas)
+    cliente = rng.integers(0, len(clientes), n_ventas)
+    ventas = pd.DataFrame({
+        "id_venta": id_venta,
+        "fecha": pd.Timestamp(FECHA_INICIAL) + pd.to_timedelta(rng.integers(0, DIAS_DE_VENTAS, n_ventas), unit="D"),
+        "id_cliente": clientes["id_cliente"].to_numpy()[cliente],
+        "nombre_cliente": clientes["nombre_cliente"].to_numpy()[cliente],
+        "email": clientes["email"].to_numpy()[cliente],
+        "medio_pago": elegir(rng, MEDIOS_PAGO, n_ventas),
+    })
+    producto = rng.integers(0, len(productos), lineas)
+    cantidad = rng.integers(1, 6, lineas)
+    precio = productos["precio_unitario"].to_numpy()[producto]
+    importe = (cantidad * precio).astype("float64")
+    importe[rng.random(lineas) < TASA_IMPORTE_NULO] = np.nan
+    detalle = pd.DataFrame({
+        "id_venta": np.repeat(id_venta, lineas_por_venta),
+        "id_producto": productos["id_producto"].to_numpy()[producto],
+        "nombre_producto": productos["nombre_producto"].to_numpy()[producto],
+        "cantidad": cantidad,
+        "precio_unitario": precio,
+        "importe": importe,
+    })
+    return ventas, detalle
+
+
+def generar_base_sintetica(lineas, semilla=42):
+    """(clientes, productos, ventas, detalle_ventas) en memoria"""
+    clientes, productos = generar_clientes_y_productos(lineas, semilla)
+    ventas, detalle = generar_ventas_sinteticas(lineas, clientes, productos, semilla=semilla)
+    return clientes, productos, ventas, detalle
+
+
+def escribir_base_sintetica(directorio, lineas, semilla=42, excel=True):
+    """
+    Escribe en `directorio` una base como database/: los cuatro .xlsx (si
+    `excel` y las filas entran en una hoja) y tabla_unificada.csv, generada
+    y unificada por bloques para que 10^8 líneas no necesiten tenerse en memoria.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    clientes, productos = generar_clientes_y_productos(lineas, semilla)
+    if excel and lineas > LIMITE_FILAS_EXCEL:
+        print(f"⚠️ {lineas:,} líneas no entran en una hoja de Excel: solo se escribe tabla_unificada.csv")
+        excel = False
+    csv_path = os.path.join(directorio, "tabla_unificada.csv")
+    for ruta in (csv_path, Programa.ruta_registro_csv(csv_path)):
+        if os.path.exists(ruta):
+            os.remove(ruta)
+    
+    bloques_ventas, bloques_detalle = [], []
+    id_inicial = 1
+    for inicio in range(0, lineas, LINEAS_POR_BLOQUE):
+        ventas, detalle = generar_ventas_sinteticas(min(LINEAS_POR_BLOQUE, lineas - inicio), clientes, productos,
+                                                    id_inicial, semilla)
+        id_inicial += len(ventas)
+        # unificar_tablas imputa importes sobre `detalle`: los Excel conservan los vacíos
+        unificada = en_silencio(lambda: Programa.unificar_tablas(clientes, productos.copy(), ventas, detalle.copy()))()
+        Programa.escribir_csv(unificada, csv_path, agregar=bool(inicio))
+        if excel:
+            bloques_ventas.append(ventas)
+            bloques_detalle.append(detalle)
+        print(f"   {min(inicio + LINEAS_POR_BLOQUE, lineas):>13,} / {lineas:,} líneas")
+    
+    if excel:
+        tablas = {"clientes": clientes, "productos": productos,
+                  "ventas": pd.concat(bloques_ventas, ignore_index=True),
+                  "detalle_ventas": pd.concat(bloques_detalle, ignore_index=True)}
+        for nombre, tabla in tablas.items():
+            tabla.to_excel(os.path.join(directorio, f"{nombre}.xlsx"), index=False)
+    print(f"💾 Base sintética de {lineas:,} líneas en: {directorio}")
+    return directorio
+
+# =====================================================
+# MEDICIÓN
+# =====================================================
+
+def medir(nombre, funcion, memoria=False):
+    """Tiempo de `funcion()` y, con `memoria`, su pico de memoria según tracemalloc"""
+    if memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    duracion = time.perf_counter() - inicio
+    if memoria:
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"   {nombre:<28} {duracion:10.3f} s   pico {pico / 2**20:10.1f} MB")
+    else:
+        print(f"   {nombre:<28} {duracion:10.3f} s")
+    return resultado, duracion
+
+
+def perfilar(nombre, funcion, registro, preparar=None):
+    """
+    Como medir(memoria=True), pero el tiempo sale de una corrida sin
+    tracemalloc (que frena mucho el código Python puro, como openpyxl) y el
+    pico de una segunda corrida trazada. `preparar()` se llama antes de cada
+    corrida (por ejemplo, para borrar una caché). Agrega la medición a `registro`.
+    """
+    if preparar:
+        preparar()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    duracion = time.perf_counter() - inicio
+    resultado = None
+    if preparar:
+        preparar()
+    tracemalloc.start()
+    resultado = funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {nombre:<28} {duracion:10.3f} s   pico {pico / 2**20:10.1f} MB")
+    registro.append({"etapa": nombre, "segundos": round(duracion, 4), "pico_mb": round(pico / 2**20, 2)})
+    return resultado
+
+
+def benchmark_unificacion(filas):
+    print(f"\n⏱️ BENCHMARK DE UNIFICACIÓN VECTORIZADA ({filas:,} filas)")
+    detalle = generar_detalle_sintetico(filas)
+
+    print("\n🔧 Imputación de importes:")
+    esperado, t_original = medir("apply(axis=1) original", lambda: imputar_importes_original(detalle))
+    obtenido, t_vectorizado = medir("máscara vectorizada", lambda: Programa.imputar_importes(detalle.copy())["importe"])
+    assert np.allclose(esperado.to_numpy(), obtenido.to_numpy()), "Los importes imputados no coinciden"
+    print(f"   Aceleración: x{t_original / t_vectorizado:,.1f}")
+
+    print("\n🔧 Corrección de categorías:")
+    nombres = detalle["nombre_producto"]
+    esperado, t_original = medir("bucle de palabras clave", lambda: nombres.apply(corregir_categoria_original))
+    obtenido, t_vectorizado = medir("regex compilada", lambda: Programa.corregir_categorias(nombres))
+    assert (esperado == obtenido).all(), "Las categorías corregidas no coinciden"
+    print(f"   Aceleración: x{t_original / t_vectorizado:,.1f}")
+
+
+def benchmark_uniones(filas):
+    print(f"\n⏱️ BENCHMARK DE UNIONES ({filas:,} filas de detalle)")
+    rng = np.random.default_rng(7)
+    detalle = generar_detalle_sintetico(filas)
+    detalle["id_producto"] = rng.integers(1, 4001, filas)
+    clientes, productos, ventas = generar_dimensiones_sinteticas(detalle)
+    
+    esperado, t_original = medir("merges en cascada", lambda: unir_tablas_original(clientes, productos, ventas, detalle),
+                                 memoria=True)
+    del esperado
+    obtenido, t_indice = medir("índice de claves + take", lambda: Programa.unir_tablas(clientes, productos, ventas, detalle),
+                               memoria=True)
+    esperado = unir_tablas_original(clientes, productos, ventas, detalle)
+    pd.testing.assert_frame_equal(esperado, obtenido)
+    print(f"   Aceleración: x{t_original / t_indice:,.1f}")
+
+
+def en_silencio(funcion):
+    """funcion() sin la salida por pantalla de Programa"""
+    def ejecutar():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return funcion()
+    return ejecutar
+
+
+def benchmark_etapas(lineas, directorio=None):
+    """
+    Tiempo y pico de memoria de cada etapa del programa sobre una base
+    sintética: generación, unión (crear_df_maestro), las tres cargas de la
+    opción 6 (Excel, CSV, caché Parquet y columnas numéricas mapeadas
+    desde el almacén .npy), la escritura del CSV (pandas.to_csv o por
+    bloques en paralelo) y los análisis del menú.
+    Devuelve la lista de mediciones.
+    """
+    print(f"\n⏱️ BENCHMARK DE ETAPAS ({lineas:,} líneas de detalle)")
+    temporal = directorio is None
+    directorio = directorio or tempfile.mkdtemp(prefix="aurelion_benchmark_")
+    entorno_previo = os.environ.get("AURELION_DATABASE_DIR")
+    os.environ["AURELION_DATABASE_DIR"] = directorio
+    registro = []
+    try:
+        clientes, productos, ventas, detalle = perfilar("generar base", lambda: generar_base_sintetica(lineas),
+                                                        registro)
+        perfilar("crear_df_maestro", en_silencio(lambda: Programa.crear_df_maestro(ventas, clientes, productos, detalle)),
+                 registro)
+        del ventas, detalle
+        en_silencio(lambda: escribir_base_sintetica(directorio, lineas, excel=lineas <= FILAS_EXCEL_BENCHMARK))()
+        
+        cache_dir = os.path.join(directorio, "cache")
+        csv_path = os.path.join(directorio, "tabla_unificada.csv")
+        cargar = en_silencio(lambda: Programa.cargar_ejecutar_documentacion(None))
+        sin_cache = lambda: shutil.rmtree(cache_dir, ignore_errors=True)
+        registro_csv = Programa.ruta_registro_csv(csv_path)
+        if os.path.exists(os.path.join(directorio, "ventas.xlsx")):
+            shutil.move(csv_path, csv_path + ".bak")
+            shutil.move(registro_csv, registro_csv + ".bak")
+            
+            def sin_csv():
+                sin_cache()
+                if os.path.exists(csv_path):
+                    os.remove(csv_path)
+            perfilar("opción 6 desde Excel", cargar, registro, preparar=sin_csv)
+            shutil.move(csv_path + ".bak", csv_path)
+            shutil.move(registro_csv + ".bak", registro_csv)
+        perfilar("opción 6 desde CSV", cargar, registro, preparar=sin_cache)
+        df_maestro = perfilar("opción 6 desde Parquet", cargar, registro)
+        perfilar("opción 6 numéricas (.npy)",
+                 en_silencio(lambda: Programa.cargar_ejecutar_documentacion(None, Programa.VARIABLES_NUMERICAS)), registro)
+        with tempfile.TemporaryDirectory() as salida:
+            perfilar("CSV con pandas.to_csv",
+                     lambda: df_maestro.to_csv(os.path.join(salida, "pandas.csv"), index=False), registro)
+            perfilar("CSV por bloques",
+                     lambda: Programa.escribir_csv(df_maestro, os.path.join(salida, "bloques.csv")), registro)
+        
+        analisis = [
+            ("8 estadísticos generales", Programa.resultados_estadisticos_generales),
+            ("9 medios de pago", Programa.medios_pago_conteo_porcentaje),
+            ("10 correlaciones", lambda df: Programa.matriz_correlacion(df, Programa.VARIABLES_NUMERICAS)),
+            ("11 deteccion_outliers", Programa.deteccion_outliers),
+            ("analisis_clientes", Programa.analisis_clientes),
+        ]
+        for nombre, funcion in analisis:
+            perfilar(nombre, en_silencio(lambda: funcion(df_maestro)), registro)
+    finally:
+        if entorno_previo is None:
+            os.environ.pop("AURELION_DATABASE_DIR", None)
+        else:
+            os.environ["AURELION_DATABASE_DIR"] = entorno_previo
+        if temporal:
+            shutil.rmtree(directorio, ignore_errors=True)
+    return registro
+
+
+def guardar_resultados(ruta, lineas, registro):
+    resultados = {
+        "lineas": lineas,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "cpus": os.cpu_count(),
+        "etapas": registro,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"💾 Resultados guardados en: {ruta}")
+
+
+def comparar_resultados(ruta, registro, umbral=1.25):
+    """
+    Compara las mediciones con un benchmark guardado. Devuelve las etapas
+    que tardan o consumen más de `umbral` veces lo registrado.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        anterior = json.load(f)
+    previas = {e["etapa"]: e for e in anterior["etapas"]}
+    print(f"\n📊 COMPARACIÓN CON {ruta} ({anterior['lineas']:,} líneas, {anterior['fecha']})")
+    regresiones = []
+    for etapa in registro:
+        previa = previas.get(etapa["etapa"])
+        if previa is None:
+            continue
+        razon_tiempo = etapa["segundos"] / max(previa["segundos"], 1e-6)
+        razon_memoria = (etapa["pico_mb"] or 0) / max(previa["pico_mb"] or 0, 1e-6) if previa["pico_mb"] else 1.0
+        marca = "⚠️" if max(razon_tiempo, razon_memoria) > umbral else "✅"
+        if marca == "⚠️":
+            regresiones.append(etapa["etapa"])
+        print(f"   {marca} {etapa['etapa']:<28} tiempo x{razon_tiempo:5.2f}   memoria x{razon_memoria:5.2f}")
+    return regresiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de Programa.py")
+    parser.add_argument("--filas", type=int, default=10_000_000, help="filas de detalle sintéticas")
+    parser.add_argument("--solo", choices=["unificacion", "uniones", "etapas"],
+                        help="ejecuta un solo benchmark (etapas no corre por defecto)")
+    parser.add_argument("--generar", metavar="DIRECTORIO",
+                        help="solo escribe una base sintética de --filas líneas en DIRECTORIO")
+    parser.add_argument("--sin-excel", action="store_true", help="con --generar, no escribe los .xlsx")
+    parser.add_argument("--guardar", metavar="JSON", help="guarda las mediciones de etapas en JSON")
+    parser.add_argument("--comparar", metavar="JSON", help="compara las etapas con un JSON guardado")
+    parser.add_argument("--umbral", type=float, default=1.25,
+                        help="razón de tiempo o memoria a partir de la cual se marca una regresión")
+    args = parser.parse_args()
+    if args.generar:
+        escribir_base_sintetica(args.generar, args.filas, excel=not args.sin_excel)
+        sys.exit(0)
+    if args.solo in (None, "unificacion"):
+        benchmark_unificacion(args.filas)
+    if args.solo in (None, "uniones"):
+        benchmark_uniones(args.filas)
+    if args.solo == "etapas":
+        registro = benchmark_etapas(args.filas)
+        if args.guardar:
+            guardar_resultados(args.guardar, args.filas, registro)
+        if args.comparar and comparar_resultados(args.comparar, registro, args.umbral):
+            sys.exit(1)
@@ -0,0 +1,28 @@
+import os
+import sys
+import shutil
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "notebooks"))
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import Programa  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Copia de database/ en una carpeta temporal, apuntada por AURELION_DATABASE_DIR"""
+    destino = tmp_path / "database"
+    shutil.copytree(os.path.join(RAIZ, "database"), destino)
+    monkeypatch.setenv("AURELION_DATABASE_DIR", str(destino))
+    Programa.VERIFICACIONES_CSV.clear()
+    return str(destino)
+
+
+@pytest.fixture
+def df_maestro(database):
+    df = Programa.cargar_tabla_unificada_csv()
+    assert df is not None
+    return df
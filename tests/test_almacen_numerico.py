@@ -0,0 +1,114 @@
+import io
+import os
+import contextlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Programa
+
+pytest.importorskip("pyarrow")
+
+
+def agregar_venta(database, id_venta, fecha):
+    """Una venta nueva (cabecera y una línea) al final de los Excel"""
+    ventas = pd.read_excel(os.path.join(database, "ventas.xlsx"))
+    detalle = pd.read_excel(os.path.join(database, "detalle_ventas.xlsx"))
+    venta = ventas.tail(1).assign(id_venta=id_venta, fecha=pd.Timestamp(fecha))
+    linea = detalle.tail(1).assign(id_venta=id_venta)
+    pd.concat([ventas, venta]).to_excel(os.path.join(database, "ventas.xlsx"), index=False)
+    pd.concat([detalle, linea]).to_excel(os.path.join(database, "detalle_ventas.xlsx"), index=False)
+
+
+def metadatos(database):
+    return Programa.leer_metadatos_cache(database)
+
+
+def columnas_parquet(database, numericas, partes, columnas):
+    """Las mismas columnas leídas del Parquet, parte por parte"""
+    datos_dir, _ = Programa.rutas_cache_columnar(database)
+    tablas = [pd.read_parquet(os.path.join(datos_dir, parte), columns=columnas) for parte in partes]
+    return pd.concat(tablas, ignore_index=True)
+
+
+@pytest.fixture
+def extendido(database):
+    """Caché de la opción 6 más dos actualizaciones incrementales (julio y agosto)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert Programa.cargar_ejecutar_documentacion(None) is not None
+        base = os.path.join(Programa.ruta_almacen_numerico(database), "0000")
+        antes = {a: os.stat(os.path.join(base, a)).st_mtime_ns for a in os.listdir(base)}
+        for id_venta, fecha in ((1001, "2024-07-15"), (1002, "2024-08-03")):
+            agregar_venta(database, id_venta, fecha)
+            assert Programa.actualizar_tabla_incremental(database) is not None
+    return database, antes
+
+
+def test_actualizar_agrega_un_segmento_sin_reescribir_los_anteriores(extendido):
+    database, antes = extendido
+    numericas = metadatos(database)["numericas"]
+    assert [nombre for nombre, _ in numericas["segmentos"]] == ["0000", "0001", "0002"]
+    base = os.path.join(Programa.ruta_almacen_numerico(database), "0000")
+    assert {a: os.stat(os.path.join(base, a)).st_mtime_ns for a in os.listdir(base)} == antes
+
+
+def test_almacen_igual_al_parquet(extendido):
+    database, _ = extendido
+    numericas = metadatos(database)["numericas"]
+    columnas = list(numericas["columnas"])
+    partes = [parte for parte, _ in numericas["partes"]]
+    obtenido = Programa.abrir_columnas_numericas(database, columnas)
+    esperado = columnas_parquet(database, numericas, partes, columnas)
+    pd.testing.assert_frame_equal(obtenido.copy(), esperado, check_dtype=False)
+    assert 1001 in obtenido["id_venta"].to_numpy() and 1002 in obtenido["id_venta"].to_numpy()
+
+
+def test_solo_se_abren_los_segmentos_de_las_partes_pedidas(extendido):
+    database, _ = extendido
+    numericas = metadatos(database)["numericas"]
+    nuevas = [parte for parte, _ in numericas["partes"][-numericas["segmentos"][-1][1]:]]
+    # Sin los segmentos anteriores, las partes del último se siguen leyendo
+    for nombre, _ in numericas["segmentos"][:-1]:
+        carpeta = os.path.join(Programa.ruta_almacen_numerico(database), nombre)
+        for archivo in os.listdir(carpeta):
+            os.remove(os.path.join(carpeta, archivo))
+    arreglos = Programa.abrir_almacen_numerico(database, numericas, nuevas, ["id_venta", "importe"])
+    esperado = columnas_parquet(database, numericas, nuevas, ["id_venta", "importe"])
+    assert np.array_equal(arreglos["id_venta"], esperado["id_venta"].to_numpy())
+    assert isinstance(arreglos["importe"], np.memmap)
+
+
+def memmap_de(arreglo):
+    """El np.memmap del que arreglo es una vista, o None si es una copia"""
+    while arreglo is not None and not isinstance(arreglo, np.memmap):
+        arreglo = arreglo.base
+    return arreglo
+
+
+def test_con_un_segmento_las_columnas_son_vistas_del_archivo(database):
+    with contextlib.redirect_stdout(io.StringIO()):
+        # La primera carga lee el CSV y escribe la caché; la segunda mapea el almacén
+        assert Programa.cargar_ejecutar_documentacion(None) is not None
+        df_maestro = Programa.cargar_ejecutar_documentacion(None)
+    for col in metadatos(database)["numericas"]["columnas"]:
+        mapa = memmap_de(df_maestro[col].to_numpy())
+        assert mapa is not None and mapa.filename.endswith(os.path.join("0000", f"{col}.npy"))
+
+
+def test_compacta_al_superar_el_maximo_de_segmentos(database, monkeypatch):
+    monkeypatch.setattr(Programa, "SEGMENTOS_NUMERICOS_MAXIMOS", 2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert Programa.cargar_ejecutar_documentacion(None) is not None
+        for id_venta, fecha in ((1001, "2024-07-15"), (1002, "2024-08-03")):
+            agregar_venta(database, id_venta, fecha)
+            assert Programa.actualizar_tabla_incremental(database) is not None
+    numericas = metadatos(database)["numericas"]
+    # La segunda actualización deja 3 segmentos (0000-0002) y se compactan en 0003
+    assert numericas["segmentos"] == [["0003", len(numericas["partes"])]]
+    assert os.listdir(Programa.ruta_almacen_numerico(database)) == ["0003"]
+    columnas = list(numericas["columnas"])
+    obtenido = Programa.abrir_columnas_numericas(database, columnas)
+    esperado = columnas_parquet(database, numericas, [parte for parte, _ in numericas["partes"]], columnas)
+    pd.testing.assert_frame_equal(obtenido.copy(), esperado, check_dtype=False)
+    assert all(memmap_de(obtenido[col].to_numpy()) is not None for col in columnas)
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+import time
+
+from conftest import RAIZ
+
+NOTEBOOKS = os.path.join(RAIZ, "notebooks")
+# Módulos que no deben cargarse solo por abrir el menú
+MODULOS_PESADOS = ("pandas", "numpy", "matplotlib", "seaborn", "scipy", "IPython", "pyarrow", "duckdb")
+LIMITE_MS = float(os.environ.get("AURELION_LIMITE_ARRANQUE_MS", "500"))
+
+
+def test_importar_no_carga_modulos_pesados():
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", "import Programa"],
+                         cwd=NOTEBOOKS, capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr
+    pesados = set()
+    for linea in res.stderr.splitlines():
+        # Formato: "import time: <propio us> | <acumulado us> | <módulo>"
+        partes = [p.strip() for p in linea.replace("import time:", "", 1).split("|")]
+        if len(partes) == 3 and partes[1].isdigit() and partes[2].split(".")[0] in MODULOS_PESADOS:
+            pesados.add(partes[2].split(".")[0])
+    assert not pesados
+
+
+def test_menu_aparece_dentro_del_limite():
+    inicio = time.perf_counter()
+    res = subprocess.run([sys.executable, os.path.join(NOTEBOOKS, "Programa.py")],
+                         input="15\n", cwd=NOTEBOOKS, capture_output=True, text=True, timeout=120)
+    sesion_ms = (time.perf_counter() - inicio) * 1000
+    assert res.returncode == 0, res.stderr
+    assert sesion_ms <= LIMITE_MS, f"el menú tardó {sesion_ms:.0f} ms (límite {LIMITE_MS:.0f} ms)"
@@ -0,0 +1,66 @@
+import io
+import contextlib
+
+import pytest
+
+import Programa
+
+pytest.importorskip("duckdb")
+
+FILTROS = {
+    "sin_filtro": None,
+    "rango_vacio": dict(desde="2030-01-01", hasta="2030-12-31"),
+    "una_ciudad": dict(ciudades=["Cordoba"]),
+    "un_mes_dos_ciudades": dict(desde="2024-03-01", hasta="2024-03-31", ciudades=["Rio Cuarto", "Villa Maria"]),
+}
+
+COMPARACIONES = {
+    "8_estadisticos": Programa.resultados_estadisticos_generales,
+    "9_medios_pago": Programa.medios_pago_conteo_porcentaje,
+    "10_correlaciones": Programa.matriz_correlaciones,
+    "11_outliers_exactos": lambda df: Programa.deteccion_outliers(df, modo="exacto"),
+    "clientes": lambda df: Programa.analisis_clientes(df),
+}
+
+
+def ejecutar(funcion, df):
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = funcion(df)
+    Programa.plt.close("all")
+    return resultado
+
+
+@pytest.fixture
+def tablas(database, request):
+    """(df_maestro en memoria, TablaSQL) con el mismo filtro"""
+    argumentos = FILTROS[request.param]
+    filtro = Programa.FiltroTabla(**argumentos) if argumentos else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_maestro = Programa.cargar_ejecutar_documentacion(None, filtro=filtro)
+    assert df_maestro is not None
+    return df_maestro, Programa.TablaSQL(database, filtro=filtro)
+
+
+@pytest.mark.parametrize("tablas", FILTROS, indirect=True)
+@pytest.mark.parametrize("opcion", COMPARACIONES)
+def test_duckdb_igual_a_pandas(tablas, opcion):
+    df_maestro, tabla = tablas
+    esperado = ejecutar(COMPARACIONES[opcion], df_maestro)
+    obtenido = ejecutar(COMPARACIONES[opcion], tabla)
+    if esperado is None:
+        assert obtenido is None
+        return
+    if opcion == "clientes":
+        esperado, obtenido = esperado.set_index("id_cliente"), obtenido.set_index("id_cliente")
+    assert Programa.diferencias_resultados(esperado, obtenido) == []
+
+
+def test_outliers_sql_sin_valores(database):
+    """Límites NaN (columna sin valores no nulos): ningún outlier, sin consultar con NaN"""
+    tabla = Programa.TablaSQL(database, filtro=Programa.FiltroTabla(ciudades=["Cordoba"]))
+    resultados, filas = Programa.outliers_iqr_sql(tabla, ["importe", "cantidad"])
+    assert filas == 65
+    vacia = Programa.TablaSQL(database, filtro=Programa.FiltroTabla(desde="2030-01-01"))
+    resultados, filas = Programa.outliers_iqr_sql(vacia, ["importe"])
+    assert filas == 0
+    assert resultados["importe"]["outliers"] == 0
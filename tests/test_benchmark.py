@@ -0,0 +1,113 @@
+import io
+import json
+import os
+import contextlib
+
+import pandas as pd
+import pytest
+
+import Programa
+import benchmark
+from conftest import RAIZ
+
+NOMBRES = ("clientes", "productos", "ventas", "detalle_ventas")
+
+
+def en_silencio(funcion, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return funcion(*args, **kwargs)
+
+
+def test_generador_determinista():
+    primera = benchmark.generar_base_sintetica(5000)
+    segunda = benchmark.generar_base_sintetica(5000)
+    for a, b in zip(primera, segunda):
+        pd.testing.assert_frame_equal(a, b)
+    otra = benchmark.generar_base_sintetica(5000, semilla=7)
+    assert not primera[3].equals(otra[3])
+
+
+def test_mismo_esquema_que_database():
+    generadas = dict(zip(NOMBRES, benchmark.generar_base_sintetica(5000)))
+    for nombre in NOMBRES:
+        original = pd.read_excel(os.path.join(RAIZ, "database", f"{nombre}.xlsx"), nrows=5)
+        assert list(generadas[nombre].columns) == list(original.columns), nombre
+        for col in original.columns:
+            assert generadas[nombre][col].dtype.kind == original[col].dtype.kind or (
+                original[col].dtype.kind in "OT" and generadas[nombre][col].dtype.kind in "OT"), (nombre, col)
+
+
+@pytest.mark.parametrize("lineas", [1, 7, 5000])
+def test_lineas_y_claves(lineas):
+    clientes, productos, ventas, detalle = benchmark.generar_base_sintetica(lineas)
+    assert len(detalle) == lineas
+    assert ventas["id_venta"].tolist() == list(range(1, len(ventas) + 1))
+    por_venta = detalle.groupby("id_venta").size()
+    assert por_venta.index.tolist() == ventas["id_venta"].tolist()
+    assert por_venta.between(1, 5).all()
+    assert detalle["id_producto"].isin(productos["id_producto"]).all()
+    assert ventas["id_cliente"].isin(clientes["id_cliente"]).all()
+    assert clientes["id_cliente"].is_unique and productos["id_producto"].is_unique
+    # El nombre y el precio de cada línea son los del producto
+    unidas = detalle.merge(productos, on="id_producto", suffixes=("", "_producto"))
+    assert (unidas["nombre_producto"] == unidas["nombre_producto_producto"]).all()
+    assert (unidas["precio_unitario"] == unidas["precio_unitario_producto"]).all()
+
+
+def test_proporciones_como_database():
+    _, _, ventas, detalle = benchmark.generar_base_sintetica(200_000)
+    nulos = detalle["importe"].isna().mean()
+    assert nulos == pytest.approx(benchmark.TASA_IMPORTE_NULO, abs=0.002)
+    completos = detalle.dropna(subset=["importe"])
+    assert (completos["importe"] == completos["cantidad"] * completos["precio_unitario"]).all()
+    frecuencias = ventas["medio_pago"].value_counts(normalize=True)
+    for medio, proporcion in benchmark.MEDIOS_PAGO.items():
+        assert frecuencias[medio] == pytest.approx(proporcion, abs=0.01)
+
+
+def test_escribir_base_igual_a_reconstruccion_pandas(tmp_path, monkeypatch):
+    # Bloques chicos: la tabla se genera y agrega al CSV en varias partes
+    monkeypatch.setattr(benchmark, "LINEAS_POR_BLOQUE", 1000)
+    directorio = str(tmp_path / "sintetica")
+    en_silencio(benchmark.escribir_base_sintetica, directorio, 3500)
+    clientes, productos, ventas, detalle = (pd.read_excel(os.path.join(directorio, f"{n}.xlsx")) for n in NOMBRES)
+    assert len(detalle) == 3500 and ventas["id_venta"].is_unique
+    assert detalle["importe"].isna().any()
+    productos["categoria_corregida"] = productos["nombre_producto"].apply(benchmark.corregir_categoria_original)
+    detalle["importe"] = benchmark.imputar_importes_original(detalle)
+    esperado = benchmark.unir_tablas_original(clientes, productos, ventas, detalle)
+
+    obtenido = pd.read_csv(os.path.join(directorio, "tabla_unificada.csv"))
+    esperado = pd.read_csv(io.StringIO(esperado[obtenido.columns].to_csv(index=False)))
+    pd.testing.assert_frame_equal(obtenido, esperado, check_dtype=False)
+
+    monkeypatch.setenv("AURELION_DATABASE_DIR", directorio)
+    df_maestro = en_silencio(Programa.cargar_ejecutar_documentacion, None)
+    assert df_maestro is not None and len(df_maestro) == 3500
+
+
+def test_escribir_base_sin_excel(tmp_path):
+    directorio = str(tmp_path / "sintetica")
+    en_silencio(benchmark.escribir_base_sintetica, directorio, 500, excel=False)
+    assert not [a for a in os.listdir(directorio) if a.endswith(".xlsx")]
+    assert len(pd.read_csv(os.path.join(directorio, "tabla_unificada.csv"))) == 500
+
+
+def test_benchmark_etapas_guardar_y_comparar(tmp_path, monkeypatch):
+    monkeypatch.delenv("AURELION_DATABASE_DIR", raising=False)
+    registro = en_silencio(benchmark.benchmark_etapas, 1500, str(tmp_path / "base"))
+    etapas = [e["etapa"] for e in registro]
+    assert {"generar base", "opción 6 desde Excel", "opción 6 desde CSV", "opción 6 desde Parquet",
+            "8 estadísticos generales", "analisis_clientes"} <= set(etapas)
+    assert all(e["segundos"] >= 0 and e["pico_mb"] >= 0 for e in registro)
+    assert "AURELION_DATABASE_DIR" not in os.environ
+
+    ruta = str(tmp_path / "base.json")
+    en_silencio(benchmark.guardar_resultados, ruta, 1500, registro)
+    with open(ruta, encoding="utf-8") as f:
+        guardado = json.load(f)
+    assert guardado["lineas"] == 1500 and guardado["etapas"] == registro
+    assert en_silencio(benchmark.comparar_resultados, ruta, registro) == []
+    # Una etapa que tarda el triple se informa como regresión
+    lenta = [dict(e, segundos=e["segundos"] * 3 + 1) if e["etapa"] == "opción 6 desde CSV" else e for e in registro]
+    assert en_silencio(benchmark.comparar_resultados, ruta, lenta) == ["opción 6 desde CSV"]
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+import Programa
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def cache_vencida(database, df_maestro):
+    """Caché columnar guardada y luego vencida por un cambio en productos.xlsx"""
+    Programa.guardar_cache_columnar(df_maestro, database)
+    ruta = os.path.join(database, "productos.xlsx")
+    estado = os.stat(ruta)
+    os.utime(ruta, (estado.st_atime, estado.st_mtime + 60))
+    return database
+
+
+@pytest.mark.parametrize("motor", ["bloques", "sql"])
+def test_cache_vencida_se_avisa_una_vez_por_tabla(cache_vencida, motor, capsys):
+    if motor == "sql":
+        pytest.importorskip("duckdb")
+        tabla = Programa.TablaSQL(cache_vencida)
+    else:
+        tabla = Programa.TablaPorBloques(cache_vencida)
+    capsys.readouterr()
+    for filtro in (None, Programa.FiltroTabla(desde="2024-03-01"), Programa.FiltroTabla(ciudades=["Cordoba"])):
+        filtrada = Programa.filtrar_tabla(tabla, filtro)
+        assert not filtrada.empty
+        Programa.conteo_valores(filtrada, "medio_pago")
+    avisos = [linea for linea in capsys.readouterr().out.splitlines() if linea.startswith("♻️")]
+    assert len(avisos) == 1
+    assert "opción 6" in avisos[0] and "se regenerará" not in avisos[0]
@@ -0,0 +1,26 @@
+import io
+import contextlib
+
+import Programa
+
+
+def memoizar_dos_veces(monkeypatch, df_maestro, traza):
+    monkeypatch.setattr(Programa, "CACHE_RESULTADOS", Programa.CacheResultados())
+    monkeypatch.setattr(Programa, "TRAZA", traza)
+    llamadas = []
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        for _ in range(2):
+            resultado = Programa.memoizar(df_maestro, "prueba", lambda: llamadas.append(1) or 42)
+    assert resultado == 42
+    assert len(llamadas) == 1
+    return salida.getvalue()
+
+
+def test_acierto_silencioso_sin_traza(monkeypatch, df_maestro):
+    assert "⚡" not in memoizar_dos_veces(monkeypatch, df_maestro, None)
+
+
+def test_acierto_visible_con_traza(monkeypatch, df_maestro, tmp_path):
+    traza = Programa.Traza(str(tmp_path / "traza.jsonl"))
+    assert "⚡ Resultado reutilizado de la caché: prueba" in memoizar_dos_veces(monkeypatch, df_maestro, traza)
@@ -0,0 +1,135 @@
+import io
+import os
+import contextlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Programa
+
+TEXTOS = ["nombre_producto", "categoria_corregida", "medio_pago", "ciudad", "nombre_cliente", "email"]
+ENTEROS = ["id_venta", "id_producto", "cantidad", "precio_unitario", "precio_unitario_producto", "id_cliente"]
+REGLAS = {regla["nombre"]: regla for regla in Programa.REGLAS_CALIDAD}
+
+
+@pytest.fixture
+def sucia(df_maestro):
+    """df_maestro con al menos una violación de cada regla, en textos y enteros con nulos"""
+    df = df_maestro.copy()
+    df[TEXTOS] = df[TEXTOS].astype(object)
+    df[ENTEROS] = df[ENTEROS].astype("Int32")
+    df.loc[0, "id_cliente"] = pd.NA
+    df.loc[1, "cantidad"] = 0
+    df.loc[2, "precio_unitario"] = 0
+    df.loc[3, "importe"] = df.loc[3, "cantidad"] * df.loc[3, "precio_unitario"] + 5
+    df.loc[4, "precio_unitario_producto"] += 1
+    df.loc[5, ["categoria_corregida", "precio_unitario_producto"]] = [None, pd.NA]
+    df.loc[6, ["fecha", "medio_pago"]] = [pd.NaT, None]
+    df.loc[7, ["nombre_cliente", "email", "ciudad"]] = None
+    df.loc[8, "email"] = "sin-arroba.com"
+    df.loc[9, "medio_pago"] = "cheque"
+    df.loc[10, "fecha_alta"] = df.loc[10, "fecha"] + pd.Timedelta(days=30)
+    return df
+
+
+def violaciones_pandas(df):
+    """Cada regla escrita como una condición de pandas, fila por fila"""
+    huerfanas = lambda columnas: df[columnas].isna().all(axis=1)
+    email = df["email"].astype("string")
+    medio = df["medio_pago"].astype("string")
+    return {
+        "claves_no_nulas": df[["id_venta", "id_producto", "id_cliente", "fecha"]].isna().any(axis=1),
+        "importe_no_nulo": df["importe"].isna(),
+        "cantidad_positiva": (df["cantidad"] < 1).fillna(False),
+        "precio_positivo": (df["precio_unitario"] < 1).fillna(False),
+        "importe_calculado": ((df["importe"] - df["cantidad"] * df["precio_unitario"]).abs() > 0.01).fillna(False),
+        "precio_de_catalogo": (df["precio_unitario"] != df["precio_unitario_producto"]).fillna(False)
+                              & df["precio_unitario"].notna() & df["precio_unitario_producto"].notna(),
+        "producto_existente": df["id_producto"].notna() & huerfanas(["categoria_corregida", "precio_unitario_producto"]),
+        "venta_existente": df["id_venta"].notna() & huerfanas(["fecha", "medio_pago"]),
+        "cliente_existente": df["id_cliente"].notna() & huerfanas(["nombre_cliente", "email", "ciudad"]),
+        "email_valido": email.notna() & ~email.str.fullmatch(REGLAS["email_valido"]["patron"]).fillna(True),
+        "medio_pago_conocido": medio.notna() & ~medio.isin(REGLAS["medio_pago_conocido"]["valores"]).fillna(True),
+        "alta_antes_de_compra": (df["fecha_alta"] > df["fecha"]).fillna(False),
+    }
+
+
+def en_silencio(funcion, *args):
+    with contextlib.redirect_stdout(io.StringIO()) as salida:
+        resultado = funcion(*args)
+    return resultado, salida.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def sin_cache(monkeypatch):
+    monkeypatch.setattr(Programa, "CACHE_RESULTADOS", None)
+    monkeypatch.delenv("AURELION_BACKEND", raising=False)
+    monkeypatch.delenv("AURELION_STREAMING", raising=False)
+
+
+@pytest.mark.parametrize("nombre", list(REGLAS))
+def test_mascara_igual_a_pandas(sucia, nombre):
+    esperado = violaciones_pandas(sucia)[nombre].to_numpy(dtype=bool)
+    assert esperado.any()
+    np.testing.assert_array_equal(Programa.mascara_regla(sucia, REGLAS[nombre]), esperado)
+
+
+@pytest.mark.parametrize("nombre", ["email_valido", "medio_pago_conocido", "cliente_existente", "venta_existente"])
+def test_categorias_igual_que_textos(sucia, nombre):
+    # En una category la condición se evalúa por categoría y se expande con los códigos
+    categorica = sucia.astype({c: "category" for c in TEXTOS})
+    np.testing.assert_array_equal(Programa.mascara_regla(categorica, REGLAS[nombre]),
+                                  Programa.mascara_regla(sucia, REGLAS[nombre]))
+
+
+def test_reporte_cuenta_y_ejemplos(sucia):
+    reporte, _ = en_silencio(Programa.calidad_datos, sucia)
+    assert list(reporte.index) == list(REGLAS)
+    for nombre, mascara in violaciones_pandas(sucia).items():
+        assert reporte.loc[nombre, "violaciones"] == mascara.sum(), nombre
+        assert reporte.loc[nombre, "porcentaje"] == round(mascara.mean() * 100, 3)
+        ejemplos = sucia.loc[mascara, "id_venta"].head(Programa.EJEMPLOS_CALIDAD)
+        assert reporte.loc[nombre, "ejemplos_id_venta"] == ", ".join(str(i) for i in ejemplos)
+
+
+def test_tabla_original_solo_importes_nulos(df_maestro):
+    reporte, _ = en_silencio(Programa.calidad_datos, df_maestro)
+    violadas = reporte[reporte["violaciones"] > 0]
+    assert list(violadas.index) == ["importe_no_nulo"]
+    assert violadas.loc["importe_no_nulo", "violaciones"] == df_maestro["importe"].isna().sum()
+
+
+def test_reglas_sin_columnas_se_omiten(df_maestro):
+    reporte, _ = en_silencio(Programa.calidad_datos, df_maestro.drop(columns=["email", "fecha_alta"]))
+    omitidas = {"email_valido", "cliente_existente", "alta_antes_de_compra"}
+    assert list(reporte.index) == [nombre for nombre in REGLAS if nombre not in omitidas]
+
+
+def test_por_bloques_igual_que_en_memoria(sucia, database):
+    sucia.to_csv(os.path.join(database, "tabla_unificada.csv"), index=False)
+    tabla = Programa.TablaPorBloques(database, tamano_bloque=37)
+    por_bloques, _ = en_silencio(Programa.calidad_datos, tabla)
+    en_memoria, _ = en_silencio(Programa.calidad_datos, sucia)
+    pd.testing.assert_frame_equal(por_bloques, en_memoria)
+
+
+def test_validar_al_cargar(df_maestro, monkeypatch):
+    _, salida = en_silencio(Programa.validar_al_cargar, df_maestro)
+    assert "1 de 12 reglas con violaciones" in salida and "importe_no_nulo" in salida
+    assert "cantidad_positiva" not in salida
+    monkeypatch.setenv("AURELION_CALIDAD", "0")
+    assert en_silencio(Programa.validar_al_cargar, df_maestro)[1] == ""
+
+
+def test_subcomando_calidad(database, df_maestro, tmp_path):
+    salida = tmp_path / "calidad.csv"
+    codigo, texto = en_silencio(Programa.cli, ["calidad", "--salida", str(salida)])
+    assert codigo == 1 and "importe_no_nulo" in texto
+    guardado = pd.read_csv(salida, index_col="regla")
+    assert guardado.loc["importe_no_nulo", "violaciones"] == df_maestro["importe"].isna().sum()
+    # Sin importes nulos ninguna regla tiene violaciones
+    completa = df_maestro.dropna(subset=["importe"])
+    completa.to_csv(os.path.join(database, "tabla_unificada.csv"), index=False)
+    codigo, texto = en_silencio(Programa.cli, ["calidad"])
+    assert codigo == 0 and "0 de 12 reglas con violaciones" in texto
@@ -0,0 +1,119 @@
+import io
+import contextlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Programa
+
+FILAS = 100_000
+
+DISTRIBUCIONES = {
+    "normal": lambda rng: rng.normal(1000, 250, FILAS),
+    "lognormal": lambda rng: rng.lognormal(7, 1, FILAS),
+    "enteros_repetidos": lambda rng: rng.integers(1, 6, FILAS).astype("float64"),
+    "ordenados": lambda rng: np.arange(FILAS, dtype="float64"),
+}
+
+CUANTILES = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+def rango_real(ordenados, valor):
+    """Posiciones [primera, última] que ocupa `valor` entre los datos ordenados"""
+    return np.searchsorted(ordenados, valor, "left"), np.searchsorted(ordenados, valor, "right")
+
+
+def assert_rango_dentro_del_error(sketch, ordenados):
+    error = sketch.error_rango() * len(ordenados)
+    for q in CUANTILES:
+        inferior, superior = rango_real(ordenados, sketch.cuantil(q))
+        assert inferior - error <= q * len(ordenados) <= superior + error, q
+
+
+@pytest.fixture(params=DISTRIBUCIONES)
+def valores(request):
+    return DISTRIBUCIONES[request.param](np.random.default_rng(7))
+
+
+def test_rango_de_los_cuantiles_dentro_del_error(valores):
+    sketch = Programa.SketchCuantiles(semilla=0)
+    sketch.actualizar(valores)
+    assert sketch.n == FILAS
+    assert_rango_dentro_del_error(sketch, np.sort(valores))
+
+
+def test_conteos_dentro_del_error(valores):
+    sketch = Programa.SketchCuantiles(semilla=0)
+    sketch.actualizar(valores)
+    error = sketch.error_rango() * FILAS
+    for x in np.quantile(valores, (0.05, 0.5, 0.95)):
+        assert abs(sketch.contar_menores(x) - np.count_nonzero(valores < x)) <= error
+        assert abs(sketch.contar_mayores(x) - np.count_nonzero(valores > x)) <= error
+
+
+def test_memoria_acotada_por_k(valores):
+    sketch = Programa.SketchCuantiles(k=200, semilla=0)
+    for bloque in np.array_split(valores, 50):
+        sketch.actualizar(bloque)
+    guardados = sum(len(nivel) for nivel in sketch.niveles)
+    assert guardados <= 3 * sketch.k + len(sketch.niveles)
+    # Los pesos suman las filas: la compactación no pierde ni duplica peso
+    _, pesos = sketch.valores_ponderados()
+    assert pesos.sum() == FILAS
+
+
+def test_combinar_bloques_igual_de_preciso(valores):
+    combinado = Programa.SketchCuantiles(semilla=0)
+    for i, bloque in enumerate(np.array_split(valores, 8)):
+        parcial = Programa.SketchCuantiles(semilla=i)
+        parcial.actualizar(bloque)
+        combinado.combinar(parcial)
+    assert combinado.n == FILAS
+    assert combinado.valores_ponderados()[1].sum() == FILAS
+    assert_rango_dentro_del_error(combinado, np.sort(valores))
+
+
+def test_ignora_nulos_y_pocos_valores_son_exactos():
+    sketch = Programa.SketchCuantiles(semilla=0)
+    sketch.actualizar([np.nan, 3.0, 1.0, np.nan, 2.0])
+    assert sketch.n == 3
+    assert [sketch.cuantil(q) for q in (0.0, 0.5, 1.0)] == [1.0, 2.0, 3.0]
+    assert sketch.contar_menores(2.0) == 1 and sketch.contar_mayores(2.0) == 1
+
+
+def test_outliers_aproximados_cerca_de_los_exactos(df_maestro):
+    exactos, filas = Programa.outliers_iqr_exactos(df_maestro, Programa.VARIABLES_NUMERICAS)
+    aproximados, filas_aproximadas = Programa.outliers_iqr_aproximados(df_maestro, Programa.VARIABLES_NUMERICAS)
+    assert filas == filas_aproximadas == len(df_maestro)
+    for var in Programa.VARIABLES_NUMERICAS:
+        ordenados = np.sort(df_maestro[var].dropna().to_numpy(dtype="float64"))
+        error = aproximados[var]["error_rango"] * len(ordenados)
+        for etiqueta, q in (("Q1", 0.25), ("Q3", 0.75)):
+            inferior, superior = rango_real(ordenados, aproximados[var][etiqueta])
+            assert inferior - error <= q * len(ordenados) <= superior + error, (var, etiqueta)
+        # Límites dentro del rango de error: el conteo difiere a lo sumo en el error de cada cola y de cada límite
+        assert abs(aproximados[var]["outliers"] - exactos[var]["outliers"]) <= 4 * error + 2
+
+
+def test_outliers_aproximados_con_muchas_filas():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({var: rng.lognormal(5, 0.8, FILAS) for var in Programa.VARIABLES_NUMERICAS})
+    aproximados, _ = Programa.outliers_iqr_aproximados(df, Programa.VARIABLES_NUMERICAS)
+    for var in Programa.VARIABLES_NUMERICAS:
+        serie = df[var]
+        Q1, Q3 = serie.quantile(0.25), serie.quantile(0.75)
+        IQR = Q3 - Q1
+        exactos = int(((serie < Q1 - 1.5 * IQR) | (serie > Q3 + 1.5 * IQR)).sum())
+        assert abs(aproximados[var]["outliers"] - exactos) <= 4 * aproximados[var]["error_rango"] * FILAS
+
+
+def test_modo_comparar_devuelve_los_exactos(df_maestro):
+    with contextlib.redirect_stdout(io.StringIO()) as salida:
+        comparado = Programa.deteccion_outliers(df_maestro, modo="comparar")
+        exacto = Programa.deteccion_outliers(df_maestro, modo="exacto")
+        invalido = Programa.deteccion_outliers(df_maestro, modo="otro")
+    pd.testing.assert_frame_equal(comparado, exacto)
+    assert invalido is None
+    assert "Aproximado (KLL)" in salida.getvalue()
+    assert "Modo de cuantiles desconocido" in salida.getvalue()
@@ -0,0 +1,85 @@
+import io
+import os
+import contextlib
+
+import pandas as pd
+import pytest
+
+import Programa
+
+pytest.importorskip("pyarrow")
+
+AGRUPACIONES = [["medio_pago"], ["mes", "ciudad"], ["mes", "categoria_corregida", "medio_pago"]]
+
+
+@pytest.fixture
+def cargada(database):
+    """df_maestro de la opción 6 (que guarda la caché y el cubo) y el cubo vigente"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_maestro = Programa.cargar_ejecutar_documentacion(None)
+    abierto = Programa.cubo_para(df_maestro)
+    assert abierto is not None
+    return df_maestro, abierto[0]
+
+
+def filtro_de(caso, df_maestro):
+    if caso == "sin_filtro":
+        return None
+    if caso == "primer_mes_y_ciudad":
+        inicio = df_maestro["fecha"].min()
+        return Programa.FiltroTabla(inicio, inicio + pd.Timedelta(days=30),
+                                    [str(df_maestro["ciudad"].value_counts().idxmax())])
+    return Programa.FiltroTabla("2024-03-01", "2024-04-15", ["Cordoba", "Villa Maria"])
+
+
+CASOS = ["sin_filtro", "primer_mes_y_ciudad", "mes_y_medio_dos_ciudades"]
+
+
+@pytest.mark.parametrize("caso", CASOS)
+@pytest.mark.parametrize("columna", Programa.DIMENSIONES_CUBO[1:])
+def test_conteo_desde_cubo(cargada, caso, columna):
+    df_maestro, cubo = cargada
+    filtro = filtro_de(caso, df_maestro)
+    tabla = filtro.aplicar(df_maestro) if filtro is not None else df_maestro
+    obtenido = Programa.conteo_desde_cubo(cubo, filtro, columna, tabla[columna].dtype)
+    assert Programa.diferencias_resultados(tabla[columna].value_counts(), obtenido) == []
+
+
+@pytest.mark.parametrize("caso", CASOS)
+@pytest.mark.parametrize("agrupar", AGRUPACIONES, ids=lambda a: "+".join(a))
+def test_resumen_desde_cubo(cargada, caso, agrupar):
+    df_maestro, cubo = cargada
+    filtro = filtro_de(caso, df_maestro)
+    tabla = filtro.aplicar(df_maestro) if filtro is not None else df_maestro
+    esperado = Programa.resumen_lineas(tabla, agrupar)
+    assert Programa.diferencias_resultados(esperado, Programa.resumen_cubo(cubo, filtro, agrupar)) == []
+
+
+def agregar_lineas(database, lineas):
+    """Copias de líneas de detalle_ventas.xlsx (por id_producto) al final del Excel, con otro id_venta"""
+    ruta = os.path.join(database, "detalle_ventas.xlsx")
+    detalle = pd.read_excel(ruta)
+    nuevas = [detalle[detalle["id_producto"] == id_producto].head(1).assign(id_venta=id_venta)
+              for id_venta, id_producto in lineas]
+    pd.concat([detalle] + nuevas).to_excel(ruta, index=False)
+
+
+def test_actualizar_con_lineas_de_una_venta_existente(cargada, database):
+    df_maestro, _ = cargada
+    id_venta = int(df_maestro["id_venta"].iloc[0])
+    venta = df_maestro[df_maestro["id_venta"] == id_venta]
+    # Una línea de una categoría que la venta ya tenía y otra de una que no
+    misma = int(venta["id_producto"].iloc[0])
+    otra = int(df_maestro.loc[~df_maestro["categoria_corregida"].isin(venta["categoria_corregida"]), "id_producto"].iloc[0])
+    with contextlib.redirect_stdout(io.StringIO()):
+        # La primera actualización solo registra hasta dónde llegan los Excel
+        assert Programa.actualizar_tabla_incremental(database) == 0
+        agregar_lineas(database, [(id_venta, misma), (id_venta, otra)])
+        assert Programa.actualizar_tabla_incremental(database) == 2
+        df_maestro = Programa.cargar_ejecutar_documentacion(None)
+    assert len(df_maestro[df_maestro["id_venta"] == id_venta]) == len(venta) + 2
+    abierto = Programa.cubo_para(df_maestro)
+    assert abierto is not None
+    for agrupar in AGRUPACIONES + [["fecha", "ciudad", "medio_pago"], ["categoria_corregida"]]:
+        esperado = Programa.resumen_lineas(df_maestro, agrupar)
+        assert Programa.diferencias_resultados(esperado, Programa.resumen_cubo(abierto[0], None, agrupar)) == []
@@ -0,0 +1,52 @@
+import io
+import contextlib
+
+import numpy as np
+import pytest
+
+import Programa
+
+PARTES = 4
+
+
+def trozos(df):
+    return np.array_split(np.arange(len(df)), PARTES)
+
+
+@pytest.mark.parametrize("nombre", Programa.COLUMNAS_CARDINALIDAD)
+def test_hyperloglog_cerca_del_exacto(df_maestro, nombre):
+    columna = df_maestro[Programa.COLUMNAS_CARDINALIDAD[nombre]]
+    exacto = columna.nunique()
+    completo = Programa.SketchDistintos()
+    completo.actualizar(columna)
+    tolerancia = 3 * completo.error_estandar() * exacto + 1
+    assert abs(completo.estimar() - exacto) <= tolerancia
+    
+    combinado = Programa.SketchDistintos()
+    for trozo in trozos(df_maestro):
+        parcial = Programa.SketchDistintos()
+        parcial.actualizar(columna.iloc[trozo])
+        combinado.combinar(parcial)
+    assert np.array_equal(completo.registros, combinado.registros)
+    
+    # Límite chico para forzar el paso de hashes exactos a HyperLogLog a mitad de camino
+    contadores = [Programa.ContadorDistintos("auto", limite=max(exacto // 3, 1)) for _ in range(PARTES)]
+    for contador, trozo in zip(contadores, trozos(df_maestro)):
+        contador.actualizar(columna.iloc[trozo])
+    for contador in contadores[1:]:
+        contadores[0].combinar(contador)
+    assert abs(contadores[0].estimar() - exacto) <= tolerancia
+
+
+@pytest.mark.parametrize("modo", ["exacto", "aproximado"])
+def test_compras_por_cliente_por_bloques(database, df_maestro, modo):
+    esperado = Programa.metricas_clientes(df_maestro).set_index("id_cliente")["compras"]
+    tabla = Programa.TablaPorBloques(database, tamano_bloque=len(df_maestro) // PARTES + 1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        obtenido = Programa.metricas_clientes_por_bloques(tabla, modo).set_index("id_cliente")["compras"]
+    diferencia = (obtenido.reindex(esperado.index) - esperado).abs()
+    if modo == "exacto":
+        assert diferencia.max() == 0
+    else:
+        # Cada cliente tiene su propio error: se exige el error relativo medio, no el peor
+        assert (diferencia / esperado).mean() <= Programa.SketchDistintosPorGrupo().error_estandar()
@@ -0,0 +1,76 @@
+import io
+import contextlib
+
+import pandas as pd
+import pytest
+
+import Programa
+
+
+@pytest.fixture
+def escrito(tmp_path, df_maestro):
+    """(ruta, bytes, registro) de tabla_unificada.csv escrita con escribir_csv"""
+    ruta = str(tmp_path / "tabla_unificada.csv")
+    registro = Programa.escribir_csv(df_maestro, ruta)
+    with open(ruta, "rb") as f:
+        return ruta, f.read(), registro
+
+
+def test_igual_a_pandas_y_se_lee_igual(df_maestro, escrito):
+    ruta, contenido, registro = escrito
+    # Puede diferir de to_csv solo en comillas (textos con comas): lo que importa es que se lea igual
+    esperado = df_maestro.to_csv(index=False, lineterminator="\n").encode("utf-8")
+    if not any("," in str(v) for v in df_maestro.select_dtypes(exclude="number").astype(str).to_numpy().ravel()):
+        assert contenido == esperado
+    with contextlib.redirect_stdout(io.StringIO()):
+        leido = Programa.aplicar_esquema(pd.read_csv(ruta, **Programa.argumentos_read_csv(ruta)))
+    # copy(): las columnas mapeadas desde el almacén .npy son memmap y assert_frame_equal compara la clase
+    pd.testing.assert_frame_equal(leido, df_maestro.copy(), check_dtype=False, check_categorical=False)
+    assert registro["filas"] == len(df_maestro)
+    assert Programa.verificar_registro_csv(ruta) is not None
+
+
+@pytest.mark.parametrize("compresion", ["gzip", "zstd"])
+def test_compresion(df_maestro, escrito, compresion):
+    if compresion == "zstd":
+        pytest.importorskip("pyarrow")
+    ruta, contenido, _ = escrito
+    comprimido = ruta + Programa.COMPRESIONES_CSV[compresion]
+    registro = Programa.escribir_csv(df_maestro, comprimido, compresion)
+    if compresion == "gzip":
+        import gzip
+        with gzip.open(comprimido, "rb") as f:
+            descomprimido = f.read()
+    else:
+        with Programa.pa.CompressedInputStream(Programa.pa.OSFile(comprimido), compresion) as f:
+            descomprimido = f.read()
+    assert descomprimido == contenido
+    assert registro["bytes"] < len(contenido)
+    assert Programa.verificar_registro_csv(comprimido) is not None
+
+
+def test_agregar_suma_un_tramo(tmp_path, df_maestro, escrito):
+    _, contenido, _ = escrito
+    ruta = str(tmp_path / "por_tramos.csv")
+    mitad = len(df_maestro) // 2
+    Programa.escribir_csv(df_maestro.iloc[:mitad], ruta)
+    registro = Programa.escribir_csv(df_maestro.iloc[mitad:], ruta, agregar=True)
+    with open(ruta, "rb") as f:
+        assert f.read() == contenido
+    assert registro["filas"] == len(df_maestro)
+    assert len(registro["tramos"]) == 2
+    assert Programa.verificar_registro_csv(ruta) is not None
+
+
+@pytest.mark.parametrize("cambio", ["modificado", "truncado"])
+def test_csv_alterado_deja_de_ser_confiable(escrito, cambio):
+    ruta, contenido, _ = escrito
+    with open(ruta, "r+b") as f:
+        if cambio == "modificado":
+            f.seek(len(contenido) // 2)
+            f.write(b"#")
+        else:
+            f.truncate(len(contenido) - 1)
+    Programa.VERIFICACIONES_CSV.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert Programa.verificar_registro_csv(ruta) is None
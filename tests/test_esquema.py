@@ -0,0 +1,60 @@
+import io
+import os
+import contextlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Programa
+
+
+@pytest.fixture
+def crudo(database):
+    """tabla_unificada.csv leída como antes del esquema compacto"""
+    return pd.read_csv(os.path.join(database, "tabla_unificada.csv"))
+
+
+def test_esquema_conserva_los_valores(df_maestro, crudo):
+    for col, tipo in Programa.ESQUEMA_TABLA_UNIFICADA.items():
+        assert str(df_maestro[col].dtype) == tipo
+        if tipo == "category":
+            pd.testing.assert_series_equal(df_maestro[col].astype(object), crudo[col].astype(object))
+        elif tipo.startswith("datetime"):
+            pd.testing.assert_series_equal(df_maestro[col], pd.to_datetime(crudo[col]).astype(tipo))
+        else:
+            assert np.array_equal(df_maestro[col].to_numpy(dtype="float64"), crudo[col].to_numpy(dtype="float64"),
+                                  equal_nan=True)
+    assert Programa.memoria_bytes(df_maestro) < Programa.memoria_bytes(crudo)
+
+
+def test_enteros_con_nulos_o_fuera_de_rango(crudo, capsys):
+    crudo = crudo.astype({"id_cliente": "float64"})
+    crudo.loc[0, "id_cliente"] = np.nan
+    crudo.loc[1, "cantidad"] = 40_000
+    df = Programa.aplicar_esquema(crudo)
+    assert str(df["id_cliente"].dtype) == "Int32" and df["id_cliente"].isna().sum() == 1
+    assert str(df["cantidad"].dtype) == "int64" and df.loc[1, "cantidad"] == 40_000
+    assert "'cantidad' no entra en int16" in capsys.readouterr().out
+
+
+def test_memoria_sin_esquema_sin_releer_el_csv(database, crudo):
+    ruta = os.path.join(database, "tabla_unificada.csv")
+    tipado = pd.read_csv(ruta, **Programa.argumentos_read_csv(ruta))
+    assert Programa.estimar_memoria_sin_esquema(tipado) == pytest.approx(Programa.memoria_bytes(crudo), rel=0.01)
+
+
+def test_la_carga_lee_el_csv_una_vez(database, monkeypatch):
+    lecturas = []
+    read_csv = pd.read_csv
+    
+    def contar(ruta, *args, **kwargs):
+        if kwargs.get("nrows") != 0:
+            lecturas.append(ruta)
+        return read_csv(ruta, *args, **kwargs)
+    
+    monkeypatch.setattr(pd, "read_csv", contar)
+    monkeypatch.setattr(Programa, "pyarrow_disponible", lambda: False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert Programa.cargar_ejecutar_documentacion(None) is not None
+    assert lecturas == [os.path.join(database, "tabla_unificada.csv")]
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import Programa
+
+stats = pytest.importorskip("scipy.stats")
+cbook = pytest.importorskip("matplotlib.cbook")
+
+
+def tabla_sintetica(filas=20_000):
+    """Importes con cola larga y algunos nulos, como para los gráficos de la opción 13 y 14"""
+    rng = np.random.default_rng(5)
+    cantidad = rng.integers(1, 6, filas)
+    precio = rng.lognormal(7, 0.6, filas).round(2)
+    importe = cantidad * precio
+    importe[rng.random(filas) < 0.02] = np.nan
+    return pd.DataFrame({
+        "cantidad": cantidad,
+        "precio_unitario": precio,
+        "importe": importe,
+        "medio_pago": pd.Categorical(rng.choice(["efectivo", "qr", "tarjeta", "transferencia"], filas)),
+    })
+
+
+@pytest.fixture(params=["database", "sintetica"])
+def tabla(request, df_maestro):
+    return df_maestro if request.param == "database" else tabla_sintetica()
+
+
+def test_histograma_igual_a_numpy(tabla):
+    datos = Programa.datos_distribucion_importe(tabla)
+    # histplot(bins=30) usa los mismos bordes que np.histogram
+    conteos, bordes = np.histogram(tabla["importe"].dropna().to_numpy(dtype="float64"), bins=30)
+    assert np.array_equal(datos["conteos"], conteos)
+    assert np.allclose(datos["bordes"], bordes)
+
+
+def test_kde_binned_igual_a_gaussian_kde(tabla):
+    datos = Programa.datos_distribucion_importe(tabla)
+    valores = tabla["importe"].dropna().to_numpy(dtype="float64")
+    # Ancho de banda de Scott y escala a conteos por bin, como histplot(kde=True)
+    esperado = stats.gaussian_kde(valores, bw_method="scott")(datos["kde_x"])
+    esperado *= len(valores) * (datos["bordes"][1] - datos["bordes"][0])
+    assert datos["kde_x"][0] == valores.min() and datos["kde_x"][-1] == valores.max()
+    assert np.max(np.abs(datos["kde_y"] - esperado)) <= 0.01 * esperado.max()
+
+
+def test_kde_constante_no_se_dibuja():
+    df = pd.DataFrame({"importe": [5.0, 5.0, 5.0]})
+    datos = Programa.datos_distribucion_importe(df)
+    assert datos["kde_x"] is None and datos["kde_y"] is None
+    assert datos["conteos"].sum() == 3
+
+
+def test_boxplot_igual_a_boxplot_stats(tabla):
+    estadisticos = Programa.datos_boxplot_importe(tabla, max_atipicos=10_000)["estadisticos"]
+    df = tabla[["medio_pago", "importe"]].dropna()
+    assert [e["label"] for e in estadisticos] == [str(m) for m in Programa.orden_categorias(df["medio_pago"])]
+    for e in estadisticos:
+        # Los mismos estadísticos que seaborn.boxplot calcula con matplotlib
+        esperado, = cbook.boxplot_stats(df.loc[df["medio_pago"] == e["label"], "importe"].to_numpy(), whis=1.5)
+        for clave in ("q1", "med", "q3", "whislo", "whishi"):
+            assert e[clave] == pytest.approx(esperado[clave]), (e["label"], clave)
+        assert np.array_equal(np.sort(e["fliers"]), np.sort(esperado["fliers"]))
+
+
+def test_boxplot_limita_los_atipicos_dibujados():
+    estadisticos = Programa.datos_boxplot_importe(tabla_sintetica(), max_atipicos=5)["estadisticos"]
+    assert all(len(e["fliers"]) <= 5 for e in estadisticos)
+    assert any(len(e["fliers"]) == 5 for e in estadisticos)
+
+
+def test_frecuencia_y_correlacion_iguales_a_pandas(tabla):
+    conteo = Programa.datos_frecuencia_medios_pago(tabla)["conteo"]
+    assert conteo.to_dict() == tabla["medio_pago"].value_counts().to_dict()
+    corr = Programa.datos_matriz_correlaciones(tabla)["corr"]
+    pd.testing.assert_frame_equal(corr, tabla[Programa.VARIABLES_NUMERICAS].corr())
+
+
+def test_barras_dibujadas_con_los_conteos(df_maestro):
+    datos = Programa.datos_distribucion_importe(df_maestro)
+    Programa.dibujar_grafico("distribucion_importe", datos)
+    alturas = [barra.get_height() for barra in Programa.plt.gca().patches]
+    Programa.plt.close("all")
+    assert alturas == list(datos["conteos"])
+    with pytest.raises(ValueError):
+        Programa.dibujar_grafico("torta", {})
+
+
+def test_renderizar_en_paralelo_guarda_cada_figura(df_maestro, tmp_path):
+    rutas = Programa.renderizar_graficos_en_paralelo(df_maestro, str(tmp_path))
+    assert sorted(rutas) == sorted(Programa.PREPARADORES_GRAFICOS)
+    for ruta in rutas.values():
+        with open(ruta, "rb") as f:
+            assert f.read(8) == b"\x89PNG\r\n\x1a\n"
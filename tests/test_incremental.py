@@ -0,0 +1,130 @@
+import io
+import os
+import contextlib
+
+import pandas as pd
+import pytest
+
+import Programa
+import benchmark
+
+
+def reconstruccion_pandas(database):
+    """tabla_unificada desde los Excel con la implementación original (apply y merges en cascada)"""
+    clientes, productos, ventas, detalle = (pd.read_excel(os.path.join(database, f"{nombre}.xlsx"))
+                                            for nombre in ("clientes", "productos", "ventas", "detalle_ventas"))
+    productos["categoria_corregida"] = productos["nombre_producto"].apply(benchmark.corregir_categoria_original)
+    detalle["importe"] = benchmark.imputar_importes_original(detalle)
+    return benchmark.unir_tablas_original(clientes, productos, ventas, detalle)
+
+
+def leer_csv(database):
+    return pd.read_csv(os.path.join(database, "tabla_unificada.csv"))
+
+
+def como_csv(df, columnas):
+    """`df` escrito y releído como CSV, para comparar con tabla_unificada.csv"""
+    return pd.read_csv(io.StringIO(df[columnas].to_csv(index=False)))
+
+
+def assert_igual_a_reconstruccion(database):
+    obtenido = leer_csv(database)
+    esperado = como_csv(reconstruccion_pandas(database), obtenido.columns)
+    pd.testing.assert_frame_equal(obtenido, esperado, check_dtype=False)
+
+
+def agregar_a_excel(database, nombre, filas):
+    ruta = os.path.join(database, f"{nombre}.xlsx")
+    pd.concat([pd.read_excel(ruta), pd.DataFrame(filas)], ignore_index=True).to_excel(ruta, index=False)
+
+
+def venta(id_venta, fecha, id_cliente=3, medio_pago="qr"):
+    return {"id_venta": id_venta, "fecha": pd.Timestamp(fecha), "id_cliente": id_cliente,
+            "nombre_cliente": "x", "email": "x", "medio_pago": medio_pago}
+
+
+def linea(id_venta, id_producto, cantidad, precio_unitario, importe):
+    return {"id_venta": id_venta, "id_producto": id_producto, "nombre_producto": "x",
+            "cantidad": cantidad, "precio_unitario": precio_unitario, "importe": importe}
+
+
+def actualizar(database):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Programa.actualizar_tabla_incremental(database)
+
+
+@pytest.fixture
+def reconstruida(database):
+    """database/ con tabla_unificada.csv reconstruida desde los Excel (opción 6 sin CSV)"""
+    os.remove(os.path.join(database, "tabla_unificada.csv"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert Programa.cargar_ejecutar_documentacion(None) is not None
+    assert_igual_a_reconstruccion(database)
+    return database
+
+
+def test_ventas_nuevas_igual_a_reconstruccion_completa(reconstruida):
+    agregar_a_excel(reconstruida, "ventas", [venta(121, "2024-07-01"), venta(122, "2024-07-02", 7, "efectivo")])
+    # Un importe vacío se imputa igual que en la reconstrucción
+    agregar_a_excel(reconstruida, "detalle_ventas", [linea(121, 5, 2, 1500, 3000.0), linea(121, 40, 1, 800, None),
+                                                     linea(122, 12, 3, 250, 750.0)])
+    assert actualizar(reconstruida) == 3
+    assert_igual_a_reconstruccion(reconstruida)
+
+    # Sin cambios en los Excel no se agrega nada
+    assert actualizar(reconstruida) == 0
+
+    # Una segunda tanda, con una línea más de una venta ya unificada
+    agregar_a_excel(reconstruida, "ventas", [venta(123, "2024-07-05", 11)])
+    agregar_a_excel(reconstruida, "detalle_ventas", [linea(123, 1, 1, 900, 900.0), linea(121, 2, 4, 100, None)])
+    assert actualizar(reconstruida) == 2
+    assert_igual_a_reconstruccion(reconstruida)
+
+
+def test_tabla_cargada_igual_a_reconstruccion_completa(reconstruida, tmp_path, monkeypatch):
+    agregar_a_excel(reconstruida, "ventas", [venta(121, "2024-07-01")])
+    agregar_a_excel(reconstruida, "detalle_ventas", [linea(121, 5, 2, 1500, 3000.0)])
+    assert actualizar(reconstruida) == 1
+    with contextlib.redirect_stdout(io.StringIO()):
+        incremental = Programa.cargar_ejecutar_documentacion(None)
+    # La misma base reconstruida de cero en otra carpeta
+    completa = tmp_path / "completa"
+    completa.mkdir()
+    for nombre in ("clientes", "productos", "ventas", "detalle_ventas"):
+        os.link(os.path.join(reconstruida, f"{nombre}.xlsx"), completa / f"{nombre}.xlsx")
+    monkeypatch.setenv("AURELION_DATABASE_DIR", str(completa))
+    with contextlib.redirect_stdout(io.StringIO()):
+        esperado = Programa.cargar_ejecutar_documentacion(None)
+    # Las dos salen de la caché particionada por mes: se comparan en el mismo orden
+    orden = ["fecha", "id_venta", "id_producto"]
+    pd.testing.assert_frame_equal(incremental.sort_values(orden, kind="stable").reset_index(drop=True),
+                                  esperado.sort_values(orden, kind="stable").reset_index(drop=True))
+
+
+def test_primera_actualizacion_sin_estado(database):
+    """Con el CSV original (sin estado) solo se agregan las ventas posteriores a su mayor id_venta"""
+    previo = leer_csv(database)
+    agregar_a_excel(database, "ventas", [venta(121, "2024-07-01")])
+    agregar_a_excel(database, "detalle_ventas", [linea(121, 5, 2, 1500, None)])
+    assert actualizar(database) == 1
+    obtenido = leer_csv(database)
+    pd.testing.assert_frame_equal(obtenido.iloc[:len(previo)], previo)
+    esperado = reconstruccion_pandas(database)
+    esperado = como_csv(esperado[esperado["id_venta"] == 121], obtenido.columns)
+    pd.testing.assert_frame_equal(obtenido.iloc[len(previo):].reset_index(drop=True), esperado, check_dtype=False)
+
+
+def test_linea_sin_cabecera_no_agrega_nada(reconstruida):
+    antes = leer_csv(reconstruida)
+    agregar_a_excel(reconstruida, "detalle_ventas", [linea(130, 5, 1, 100, 100.0)])
+    assert actualizar(reconstruida) is None
+    pd.testing.assert_frame_equal(leer_csv(reconstruida), antes)
+    # Cuando llega la cabecera la línea se agrega
+    agregar_a_excel(reconstruida, "ventas", [venta(130, "2024-07-10")])
+    assert actualizar(reconstruida) == 1
+    assert_igual_a_reconstruccion(reconstruida)
+
+
+def test_sin_csv_pide_reconstruccion(database):
+    os.remove(os.path.join(database, "tabla_unificada.csv"))
+    assert actualizar(database) is None
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import Programa
+
+VARIABLES = Programa.VARIABLES_NUMERICAS
+
+
+def con_nulos(df):
+    """Copia con NaN en algunas filas de cada variable numérica"""
+    df = df.copy()
+    filas = np.random.default_rng(1).permutation(len(df))
+    for i, col in enumerate(VARIABLES):
+        df[col] = df[col].astype("float64")
+        df.loc[df.index[filas[i * 5:i * 5 + 9]], col] = np.nan
+    return df
+
+
+@pytest.fixture(params=["datos", "nulos"])
+def tabla(request, df_maestro):
+    return df_maestro if request.param == "datos" else con_nulos(df_maestro)
+
+
+def test_describe_igual_a_pandas(tabla):
+    pd.testing.assert_frame_equal(Programa.describir_con_kernel(tabla), tabla.describe(), check_dtype=False)
+    pd.testing.assert_frame_equal(Programa.describir_con_kernel(tabla, VARIABLES), tabla[VARIABLES].describe())
+
+
+def test_kernel_solo_recorre_las_variables_numericas(df_maestro):
+    assert "id_venta" in df_maestro.select_dtypes("number").columns
+    kernel = Programa.kernel_estadistico(df_maestro)
+    assert list(kernel["resumen"].columns) == VARIABLES
+    assert list(kernel["corr"].columns) == VARIABLES
+
+
+def test_correlacion_y_covarianza_iguales_a_pandas(tabla):
+    kernel = Programa.kernel_estadistico(tabla)
+    pd.testing.assert_frame_equal(kernel["corr"], tabla[VARIABLES].corr())
+    pd.testing.assert_frame_equal(kernel["cov"], tabla[VARIABLES].cov())
+
+
+@pytest.mark.parametrize("variable", VARIABLES)
+def test_histograma_y_outliers_iguales_a_numpy_y_pandas(tabla, variable):
+    kernel = Programa.kernel_estadistico(tabla)
+    valores = tabla[variable].dropna()
+    conteos, bordes = kernel["histogramas"][variable]
+    esperado, bordes_esperados = np.histogram(valores.to_numpy(dtype="float64"), bins=Programa.BINS_HISTOGRAMA)
+    assert np.array_equal(conteos, esperado)
+    assert np.allclose(bordes, bordes_esperados)
+
+    Q1, Q3 = valores.quantile(0.25), valores.quantile(0.75)
+    IQR = Q3 - Q1
+    fuera = valores[(valores < Q1 - 1.5 * IQR) | (valores > Q3 + 1.5 * IQR)]
+    r = kernel["outliers"][variable]
+    assert r["Q1"] == pytest.approx(Q1) and r["Q3"] == pytest.approx(Q3)
+    assert r["outliers"] == len(fuera)
+
+
+@pytest.mark.parametrize("valores", [[], [np.nan, np.nan], [5.0], [3.0, 3.0, 3.0], [4.0, 1.0, np.nan, 2.0, 9.0]],
+                         ids=["vacia", "solo_nulos", "un_valor", "constante", "con_nulo"])
+def test_columnas_chicas_iguales_a_pandas(valores):
+    serie = pd.Series(valores, dtype="float64", name="x")
+    matriz = np.asfortranarray(serie.to_numpy().reshape(-1, 1))
+    kernel = Programa.calcular_kernel_estadistico(matriz, ["x"])
+    pd.testing.assert_series_equal(kernel["resumen"]["x"], serie.describe())
+    conteos, _ = kernel["histogramas"]["x"]
+    assert np.array_equal(conteos, np.histogram(serie.dropna().to_numpy(), bins=Programa.BINS_HISTOGRAMA)[0])
+
+
+def test_cuantiles_por_seleccion_iguales_a_numpy():
+    valores = np.random.default_rng(2).normal(size=1001)
+    qs = (0.0, 0.1, 0.25, 0.5, 0.75, 0.99, 1.0)
+    minimo, cuantiles, maximo = Programa.extremos_y_cuantiles(valores.copy(), qs)
+    assert minimo == valores.min() and maximo == valores.max()
+    assert np.allclose(cuantiles, np.quantile(valores, qs))
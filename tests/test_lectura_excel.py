@@ -0,0 +1,71 @@
+import io
+import os
+import contextlib
+import concurrent.futures
+
+import pandas as pd
+import pytest
+
+import Programa
+
+ARCHIVOS = list(Programa.COLUMNAS_EXCEL)
+
+
+def leer(database, lecturas):
+    with contextlib.redirect_stdout(io.StringIO()) as salida:
+        tablas = Programa.leer_excels_en_paralelo(database, lecturas)
+    return tablas, salida.getvalue()
+
+
+def en_serie(database, nombre, **argumentos):
+    """La lectura original: read_excel del archivo completo, después las columnas usadas"""
+    return pd.read_excel(os.path.join(database, nombre), **argumentos)[Programa.COLUMNAS_EXCEL[nombre]]
+
+
+@pytest.fixture(params=["serie", "pool"])
+def modo(request, monkeypatch):
+    """Con umbral 0 (y más de una CPU) los cuatro archivos chicos de database/ se leen en el pool de procesos"""
+    if request.param == "pool":
+        monkeypatch.setattr(Programa, "UMBRAL_EXCEL_PARALELO_BYTES", 0)
+        monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    return request.param
+
+
+def test_igual_a_read_excel(database, modo):
+    tablas, salida = leer(database, {nombre: {} for nombre in ARCHIVOS})
+    assert sorted(tablas) == sorted(ARCHIVOS)
+    for nombre in ARCHIVOS:
+        pd.testing.assert_frame_equal(tablas[nombre], en_serie(database, nombre))
+        assert nombre in salida
+    assert "Pool de procesos no disponible" not in salida
+
+
+def test_filas_salteadas_y_limitadas(database, modo):
+    lecturas = {
+        "ventas.xlsx": {"skiprows": range(1, 101)},
+        "detalle_ventas.xlsx": {"nrows": 50},
+    }
+    tablas, _ = leer(database, lecturas)
+    pd.testing.assert_frame_equal(tablas["ventas.xlsx"], en_serie(database, "ventas.xlsx", skiprows=range(1, 101)))
+    pd.testing.assert_frame_equal(tablas["detalle_ventas.xlsx"], en_serie(database, "detalle_ventas.xlsx", nrows=50))
+    assert len(tablas["ventas.xlsx"]) == 20
+
+
+def test_sin_pool_lee_en_serie(database, monkeypatch):
+    def sin_procesos(*args, **kwargs):
+        raise OSError("sin semáforos")
+    monkeypatch.setattr(Programa, "UMBRAL_EXCEL_PARALELO_BYTES", 0)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", sin_procesos)
+    tablas, salida = leer(database, {nombre: {} for nombre in ARCHIVOS})
+    assert "se leen en serie" in salida
+    for nombre in ARCHIVOS:
+        pd.testing.assert_frame_equal(tablas[nombre], en_serie(database, nombre))
+
+
+def test_motor_excel(monkeypatch):
+    monkeypatch.setenv("AURELION_MOTOR_EXCEL", "openpyxl")
+    assert Programa.motor_excel() == "openpyxl"
+    monkeypatch.delenv("AURELION_MOTOR_EXCEL")
+    instalado = Programa.importlib.util.find_spec("python_calamine") is not None
+    assert Programa.motor_excel() == ("calamine" if instalado else "openpyxl")
@@ -0,0 +1,76 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Programa
+
+
+def referencia(df):
+    """El groupby original de analisis_clientes"""
+    return df.groupby(["id_cliente"], as_index=False).agg(
+        nombre_cliente=("nombre_cliente", "first"),
+        ciudad=("ciudad", "first"),
+        compras=("id_venta", "nunique"),
+        total_gastado=("importe", "sum"),
+        ticket_promedio_cliente=("importe", "mean"),
+        fecha_ultima_compra=("fecha", "max"),
+    )
+
+
+def con_nulos(df):
+    """Copia con id_cliente, importe, nombre y ciudad nulos en algunas filas"""
+    df = df.copy()
+    df["id_cliente"] = df["id_cliente"].astype("Int64")
+    filas = np.random.default_rng(0).permutation(len(df))
+    df.loc[df.index[filas[:7]], "id_cliente"] = pd.NA
+    df.loc[df.index[filas[7:15]], "importe"] = np.nan
+    df.loc[df.index[filas[15:25]], ["nombre_cliente", "ciudad"]] = None
+    return df
+
+
+def comparar(obtenido, esperado):
+    tipos = {c: "float64" for c in ["compras", "total_gastado", "ticket_promedio_cliente"]}
+    tipos.update(nombre_cliente=object, ciudad=object)
+    pd.testing.assert_frame_equal(
+        obtenido.reset_index(drop=True).astype(tipos),
+        esperado.reset_index(drop=True).astype(tipos),
+        check_dtype=False,
+    )
+
+
+@pytest.mark.parametrize("preparar", [lambda df: df, con_nulos], ids=["datos", "nulos"])
+@pytest.mark.parametrize("procesos", [1, 2])
+def test_metricas_clientes_igual_al_groupby(df_maestro, monkeypatch, preparar, procesos):
+    monkeypatch.setattr(Programa, "FILAS_CLIENTES_PARALELO", 1)
+    df = preparar(df_maestro)
+    comparar(Programa.metricas_clientes(df, procesos=procesos), referencia(df))
+
+
+def test_sin_clientes(df_maestro):
+    df = df_maestro.assign(id_cliente=pd.array([pd.NA] * len(df_maestro), dtype="Int64"))
+    assert Programa.metricas_clientes(df).empty
+
+
+@pytest.mark.parametrize("motor", ["bloques", "sql"])
+def test_motores_en_disco_ignoran_clientes_nulos(database, df_maestro, motor):
+    df = con_nulos(df_maestro)
+    Programa.escribir_csv(df, f"{database}/tabla_unificada.csv")
+    Programa.VERIFICACIONES_CSV.clear()
+    if motor == "sql":
+        pytest.importorskip("duckdb")
+        obtenido = Programa.metricas_clientes_sql(Programa.TablaSQL(database))
+    else:
+        obtenido = Programa.metricas_clientes_por_bloques(Programa.TablaPorBloques(database))
+    comparar(obtenido.sort_values("id_cliente"), referencia(df))
+
+
+def test_analisis_clientes_redondea_sin_avisos(df_maestro, capsys):
+    with warnings.catch_warnings(record=True) as avisos:
+        warnings.simplefilter("always")
+        agrupado = Programa.analisis_clientes(df_maestro)
+    assert [str(aviso.message) for aviso in avisos] == []
+    salida = capsys.readouterr().out
+    mayor = agrupado.sort_values("total_gastado", ascending=False).iloc[0]
+    assert f"{mayor['total_gastado']:.2f}".rstrip("0").rstrip(".") in salida
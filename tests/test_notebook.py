@@ -0,0 +1,126 @@
+import io
+import os
+import contextlib
+
+import pandas as pd
+import pytest
+
+import Programa
+
+nbformat = pytest.importorskip("nbformat")
+
+CELDAS = [
+    "import pandas as pd\nventas = pd.read_excel('../database/ventas.xlsx')\nprint('ventas:', len(ventas))",
+    "ventas.to_csv('../database/tabla_unificada.csv', index=False)\n"
+    "open('resumen.md', 'w').write('# Resumen')\nlen(ventas) * 2",
+]
+
+
+def escribir_notebook(ruta, celdas):
+    notebook = nbformat.v4.new_notebook()
+    notebook.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3", "language": "python"}
+    notebook.cells = [nbformat.v4.new_code_cell(fuente) for fuente in celdas]
+    nbformat.write(notebook, str(ruta))
+
+
+@pytest.fixture
+def proyecto(database, tmp_path, monkeypatch):
+    """Un SPRINT2.ipynb chico junto a un Programa.py ficticio, en lugar del del repositorio"""
+    carpeta = tmp_path / "notebooks"
+    carpeta.mkdir()
+    escribir_notebook(carpeta / "SPRINT2.ipynb", CELDAS)
+    monkeypatch.setattr(Programa, "__file__", str(carpeta / "Programa.py"))
+    monkeypatch.setattr(Programa, "EJECUCION_NOTEBOOK", None)
+    return carpeta
+
+
+def ejecutar(**argumentos):
+    with contextlib.redirect_stdout(io.StringIO()) as salida:
+        resultado = Programa.ejecutar_documentacion_notebook(en_segundo_plano=False, **argumentos)
+    return resultado, salida.getvalue()
+
+
+def guardados(database):
+    carpeta = os.path.join(database, "cache", "notebooks")
+    return sorted(os.listdir(carpeta)) if os.path.isdir(carpeta) else []
+
+
+def test_clave_cambia_con_el_codigo_y_los_excel(proyecto, database):
+    notebook = proyecto / "SPRINT2.ipynb"
+    clave = Programa.clave_notebook(str(notebook), database)
+    assert Programa.clave_notebook(str(notebook), database) == clave
+
+    # Salidas y conteos de ejecución no cambian la clave
+    contenido = nbformat.read(str(notebook), as_version=4)
+    contenido.cells[0].outputs = [nbformat.v4.new_output("stream", text="ventas: 120\n")]
+    contenido.cells[0].execution_count = 7
+    nbformat.write(contenido, str(notebook))
+    assert Programa.clave_notebook(str(notebook), database) == clave
+
+    # tabla_unificada.csv la escribe el propio notebook: no forma parte de la clave
+    with open(os.path.join(database, "tabla_unificada.csv"), "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert Programa.clave_notebook(str(notebook), database) == clave
+
+    escribir_notebook(notebook, CELDAS[:1] + ["print('otra celda')"])
+    clave_codigo = Programa.clave_notebook(str(notebook), database)
+    assert clave_codigo != clave
+
+    ruta = os.path.join(database, "clientes.xlsx")
+    clientes = pd.read_excel(ruta)
+    clientes.iloc[:-1].to_excel(ruta, index=False)
+    assert Programa.clave_notebook(str(notebook), database) != clave_codigo
+
+
+def test_ejecuta_una_vez_y_despues_reutiliza(proyecto, database):
+    pytest.importorskip("nbclient")
+    pytest.importorskip("ipykernel")
+    csv_original = os.path.join(database, "tabla_unificada.csv")
+    with open(csv_original, "rb") as f:
+        contenido_csv = f.read()
+
+    ok, salida = ejecutar()
+    assert ok, salida
+    assert "ventas: 120" in salida and "240" in salida
+    assert "Ejecución de SPRINT2.ipynb finalizada" in salida
+    [guardado] = guardados(database)
+    # El notebook corrió sobre una copia: la tabla de la opción 6 no cambió
+    with open(csv_original, "rb") as f:
+        assert f.read() == contenido_csv
+    # Lo que escribe junto a sí mismo queda junto al original
+    assert (proyecto / "resumen.md").read_text() == "# Resumen"
+
+    ok, salida = ejecutar()
+    assert ok and "sin cambios" in salida and "ventas: 120" in salida
+    assert guardados(database) == [guardado]
+
+    ok, salida = ejecutar(forzar=True)
+    assert ok and "finalizada" in salida
+
+    # Otro código: se ejecuta de nuevo y queda solo el resultado vigente
+    escribir_notebook(proyecto / "SPRINT2.ipynb", CELDAS + ["print('nueva')"])
+    ok, salida = ejecutar()
+    assert ok and "nueva" in salida and "sin cambios" not in salida
+    assert len(guardados(database)) == 1 and guardados(database) != [guardado]
+
+
+def test_error_en_una_celda(proyecto, database):
+    pytest.importorskip("nbclient")
+    pytest.importorskip("ipykernel")
+    escribir_notebook(proyecto / "SPRINT2.ipynb", ["1 / 0"])
+    ok, salida = ejecutar()
+    assert ok is False
+    assert "ZeroDivisionError" in salida
+    assert not [a for a in guardados(database) if not a.endswith(".ejecutando.ipynb")]
+
+
+def test_en_segundo_plano_devuelve_el_hilo(proyecto, database):
+    pytest.importorskip("nbclient")
+    pytest.importorskip("ipykernel")
+    with contextlib.redirect_stdout(io.StringIO()) as salida:
+        hilo = Programa.ejecutar_documentacion_notebook()
+        assert Programa.ejecutar_documentacion_notebook() is hilo
+        hilo.join(timeout=120)
+    assert not hilo.is_alive()
+    assert "ya se está ejecutando" in salida.getvalue()
+    assert len(guardados(database)) == 1
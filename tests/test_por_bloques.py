@@ -0,0 +1,104 @@
+import io
+import contextlib
+
+import numpy as np
+import pytest
+
+import Programa
+
+# Bloques chicos para que las 343 filas de database/ se recorran en varias pasadas
+TAMANO_BLOQUE = 37
+
+FILTROS = {
+    "sin_filtro": None,
+    "un_mes_dos_ciudades": dict(desde="2024-03-01", hasta="2024-03-31", ciudades=["Rio Cuarto", "Villa Maria"]),
+}
+
+
+def ejecutar(funcion, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = funcion(*args)
+    Programa.plt.close("all")
+    return resultado
+
+
+@pytest.fixture(params=["csv", "cache"])
+def origen(request, database, df_maestro):
+    """Tabla en disco leída del CSV o de la caché columnar"""
+    if request.param == "cache":
+        pytest.importorskip("pyarrow")
+        Programa.guardar_cache_columnar(df_maestro, database)
+        assert Programa.leer_metadatos_cache(database) is not None
+    return database
+
+
+@pytest.fixture(params=FILTROS)
+def tablas(request, origen, df_maestro):
+    """(df_maestro en memoria, TablaPorBloques) con el mismo filtro"""
+    argumentos = FILTROS[request.param]
+    filtro = Programa.FiltroTabla(**argumentos) if argumentos else None
+    tabla = Programa.TablaPorBloques(origen, tamano_bloque=TAMANO_BLOQUE, filtro=filtro)
+    return Programa.filtrar_tabla(df_maestro, filtro), tabla
+
+
+def test_bloques_acotados(tablas):
+    df_maestro, tabla = tablas
+    tamanos = [len(bloque) for bloque in tabla.iterar(["importe"])]
+    assert len(tamanos) > 1
+    assert max(tamanos) <= TAMANO_BLOQUE
+    assert sum(tamanos) == len(df_maestro)
+
+
+def test_describe_igual_a_pandas(tablas):
+    df_maestro, tabla = tablas
+    descripcion, filas, _ = Programa.describir_por_bloques(tabla)
+    assert filas == len(df_maestro)
+    esperado = df_maestro[descripcion.columns].describe()
+    exactas = ["count", "mean", "std", "min", "max"]
+    assert Programa.diferencias_resultados(esperado.loc[exactas], descripcion.loc[exactas]) == []
+    # Los percentiles salen del sketch KLL: su rango queda dentro del error garantizado
+    error = Programa.SketchCuantiles().error_rango() * len(df_maestro)
+    for col in descripcion.columns:
+        valores = np.sort(df_maestro[col].dropna().to_numpy(dtype="float64"))
+        for etiqueta, q in (("25%", 0.25), ("50%", 0.5), ("75%", 0.75)):
+            aproximado = descripcion.loc[etiqueta, col]
+            rango = (np.searchsorted(valores, aproximado, "left"), np.searchsorted(valores, aproximado, "right"))
+            objetivo = q * (len(valores) - 1)
+            assert rango[0] - error - 1 <= objetivo <= rango[1] + error, (col, etiqueta)
+
+
+@pytest.mark.parametrize("opcion", [
+    pytest.param(Programa.medios_pago_conteo_porcentaje, id="9_medios_pago"),
+    pytest.param(lambda df: Programa.deteccion_outliers(df, modo="exacto"), id="11_outliers_exactos"),
+])
+def test_opcion_igual_a_pandas(tablas, opcion):
+    df_maestro, tabla = tablas
+    esperado = ejecutar(opcion, df_maestro)
+    obtenido = ejecutar(opcion, tabla)
+    assert Programa.diferencias_resultados(esperado, obtenido) == []
+
+
+def test_conteo_de_valores_igual_a_value_counts(tablas):
+    df_maestro, tabla = tablas
+    for columna in ("medio_pago", "ciudad", "cantidad"):
+        esperado = df_maestro[columna].value_counts()
+        # Las columnas category informan también las categorías sin filas
+        esperado = esperado[esperado > 0]
+        obtenido = Programa.contar_valores_por_bloques(tabla, columna)
+        assert obtenido.to_dict() == esperado.to_dict()
+
+
+def test_cuantil_desde_frecuencias_igual_a_quantile(tablas):
+    df_maestro, tabla = tablas
+    frecuencias, filas = Programa.frecuencias_numericas_por_bloques(tabla, Programa.VARIABLES_NUMERICAS)
+    assert filas == len(df_maestro)
+    for col, conteo in frecuencias.items():
+        for q in (0.0, 0.25, 0.5, 0.75, 1.0):
+            assert Programa.cuantil_desde_frecuencias(conteo, q) == pytest.approx(df_maestro[col].quantile(q))
+
+
+def test_metricas_clientes_igual_a_pandas(tablas):
+    df_maestro, tabla = tablas
+    esperado = ejecutar(Programa.analisis_clientes, df_maestro).set_index("id_cliente").sort_index()
+    obtenido = Programa.metricas_clientes_por_bloques(tabla, modo="exacto").set_index("id_cliente").sort_index()
+    assert Programa.diferencias_resultados(esperado, obtenido) == []
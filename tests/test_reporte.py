@@ -0,0 +1,98 @@
+import io
+import json
+import os
+import contextlib
+
+import pandas as pd
+import pytest
+
+import Programa
+
+
+@pytest.fixture
+def reporte(database, tmp_path, monkeypatch):
+    """Ejecuta `Programa.py report` con los argumentos dados; devuelve (código, carpeta de salida, texto)"""
+    for nombre, valor in (("DIRECTORIO_FIGURAS", None), ("CACHE_RESULTADOS", None),
+                          ("TRAZA", None), ("FIGURAS_PRERENDERIZADAS", set())):
+        monkeypatch.setattr(Programa, nombre, valor)
+    monkeypatch.delenv("AURELION_STREAMING", raising=False)
+    monkeypatch.delenv("AURELION_BACKEND", raising=False)
+    salida = tmp_path / "reporte"
+
+    def ejecutar(*argumentos):
+        with contextlib.redirect_stdout(io.StringIO()) as texto:
+            codigo = Programa.cli(["report", "--salida", str(salida), *argumentos])
+        Programa.plt.close("all")
+        return codigo, salida, texto.getvalue()
+    return ejecutar
+
+
+def leer_resumen(salida):
+    with open(salida / "resumen.json", encoding="utf-8") as f:
+        return {estado["opcion"]: estado for estado in json.load(f)}
+
+
+def test_reporte_completo(reporte, df_maestro):
+    codigo, salida, _ = reporte()
+    assert codigo == 0
+    resumen = leer_resumen(salida)
+    assert sorted(resumen) == sorted(Programa.FUNCIONES_REPORTE)
+    assert all(estado["ok"] for estado in resumen.values())
+    for archivo in ("matriz_correlaciones.png", "frecuencia_medios_pago.png",
+                    "distribucion_importe.png", "boxplot_importe_medio_pago.png"):
+        assert (salida / archivo).stat().st_size > 0
+    for estado in resumen.values():
+        assert estado["archivos"] and all(os.path.exists(ruta) for ruta in estado["archivos"])
+
+
+def test_tablas_guardadas_iguales_a_pandas(reporte, df_maestro):
+    codigo, salida, _ = reporte("--opciones", "9,10")
+    assert codigo == 0
+    medios = pd.read_csv(salida / "opcion_09_medios_pago.csv", index_col=0)
+    assert medios["Frecuencia"].to_dict() == df_maestro["medio_pago"].value_counts().to_dict()
+    assert medios["Porcentaje (%)"].sum() == pytest.approx(100, abs=0.05)
+    with open(salida / "opcion_10_matriz_correlaciones.json", encoding="utf-8") as f:
+        corr = pd.read_json(f, orient="split")
+    esperado = df_maestro[Programa.VARIABLES_NUMERICAS].corr()
+    pd.testing.assert_frame_equal(corr, esperado, check_exact=False, check_names=False)
+    assert sorted(leer_resumen(salida)) == [9, 10]
+
+
+def test_reporte_con_filtro(reporte, df_maestro):
+    codigo, salida, _ = reporte("--opciones", "9", "--desde", "2024-03-01", "--hasta", "2024-03-31",
+                                "--ciudad", "Rio Cuarto,Villa Maria")
+    assert codigo == 0
+    filtro = Programa.FiltroTabla("2024-03-01", "2024-03-31", ["Rio Cuarto", "Villa Maria"])
+    conteo = Programa.filtrar_tabla(df_maestro, filtro)["medio_pago"].value_counts()
+    medios = pd.read_csv(salida / "opcion_09_medios_pago.csv", index_col=0)
+    assert medios["Frecuencia"].to_dict() == conteo.to_dict()
+
+
+@pytest.mark.parametrize("argumentos", [
+    ["--opciones", "3,8"],
+    ["--opciones", "ocho"],
+    ["--desde", "ayer"],
+    ["--desde", "2024-05-01", "--hasta", "2024-04-01"],
+], ids=["opcion_fuera_del_reporte", "opcion_no_numerica", "fecha_invalida", "rango_invertido"])
+def test_argumentos_invalidos_salen_con_codigo_2(reporte, argumentos, capsys):
+    with pytest.raises(SystemExit) as salida:
+        reporte(*argumentos)
+    assert salida.value.code == 2
+
+
+def test_sin_datos_devuelve_2(reporte, database):
+    for nombre in os.listdir(database):
+        os.remove(os.path.join(database, nombre))
+    codigo, salida, texto = reporte("--opciones", "8")
+    assert codigo == 2
+    assert "Reporte cancelado" in texto
+    assert not (salida / "resumen.json").exists()
+
+
+def test_opcion_no_soportada_devuelve_1(reporte, monkeypatch):
+    monkeypatch.setenv("AURELION_STREAMING", "1")
+    codigo, salida, texto = reporte("--opciones", "7,9")
+    assert codigo == 1
+    resumen = leer_resumen(salida)
+    assert not resumen[7]["ok"] and "tabla completa en memoria" in resumen[7]["error"]
+    assert resumen[9]["ok"] and (salida / "opcion_09_medios_pago.csv").exists()
@@ -0,0 +1,168 @@
+import io
+import json
+import os
+import time
+import threading
+import contextlib
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+import Programa
+
+
+@pytest.fixture
+def servidor(database, monkeypatch):
+    """ServicioAnalisis cargado y su servidor HTTP en un puerto libre; devuelve (servicio, get)"""
+    monkeypatch.setattr(Programa, "CACHE_RESULTADOS", Programa.crear_cache_resultados())
+    monkeypatch.delenv("AURELION_BACKEND", raising=False)
+    monkeypatch.delenv("AURELION_STREAMING", raising=False)
+    # Los hilos del servidor también escriben en este stdout mientras dura el test
+    with contextlib.redirect_stdout(io.StringIO()):
+        servicio = Programa.ServicioAnalisis(intervalo=0.1)
+        assert servicio.cargar()
+        http = Programa.crear_servidor_http(servicio, puerto=0)
+        hilos = [threading.Thread(target=http.serve_forever, daemon=True),
+                 threading.Thread(target=servicio.vigilar, daemon=True)]
+        for hilo in hilos:
+            hilo.start()
+        base = "http://{}:{}".format(*http.server_address[:2])
+
+        def get(ruta):
+            try:
+                with urllib.request.urlopen(base + ruta, timeout=30) as respuesta:
+                    return respuesta.status, json.loads(respuesta.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+        yield servicio, get
+        servicio.detenido.set()
+        http.shutdown()
+        http.server_close()
+
+
+def tabla(cuerpo):
+    datos = cuerpo["datos"]
+    return pd.DataFrame(datos["data"], index=datos["index"], columns=datos["columns"])
+
+
+def test_salud(servidor, df_maestro):
+    _, get = servidor
+    codigo, cuerpo = get("/salud")
+    assert codigo == 200
+    assert cuerpo["version_datos"] == 1 and cuerpo["filas"] == len(df_maestro)
+    assert set(Programa.ENDPOINTS_SERVIDOR) <= set(cuerpo["endpoints"])
+
+
+def test_medios_pago_y_correlaciones_iguales_a_pandas(servidor, df_maestro):
+    _, get = servidor
+    _, cuerpo = get("/medios-pago")
+    conteo = df_maestro["medio_pago"].value_counts()
+    assert tabla(cuerpo)["Frecuencia"].to_dict() == conteo.to_dict()
+    _, cuerpo = get("/correlaciones")
+    esperado = df_maestro[Programa.VARIABLES_NUMERICAS].corr()
+    pd.testing.assert_frame_equal(tabla(cuerpo), esperado, check_names=False)
+    _, cuerpo = get("/estadisticos")
+    descripcion = df_maestro[Programa.VARIABLES_NUMERICAS].describe()
+    assert Programa.diferencias_resultados(descripcion, tabla(cuerpo)[Programa.VARIABLES_NUMERICAS]) == []
+
+
+def test_filtro_igual_a_pandas(servidor, df_maestro):
+    _, get = servidor
+    _, cuerpo = get("/medios-pago?desde=2024-03-01&hasta=2024-04-30&ciudad=Cordoba,Carlos%20Paz")
+    fechas = df_maestro["fecha"]
+    filtradas = df_maestro[(fechas >= "2024-03-01") & (fechas < "2024-05-01")
+                           & df_maestro["ciudad"].isin(["Cordoba", "Carlos Paz"])]
+    conteo = filtradas["medio_pago"].value_counts()
+    assert tabla(cuerpo)["Frecuencia"].to_dict() == conteo[conteo > 0].to_dict()
+    _, cuerpo = get("/medios-pago?desde=2030-01-01")
+    assert cuerpo["datos"] is None and "Ninguna venta" in cuerpo["aviso"]
+
+
+def test_top_clientes_igual_a_pandas(servidor, df_maestro):
+    _, get = servidor
+    _, cuerpo = get("/clientes/top?n=5&orden=compras")
+    top = tabla(cuerpo)
+    compras = df_maestro.groupby("id_cliente")["id_venta"].nunique()
+    assert len(top) == 5
+    assert top["compras"].tolist() == compras.sort_values(ascending=False).head(5).tolist()
+    gasto = df_maestro.groupby("id_cliente")["importe"].sum()
+    for _, fila in top.iterrows():
+        assert fila["total_gastado"] == pytest.approx(gasto[fila["id_cliente"]])
+
+
+def test_cubo_igual_a_groupby(servidor, df_maestro):
+    pytest.importorskip("pyarrow")
+    _, get = servidor
+    codigo, cuerpo = get("/cubo?agrupar=mes,ciudad")
+    assert codigo == 200
+    obtenido = tabla(cuerpo).set_index(["mes", "ciudad"])
+    esperado = df_maestro.groupby([df_maestro["fecha"].dt.strftime("%Y-%m").rename("mes"), "ciudad"],
+                                  observed=True).agg(lineas=("id_venta", "size"), importe=("importe", "sum"),
+                                                     ventas=("id_venta", "nunique"))
+    assert Programa.diferencias_resultados(esperado, obtenido[["lineas", "importe", "ventas"]]) == []
+
+
+def test_respuestas_reutilizadas(servidor):
+    _, get = servidor
+    _, primera = get("/outliers?modo=aproximado")
+    _, segunda = get("/outliers?modo=aproximado")
+    assert not primera["desde_cache"] and segunda["desde_cache"]
+    assert primera["datos"] == segunda["datos"]
+    # Las respuestas sin filtro se precalculan al cargar
+    assert get("/outliers")[1]["desde_cache"]
+
+
+@pytest.mark.parametrize("ruta, codigo", [
+    ("/no-existe", 404),
+    ("/medios-pago?desde=ayer", 400),
+    ("/clientes/top?n=0", 400),
+    ("/clientes/top?orden=nombre", 400),
+    ("/outliers?modo=otro", 400),
+    ("/cubo?agrupar=producto", 400),
+], ids=["ruta", "fecha", "n", "orden", "modo", "agrupar"])
+def test_consultas_invalidas(servidor, ruta, codigo):
+    _, get = servidor
+    obtenido, cuerpo = get(ruta)
+    assert obtenido == codigo and "error" in cuerpo
+
+
+def agregar_venta(database, id_venta):
+    """Una venta nueva (cabecera y una línea, copiadas de la última) al final de los Excel"""
+    for nombre in ("ventas", "detalle_ventas"):
+        ruta = os.path.join(database, f"{nombre}.xlsx")
+        filas = pd.read_excel(ruta)
+        pd.concat([filas, filas.tail(1).assign(id_venta=id_venta)]).to_excel(ruta, index=False)
+
+
+def esperar_filas(get, filas, segundos=60):
+    """
+    Estado del servidor cuando sirve `filas` filas. El vigilante puede
+    recargar entre la escritura de los dos Excel: se espera la cantidad de
+    filas y no una versión dada.
+    """
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        cuerpo = get("/salud")[1]
+        if cuerpo["filas"] == filas:
+            return cuerpo
+        time.sleep(0.1)
+    raise AssertionError(f"el servidor no llegó a servir {filas} filas")
+
+
+def test_recarga_en_caliente(servidor, database, df_maestro):
+    servicio, get = servidor
+    _, antes = get("/medios-pago")
+    agregar_venta(database, 121)
+    salud = esperar_filas(get, len(df_maestro) + 1)
+    assert salud["version_datos"] >= 2
+    _, despues = get("/medios-pago")
+    assert despues["version_datos"] == salud["version_datos"]
+    medio = str(pd.read_excel(os.path.join(database, "ventas.xlsx"))["medio_pago"].iloc[-1])
+    frecuencia_antes = tabla(antes)["Frecuencia"].to_dict()
+    frecuencia_despues = tabla(despues)["Frecuencia"].to_dict()
+    assert frecuencia_despues[medio] == frecuencia_antes[medio] + 1
+    # La tabla nueva se armó con la actualización incremental, igual que la que se carga de cero
+    assert len(Programa.cargar_tabla_unificada_csv()) == len(df_maestro) + 1
+    assert servicio.datos.version == salud["version_datos"]
@@ -0,0 +1,46 @@
+import pytest
+
+import Programa
+
+FILTROS = {
+    "sin_filtro": (None, False),
+    "rango_sin_ventas": (dict(desde="2030-01-01"), True),
+    "ciudad_inexistente": (dict(ciudades=["Nowhere"]), True),
+    "un_mes": (dict(desde="2024-03-01", hasta="2024-03-31"), False),
+}
+
+
+@pytest.fixture(params=["csv", "cache"])
+def origen(request, database, df_maestro):
+    """Tabla en disco leída del CSV o de la caché columnar"""
+    if request.param == "cache":
+        pytest.importorskip("pyarrow")
+        Programa.guardar_cache_columnar(df_maestro, database)
+        assert Programa.leer_metadatos_cache(database) is not None
+    return database
+
+
+@pytest.mark.parametrize("motor", ["bloques", "sql"])
+@pytest.mark.parametrize("caso", FILTROS)
+def test_empty_refleja_el_filtro(origen, motor, caso):
+    argumentos, vacia = FILTROS[caso]
+    filtro = Programa.FiltroTabla(**argumentos) if argumentos else None
+    if motor == "sql":
+        pytest.importorskip("duckdb")
+        tabla = Programa.TablaSQL(origen, filtro=filtro)
+    else:
+        tabla = Programa.TablaPorBloques(origen, filtro=filtro)
+    assert tabla.empty is vacia
+
+
+@pytest.mark.parametrize("motor", ["bloques", "sql"])
+def test_opciones_sin_ventas_avisan(origen, motor, capsys):
+    if motor == "sql":
+        pytest.importorskip("duckdb")
+        tabla = Programa.TablaSQL(origen)
+    else:
+        tabla = Programa.TablaPorBloques(origen)
+    filtro = Programa.FiltroTabla(desde="2030-01-01")
+    for opcion in (8, 9, 11):
+        Programa.FUNCIONES_REPORTE[opcion][1](Programa.filtrar_tabla(tabla, filtro))
+    assert capsys.readouterr().out.count("Ninguna venta cumple el filtro") == 3
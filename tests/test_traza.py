@@ -0,0 +1,143 @@
+import io
+import json
+import contextlib
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import Programa
+
+
+@pytest.fixture
+def traza(monkeypatch):
+    """Activa una Traza en memoria mientras dura el test; devuelve una función para crearla"""
+    monkeypatch.setattr(Programa, "TRAZA", None)
+    midiendo = tracemalloc.is_tracing()
+
+    def activar(ruta, memoria=False):
+        Programa.TRAZA = Programa.Traza(str(ruta), memoria=memoria)
+        return Programa.TRAZA
+    yield activar
+    if not midiendo:
+        tracemalloc.stop()
+
+
+def etapas_anidadas():
+    """carga (con lectura y esquema adentro) y después análisis, como en la opción 6 y el menú"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        with Programa.medir_etapa("carga", 100) as span:
+            with Programa.medir_etapa("lectura") as lectura:
+                lectura["filas_salida"] = 100
+            with Programa.medir_etapa("esquema", 100, columnas=3) as esquema:
+                esquema["filas_salida"] = 100
+            span["filas_salida"] = 100
+        with Programa.medir_etapa("analisis", 100):
+            pass
+
+
+def leer_lineas(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        return [json.loads(linea) for linea in f]
+
+
+def test_sin_traza_no_mide(monkeypatch):
+    monkeypatch.setattr(Programa, "TRAZA", None)
+    with Programa.medir_etapa("carga", 10) as span:
+        span["filas_salida"] = 10
+    assert span == {"filas_salida": 10}
+
+
+def test_json_lines_con_spans_anidados(traza, tmp_path):
+    ruta = tmp_path / "traza.jsonl"
+    activa = traza(ruta)
+    etapas_anidadas()
+    with contextlib.redirect_stdout(io.StringIO()):
+        activa.exportar()
+    spans = {span["nombre"]: span for span in leer_lineas(ruta)}
+    # Los spans se registran al cerrarse: los hijos antes que el padre
+    assert [span["nombre"] for span in leer_lineas(ruta)] == ["lectura", "esquema", "carga", "analisis"]
+    assert spans["lectura"]["padre"] == "carga" and spans["lectura"]["nivel"] == 1
+    assert spans["carga"]["padre"] is None and spans["analisis"]["nivel"] == 0
+    assert spans["carga"]["filas_entrada"] == spans["carga"]["filas_salida"] == 100
+    assert spans["esquema"]["columnas"] == 3
+    assert spans["lectura"]["filas_entrada"] is None and spans["lectura"]["filas_salida"] == 100
+    for span in spans.values():
+        assert span["segundos"] >= 0 and span["cpu_segundos"] >= 0
+        assert span["ejecucion"] == activa.ejecucion
+        assert not any(clave.startswith("_") for clave in span)
+    hijos = spans["lectura"]["segundos"] + spans["esquema"]["segundos"]
+    assert hijos <= spans["carga"]["segundos"] + 1e-6
+
+
+def test_json_lines_agrega_cada_ejecucion(traza, tmp_path):
+    ruta = tmp_path / "traza.jsonl"
+    for _ in range(2):
+        activa = traza(ruta)
+        etapas_anidadas()
+        with contextlib.redirect_stdout(io.StringIO()):
+            activa.exportar()
+    assert len(leer_lineas(ruta)) == 8
+
+
+def test_chrome_trace(traza, tmp_path):
+    ruta = tmp_path / "traza.json"
+    activa = traza(ruta)
+    etapas_anidadas()
+    with contextlib.redirect_stdout(io.StringIO()):
+        activa.exportar()
+        # Un .json se reescribe en cada ejecución
+        activa.exportar()
+    with open(ruta, encoding="utf-8") as f:
+        eventos = {evento["name"]: evento for evento in json.load(f)["traceEvents"]}
+    assert sorted(eventos) == ["analisis", "carga", "esquema", "lectura"]
+    assert all(evento["ph"] == "X" and evento["dur"] >= 0 for evento in eventos.values())
+    carga = eventos["carga"]
+    for hijo in ("lectura", "esquema"):
+        # En microsegundos, redondeados a 1 µs
+        assert carga["ts"] - 1 <= eventos[hijo]["ts"]
+        assert eventos[hijo]["ts"] + eventos[hijo]["dur"] <= carga["ts"] + carga["dur"] + 1
+    assert eventos["analisis"]["ts"] >= carga["ts"] + carga["dur"] - 1
+    assert eventos["lectura"]["args"]["padre"] == "carga"
+    assert eventos["esquema"]["args"]["filas_salida"] == 100
+
+
+def test_memoria_del_hijo_cuenta_en_el_padre(traza, tmp_path):
+    activa = traza(tmp_path / "traza.jsonl", memoria=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        with Programa.medir_etapa("padre"):
+            with Programa.medir_etapa("hijo"):
+                grande = np.ones(4 * 2**20 // 8)
+                del grande
+            with Programa.medir_etapa("liviano"):
+                pass
+    spans = {span["nombre"]: span for span in activa.spans}
+    assert spans["hijo"]["incremento_tracemalloc_mb"] >= 3.9
+    assert spans["padre"]["incremento_tracemalloc_mb"] >= 3.9
+    assert spans["liviano"]["incremento_tracemalloc_mb"] < 1
+
+
+def test_span_se_cierra_con_excepcion(traza, tmp_path):
+    activa = traza(tmp_path / "traza.jsonl")
+    with contextlib.redirect_stdout(io.StringIO()), pytest.raises(ZeroDivisionError):
+        with Programa.medir_etapa("falla"):
+            1 / 0
+    assert [span["nombre"] for span in activa.spans] == ["falla"]
+    assert activa.abiertos == []
+
+
+def test_cli_exporta_las_etapas_de_la_carga(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(Programa, "TRAZA", None)
+    monkeypatch.setattr(Programa, "DIRECTORIO_FIGURAS", None)
+    monkeypatch.setattr(Programa, "CACHE_RESULTADOS", None)
+    # cli() escribe AURELION_TRAZA: monkeypatch la restaura al terminar
+    monkeypatch.setenv("AURELION_TRAZA", "")
+    ruta = tmp_path / "traza.jsonl"
+    with contextlib.redirect_stdout(io.StringIO()):
+        codigo = Programa.cli(["--traza", str(ruta), "report", "--opciones", "8",
+                               "--salida", str(tmp_path / "reporte")])
+    assert codigo == 0
+    spans = {span["nombre"]: span for span in leer_lineas(ruta)}
+    assert {"opcion_6", "leer_csv", "aplicar_esquema"} <= set(spans)
+    assert spans["leer_csv"]["padre"] == "opcion_6"
+    assert spans["leer_csv"]["filas_salida"] == spans["opcion_6"]["filas_salida"] == 343
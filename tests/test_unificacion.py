@@ -0,0 +1,61 @@
+import os
+
+import pandas as pd
+import pytest
+
+import Programa
+import benchmark
+from conftest import RAIZ
+
+
+@pytest.fixture(scope="module")
+def excels():
+    """detalle_ventas y productos de database/, como los lee la reconstrucción"""
+    return {
+        nombre: pd.read_excel(os.path.join(RAIZ, "database", f"{nombre}.xlsx"))
+        for nombre in ("detalle_ventas", "productos")
+    }
+
+
+@pytest.fixture(params=["database", "sintetico"])
+def detalle(request, excels):
+    if request.param == "database":
+        return excels["detalle_ventas"]
+    return benchmark.generar_detalle_sintetico(5000)
+
+
+def test_imputar_importes_igual_al_apply_fila_por_fila(detalle):
+    assert detalle["importe"].isna().any()
+    esperado = benchmark.imputar_importes_original(detalle)
+    obtenido = Programa.imputar_importes(detalle.copy())
+    pd.testing.assert_series_equal(obtenido["importe"], esperado, check_names=False)
+    # Las demás columnas no cambian
+    pd.testing.assert_frame_equal(obtenido.drop(columns="importe"), detalle.drop(columns="importe"))
+
+
+def test_imputar_importes_sin_faltantes_no_cambia_nada():
+    detalle = pd.DataFrame({"cantidad": [1, 2], "precio_unitario": [10, 20], "importe": [5.0, 7.0]})
+    pd.testing.assert_frame_equal(Programa.imputar_importes(detalle.copy()), detalle)
+
+
+def test_corregir_categorias_igual_al_bucle_por_palabra(excels, detalle):
+    for nombres in (excels["productos"]["nombre_producto"], detalle["nombre_producto"]):
+        esperado = nombres.apply(benchmark.corregir_categoria_original)
+        obtenido = Programa.corregir_categorias(nombres)
+        assert obtenido.index.equals(nombres.index)
+        assert obtenido.tolist() == esperado.tolist()
+
+
+def test_corregir_categorias_mayusculas_acentos_y_nulos():
+    nombres = pd.Series(["YERBA Mate", "Café molido", "CAFE sin tilde", "Detergente", None, "Pan Lactal"],
+                        index=[10, 11, 12, 13, 14, 15])
+    obtenido = Programa.corregir_categorias(nombres)
+    esperado = [benchmark.corregir_categoria_original(n) if isinstance(n, str) else "Limpieza" for n in nombres]
+    assert obtenido.tolist() == esperado
+    assert obtenido.tolist() == ["Alimentos", "Alimentos", "Limpieza", "Limpieza", "Limpieza", "Alimentos"]
+    assert list(obtenido.index) == [10, 11, 12, 13, 14, 15]
+
+
+def test_corregir_categorias_vacia():
+    obtenido = Programa.corregir_categorias(pd.Series([], dtype=object))
+    assert len(obtenido) == 0
@@ -0,0 +1,90 @@
+import io
+import os
+import contextlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Programa
+import benchmark
+from conftest import RAIZ
+
+
+def unir(*tablas):
+    with contextlib.redirect_stdout(io.StringIO()) as salida:
+        df = Programa.unir_tablas(*tablas)
+    return df, salida.getvalue()
+
+
+@pytest.fixture(scope="module")
+def excels():
+    """clientes, productos (con categoría corregida), ventas y detalle de database/"""
+    clientes, productos, ventas, detalle = (pd.read_excel(os.path.join(RAIZ, "database", f"{nombre}.xlsx"))
+                                            for nombre in ("clientes", "productos", "ventas", "detalle_ventas"))
+    productos["categoria_corregida"] = Programa.corregir_categorias(productos["nombre_producto"])
+    return clientes, productos, ventas, detalle
+
+
+def sinteticas(filas=50_000):
+    detalle = benchmark.generar_detalle_sintetico(filas)
+    detalle["id_producto"] = np.random.default_rng(1).integers(1, 4001, filas)
+    clientes, productos, ventas = benchmark.generar_dimensiones_sinteticas(detalle)
+    return clientes, productos, ventas, detalle
+
+
+@pytest.fixture(params=["database", "sinteticas"])
+def tablas(request, excels):
+    return excels if request.param == "database" else sinteticas()
+
+
+def test_igual_a_merges_en_cascada(tablas):
+    esperado = benchmark.unir_tablas_original(*tablas)
+    obtenido, _ = unir(*tablas)
+    pd.testing.assert_frame_equal(obtenido, esperado)
+
+
+def test_claves_no_enteras_igual_a_merges(excels):
+    """Claves de texto y dimensiones desordenadas usan el índice hash"""
+    clientes, productos, ventas, detalle = (t.copy() for t in excels)
+    for tabla, clave in ((clientes, "id_cliente"), (ventas, "id_cliente"), (ventas, "id_venta"),
+                         (detalle, "id_venta"), (productos, "id_producto"), (detalle, "id_producto")):
+        tabla[clave] = "k" + tabla[clave].astype(str)
+    tablas = (clientes.sample(frac=1, random_state=0), productos.sample(frac=1, random_state=1), ventas, detalle)
+    obtenido, _ = unir(*tablas)
+    pd.testing.assert_frame_equal(obtenido, benchmark.unir_tablas_original(*tablas))
+
+
+def test_claves_huerfanas_quedan_nulas_y_se_informan(excels):
+    clientes, productos, ventas, detalle = excels
+    detalle = pd.concat([detalle, detalle.head(2).assign(id_producto=[9999, 10_000])], ignore_index=True)
+    ventas = ventas[ventas["id_venta"] != 1]
+    esperado = benchmark.unir_tablas_original(clientes, productos, ventas, detalle)
+    obtenido, salida = unir(clientes, productos, ventas, detalle)
+    pd.testing.assert_frame_equal(obtenido, esperado)
+    assert "2 filas con 'id_producto' sin correspondencia" in salida
+    assert "'id_venta' sin correspondencia" in salida
+
+
+def test_ids_dispersos_igual_a_merges(excels):
+    """Ids muy grandes o negativos no entran en el arreglo indexado: misma salida con el índice hash"""
+    clientes, productos, ventas, detalle = (t.copy() for t in excels)
+    productos["id_producto"] = productos["id_producto"] * 10**9
+    detalle["id_producto"] = detalle["id_producto"] * 10**9
+    clientes["id_cliente"] = -clientes["id_cliente"]
+    ventas["id_cliente"] = -ventas["id_cliente"]
+    obtenido, _ = unir(clientes, productos, ventas, detalle)
+    pd.testing.assert_frame_equal(obtenido, benchmark.unir_tablas_original(clientes, productos, ventas, detalle))
+
+
+def test_clave_repetida_en_una_dimension_falla(excels):
+    clientes, productos, ventas, detalle = excels
+    productos = pd.concat([productos, productos.head(1)], ignore_index=True)
+    with pytest.raises(ValueError, match="id_producto"):
+        unir(clientes, productos, ventas, detalle)
+
+
+def test_posiciones_por_clave():
+    dimension = pd.Series([30, 10, 20])
+    assert Programa.posiciones_por_clave(dimension, pd.Series([10, 20, 30, 40, -1])).tolist() == [1, 2, 0, -1, -1]
+    assert Programa.posiciones_por_clave(pd.Series(["b", "a"]), pd.Series(["a", "c"])).tolist() == [1, -1]